@@ -6,8 +6,11 @@ setup(
     description='A simple Python project.',
     author='Your Name',
     author_email='your.email@example.com',
-    packages=find_packages(),
+    packages=find_packages('src'),
+    package_dir={'': 'src'},
     entry_points={
-        'console_scripts': [],
+        'console_scripts': [
+            'py-gib-validate=py_gib.validate:main',
+        ],
     },
 )
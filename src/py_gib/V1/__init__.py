@@ -0,0 +1 @@
+# This file makes V1 a package.
@@ -0,0 +1,175 @@
+# py_gib/V1/async_sha256v1.py
+
+from typing import Any, Iterable, List, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+import asyncio
+import mmap
+import os
+import threading
+import time
+
+from .sha256v1 import SHA256V1_MODE_FAST, is_binary_source, sha256v1
+
+DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024
+"""
+ibgibs whose `data` and `rel8ns` are (about) at least this many bytes are
+hashed on the executor. Smaller ibgibs are hashed inline, since a thread hop
+costs more than the hash itself.
+"""
+
+DEFAULT_ASYNC_HASH_WORKERS = os.cpu_count() or 1
+"""
+Threads in the shared hashing executor. `hashlib` releases the GIL while
+hashing large buffers, so this many big payloads hash on separate cores.
+"""
+
+INLINE_BUDGET_S = 0.002
+"""
+`async_sha256v1_many` yields to the event loop after hashing inline for this
+long, so a long run of small ibgibs cannot stall other coroutines.
+"""
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """
+    Returns the shared, bounded executor used when no executor is passed,
+    creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_ASYNC_HASH_WORKERS,
+                thread_name_prefix='py_gib-hash',
+            )
+        return _executor
+
+def shutdown_hash_executor(wait: bool = True) -> None:
+    """
+    Shuts down the shared executor. A new one is created on next use.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+def _binary_size(data: Any) -> Optional[int]:
+    """
+    Size in bytes of binary `data`, or None if it cannot be known cheaply
+    (e.g. a stream).
+    """
+    if isinstance(data, memoryview):
+        return data.nbytes
+    if isinstance(data, (bytes, bytearray, mmap.mmap)):
+        return len(data)
+    if isinstance(data, os.PathLike):
+        try:
+            return os.path.getsize(data)
+        except OSError:
+            return None
+    return None
+
+def should_offload(ib_gib: Any, offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD) -> bool:
+    """
+    True if hashing `ib_gib` is worth a trip to the executor: its `data` is a
+    stream/file of unknown size, or its `data` and `rel8ns` add up to at
+    least `offload_threshold` bytes (binary `data` by its size, JSON by
+    `estimated_size`, which stops counting at the threshold).
+
+    Encoding JSON holds the GIL, but the event loop's thread still gets it
+    back every switch interval, so a large JSON ibgib on the executor only
+    slows the loop down instead of stalling it.
+    """
+    # (imported here, `parallel_sha256v1` imports this module.)
+    from .parallel_sha256v1 import estimated_size
+
+    data = ib_gib.get('data')
+    total = 0
+    if data is not None and not isinstance(data, str) and is_binary_source(data):
+        size = _binary_size(data)
+        if size is None:
+            return True
+        total = size
+    elif data is not None:
+        total = estimated_size(data, offload_threshold)
+    if total < offload_threshold:
+        rel8ns = ib_gib.get('rel8ns')
+        if rel8ns:
+            total += estimated_size(rel8ns, offload_threshold - total)
+    return total >= offload_threshold
+
+async def async_sha256v1(
+    ib_gib: Any,
+    mode: str = SHA256V1_MODE_FAST,
+    offload: Optional[bool] = None,
+    offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+    executor: Optional[Executor] = None,
+) -> str:
+    """
+    asyncio-friendly `sha256v1`, like the TS `async sha256v1`.
+
+    Large ibgibs (see `should_offload`) are hashed on `executor`
+    (default: the shared bounded executor, see `get_hash_executor`) so the
+    event loop keeps running. Everything else is hashed inline. `offload`
+    forces either behavior.
+
+    The gib is identical to `sha256v1(ib_gib, mode)`.
+    """
+    if offload is None:
+        offload = should_offload(ib_gib, offload_threshold)
+    if not offload:
+        return sha256v1(ib_gib, mode)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or get_hash_executor(), sha256v1, ib_gib, mode)
+
+async def async_sha256v1_many(
+    ib_gibs: Iterable[Any],
+    mode: str = SHA256V1_MODE_FAST,
+    max_concurrency: Optional[int] = None,
+    offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+    executor: Optional[Executor] = None,
+) -> List[str]:
+    """
+    Hashes every ibgib in `ib_gibs`, returning gibs in input order.
+
+    Large ibgibs are hashed on `executor`, at most `max_concurrency` at a
+    time (default: twice the shared executor's threads), so a burst of big
+    payloads cannot queue unbounded work or memory. Small ibgibs are
+    hashed inline, yielding to the event loop every `INLINE_BUDGET_S`.
+    """
+    if max_concurrency is None:
+        max_concurrency = 2 * DEFAULT_ASYNC_HASH_WORKERS
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+    loop = asyncio.get_running_loop()
+    executor = executor or get_hash_executor()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: List[Any] = []
+    futures: List[asyncio.Future] = []
+    budget_start = time.perf_counter()
+
+    try:
+        for ib_gib in ib_gibs:
+            if should_offload(ib_gib, offload_threshold):
+                await semaphore.acquire()
+                future = loop.run_in_executor(executor, sha256v1, ib_gib, mode)
+                future.add_done_callback(lambda _: semaphore.release())
+                futures.append(future)
+                results.append(future)
+                budget_start = time.perf_counter()
+            else:
+                results.append(sha256v1(ib_gib, mode))
+                if time.perf_counter() - budget_start >= INLINE_BUDGET_S:
+                    await asyncio.sleep(0)
+                    budget_start = time.perf_counter()
+        await asyncio.gather(*futures)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+    return [r.result() if isinstance(r, asyncio.Future) else r for r in results]
@@ -0,0 +1,226 @@
+# py_gib/V1/binary_encoding.py
+"""
+Binary record encoding for V1 ibgibs that stores `rel8ns`/`data` already in
+the canonical form `sha256v1` hashes.
+
+A record is a fixed header followed by five sections:
+
+    header   `_HEADER`: magic, flags, rel8ns/data kinds, section lengths
+    ib       UTF-8
+    gib      UTF-8
+    rel8ns   canonical JSON (sorted keys, compact, ASCII), if any
+    data     canonical JSON, or the raw bytes of binary data, if any
+    nulls    JSON list of the [block, key, key, ...] paths of the None-valued
+             dict entries that canonical JSON drops, if any
+
+Because the canonical JSON is stored as is, recomputing or checking a gib from
+a record (`IbGibRecordView.sha256v1`) is just hashing slices of the buffer: no
+parsing, sorting or re-serializing. `IbGibRecordView` reads records straight
+from any buffer (bytes, memoryview, mmap) without copying them, and
+`decode_ib_gib` rebuilds a dict equal to the one encoded (and with the same
+gib), with binary data as bytes.
+
+Only JSON-compatible ibgibs can be encoded: dict keys must be strings, and
+tuples come back as lists.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+import codecs
+import hashlib
+import json
+import struct
+
+from .canonical_json import to_canonical_json
+from .sha256v1 import _BUFFER_TYPES, _has_data, _has_rel8ns, is_binary_source
+from .types import IbGib_V1
+
+RECORD_MAGIC = b'IBR1'
+
+_HEADER = struct.Struct('>4sBBBIIIQI')
+"""magic, flags, rel8ns kind, data kind, ib/gib/rel8ns/data/nulls lengths"""
+
+FLAG_HAS_GIB = 1
+FLAG_HAS_REL8NS = 2
+"""`sha256v1` hashes the rel8ns (see `_has_rel8ns`)."""
+FLAG_HAS_DATA = 4
+"""`sha256v1` hashes the data (see `_has_data`)."""
+
+KIND_ABSENT = 0
+"""The key is not in the ibgib."""
+KIND_NULL = 1
+KIND_JSON = 2
+KIND_BINARY = 3
+
+_BLOCKS = ('rel8ns', 'data')
+
+_decode_utf8 = codecs.utf_8_decode
+
+def _null_paths(obj: Any, path: List[str], out: List[List[str]]) -> None:
+    """
+    Collects the paths of the None values canonical JSON drops, i.e. those of
+    dicts reachable from the block through dicts only.
+    """
+    for key, value in obj.items():
+        if value is None:
+            out.append(path + [key])
+        elif isinstance(value, dict):
+            _null_paths(value, path + [key], out)
+
+def _encode_block(name: str, block: Any, nulls: List[List[str]]) -> Tuple[int, bytes]:
+    if block is None:
+        return KIND_NULL, b''
+    if name == 'data' and is_binary_source(block):
+        if not isinstance(block, _BUFFER_TYPES):
+            raise ValueError(f'[encode_ib_gib] binary data must be a buffer, got {type(block).__name__}')
+        return KIND_BINARY, block if isinstance(block, bytes) else bytes(block)
+    if isinstance(block, dict):
+        _null_paths(block, [name], nulls)
+    return KIND_JSON, to_canonical_json(block).encode('ascii')
+
+def encode_ib_gib(ib_gib: Union[dict, IbGib_V1]) -> bytes:
+    """
+    Encodes `ib_gib` (a dict or `IbGib_V1`) as a binary record. Binary `data`
+    must be a buffer (not a file or stream).
+    """
+    if isinstance(ib_gib, dict):
+        unknown = set(ib_gib) - {'ib', 'gib', 'rel8ns', 'data'}
+        if unknown:
+            raise ValueError(f'[encode_ib_gib] unexpected ibgib keys: {sorted(unknown)}')
+    ib = ib_gib.get('ib')
+    if not isinstance(ib, str):
+        raise ValueError(f'[encode_ib_gib] ib must be a string, got {type(ib).__name__}')
+    gib = ib_gib.get('gib')
+
+    flags = 0
+    if gib is not None:
+        flags |= FLAG_HAS_GIB
+    if _has_rel8ns(ib_gib.get('rel8ns')):
+        flags |= FLAG_HAS_REL8NS
+    if _has_data(ib_gib.get('data')):
+        flags |= FLAG_HAS_DATA
+
+    nulls: List[List[str]] = []
+    kinds = []
+    sections = [ib.encode('utf-8'), (gib or '').encode('utf-8')]
+    for name in _BLOCKS:
+        if name in ib_gib:
+            kind, section = _encode_block(name, ib_gib.get(name), nulls)
+        else:
+            kind, section = KIND_ABSENT, b''
+        kinds.append(kind)
+        sections.append(section)
+    sections.append(json.dumps(nulls, separators=(',', ':')).encode('ascii') if nulls else b'')
+
+    header = _HEADER.pack(RECORD_MAGIC, flags, kinds[0], kinds[1], *(len(s) for s in sections))
+    return b''.join([header, *sections])
+
+class IbGibRecordView:
+    """
+    Read-only view of one binary record at `offset` in `buffer` (bytes,
+    memoryview, mmap, ...). Sections are memoryview slices of the buffer;
+    nothing is copied until a value is decoded.
+
+    `nbytes` is the size of the record, so records laid end to end can be
+    walked with `IbGibRecordView(buffer, offset + view.nbytes)`.
+    """
+    __slots__ = ('_view', 'flags', 'rel8ns_kind', 'data_kind', '_sections', 'nbytes')
+
+    def __init__(self, buffer: Any, offset: int = 0):
+        view = memoryview(buffer)
+        if view.ndim != 1 or view.format not in ('B', 'b', 'c'):
+            view = view.cast('B')
+        if len(view) - offset < _HEADER.size:
+            raise ValueError(f'[IbGibRecordView] truncated record header at {offset}')
+        magic, flags, rel8ns_kind, data_kind, *lengths = _HEADER.unpack_from(view, offset)
+        if magic != RECORD_MAGIC:
+            raise ValueError(f'[IbGibRecordView] not an ibgib record at {offset}: {bytes(magic)!r}')
+        sections = []
+        position = offset + _HEADER.size
+        for length in lengths:
+            sections.append(view[position:position + length])
+            position += length
+        if position > len(view):
+            raise ValueError(f'[IbGibRecordView] truncated record at {offset}: needs {position - offset} bytes')
+        self._view = view
+        self.flags = flags
+        self.rel8ns_kind = rel8ns_kind
+        self.data_kind = data_kind
+        self._sections = sections
+        self.nbytes = position - offset
+
+    @property
+    def ib(self) -> str:
+        return _decode_utf8(self._sections[0])[0]
+
+    @property
+    def gib(self) -> Optional[str]:
+        return _decode_utf8(self._sections[1])[0] if self.flags & FLAG_HAS_GIB else None
+
+    @property
+    def rel8ns_json(self) -> memoryview:
+        """
+        The canonical JSON `sha256v1` hashes for the rel8ns (empty if none).
+        """
+        return self._sections[2]
+
+    @property
+    def data_bytes(self) -> memoryview:
+        """
+        The raw binary data, or the canonical JSON of the data (empty if none).
+        """
+        return self._sections[3]
+
+    def _block(self, index: int, kind: int) -> Any:
+        if kind == KIND_BINARY:
+            return bytes(self._sections[index])
+        if kind == KIND_JSON:
+            return json.loads(_decode_utf8(self._sections[index])[0])
+        return None
+
+    def to_ib_gib(self) -> dict:
+        """
+        Decodes the whole record into an ibgib dict.
+        """
+        ib_gib: Dict[str, Any] = {'ib': self.ib}
+        if self.flags & FLAG_HAS_GIB:
+            ib_gib['gib'] = self.gib
+        for index, (name, kind) in enumerate(zip(_BLOCKS, (self.rel8ns_kind, self.data_kind)), start=2):
+            if kind != KIND_ABSENT:
+                ib_gib[name] = self._block(index, kind)
+        if self._sections[4]:
+            for name, *keys in json.loads(_decode_utf8(self._sections[4])[0]):
+                target = ib_gib[name]
+                for key in keys[:-1]:
+                    target = target[key]
+                target[keys[-1]] = None
+        return ib_gib
+
+    def sha256v1(self, salt: str = '') -> str:
+        """
+        The punctiliar gib, identical to `sha256v1(self.to_ib_gib(), salt=salt)`,
+        hashed straight from the stored canonical sections.
+        """
+        prefix = hashlib.sha256(salt.encode('utf-8')) if salt else None
+
+        def hex_(message: Any) -> str:
+            if prefix is None:
+                # unsalted, an empty message hashes to '' (see `_hash_to_hex`).
+                return hashlib.sha256(message).hexdigest().upper() if len(message) else ''
+            hasher = prefix.copy()
+            hasher.update(message)
+            return hasher.hexdigest().upper()
+
+        has_rel8ns = self.flags & FLAG_HAS_REL8NS
+        has_data = self.flags & FLAG_HAS_DATA
+        ib_hash = hex_(self._sections[0])
+        if not (has_rel8ns or has_data):
+            return hex_(ib_hash.encode('ascii'))
+        rel8ns_hash = hex_(self._sections[2]) if has_rel8ns else ''
+        data_hash = hex_(self._sections[3]) if has_data else ''
+        return hex_((ib_hash + rel8ns_hash + data_hash).encode('ascii'))
+
+def decode_ib_gib(buffer: Any, offset: int = 0) -> dict:
+    """
+    Decodes the record at `offset` of `buffer` into an ibgib dict.
+    """
+    return IbGibRecordView(buffer, offset).to_ib_gib()
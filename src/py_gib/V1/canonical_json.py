@@ -0,0 +1,170 @@
+# py_gib/V1/canonical_json.py
+
+from typing import Any, Callable, List, Optional
+import json
+
+# Same settings as the reference path in sha256v1:
+#   json.dumps(to_normalized_for_hashing(obj), sort_keys=True, separators=(',', ':'))
+_encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+_encode_str = json.encoder.encode_basestring_ascii
+
+if json.encoder.c_make_encoder is not None:
+    # build the C encoder once instead of once per `JSONEncoder.encode` call.
+    # markers=None skips circular reference checks, same as check_circular=False.
+    _c_iterencode = json.encoder.c_make_encoder(
+        None, _encoder.default, _encode_str, None, ':', ',', True, False, True,
+    )
+    def _encode(obj: Any) -> str:
+        if isinstance(obj, str):
+            return _encode_str(obj)
+        return ''.join(_c_iterencode(obj, 0))
+else:
+    _encode = _encoder.encode
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+"""
+Number of characters accumulated before they are flushed to the sink.
+"""
+
+def _key_to_str(key: Any) -> str:
+    """
+    Converts a dict key the same way the json module does (skipkeys=False).
+    """
+    if isinstance(key, str):
+        return key
+    if isinstance(key, float):
+        return _encode(key)
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(f'keys must be str, int, float, bool or None, not {key.__class__.__name__}')
+
+def _encode_leaf(obj: Any) -> Optional[str]:
+    """
+    Encodes `obj` in one C encoder call if it needs no walking, else None.
+
+    Non-dicts are always leaves. A dict is a leaf if none of its values are
+    dicts, in which case the C encoder sorts its keys the same way once the
+    `None` values are dropped.
+    """
+    if not isinstance(obj, dict):
+        return _encode(obj)
+    has_none = False
+    for value in obj.values():
+        if value is None:
+            has_none = True
+        elif isinstance(value, dict):
+            return None
+    if has_none:
+        obj = {k: v for k, v in obj.items() if v is not None}
+    return _encode(obj)
+
+class _CanonicalWriter:
+    """
+    Walks an object once, writing canonical JSON into `sink` in buffered chunks.
+
+    Only dicts reachable through other dicts are walked in Python, since that
+    is the only place `to_normalized_for_hashing` drops `None` values. Every
+    other value (including lists, whose contents are never normalized) is
+    handed to the C encoder in one call.
+    """
+    __slots__ = ('sink', 'buffer_size', 'parts', 'size')
+
+    def __init__(self, sink: Callable[[str], None], buffer_size: int):
+        self.sink = sink
+        self.buffer_size = buffer_size
+        self.parts: List[str] = []
+        self.size = 0
+
+    def write(self, s: str) -> None:
+        self.parts.append(s)
+        self.size += len(s)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.parts:
+            self.sink(''.join(self.parts))
+            self.parts = []
+            self.size = 0
+
+    def write_value(self, obj: Any) -> None:
+        leaf = _encode_leaf(obj)
+        if leaf is not None:
+            self.write(leaf)
+            return
+
+        write = self.write
+        sep = '{'
+        for key in sorted(obj):
+            value = obj[key]
+            if value is None:
+                continue
+            prefix = sep + _encode_str(_key_to_str(key)) + ':'
+            sep = ','
+            leaf = _encode_leaf(value)
+            if leaf is None:
+                write(prefix)
+                self.write_value(value)
+            else:
+                write(prefix + leaf)
+        write('{}' if sep == '{' else '}')
+
+def to_canonical_json(obj: Any) -> str:
+    """
+    Returns the canonical JSON string for `obj`, i.e. exactly
+
+        json.dumps(to_normalized_for_hashing(obj), sort_keys=True, separators=(',', ':'))
+
+    but built in a single walk without the intermediate normalized copy.
+    """
+    chunks: List[str] = []
+    writer = _CanonicalWriter(chunks.append, DEFAULT_BUFFER_SIZE)
+    writer.write_value(obj)
+    writer.flush()
+    return ''.join(chunks)
+
+def encode_canonical_compact(obj: Any) -> str:
+    """
+    `obj` as compact JSON with sorted keys, in one C encoder call. Unlike
+    `to_canonical_json` it keeps `None` dict values, so the two only agree
+    when no dict in `obj` has any.
+    """
+    return _encode(obj)
+
+def encode_canonical_key(key: Any) -> str:
+    """
+    The JSON string `to_canonical_json` writes for the dict key `key`, quotes
+    included.
+    """
+    return _encode_str(_key_to_str(key))
+
+def update_canonical_json(hasher: Any, obj: Any, buffer_size: int = DEFAULT_BUFFER_SIZE) -> int:
+    """
+    Feeds the canonical JSON for `obj` into `hasher` (anything with a hashlib
+    style `update`) as UTF-8, one buffered chunk at a time.
+
+    Returns the number of bytes fed to the hasher.
+    """
+    leaf = _encode_leaf(obj)
+    if leaf is not None:
+        # common small case, skip the writer entirely.
+        b = leaf.encode('utf-8')
+        hasher.update(b)
+        return len(b)
+
+    total = 0
+    def sink(s: str) -> None:
+        nonlocal total
+        b = s.encode('utf-8')
+        total += len(b)
+        hasher.update(b)
+    writer = _CanonicalWriter(sink, buffer_size)
+    writer.write_value(obj)
+    writer.flush()
+    return total
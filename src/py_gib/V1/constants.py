@@ -0,0 +1,47 @@
+# py_gib/V1/constants.py
+
+IB = 'ib'
+"""
+This is essentially an alias of the string literal `'ib'`
+"""
+
+GIB = 'gib'
+"""
+This is essentially an alias of the string literal `'gib'`
+
+When you have a primitive ibgib, this should be the `ib_gib['gib']` value, as
+there is no hashing metadata for primitives.
+"""
+
+ROOT = {'ib': IB, 'gib': GIB}
+"""
+This is the root ibgib from which all ibgib are ultimately forked.
+It has 0 and infinite data, 0 and infinite rel8ns. Its ib and gib
+are simply 'ib' and 'gib'.
+"""
+
+IBGIB_DELIMITER = '^'
+"""
+The default delimiter is the caret (^) symbol. This is derived from
+taking an ib^gib address and turning it into an ibGib object.
+"""
+
+GIB_DELIMITER = '.'
+"""
+Gib is often just a single hash for a single ib^gib record.
+But if the ibgib has a tjp, which implies a timeline, then we will include
+the tjp gib hash alongside the individual punctiliar ibgib frame.
+
+e.g. "comment abc^TJPHASH123", "comment abc^THISRECORDHASH456.TJPHASH123"
+"""
+
+ROOT_ADDR = 'ib^gib'
+"""
+This is the address of the ROOT ibgib with the default delimiter (caret ^).
+"""
+
+FORBIDDEN_ADD_RENAME_REMOVE_REL8N_NAMES = ['past', 'ancestor', 'dna', 'tjp']
+"""
+Some rel8ns should not be able to be renamed or removed, as these have
+"special" semantic meaning in the low-level graphing protocol.
+"""
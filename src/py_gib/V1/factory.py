@@ -0,0 +1,103 @@
+# py_gib/V1/factory.py
+
+from typing import Any, Dict, List, Optional
+
+from .constants import GIB, IB, ROOT
+from .types import TransformResult
+from .transforms.fork import fork
+from .transforms.mut8 import mut8
+from .transforms.rel8 import rel8
+
+class Factory_V1:
+    """
+    Port of the TS `Factory_V1`.
+    """
+    @staticmethod
+    def root() -> dict:
+        return Factory_V1.primitive(ib=IB)
+
+    @staticmethod
+    def primitive(ib: str) -> dict:
+        """
+        Returns an ibgib primitive with the given `ib`, e.g. `{'ib': '7', 'gib': 'gib'}`.
+        """
+        return {'ib': ib, 'gib': GIB}
+
+    @staticmethod
+    def primitives(ibs: List[str]) -> List[dict]:
+        """
+        Generates a primitive ibgib for each of `ibs`.
+        """
+        return [Factory_V1.primitive(ib=ib) for ib in ibs]
+
+    @staticmethod
+    def first_gen(
+        ib: str = IB,
+        parent_ib_gib: Optional[dict] = None,
+        data: Optional[Any] = None,
+        rel8ns: Optional[Dict[str, List[str]]] = None,
+        dna: bool = False,
+        tjp: Optional[dict] = None,
+        linked_rel8ns: Optional[List[str]] = None,
+        no_timestamp: bool = False,
+        n_counter: bool = False,
+    ) -> TransformResult:
+        """
+        Forks `parent_ib_gib` (default: the root) to a new ibgib with `ib`,
+        then applies `data` (mut8) and/or `rel8ns` (rel8), if any.
+
+        Returns the transform result of the last step, with the earlier
+        steps' ibgibs in `intermediate_ib_gibs` and, if `dna`, every step's
+        dna in `dnas`.
+        """
+        lc = '[first_gen]'
+        interim_results: List[TransformResult] = []
+        src = parent_ib_gib or ROOT
+        res_fork = fork(
+            src,
+            dest_ib=ib,
+            tjp=tjp,
+            dna=dna,
+            linked_rel8ns=linked_rel8ns,
+            no_timestamp=no_timestamp,
+            n_counter=n_counter,
+        )
+        interim_results.append(res_fork)
+        src = res_fork['new_ib_gib']
+
+        if data:
+            res_mut8 = mut8(
+                src,
+                data_to_add_or_patch=data,
+                dna=dna,
+                linked_rel8ns=linked_rel8ns,
+                no_timestamp=no_timestamp,
+                n_counter=n_counter,
+            )
+            interim_results.append(res_mut8)
+            src = res_mut8['new_ib_gib']
+
+        if rel8ns:
+            res_rel8 = rel8(
+                src,
+                rel8ns_to_add_by_addr=rel8ns,
+                dna=dna,
+                linked_rel8ns=linked_rel8ns,
+                no_timestamp=no_timestamp,
+                n_counter=n_counter,
+            )
+            interim_results.append(res_rel8)
+
+        if len(interim_results) > 1:
+            result: TransformResult = {
+                'new_ib_gib': interim_results[-1]['new_ib_gib'],
+                'intermediate_ib_gibs': [x['new_ib_gib'] for x in interim_results[:-1]],
+            }
+            if dna:
+                result['dnas'] = [d for res in interim_results for d in res.get('dnas') or []]
+            return result
+        elif len(interim_results) == 1:
+            # for some reason the caller just used this as a fork.
+            return interim_results[0]
+        else:
+            raise ValueError(f"{lc} hmm, I'm not sure...")
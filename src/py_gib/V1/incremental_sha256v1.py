@@ -0,0 +1,392 @@
+# py_gib/V1/incremental_sha256v1.py
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import bisect
+import hashlib
+import itertools
+import operator
+
+from . import instrumentation as _instrumentation
+from .canonical_json import (
+    encode_canonical_compact,
+    encode_canonical_key,
+    to_canonical_json,
+    update_canonical_json,
+)
+from .sha256v1 import SHA256V1_MODE_FAST, _has_data, _has_rel8ns, get_sha256v1_hasher, is_binary_source, sha256v1
+from .types import IbGib_V1
+
+DEFAULT_CHECKPOINT_BYTES = 4096
+"""
+Target size of a block's segments, i.e. a `hashlib` state is saved at a key
+boundary about every this many bytes of canonical JSON.
+"""
+
+MIN_SEGMENTS = 4
+"""
+Blocks shorter than this many `checkpoint_bytes` are hashed in one pass, which
+is faster than finding and re-encoding their changed segments.
+"""
+
+LIST_STATE_MIN_ITEMS = 32
+"""
+Lists of strings (e.g. `past`) with at least this many items get a segment of
+their own, with a state saved just before their closing `]`, so that a list
+that only grew at the end resumes from there.
+"""
+
+_MAX_LIST_PIECES = 64
+"""
+A list segment's bytes are kept as one piece per growth, joined once there
+are more than this many.
+"""
+
+_STR_ONLY = {str}
+_CONTAINERS = frozenset((dict, list, tuple))
+
+def _same_value(a: Any, b: Any) -> bool:
+    """
+    True if `a` and `b` are known to have the same canonical JSON, as long
+    as containers that are the same object also have the same `_fingerprint`.
+
+    Containers only match if they are the very same object: the transforms
+    share every untouched sub-structure, so this finds the unchanged values
+    of a timeline's frames without encoding them. Scalars match by exact type
+    and value (1, 1.0 and True all encode differently).
+    """
+    if a is b:
+        return True
+    t = type(a)
+    if t is not type(b):
+        return False
+    if t is str or t is int or t is bool:
+        return a == b
+    if t is float:
+        # repr keeps -0.0 distinct from 0.0 and makes nan equal to itself.
+        return float.__repr__(a) == float.__repr__(b)
+    return False
+
+def _is_long_list(value: Any) -> bool:
+    return type(value) is list and len(value) >= LIST_STATE_MIN_ITEMS
+
+def _all_same(a: List[Any], b: List[Any]) -> bool:
+    return all(map(operator.is_, a, b))
+
+def _collect(value: Any, sizes: List[int], refs: List[Any]) -> None:
+    if type(value) is dict:
+        refs.extend(value)
+        children = tuple(value.values())
+    else:
+        children = value
+    sizes.append(len(children))
+    refs.extend(children)
+    for child in itertools.compress(children, map(_CONTAINERS.__contains__, map(type, children))):
+        _collect(child, sizes, refs)
+
+def _fingerprint(value: Any) -> Tuple[Any, Any]:
+    """
+    What can change in a container without it becoming another object, so
+    that one the previous block also had can be checked for in-place changes:
+
+    - for a long list of strings (e.g. `past`), its length and a copy of it
+      (compared with `==`, which is by identity for the strings it shares),
+    - otherwise the sizes of it and every container in it, and every key and
+      value in them, as references (kept, so none is freed and its id reused).
+    """
+    if _is_long_list(value) and set(map(type, value)) <= _STR_ONLY:
+        return len(value), value[:]
+    sizes: List[int] = []
+    refs: List[Any] = []
+    _collect(value, sizes, refs)
+    return tuple(sizes), tuple(refs)
+
+def _grown_list_fingerprint(value: list, old_fingerprint: Any) -> Optional[Tuple[int, list]]:
+    """
+    `_fingerprint` of the long list `value` if it holds the items of the
+    previous block's long list of strings (as they were when it was hashed)
+    with only strings added at the end (e.g. a grown `past`), else None.
+    Saves looking at the type of every item.
+    """
+    if old_fingerprint is None or type(old_fingerprint[0]) is not int:
+        return None
+    n, items = old_fingerprint
+    if len(value) < n or value[:n] != items:
+        return None
+    if not set(map(type, value[n:])) <= _STR_ONLY:
+        return None
+    return len(value), value[:]
+
+def _same_fingerprint(a: Optional[Tuple[Any, Any]], b: Optional[Tuple[Any, Any]]) -> bool:
+    if a is b:
+        # both None, i.e. scalars.
+        return True
+    if a is None or b is None or a[0] != b[0]:
+        return False
+    if type(a[0]) is int:
+        return a[1] == b[1]
+    return len(a[1]) == len(b[1]) and all(map(operator.is_, a[1], b[1]))
+
+def _all_same_fingerprints(a: List[Any], b: List[Any]) -> bool:
+    # scalars' None fingerprints are skipped in C.
+    pairs = itertools.compress(zip(a, b), map(operator.is_not, a, b))
+    return all(_same_fingerprint(x, y) for x, y in pairs)
+
+class _Segment:
+    """
+    Entries `[start, end)` of a block's canonical JSON: the hashing state
+    before them and their encoded bytes. A long list of strings (see
+    `LIST_STATE_MIN_ITEMS`) is a segment of its own, whose `pieces` leave out
+    the closing `]` and whose `list_state` is the state right before it.
+    """
+    __slots__ = ('start', 'end', 'state', 'pieces', 'nbytes', 'list_state')
+
+    def __init__(self, start: int, end: int, state: Any, pieces: List[bytes], list_state: Any = None):
+        self.start = start
+        self.end = end
+        self.state = state
+        self.pieces = pieces
+        self.nbytes = sum(map(len, pieces)) + (1 if list_state is not None else 0)
+        self.list_state = list_state
+
+class _BlockState:
+    """
+    What is kept of the last `rel8ns` or `data` dict hashed: its size and,
+    unless it was small, its entries in canonical order, their values'
+    `_fingerprint`s (None for scalars) and its segments.
+    """
+    __slots__ = ('nbytes', 'keys', 'values', 'fingerprints', 'segments')
+
+    def __init__(
+        self,
+        nbytes: int,
+        keys: Optional[List[Any]] = None,
+        values: Optional[List[Any]] = None,
+        fingerprints: Optional[List[Any]] = None,
+        segments: Optional[List[_Segment]] = None,
+    ):
+        self.nbytes = nbytes
+        self.keys = keys
+        self.values = values
+        self.fingerprints = fingerprints
+        self.segments = segments or []
+
+class IncrementalSha256V1Hasher:
+    """
+    `sha256v1` for successive frames of one timeline.
+
+    Consecutive frames usually differ in a few `data` keys and in their `past`
+    (and `dna`) lists, which only grow at the end. Since canonical JSON sorts
+    keys, everything before the first changed key serializes to the same
+    bytes. So for each of `rel8ns` and `data` the hasher keeps the last block
+    as segments of about `checkpoint_bytes` (see `DEFAULT_CHECKPOINT_BYTES`),
+    each with the `hashlib` state before it and its encoded bytes. A new frame
+    resumes from the state before its first changed key. After that, only
+    changed segments are serialized again; unchanged ones are just digested.
+    A grown list of addresses resumes from just before its old `]`, so only
+    the new addresses are serialized.
+
+    Gibs are identical to `sha256v1(ib_gib, salt=salt)`. Frames do not have to
+    be related at all (unrelated ones just start over), but only the frames
+    of a timeline, whose unchanged values are shared objects (see the
+    transforms), reuse anything. A value that is the same object as before
+    is still checked for changes made to it in place (see `_fingerprint`),
+    without encoding it. Blocks that are not dicts are hashed in full.
+
+    Keeps about one copy of each block's canonical JSON, plus a shallow copy
+    of its long lists. Not thread safe: use one hasher per timeline.
+    """
+    __slots__ = ('salt', 'checkpoint_bytes', '_prefix', '_blocks')
+
+    def __init__(self, salt: str = '', checkpoint_bytes: int = DEFAULT_CHECKPOINT_BYTES):
+        if checkpoint_bytes < 1:
+            raise ValueError(f"checkpoint_bytes must be at least 1, got {checkpoint_bytes}")
+        self.salt = salt
+        self.checkpoint_bytes = checkpoint_bytes
+        self._prefix = hashlib.sha256(salt.encode('utf-8'))
+        self._blocks: Dict[str, Optional[_BlockState]] = {'rel8ns': None, 'data': None}
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(salt={self.salt!r}, checkpoint_bytes={self.checkpoint_bytes})'
+
+    def reset(self) -> None:
+        """
+        Forgets every saved state, e.g. before switching to another timeline.
+        """
+        self._blocks = {'rel8ns': None, 'data': None}
+
+    def _block_hex(self, name: str, block: dict) -> str:
+        previous = self._blocks[name]
+        checkpoint_bytes = self.checkpoint_bytes
+        if previous is None or previous.nbytes < MIN_SEGMENTS * checkpoint_bytes:
+            # first or small block: nothing worth resuming from, one pass.
+            hasher = self._prefix.copy()
+            nbytes = update_canonical_json(hasher, block)
+            hex = hasher.hexdigest().upper()
+            self._blocks[name] = _BlockState(nbytes)
+            return hex
+
+        # same order as the canonical writer (which sorts before dropping Nones).
+        keys = sorted(block)
+        values = list(map(block.__getitem__, keys))
+        if None in values:
+            keys = [key for key, value in zip(keys, values) if value is not None]
+            values = [value for value in values if value is not None]
+        n_keys = len(keys)
+
+        old_keys = previous.keys or []
+        old_values = previous.values or []
+        old_fingerprints = previous.fingerprints or []
+        fingerprints: List[Any] = [None] * n_keys
+        # long lists of strings that only grew at the end since the previous block.
+        grown = set()
+        for index in itertools.compress(itertools.count(), map(_CONTAINERS.__contains__, map(type, values))):
+            value = values[index]
+            fingerprint = None
+            if _is_long_list(value) and index < len(old_keys) and _same_value(keys[index], old_keys[index]):
+                fingerprint = _grown_list_fingerprint(value, old_fingerprints[index])
+                if fingerprint is not None:
+                    grown.add(index)
+            fingerprints[index] = fingerprint or _fingerprint(value)
+        old_segments = previous.segments
+        # find the first entry that differs from the previous block's. Shared
+        # keys and scalar values are skipped in C, by identity.
+        common = min(n_keys, len(old_keys))
+        first = common
+        candidates = itertools.compress(
+            itertools.count(),
+            map(operator.or_,
+                map(operator.or_,
+                    map(operator.is_not, keys[:common], old_keys[:common]),
+                    map(operator.is_not, values[:common], old_values[:common])),
+                map(operator.is_not, fingerprints[:common], old_fingerprints[:common])),
+        )
+        for index in candidates:
+            if not (_same_value(keys[index], old_keys[index]) and _same_value(values[index], old_values[index])
+                    and _same_fingerprint(fingerprints[index], old_fingerprints[index])):
+                first = index
+                break
+
+        # resume before the segment holding the first change.
+        k = bisect.bisect_right([s.start for s in old_segments], first) - 1
+        if k < 0:
+            segments: List[_Segment] = []
+            i, hasher = 0, self._prefix.copy()
+        else:
+            segments = old_segments[:k]
+            i, hasher = old_segments[k].start, old_segments[k].state.copy()
+
+        aligned = n_keys == len(old_keys)
+        group = max(1, checkpoint_bytes * max(1, len(old_keys)) // previous.nbytes)
+        j = max(k, 0)
+        while i < n_keys:
+            state = hasher.copy()
+            while j < len(old_segments) and old_segments[j].start < i:
+                j += 1
+            next_old = old_segments[j] if aligned and j < len(old_segments) else None
+            old = next_old if next_old is not None and next_old.start == i else None
+
+            if old is not None and old.list_state is not None and i == first:
+                new_list = values[i]
+                # the old list may have grown in place since, so its length is
+                # the one in its fingerprint.
+                n = old_fingerprints[i][0]
+                if i in grown and len(new_list) > n:
+                    # the list only grew, by strings: hash just the new items.
+                    new_items = new_list[n:]
+                    piece = (',' + encode_canonical_compact(new_items)[1:-1]).encode('utf-8')
+                    hasher = old.list_state.copy()
+                    hasher.update(piece)
+                    pieces = old.pieces + [piece]
+                    if len(pieces) > _MAX_LIST_PIECES:
+                        pieces = [b''.join(pieces)]
+                    list_state = hasher.copy()
+                    hasher.update(b']')
+                    segments.append(_Segment(i, i + 1, old.state, pieces, list_state))
+                    i += 1
+                    continue
+
+            if old is not None and _all_same(keys[i:old.end], old_keys[i:old.end]) \
+                    and _all_same(values[i:old.end], old_values[i:old.end]) \
+                    and _all_same_fingerprints(fingerprints[i:old.end], old_fingerprints[i:old.end]):
+                # unchanged segment after an earlier change: digest its bytes.
+                for piece in old.pieces:
+                    hasher.update(piece)
+                list_state = None
+                if old.list_state is not None:
+                    list_state = hasher.copy()
+                    hasher.update(b']')
+                segments.append(_Segment(i, old.end, state, old.pieces, list_state))
+                i = old.end
+                continue
+
+            prefix = '{' if i == 0 else ','
+            value = values[i]
+            if _is_long_list(value) and set(map(type, value)) <= _STR_ONLY:
+                piece = (prefix + encode_canonical_key(keys[i]) + ':' + encode_canonical_compact(value)[:-1]).encode('utf-8')
+                hasher.update(piece)
+                list_state = hasher.copy()
+                hasher.update(b']')
+                segments.append(_Segment(i, i + 1, state, [piece], list_state))
+                i += 1
+                continue
+
+            # a fresh segment of plain entries. It ends before the next long
+            # list and at the next old segment boundary, so that later
+            # unchanged segments can still be reused.
+            end = min(n_keys, i + group)
+            if next_old is not None:
+                end = min(end, next_old.end if next_old.start == i else next_old.start)
+            if list in set(map(type, values[i + 1:end])):
+                for m in range(i + 1, end):
+                    if _is_long_list(values[m]):
+                        end = m
+                        break
+            text = to_canonical_json(dict(zip(keys[i:end], values[i:end])))
+            piece = (prefix + text[1:-1]).encode('utf-8')
+            hasher.update(piece)
+            segments.append(_Segment(i, end, state, [piece]))
+            group = max(1, (end - i) * checkpoint_bytes // len(piece))
+            i = end
+
+        hasher.update(b'}' if keys else b'{}')
+        hex = hasher.hexdigest().upper()
+        nbytes = sum(s.nbytes for s in segments) + (1 if keys else 2)
+        self._blocks[name] = _BlockState(nbytes, keys, values, fingerprints, segments)
+        return hex
+
+    def hash(self, ib_gib: Union[dict, IbGib_V1]) -> str:
+        """
+        `sha256v1(ib_gib, salt=self.salt)`, resuming from the previous frame's
+        saved states where it can.
+        """
+        if _instrumentation.active is not None:
+            return sha256v1(ib_gib, salt=self.salt)
+
+        data = ib_gib.get('data')
+        rel8ns = ib_gib.get('rel8ns')
+        has_rel8ns = _has_rel8ns(rel8ns)
+        has_data = _has_data(data)
+        hasher = get_sha256v1_hasher(self.salt)
+
+        ib_hash = hasher.hex_ib(ib_gib.get('ib'))
+        rel8ns_hash = self._block_hex('rel8ns', rel8ns) if has_rel8ns else ''
+        data_hash = ''
+        if has_data:
+            if is_binary_source(data):
+                data_hash = hasher.hex_bytes(data)
+            elif isinstance(data, dict):
+                data_hash = self._block_hex('data', data)
+            else:
+                data_hash = hasher.hex_json(data, SHA256V1_MODE_FAST, use_cache=False)
+
+        return hasher.hex_gib(ib_hash, rel8ns_hash, data_hash)
+
+    __call__ = hash
+
+    def hash_many(self, ib_gibs: Iterable[Union[dict, IbGib_V1]]) -> Iterator[str]:
+        """
+        Lazily hashes every ibgib in `ib_gibs` (e.g. a timeline's frames in
+        order), each resuming from the one before.
+        """
+        for ib_gib in ib_gibs:
+            yield self.hash(ib_gib)
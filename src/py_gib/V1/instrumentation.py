@@ -0,0 +1,136 @@
+# py_gib/V1/instrumentation.py
+
+from typing import Callable, Dict, Iterator, Optional
+from contextlib import contextmanager
+import threading
+
+PHASE_TOTAL = 'sha256v1'
+"""
+Whole `sha256v1` calls, including everything below.
+"""
+PHASE_NORMALIZE = 'normalize'
+"""
+`to_normalized_for_hashing` (reference mode).
+"""
+PHASE_JSON_DUMPS = 'json_dumps'
+"""
+`json.dumps` of the normalized block (reference mode).
+"""
+PHASE_ENCODE = 'encode'
+"""
+UTF-8 encoding of strings before they are hashed.
+"""
+PHASE_DIGEST = 'digest'
+"""
+Feeding bytes to sha-256 and producing the hex digest, including binary data.
+"""
+PHASE_CANONICAL_JSON = 'canonical_json'
+"""
+Fast mode's fused walk, which encodes and hashes in one pass, so its
+serialize/encode/digest time cannot be split.
+"""
+PHASE_CACHE_LOOKUP = 'cache_lookup'
+"""
+Fingerprinting and looking up a block in the sub-hash cache.
+"""
+
+PhaseSink = Callable[[str, float, int], None]
+"""
+`sink(phase, seconds, nbytes)`, called for every recorded phase.
+"""
+
+class PhaseStats:
+    __slots__ = ('calls', 'seconds', 'bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {'calls': self.calls, 'seconds': self.seconds, 'bytes': self.bytes}
+
+class HashInstrumentation:
+    """
+    Cumulative per-phase timings, call counts and bytes hashed for
+    `sha256v1`, plus an optional `sink` that sees every record as it happens
+    (e.g. to feed a metrics library).
+
+    Safe to share between threads.
+    """
+    def __init__(self, sink: Optional[PhaseSink] = None):
+        self.sink = sink
+        self._phases: Dict[str, PhaseStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, seconds: float, nbytes: int = 0) -> None:
+        with self._lock:
+            stats = self._phases.get(phase)
+            if stats is None:
+                stats = self._phases[phase] = PhaseStats()
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.bytes += nbytes
+        if self.sink is not None:
+            self.sink(phase, seconds, nbytes)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Snapshot of phase -> {'calls', 'seconds', 'bytes'}.
+        """
+        with self._lock:
+            return {phase: stats.to_dict() for phase, stats in self._phases.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._phases.clear()
+
+    def report(self) -> str:
+        """
+        Human-readable table of the stats, slowest phase first.
+        """
+        stats = self.stats()
+        lines = [f'{"phase":<16}{"calls":>12}{"seconds":>12}{"MB":>12}']
+        for phase, s in sorted(stats.items(), key=lambda x: x[1]['seconds'], reverse=True):
+            lines.append(f'{phase:<16}{s["calls"]:>12,}{s["seconds"]:>12.4f}{s["bytes"] / 1e6:>12.2f}')
+        return '\n'.join(lines)
+
+active: Optional[HashInstrumentation] = None
+"""
+The instrumentation `sha256v1` currently records into, or None (the default),
+in which case the only cost is one attribute check per call.
+"""
+
+def enable_instrumentation(sink: Optional[PhaseSink] = None) -> HashInstrumentation:
+    """
+    Turns on process-wide `sha256v1` instrumentation and returns it. Replaces
+    any previously enabled instrumentation.
+    """
+    global active
+    active = HashInstrumentation(sink=sink)
+    return active
+
+def disable_instrumentation() -> None:
+    global active
+    active = None
+
+def get_instrumentation() -> Optional[HashInstrumentation]:
+    return active
+
+@contextmanager
+def instrument(sink: Optional[PhaseSink] = None) -> Iterator[HashInstrumentation]:
+    """
+    Collects `sha256v1` stats for the duration of the `with` block, then
+    restores whatever instrumentation (if any) was active before.
+
+        with instrument() as stats:
+            sha256v1(ib_gib)
+        print(stats.report())
+    """
+    global active
+    previous = active
+    active = HashInstrumentation(sink=sink)
+    try:
+        yield active
+    finally:
+        active = previous
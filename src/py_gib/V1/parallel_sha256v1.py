@@ -0,0 +1,140 @@
+# py_gib/V1/parallel_sha256v1.py
+
+from typing import Any, Optional, Union
+from concurrent.futures import Executor, ThreadPoolExecutor
+import os
+import threading
+
+from . import instrumentation as _instrumentation
+from .async_sha256v1 import _binary_size
+from .sha256v1 import (
+    SHA256V1_MODE_FAST, SHA256V1_MODES, _has_data, _has_rel8ns, get_sha256v1_hasher, is_binary_source, sha256v1,
+)
+from .types import IbGib_V1
+
+PARALLEL_SUB_HASH_THRESHOLD = 256 * 1024
+"""
+`sha256v1_parallel` only hashes `rel8ns` and `data` concurrently when both are
+at least about this many bytes. Below it a thread hop costs more than it
+saves, so the plain sequential `sha256v1` is used.
+"""
+
+DEFAULT_SUB_HASH_WORKERS = os.cpu_count() or 1
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_sub_hash_executor() -> ThreadPoolExecutor:
+    """
+    Returns the shared executor used when no executor is passed, creating it
+    on first use. Separate from the async hashing executor so that an
+    offloaded `sha256v1` can never wait on a sub-hash queued behind it.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_SUB_HASH_WORKERS,
+                thread_name_prefix='py_gib-sub-hash',
+            )
+        return _executor
+
+def shutdown_sub_hash_executor(wait: bool = True) -> None:
+    """
+    Shuts down the shared executor. A new one is created on next use.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+def _forget_executor_after_fork() -> None:
+    # a forked child (e.g. a `pool.map_chunks` worker) inherits the executor
+    # object but not its threads; anything submitted to it would never run.
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_executor_after_fork)
+
+def estimated_size(value: Any, limit: int, depth: int = 2) -> int:
+    """
+    Cheap estimate of the serialized size of a `rel8ns`/`data` block, in bytes.
+
+    Strings and binary buffers count their length. Containers are walked at
+    most `depth` levels deep, deeper containers counting a guess per entry.
+    Stops as soon as the estimate reaches `limit`, so the cost is bounded no
+    matter how big `value` is. Streams of unknown size count as `limit`.
+    """
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        if depth <= 0:
+            return 16 * len(value)
+        total = 2
+        for key, item in value.items():
+            total += (len(key) if isinstance(key, str) else 8) + 4
+            total += len(item) + 2 if isinstance(item, str) else estimated_size(item, limit - total, depth - 1)
+            if total >= limit:
+                break
+        return total
+    if isinstance(value, (list, tuple)):
+        if depth <= 0:
+            return 16 * len(value)
+        total = 2
+        for item in value:
+            # (the common case, rel8n addresses, skips the call.)
+            total += len(item) + 3 if isinstance(item, str) else estimated_size(item, limit - total, depth - 1) + 1
+            if total >= limit:
+                break
+        return total
+    if is_binary_source(value):
+        size = _binary_size(value)
+        return limit if size is None else size
+    return 8
+
+def sha256v1_parallel(
+    ib_gib: Union[dict, IbGib_V1],
+    mode: str = SHA256V1_MODE_FAST,
+    use_cache: bool = True,
+    salt: str = '',
+    threshold: int = PARALLEL_SUB_HASH_THRESHOLD,
+    executor: Optional[Executor] = None,
+) -> str:
+    """
+    `sha256v1` for single very large ibgibs: the `data` sub-hash is computed
+    on `executor` (default: see `get_sub_hash_executor`) while this thread
+    computes the `rel8ns` sub-hash.
+
+    `hashlib` releases the GIL while digesting, so one block's digest (or all
+    of a binary `data` payload) overlaps with the other block's serialization.
+    On free-threaded builds both serializations run in parallel too.
+
+    Only ibgibs whose `rel8ns` and `data` are both at least `threshold`
+    bytes (see `estimated_size`) take this path; everything else is hashed by
+    the sequential `sha256v1`. The gib is always identical.
+    """
+    if mode not in SHA256V1_MODES:
+        raise ValueError(f"unknown sha256v1 mode: {mode!r}. expected one of {SHA256V1_MODES}")
+    data = ib_gib.get('data')
+    rel8ns = ib_gib.get('rel8ns')
+    if _instrumentation.active is not None or not (_has_rel8ns(rel8ns) and _has_data(data)):
+        return sha256v1(ib_gib, mode=mode, use_cache=use_cache, salt=salt)
+    if estimated_size(rel8ns, threshold) < threshold or estimated_size(data, threshold) < threshold:
+        return sha256v1(ib_gib, mode=mode, use_cache=use_cache, salt=salt)
+
+    hasher = get_sha256v1_hasher(salt)
+
+    def data_hex() -> str:
+        if is_binary_source(data):
+            return hasher.hex_bytes(data)
+        return hasher.hex_json(data, mode, use_cache)
+
+    future = (executor or get_sub_hash_executor()).submit(data_hex)
+    rel8ns_hash = hasher.hex_json(rel8ns, mode, use_cache)
+    data_hash = future.result()
+
+    ib_hash = hasher.hex_ib(ib_gib.get('ib'))
+    return hasher.hex_gib(ib_hash, rel8ns_hash, data_hash)
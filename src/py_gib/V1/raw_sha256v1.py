@@ -0,0 +1,227 @@
+# py_gib/V1/raw_sha256v1.py
+"""
+`sha256v1` of an ibgib given as raw JSON, hashing its `rel8ns`/`data` text
+as is when it is already canonical.
+
+Most ibgibs arrive in canonical compact form, i.e. their `rel8ns` and `data`
+already read exactly like `to_canonical_json` of their values. Hashing them
+the normal way parses them and then serializes them again, only to get back
+the same characters. Here, the raw text is scanned once (`json`'s own C
+scanner, one top-level value at a time, to know where each value starts and
+ends) and a `rel8ns`/`data` block that passes the checks below is hashed as
+it stands. Everything else goes through `json.loads` and `sha256v1`, so the
+gib is the same either way.
+
+A block is canonical if:
+
+- it is ASCII with no whitespace outside strings, and its escapes are the
+  ones `json.dumps` writes (lowercase `\\u` hex, no `\\/`),
+- its floats read as `repr` writes them (no `1e-7`, `1.50`) and there is no
+  `-0`,
+- the keys of every dict are sorted, unique and have no `null` values (nulls
+  in lists are kept by `to_normalized_for_hashing`, so they are fine).
+
+The top level has to be compact too (a JSONL line's newline aside), or the
+rest is not worth scanning.
+
+Blocks with no dicts below the top level (`rel8ns`, most `data`) are checked
+on the text. For deeper blocks, walking every dict in Python costs more than
+encoding the block again in C, so those are re-encoded and compared.
+
+The ibgib still has to be parsed, since callers need it, and the parse is
+most of what is left: about 1.2-2.9x on large ibgibs, and nothing for dicts
+of small dicts, which the canonical writer already encodes in C (see
+`bench/raw_canonical.py`).
+"""
+
+from typing import Any, Dict, Optional, Tuple, Union
+import json
+import re
+from json.decoder import scanstring
+
+from . import instrumentation as _instrumentation
+from .canonical_json import encode_canonical_compact, to_canonical_json
+from .sha256v1 import _has_data, _has_rel8ns, get_sha256v1_hasher, sha256v1
+
+RAW_FAST_PATH_MIN_SIZE = 1024
+"""
+Raw ibgibs shorter than this (in characters) skip the fast path. Scanning the
+top level in Python costs more than it saves on small ibgibs.
+"""
+
+class _NotCanonical(Exception):
+    pass
+
+def _parse_float(token: str) -> float:
+    value = float(token)
+    if float.__repr__(value) != token:
+        raise _NotCanonical()
+    return value
+
+_scan_once = json.JSONDecoder(parse_float=_parse_float).scan_once
+_BAD_ESCAPE = re.compile(
+    r'\\(?![nrtbf]|u(?:00(?:0[0-7bef]|1[0-9a-f])|007f|00[89a-f][0-9a-f]|0[1-9a-f][0-9a-f]{2}|[1-9a-f][0-9a-f]{3}))'
+)
+_NEGATIVE_ZERO = re.compile(r'-0(?![\d.eE])')
+_CONTAINERS = frozenset((dict, list))
+
+def _text(raw: Any) -> Optional[str]:
+    """
+    `raw` as a str, or None if only `json.loads` should handle it.
+    """
+    if isinstance(raw, str):
+        return raw
+    if isinstance(raw, (bytes, bytearray)) and json.detect_encoding(raw) == 'utf-8':
+        return raw.decode('utf-8', 'surrogatepass')
+    return None
+
+def _scan_object(text: str, idx: int, unique: bool = False) -> Tuple[dict, Dict[str, Tuple[int, int]], int]:
+    """
+    Parses the compact JSON object at `text[idx]` like `json.loads`, also
+    returning where each value starts and ends, and where the object ends.
+
+    Raises ValueError, StopIteration or IndexError on anything that is not
+    compact valid JSON, and `_NotCanonical` on a repeated key if `unique`.
+    Whitespace between the top-level tokens is not worth scanning any
+    further: whatever wrote it did not write canonical JSON below it either.
+    """
+    obj: dict = {}
+    spans: Dict[str, Tuple[int, int]] = {}
+    if text[idx] != '{':
+        raise ValueError("expected '{'")
+    idx += 1
+    if text[idx] == '}':
+        return obj, spans, idx + 1
+    while True:
+        if text[idx] != '"':
+            raise ValueError('expected a key')
+        key, idx = scanstring(text, idx + 1)
+        if unique and key in obj:
+            raise _NotCanonical()
+        if text[idx] != ':':
+            raise ValueError("expected ':'")
+        idx += 1
+        if key == 'rel8ns' and not unique and text[idx] == '{':
+            # a handful of rel8n names with long lists: checking their keys
+            # here costs less than counting them in the text later.
+            value, _, end = _scan_object(text, idx, unique=True)
+        else:
+            value, end = _scan_once(text, idx)
+        obj[key] = value
+        spans[key] = (idx, end)
+        separator = text[end]
+        idx = end + 1
+        if separator == '}':
+            return obj, spans, idx
+        if separator != ',':
+            raise ValueError("expected ',' or '}'")
+
+def _is_flat(value: Any) -> bool:
+    """
+    True if `value` has no dicts below its top level.
+    """
+    if isinstance(value, dict):
+        values = value.values()
+    elif isinstance(value, list):
+        values = value
+    else:
+        return True
+    types = set(map(type, values))
+    if dict in types:
+        return False
+    if list in types:
+        return all(type(v) is not list or _CONTAINERS.isdisjoint(map(type, v)) for v in values)
+    return True
+
+def _is_canonical_flat(value: Any, block: str, unique: bool) -> bool:
+    """
+    Text checks for a block with no dicts below its top level, once it is
+    known to be ASCII without newlines and tabs. `unique` if its keys are
+    already known to be unique.
+    """
+    # without `\\` and `\"`, every quote is a string delimiter.
+    text = block
+    if '\\' in text:
+        text = text.replace('\\\\', '__').replace('\\"', '__')
+        if '\\' in text and _BAD_ESCAPE.search(text):
+            return False
+    if isinstance(value, dict):
+        keys = list(value)
+        if keys != sorted(keys) or None in value.values():
+            return False
+        # only keys are followed by '":', so more of those than keys means a
+        # repeated key.
+        if not unique and text.count('":') != len(keys):
+            return False
+    if ' ' in text or '-' in text:
+        outside_strings = ''.join(text.split('"')[0::2])
+        if ' ' in outside_strings or _NEGATIVE_ZERO.search(outside_strings):
+            return False
+    return True
+
+def _is_canonical_block(value: Any, block: str, unique: bool) -> bool:
+    if not block.isascii() or '\n' in block or '\r' in block or '\t' in block or '\x7f' in block:
+        return False
+    if _is_flat(value):
+        return _is_canonical_flat(value, block, unique)
+    if '": ' in block:
+        # `json.dumps` default separators, not worth encoding to find out.
+        return False
+    # without nulls there is nothing to normalize, so the C encoder alone gives
+    # the canonical form.
+    expected = to_canonical_json(value) if 'null' in block else encode_canonical_compact(value)
+    return expected == block
+
+def _raw_sha256v1(text: str, salt: str = '') -> Optional[Tuple[dict, str]]:
+    """
+    The parsed ibgib and its gib, if `text` is an ibgib whose hashed blocks
+    are all canonical. Otherwise None, and the caller takes the normal path.
+    """
+    try:
+        ib_gib, spans, end = _scan_object(text, 0)
+        if text[end:].strip(' \t\n\r'):
+            return None
+    except (ValueError, StopIteration, IndexError, _NotCanonical):
+        return None
+    ib = ib_gib.get('ib')
+    if ib is not None and not isinstance(ib, str):
+        return None
+
+    hasher = get_sha256v1_hasher(salt)
+    sub_hashes = {'rel8ns': '', 'data': ''}
+    for key, present in (('rel8ns', _has_rel8ns), ('data', _has_data)):
+        value = ib_gib.get(key)
+        if not present(value):
+            continue
+        start, end = spans[key]
+        block = text[start:end]
+        if not _is_canonical_block(value, block, unique=key == 'rel8ns'):
+            return None
+        block_hasher = hasher.prefix_state()
+        block_hasher.update(block.encode('ascii'))
+        sub_hashes[key] = block_hasher.hexdigest().upper()
+
+    ib_hash = hasher.hex_ib(ib)
+    return ib_gib, hasher.hex_gib(ib_hash, sub_hashes['rel8ns'], sub_hashes['data'])
+
+def loads_sha256v1(raw: Union[str, bytes, bytearray], salt: str = '') -> Tuple[Any, str]:
+    """
+    `json.loads(raw)` and its `sha256v1(..., salt=salt)`, hashing canonical
+    `rel8ns`/`data` straight from `raw` (see the module docstring).
+
+    Raises whatever `json.loads` raises for invalid JSON, and whatever
+    `sha256v1` raises for JSON that is not an ibgib.
+    """
+    text = _text(raw)
+    if text is not None and len(text) >= RAW_FAST_PATH_MIN_SIZE and _instrumentation.active is None:
+        result = _raw_sha256v1(text, salt)
+        if result is not None:
+            return result
+    ib_gib = json.loads(raw)
+    return ib_gib, sha256v1(ib_gib, salt=salt)
+
+def sha256v1_raw(raw: Union[str, bytes, bytearray], salt: str = '') -> str:
+    """
+    `sha256v1(json.loads(raw), salt=salt)`, via `loads_sha256v1`.
+    """
+    return loads_sha256v1(raw, salt)[1]
@@ -1,8 +1,29 @@
-# python_ibgib/ibgib_helper.py
+# py_gib/V1/sha256v1.py
 
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+import functools
 import hashlib
 import json
+import mmap
+import os
+import time
+
+from . import instrumentation as _instrumentation
+from .canonical_json import update_canonical_json
+from .sub_hash_cache import get_sub_hash_cache
+from .types import IbGib_V1
+
+SHA256V1_MODE_FAST = 'fast'
+"""
+Default mode. Streams canonical JSON straight into the hasher in a single walk
+(see `canonical_json.py`).
+"""
+SHA256V1_MODE_REFERENCE = 'reference'
+"""
+Original path: `to_normalized_for_hashing` -> `json.dumps(sort_keys=True)` ->
+UTF-8 encode -> hash. Kept as the reference that all other modes must match.
+"""
+SHA256V1_MODES = (SHA256V1_MODE_FAST, SHA256V1_MODE_REFERENCE)
 
 def to_normalized_for_hashing(obj: Any) -> Any:
     """
@@ -43,100 +64,380 @@ def to_normalized_for_hashing(obj: Any) -> Any:
                 
     return normalized_dict
 
+HASH_CHUNK_SIZE = 1024 * 1024
+"""
+Binary sources (see `is_binary_source`) are fed to the hasher this many bytes
+at a time so that large payloads never need to be held in one `bytes` object.
+"""
+
+_BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+def is_binary_source(value: Any) -> bool:
+    """
+    True if `value` is hashed as raw bytes rather than as JSON, i.e. the Python
+    equivalents of the TS `Uint8Array` case:
+
+    - `bytes`, `bytearray`, `memoryview` or `mmap.mmap`
+    - a file-like object opened in binary mode (anything with `readinto`/`read`)
+    - an `os.PathLike` path to a file (plain `str` is never treated as a path)
+    """
+    if isinstance(value, _BUFFER_TYPES) or isinstance(value, os.PathLike):
+        return True
+    return not isinstance(value, str) and (hasattr(value, 'readinto') or hasattr(value, 'read'))
+
+def update_binary_source(hasher: Any, source: Any, chunk_size: int = HASH_CHUNK_SIZE) -> int:
+    """
+    Feeds the bytes of binary `source` into `hasher` in `chunk_size` chunks.
+
+    Buffers (bytes, bytearray, memoryview, mmap) are sliced through a
+    memoryview so nothing is copied. Files are read into one reused buffer.
+    File-like objects are read from their current position and are not closed.
+
+    Returns the number of bytes fed to the hasher.
+    """
+    if isinstance(source, _BUFFER_TYPES):
+        with memoryview(source) as view:
+            if view.ndim != 1 or view.format not in ('B', 'b', 'c'):
+                view = view.cast('B')
+            total = view.nbytes
+            for offset in range(0, total, chunk_size):
+                hasher.update(view[offset:offset + chunk_size])
+            return total
+
+    if isinstance(source, os.PathLike):
+        with open(source, 'rb', buffering=0) as f:
+            return update_binary_source(hasher, f, chunk_size)
+
+    total = 0
+    if hasattr(source, 'readinto'):
+        buffer = bytearray(chunk_size)
+        with memoryview(buffer) as view:
+            while True:
+                n = source.readinto(buffer)
+                if not n:
+                    break
+                hasher.update(view[:n])
+                total += n
+    else:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            total += len(chunk)
+    return total
+
 # Helper function for sha256v1
 def _hash_to_hex(message: Any) -> str:
     """
     Computes SHA256 hash and returns uppercase hex digest.
     Returns "" for None, empty string, or empty bytes.
-    Input `message` can be str or bytes.
+    Input `message` can be str or bytes, or any other binary source accepted
+    by `is_binary_source` (hashed in chunks, see `update_binary_source`).
     """
-    if not message:  # Handles None, empty string, empty bytes
+    if not message:  # Handles None, empty string, empty bytes/buffers
         return ""
-    
-    data_to_hash: bytes
-    if isinstance(message, bytes):
-        data_to_hash = message
-    elif isinstance(message, str):
-        data_to_hash = message.encode('utf-8')
-    else:
+
+    if isinstance(message, str):
+        return hashlib.sha256(message.encode('utf-8')).hexdigest().upper()
+    if isinstance(message, bytes) and len(message) <= HASH_CHUNK_SIZE:
+        return hashlib.sha256(message).hexdigest().upper()
+    if not is_binary_source(message):
         # This case should ideally not be reached if inputs are validated upstream
         # or are of expected types (str/bytes after JSON stringification).
-        return "" 
-
-    # Ensure that after encoding or if it was initially bytes, it's not empty.
-    # e.g. if an empty string was passed and encoded.
-    # However, `if not message:` at the start handles empty strings already.
-    # If `message` was non-empty string but encoded to empty bytes (e.g. weird unicode),
-    # this check might be relevant, but typically `encode()` on non-empty string
-    # produces non-empty bytes.
-    # For safety, checking `data_to_hash` might be redundant due to initial check.
-    # The first `if not message:` covers empty strings and empty bytes.
-    # Let's assume valid non-empty string/bytes make it here.
+        return ""
 
     hasher = hashlib.sha256()
-    hasher.update(data_to_hash)
+    if not update_binary_source(hasher, message):
+        # e.g. an empty file, treated the same as empty bytes.
+        return ""
     return hasher.hexdigest().upper()
 
-def sha256v1(ib_gib: dict) -> str:
+def _has_rel8ns(rel8ns: Any) -> bool:
     """
-    Replicates the no-salt version of the TypeScript sha256v1 function.
-    Computes a deterministic SHA256 hash for an ib_gib dictionary structure.
+    True if rel8ns is a non-empty dict and at least one of its values is a non-empty list.
+    (`IbGib_V1` records hold rel8ns as tuples, which serialize the same.)
     """
-    ib = ib_gib.get('ib')
-    data = ib_gib.get('data')
-    rel8ns = ib_gib.get('rel8ns')
-
-    # Determine has_rel8ns
-    # True if rel8ns is a non-empty dict and at least one of its values is a non-empty list.
-    has_rel8ns = False
     if rel8ns and isinstance(rel8ns, dict): # Ensure rel8ns is not None and is a dict
         for value in rel8ns.values():
-            if isinstance(value, list) and len(value) > 0:
-                has_rel8ns = True
-                break
-    
-    # Determine has_data
-    # True if data is present and not an empty string or empty dict. Bytes are always data.
-    has_data = False
-    if data is not None:
-        if isinstance(data, str):
-            has_data = len(data) > 0
-        elif isinstance(data, bytes):
-            # In TS, `data instanceof Uint8Array` sets `hasData = true` regardless of length.
-            has_data = True 
-        elif isinstance(data, dict):
-            has_data = bool(data) # True if dict is not empty
-        else:
-            # Other types (numbers, booleans, etc.) are considered data if not None.
-            has_data = True 
-
-    ib_hash = _hash_to_hex(ib)
-
-    rel8ns_hash = ""
-    if has_rel8ns:
-        normalized_rel8ns = to_normalized_for_hashing(rel8ns)
-        # Compact JSON string with sorted keys
-        json_rel8ns = json.dumps(normalized_rel8ns, sort_keys=True, separators=(',', ':'))
-        rel8ns_hash = _hash_to_hex(json_rel8ns)
-
-    data_hash = ""
-    if has_data:
-        if isinstance(data, bytes):
-            data_hash = _hash_to_hex(data) # Hash bytes directly
+            if isinstance(value, (list, tuple)) and len(value) > 0:
+                return True
+    return False
+
+def _has_data(data: Any) -> bool:
+    """
+    True if data is present and not an empty string or empty dict. Bytes are always data.
+    """
+    if data is None:
+        return False
+    if isinstance(data, str):
+        return len(data) > 0
+    if is_binary_source(data):
+        # In TS, `data instanceof Uint8Array` sets `hasData = true` regardless of length.
+        return True
+    if isinstance(data, dict):
+        return bool(data) # True if dict is not empty
+    # Other types (numbers, booleans, etc.) are considered data if not None.
+    return True
+
+def sha256v1(
+    ib_gib: Union[dict, IbGib_V1],
+    mode: str = SHA256V1_MODE_FAST,
+    use_cache: bool = True,
+    salt: str = '',
+) -> str:
+    """
+    Replicates the TypeScript sha256v1 function.
+    Computes a deterministic SHA256 hash for an ib_gib dictionary structure
+    (or an `IbGib_V1` record, which hashes the same as its dict form).
+
+    `mode` selects how `rel8ns`/`data` are serialized (see `SHA256V1_MODES`).
+    Every mode produces the same gib.
+
+    `use_cache=False` bypasses the opt-in sub-hash cache for this call (it is
+    a no-op unless `enable_sub_hash_cache` has been called).
+
+    `salt` is prepended to every hashed message, as in the TS
+    `sha256v1(ibGib, salt)`.
+
+    This is `Sha256V1Hasher.hash` on a hasher kept per salt (see
+    `get_sha256v1_hasher`); batch callers can hold their own.
+
+    Raises ValueError for an unknown `mode` or an `ib` that is not a string
+    (a missing `ib` hashes as "").
+    """
+    hasher = get_sha256v1_hasher(salt) if salt else _UNSALTED_HASHER
+    return hasher.hash(ib_gib, mode=mode, use_cache=use_cache)
+
+_SALTED_CACHE_KEY_TAG = 's'
+"""
+Salted sub-hashes are cached under `(tag, salt, fingerprint)`. No unsalted
+fingerprint starts with this tag, so the two can never collide.
+"""
+
+_clock = time.perf_counter
+
+_Record = Callable[..., None]
+"""
+`HashInstrumentation.record(phase, seconds, nbytes=0)`.
+"""
+
+class Sha256V1Hasher:
+    """
+    Reusable salted `sha256v1`, for hashing many ibgibs under one salt.
+
+    The salt is encoded and fed to a `hashlib` state once, and each of the
+    four sub-hashes starts from a `.copy()` of that prefix state instead of
+    re-encoding and concatenating the salt onto every message.
+
+    Gibs are byte-identical to the TS `sha256v1(ibGib, salt)`:
+
+        ibHash  = H(salt + ib)
+        rel8ns  = H(salt + canonical JSON)           (if any rel8ns)
+        data    = H(salt + canonical JSON or bytes)  (if any data)
+        gib     = H(salt + ibHash + rel8nsHash + dataHash), or H(salt + ibHash)
+
+    Unsalted, empty messages hash to "" as they do in TS. A missing `ib`
+    hashes as "", and an `ib` that is not a string raises ValueError.
+
+    This is the one implementation of the gib algorithm; `sha256v1` calls it
+    too. While instrumentation is enabled (see `instrumentation.py`), its
+    steps report their timings through the `record` hook its sub-hash
+    methods take.
+
+    Safe to share between threads (the prefix state is only ever copied).
+    """
+    __slots__ = ('salt', '_prefix')
+
+    def __init__(self, salt: str = ''):
+        self.salt = salt
+        self._prefix = hashlib.sha256(salt.encode('utf-8'))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(salt={self.salt!r})'
+
+    # region sub-hashes
+    # The steps of `hash`, for other gib paths (e.g. parallel or incremental
+    # hashing) that compute some sub-hashes their own way. `record` is the
+    # instrumentation hook `hash` passes, leave it None.
+
+    def prefix_state(self) -> Any:
+        """
+        A new `hashlib` sha-256 state that has been fed the salt, to feed a
+        message (e.g. canonical JSON) to and take the sub-hash from.
+        """
+        return self._prefix.copy()
+
+    def hex_str(self, message: str, record: Optional[_Record] = None) -> str:
+        """
+        H(salt + message) as uppercase hex, or "" if both are empty.
+        """
+        if not message and not self.salt:
+            return ""
+        if record is not None:
+            start = _clock()
+        encoded = message.encode('utf-8')
+        if record is not None:
+            record(_instrumentation.PHASE_ENCODE, _clock() - start, len(encoded))
+            start = _clock()
+        hasher = self._prefix.copy()
+        hasher.update(encoded)
+        hex_digest = hasher.hexdigest().upper()
+        if record is not None:
+            record(_instrumentation.PHASE_DIGEST, _clock() - start, len(encoded))
+        return hex_digest
+
+    def hex_ib(self, ib: Any, record: Optional[_Record] = None) -> str:
+        """
+        The ib sub-hash. A missing ib hashes as "". TS would hash `String(ib)`
+        for anything else, which no ibgib relies on, so other types raise
+        ValueError.
+        """
+        if ib is None:
+            ib = ''
+        elif not isinstance(ib, str):
+            raise ValueError(f"[sha256v1] ib must be a string, got {type(ib).__name__}")
+        return self.hex_str(ib, record)
+
+    def hex_bytes(self, data: Any, record: Optional[_Record] = None) -> str:
+        """
+        The sub-hash of binary `data` (see `is_binary_source`). Unsalted,
+        empty data hashes to "".
+        """
+        if record is not None:
+            start = _clock()
+        hasher = self._prefix.copy()
+        if type(data) is bytes and len(data) <= HASH_CHUNK_SIZE:
+            hasher.update(data)
+            nbytes = len(data)
         else:
-            normalized_data = to_normalized_for_hashing(data)
-            json_data = json.dumps(normalized_data, sort_keys=True, separators=(',', ':'))
-            data_hash = _hash_to_hex(json_data)
-
-    # Calculate final combined hash
-    # If there's data or rel8ns, concatenate hashes and hash again.
-    # Otherwise, hash the ib_hash again.
-    if has_data or has_rel8ns:
-        combined_content = ib_hash + rel8ns_hash + data_hash
-        all_hash = _hash_to_hex(combined_content)
-    else:
-        # TS: (await hashToHex(ibHash)).toUpperCase()
-        # This means if only 'ib' contributes, its hash is hashed again.
-        all_hash = _hash_to_hex(ib_hash)
-        
-    return all_hash
+            nbytes = update_binary_source(hasher, data)
+        # the TS Uint8Array path hashes salt + bytes even when bytes are empty.
+        hex_digest = hasher.hexdigest().upper() if nbytes or self.salt else ""
+        if record is not None:
+            record(_instrumentation.PHASE_DIGEST, _clock() - start, nbytes)
+        return hex_digest
+
+    def hex_json(
+        self,
+        obj: Any,
+        mode: str = SHA256V1_MODE_FAST,
+        use_cache: bool = True,
+        record: Optional[_Record] = None,
+    ) -> str:
+        """
+        Hashes the canonical (normalized, sorted, compact) JSON form of `obj`.
+
+        In fast mode, consults the sub-hash cache if one is enabled (see
+        `sub_hash_cache.py`) and `use_cache` is true. The reference mode never
+        uses the cache.
+        """
+        if mode == SHA256V1_MODE_REFERENCE:
+            if record is not None:
+                start = _clock()
+            normalized = to_normalized_for_hashing(obj)
+            if record is not None:
+                record(_instrumentation.PHASE_NORMALIZE, _clock() - start)
+                start = _clock()
+            # Compact JSON string with sorted keys
+            json_str = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+            if record is not None:
+                record(_instrumentation.PHASE_JSON_DUMPS, _clock() - start, len(json_str))
+            return self.hex_str(json_str, record)
+
+        cache = get_sub_hash_cache() if use_cache else None
+        key = None
+        if cache is not None:
+            if record is not None:
+                start = _clock()
+            sized = cache.fingerprint(obj)
+            cached = None
+            if sized is not None:
+                fp, key_bytes = sized
+                key = (_SALTED_CACHE_KEY_TAG, self.salt, fp) if self.salt else fp
+                cached = cache.get(key)
+            if record is not None:
+                record(_instrumentation.PHASE_CACHE_LOOKUP, _clock() - start)
+            if cached is not None:
+                return cached
+
+        if record is not None:
+            start = _clock()
+        hasher = self._prefix.copy()
+        nbytes = update_canonical_json(hasher, obj)
+        sub_hash = hasher.hexdigest().upper()
+        if record is not None:
+            record(_instrumentation.PHASE_CANONICAL_JSON, _clock() - start, nbytes)
+        if key is not None:
+            cache.put(key, sub_hash, key_bytes)
+        return sub_hash
+
+    def hex_gib(
+        self,
+        ib_hash: str,
+        rel8ns_hash: str = '',
+        data_hash: str = '',
+        record: Optional[_Record] = None,
+    ) -> str:
+        """
+        The gib from the sub-hashes ("" for a block that is not hashed).
+        """
+        # TS hashes ib_hash + rel8ns_hash + data_hash when there are rel8ns or
+        # data, else ib_hash again: the same message when both are "".
+        return self.hex_str(ib_hash + rel8ns_hash + data_hash, record)
+
+    # endregion sub-hashes
+
+    def hash(self, ib_gib: Union[dict, IbGib_V1], mode: str = SHA256V1_MODE_FAST, use_cache: bool = True) -> str:
+        """
+        `sha256v1(ib_gib, mode=mode, use_cache=use_cache, salt=self.salt)`
+        """
+        if mode not in SHA256V1_MODES:
+            raise ValueError(f"unknown sha256v1 mode: {mode!r}. expected one of {SHA256V1_MODES}")
+        stats = _instrumentation.active
+        record = None
+        if stats is not None:
+            record = stats.record
+            call_start = _clock()
+
+        data = ib_gib.get('data')
+        rel8ns = ib_gib.get('rel8ns')
+        has_rel8ns = _has_rel8ns(rel8ns)
+        has_data = _has_data(data)
+
+        ib_hash = self.hex_ib(ib_gib.get('ib'), record)
+        rel8ns_hash = self.hex_json(rel8ns, mode, use_cache, record) if has_rel8ns else ''
+        data_hash = ''
+        if has_data:
+            if is_binary_source(data):
+                data_hash = self.hex_bytes(data, record)
+            else:
+                data_hash = self.hex_json(data, mode, use_cache, record)
+
+        all_hash = self.hex_gib(ib_hash, rel8ns_hash, data_hash, record)
+        if record is not None:
+            record(_instrumentation.PHASE_TOTAL, _clock() - call_start)
+        return all_hash
+
+    __call__ = hash
+
+    def hash_many(self, ib_gibs: Iterable[Union[dict, IbGib_V1]], mode: str = SHA256V1_MODE_FAST) -> Iterator[str]:
+        """
+        Lazily hashes every ibgib in `ib_gibs` under this hasher's salt.
+        """
+        for ib_gib in ib_gibs:
+            yield self.hash(ib_gib, mode=mode)
+
+SALTED_HASHER_CACHE_MAXSIZE = 64
+"""
+Number of per-salt hashers `sha256v1(..., salt=...)` keeps around.
+"""
+
+@functools.lru_cache(maxsize=SALTED_HASHER_CACHE_MAXSIZE)
+def get_sha256v1_hasher(salt: str = '') -> Sha256V1Hasher:
+    """
+    Returns a shared `Sha256V1Hasher` for `salt`, built on first use.
+    """
+    return Sha256V1Hasher(salt)
+
+_UNSALTED_HASHER = Sha256V1Hasher()
@@ -0,0 +1,38 @@
+# py_gib/V1/sha256v1_many.py
+
+from typing import Iterable, Iterator, List, Optional
+
+from ..pool import DEFAULT_CHUNK_SIZE, DEFAULT_MIN_PARALLEL, map_chunks
+from .sha256v1 import sha256v1
+
+def _sha256v1_chunk(chunk: List[dict]) -> List[str]:
+    """
+    Worker entry point. Must be module-level so it can be pickled.
+    """
+    return [sha256v1(ib_gib) for ib_gib in chunk]
+
+def sha256v1_many(
+    ib_gibs: Iterable[dict],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    min_parallel: int = DEFAULT_MIN_PARALLEL,
+) -> Iterator[str]:
+    """
+    Computes `sha256v1` for each ibgib in `ib_gibs`, yielding gibs in input order.
+
+    This is a generator that pulls from `ib_gibs` lazily, so it can be fed an
+    arbitrarily large stream (e.g. a JSONL reader) without memory growing with
+    the input.
+
+    - If the input has fewer than `min_parallel` ibgibs, or `workers` is 1,
+      everything is hashed in-process.
+    - Otherwise chunks of `chunk_size` ibgibs are fanned out across a process
+      pool of `workers` processes (defaults to `os.cpu_count()`). At most
+      `2 * workers` chunks are in flight at any time.
+
+    Gibs are byte-identical to calling `sha256v1` on each ibgib.
+    """
+    return map_chunks(
+        _sha256v1_chunk, ib_gibs,
+        workers=workers, chunk_size=chunk_size, min_parallel=min_parallel,
+    )
@@ -0,0 +1,311 @@
+# py_gib/V1/shared_memory_sha256v1.py
+"""
+`sha256v1_many` for ibgibs with large payloads, which passes the payloads to
+the worker processes through `multiprocessing.shared_memory` instead of
+pickling them.
+
+A process pool pickles every chunk it sends. So a 64 MB binary `data` is
+copied into the pipe, out of it and into a new bytes object before a worker
+hashes it, and that costs more than the sha-256 itself. Here, a chunk's
+payloads of at least `SHARED_MEMORY_THRESHOLD` bytes are copied once into one
+shared memory segment, and only their offsets are pickled. Workers attach to
+the segment and hash the payloads through `memoryview`s of it.
+
+Large payloads are:
+
+- the binary `data` (bytes, bytearray, memoryview, mmap) of an ibgib dict,
+- serialized ibgibs, i.e. `binary_encoding` records passed as bytes-like
+  items. Their canonical sections are hashed in place
+  (`IbGibRecordView.sha256v1`).
+
+JSON `data` cannot be shared without serializing it, and serializing it is
+most of the cost of hashing it. Pass such ibgibs as records (`encode_ib_gib`)
+to share them. Otherwise they are pickled as usual, like `IbGib_V1`s.
+
+The parent creates and unlinks every segment. A segment lives from its chunk
+being sent until the chunk's gibs are back. Segments still in flight are
+unlinked when the generator is closed or raises. Workers only attach and
+close. On POSIX the workers report to the parent's resource tracker, so
+attaching does not make it unlink anything early.
+"""
+
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from itertools import chain
+from multiprocessing.shared_memory import SharedMemory
+import os
+import pickle
+
+from ..pool import DEFAULT_CHUNK_SIZE, map_chunks
+from .async_sha256v1 import _binary_size
+from .binary_encoding import IbGibRecordView
+from .sha256v1 import _BUFFER_TYPES, sha256v1
+
+SHARED_MEMORY_THRESHOLD = 64 * 1024
+"""
+Payloads of at least this many bytes go through shared memory. Below that,
+pickling them costs less than the extra copy and segment bookkeeping.
+"""
+
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+"""
+Shared bytes after which a chunk is sent early, even if it has fewer than
+`chunk_size` items. With at most `2 * workers + 1` chunks in flight, this
+bounds the shared memory in use, and it spreads a few large payloads over
+several workers.
+"""
+
+DEFAULT_SHARED_MIN_PARALLEL = 64
+"""
+`sha256v1_many_shared` hashes in-process unless there are at least this many
+items or their shared payloads reach `segment_bytes`. Lower than
+`pool.DEFAULT_MIN_PARALLEL`, since this is meant for large payloads; many
+small ibgibs are better off with `sha256v1_many`.
+"""
+
+_PICKLED = 0
+_SHARED_DATA = 1
+_SHARED_RECORD = 2
+
+_Entry = Tuple[int, Any, int, int]
+"""kind, pickled value (ibgib, data-less ibgib or record bytes), offset, size"""
+
+_Chunk = Tuple[Optional[str], str, List[_Entry]]
+"""segment name (None if nothing is shared), salt, entries"""
+
+class SharedMemoryStats:
+    """
+    What `sha256v1_many_shared` sent to its workers. `sent_bytes` is the size
+    of the pickled chunks (measured with an extra `pickle.dumps`, so only when
+    stats are asked for). `shared_bytes` is what went through shared memory
+    instead of the pipe.
+    """
+    __slots__ = ('items', 'chunks', 'segments', 'shared_items', 'shared_bytes', 'sent_bytes')
+
+    def __init__(self):
+        self.items = 0
+        self.chunks = 0
+        self.segments = 0
+        self.shared_items = 0
+        self.shared_bytes = 0
+        self.sent_bytes = 0
+
+    @property
+    def saved_fraction(self) -> float:
+        """
+        Share of the IPC volume of the pickling path (about `sent_bytes +
+        shared_bytes`) that shared memory saved.
+        """
+        total = self.sent_bytes + self.shared_bytes
+        return self.shared_bytes / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(items={self.items}, chunks={self.chunks}, segments={self.segments}, '
+            f'shared_items={self.shared_items}, shared_bytes={self.shared_bytes}, sent_bytes={self.sent_bytes})'
+        )
+
+def _shared_size(value: Any, threshold: int) -> Optional[int]:
+    """
+    Size of `value` if it is a (non-empty) buffer worth sharing, else None.
+    """
+    if not isinstance(value, _BUFFER_TYPES):
+        return None
+    size = _binary_size(value)
+    return size if size and size >= threshold else None
+
+def _payload_size(item: Any, threshold: int) -> int:
+    """
+    Bytes of `item` that would go through shared memory (0 if none).
+    """
+    payload = item if isinstance(item, _BUFFER_TYPES) else item.get('data') if isinstance(item, dict) else None
+    return _shared_size(payload, threshold) or 0
+
+def _hash_item(item: Any, salt: str) -> str:
+    if isinstance(item, _BUFFER_TYPES):
+        return IbGibRecordView(item).sha256v1(salt)
+    return sha256v1(item, salt=salt)
+
+def _hash_entry(buf: Optional[memoryview], salt: str, entry: _Entry) -> str:
+    kind, value, offset, size = entry
+    if kind == _PICKLED:
+        return _hash_item(value, salt)
+    # the slice (and any view of it) must be gone before the segment closes.
+    with buf[offset:offset + size] as view:
+        if kind == _SHARED_RECORD:
+            return IbGibRecordView(view).sha256v1(salt)
+        return sha256v1({**value, 'data': view}, use_cache=False, salt=salt)
+
+def _hash_chunks(chunks: List[_Chunk]) -> List[List[str]]:
+    """
+    Worker entry point. Must be module-level so it can be pickled.
+    """
+    results = []
+    for name, salt, entries in chunks:
+        if name is None:
+            results.append([_hash_entry(None, salt, entry) for entry in entries])
+            continue
+        segment = SharedMemory(name=name)
+        try:
+            results.append([_hash_entry(segment.buf, salt, entry) for entry in entries])
+        finally:
+            segment.close()
+    return results
+
+def _release(segment: Optional[SharedMemory]) -> None:
+    if segment is not None:
+        segment.close()
+        segment.unlink()
+
+def _prepare_chunk(
+    items: List[Any],
+    salt: str,
+    threshold: int,
+    stats: Optional[SharedMemoryStats] = None,
+) -> Tuple[Optional[SharedMemory], _Chunk]:
+    """
+    The chunk to send for `items`, and the segment holding its large payloads
+    (None if there are none), which the caller must `_release`.
+    """
+    entries: List[_Entry] = []
+    payloads = []
+    total = 0
+    for item in items:
+        if isinstance(item, _BUFFER_TYPES):
+            size = _shared_size(item, threshold)
+            if size is None:
+                # memoryviews and mmaps do not pickle.
+                entries.append((_PICKLED, bytes(item), 0, 0))
+                continue
+            entries.append((_SHARED_RECORD, None, total, size))
+        else:
+            data = item.get('data') if isinstance(item, dict) else None
+            size = _shared_size(data, threshold)
+            if size is None:
+                if isinstance(data, _BUFFER_TYPES) and not isinstance(data, (bytes, bytearray)):
+                    item = {**item, 'data': bytes(data)}
+                entries.append((_PICKLED, item, 0, 0))
+                continue
+            entries.append((_SHARED_DATA, {k: v for k, v in item.items() if k != 'data'}, total, size))
+            item = item['data']
+        payloads.append(item)
+        total += size
+
+    segment = None
+    if total:
+        segment = SharedMemory(create=True, size=total)
+        try:
+            offset = 0
+            for payload in payloads:
+                with memoryview(payload) as view:
+                    if view.ndim != 1 or view.format not in ('B', 'b', 'c'):
+                        view = view.cast('B')
+                    segment.buf[offset:offset + view.nbytes] = view
+                    offset += view.nbytes
+        except BaseException:
+            _release(segment)
+            raise
+
+    chunk: _Chunk = (None if segment is None else segment.name, salt, entries)
+    if stats is not None:
+        stats.items += len(entries)
+        stats.chunks += 1
+        stats.segments += segment is not None
+        stats.shared_items += len(payloads)
+        stats.shared_bytes += total
+        stats.sent_bytes += len(pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL))
+    return segment, chunk
+
+def _chunks(
+    items: Iterable[Any],
+    chunk_size: int,
+    segment_bytes: int,
+    threshold: int,
+) -> Iterator[List[Any]]:
+    """
+    Chunks of at most `chunk_size` items, cut early once their shared
+    payloads reach `segment_bytes`.
+    """
+    chunk: List[Any] = []
+    shared = 0
+    for item in items:
+        chunk.append(item)
+        shared += _payload_size(item, threshold)
+        if len(chunk) >= chunk_size or shared >= segment_bytes:
+            yield chunk
+            chunk, shared = [], 0
+    if chunk:
+        yield chunk
+
+def sha256v1_many_shared(
+    items: Iterable[Any],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    min_parallel: int = DEFAULT_SHARED_MIN_PARALLEL,
+    threshold: int = SHARED_MEMORY_THRESHOLD,
+    segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+    salt: str = '',
+    stats: Optional[SharedMemoryStats] = None,
+) -> Iterator[str]:
+    """
+    Computes `sha256v1(..., salt=salt)` for each of `items`, yielding gibs in
+    input order, like `sha256v1_many`. An item is an ibgib (a dict or an
+    `IbGib_V1`) or an `encode_ib_gib` record (bytes-like).
+
+    Payloads of at least `threshold` bytes reach the workers through shared
+    memory (see the module docstring). A chunk holds at most `chunk_size`
+    items and is sent early once its shared payloads reach `segment_bytes`.
+    Pass a `SharedMemoryStats` as `stats` to measure what was sent.
+
+    Items are looked at until there are `min_parallel` of them or their
+    shared payloads reach `segment_bytes`, whichever comes first, so at most
+    about one segment's worth of payloads is held before anything is sent.
+    If the items run out first, or `workers=1`, they are hashed in-process,
+    with no shared memory at all.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    if segment_bytes < 1:
+        raise ValueError(f"segment_bytes must be at least 1, got {segment_bytes}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+
+    it = iter(items)
+    head: List[Any] = []
+    parallel = False
+    if workers > 1:
+        shared = 0
+        for item in it:
+            head.append(item)
+            shared += _payload_size(item, threshold)
+            if len(head) >= min_parallel or shared >= segment_bytes:
+                parallel = True
+                break
+        parallel = parallel or min_parallel <= 0
+    if not parallel:
+        for item in chain(head, it):
+            yield _hash_item(item, salt)
+        return
+
+    # segments of the chunks sent so far, in order, i.e. the order their
+    # results come back in.
+    segments: deque = deque()
+
+    def chunks() -> Iterator[_Chunk]:
+        for chunk_items in _chunks(chain(head, it), chunk_size, segment_bytes, threshold):
+            segment, chunk = _prepare_chunk(chunk_items, salt, threshold, stats)
+            segments.append(segment)
+            yield chunk
+
+    results = map_chunks(_hash_chunks, chunks(), workers=workers, chunk_size=1, min_parallel=1)
+    try:
+        for gibs in results:
+            _release(segments.popleft())
+            yield from gibs
+    finally:
+        # closing the pool first means no worker still reads a segment.
+        results.close()
+        while segments:
+            _release(segments.popleft())
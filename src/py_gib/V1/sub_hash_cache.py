@@ -0,0 +1,261 @@
+# py_gib/V1/sub_hash_cache.py
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import threading
+
+SUB_HASH_CACHE_POLICY_LRU = 'lru'
+"""
+Hits move the entry to the back of the eviction queue.
+"""
+SUB_HASH_CACHE_POLICY_FIFO = 'fifo'
+"""
+Entries are evicted in insertion order regardless of hits (cheaper hits).
+"""
+SUB_HASH_CACHE_POLICIES = (SUB_HASH_CACHE_POLICY_LRU, SUB_HASH_CACHE_POLICY_FIFO)
+
+DEFAULT_SUB_HASH_CACHE_MAXSIZE = 4096
+"""
+Most entries a `SubHashCache` keeps.
+"""
+DEFAULT_SUB_HASH_CACHE_MAX_BYTES = 32 * 1024 * 1024
+"""
+Roughly how much memory a `SubHashCache`'s keys may hold in total. Keys refer
+to the blocks' strings, so a cached key keeps those strings alive.
+"""
+DEFAULT_SUB_HASH_CACHE_MAX_BLOCK_BYTES = 64 * 1024
+"""
+Blocks whose key would be larger than roughly this are not cached. Building a
+key walks the whole block, so for big blocks it costs about as much as the
+encode it would save, and caching it would pin the block in memory.
+"""
+
+# Rough memory per fingerprint element (tuple slot plus a small object), used
+# for the byte limits above. String lengths are added on top.
+_ENTRY_BYTES = 64
+
+# Tags for fingerprint tuples. Every tuple starts with its tag, so two
+# fingerprints are only equal if they have the same shape *and* the same
+# scalar types (e.g. 1, 1.0 and True are all distinct, as they are in JSON).
+_DICT = 'd'
+_LIST = 'l'
+_INT = 'i'
+_FLOAT = 'f'
+_BOOL = 'b'
+
+class _Uncacheable(Exception):
+    pass
+
+def _fingerprint(obj: Any, budget: List[int]) -> Any:
+    # `budget[0]` is the bytes left before the block counts as too large. It
+    # is charged before walking a container, so a big block is given up on
+    # after about `max_bytes` of work rather than after all of it.
+    t = type(obj)
+    if t is str:
+        budget[0] -= len(obj)
+        if budget[0] < 0:
+            raise _Uncacheable()
+        return obj
+    if obj is None:
+        return obj
+    if t is dict:
+        budget[0] -= 2 * _ENTRY_BYTES * len(obj)
+        if budget[0] < 0:
+            raise _Uncacheable()
+        fp = [_DICT]
+        for key, value in obj.items():
+            fp.append(_fingerprint(key, budget))
+            fp.append(_fingerprint(value, budget))
+        return tuple(fp)
+    if t is list or t is tuple:
+        budget[0] -= _ENTRY_BYTES * len(obj)
+        if budget[0] < 0:
+            raise _Uncacheable()
+        if set(map(type, obj)) <= {str}:
+            budget[0] -= sum(map(len, obj))
+            if budget[0] < 0:
+                raise _Uncacheable()
+            return (_LIST, *obj)
+        return (_LIST, *[_fingerprint(x, budget) for x in obj])
+    if t is int:
+        return (_INT, obj)
+    if t is float:
+        # repr keeps -0.0 distinct from 0.0 and makes nan equal to itself.
+        return (_FLOAT, float.__repr__(obj))
+    if t is bool:
+        return (_BOOL, obj)
+    raise _Uncacheable()
+
+def sized_fingerprint(
+    obj: Any,
+    max_bytes: int = DEFAULT_SUB_HASH_CACHE_MAX_BLOCK_BYTES,
+) -> Optional[Tuple[Any, int]]:
+    """
+    `fingerprint(obj, max_bytes)` along with the rough number of bytes it
+    holds, or None if the block is not cacheable.
+    """
+    budget = [max_bytes - _ENTRY_BYTES]
+    try:
+        fp = _fingerprint(obj, budget)
+    except _Uncacheable:
+        return None
+    return fp, max_bytes - budget[0]
+
+def fingerprint(obj: Any, max_bytes: int = DEFAULT_SUB_HASH_CACHE_MAX_BLOCK_BYTES) -> Optional[Any]:
+    """
+    Builds a hashable content fingerprint of a `rel8ns`/`data` block.
+
+    Two blocks with equal fingerprints always have the same canonical JSON, so
+    the fingerprint can stand in for the block as a cache key. The reverse is
+    not guaranteed (e.g. different key insertion order), which only costs a
+    cache miss.
+
+    The fingerprint refers to the block's strings rather than copying them,
+    but it is still built by walking the whole block. For nested blocks that
+    costs about half as much as encoding them; lists of strings (e.g. `past`)
+    are much cheaper to fingerprint than to encode and hash.
+
+    Returns None if the block contains anything other than exact dict, list,
+    tuple, str, int, float, bool or None values, or if the fingerprint would
+    hold more than about `max_bytes`, i.e. it is not cacheable.
+    """
+    sized = sized_fingerprint(obj, max_bytes)
+    return None if sized is None else sized[0]
+
+class SubHashCache:
+    """
+    Bounded map of block fingerprint -> uppercase hex sub-hash.
+
+    Bounded both by entry count (`maxsize`) and by the rough bytes held by its
+    keys (`max_bytes`). Blocks whose key would hold more than `max_block_bytes`
+    are not cached at all (see `fingerprint`).
+
+    Safe to share between threads. Counts hits, misses, evictions and blocks
+    skipped for being too large.
+    """
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_SUB_HASH_CACHE_MAXSIZE,
+        policy: str = SUB_HASH_CACHE_POLICY_LRU,
+        max_bytes: int = DEFAULT_SUB_HASH_CACHE_MAX_BYTES,
+        max_block_bytes: int = DEFAULT_SUB_HASH_CACHE_MAX_BLOCK_BYTES,
+    ):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        if policy not in SUB_HASH_CACHE_POLICIES:
+            raise ValueError(f"unknown policy: {policy!r}. expected one of {SUB_HASH_CACHE_POLICIES}")
+        if max_block_bytes < 1 or max_bytes < max_block_bytes:
+            raise ValueError(
+                f"expected 1 <= max_block_bytes <= max_bytes, got {max_block_bytes} and {max_bytes}"
+            )
+        self.maxsize = maxsize
+        self.policy = policy
+        self.max_bytes = max_bytes
+        self.max_block_bytes = max_block_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.skipped = 0
+        self._entries: "OrderedDict[Any, Tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fingerprint(self, obj: Any) -> Optional[Tuple[Any, int]]:
+        """
+        `sized_fingerprint(obj, self.max_block_bytes)`, counting blocks that
+        are too large (or otherwise uncacheable) as skipped.
+        """
+        sized = sized_fingerprint(obj, self.max_block_bytes)
+        if sized is None:
+            with self._lock:
+                self.skipped += 1
+        return sized
+
+    def get(self, key: Any) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.policy == SUB_HASH_CACHE_POLICY_LRU:
+                self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Any, value: str, nbytes: int = 0) -> None:
+        """
+        Caches `value` under `key`, which holds about `nbytes` (see
+        `sized_fingerprint`), evicting the oldest entries while over either
+        bound.
+        """
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while len(self._entries) > self.maxsize or self.nbytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = self.skipped = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'nbytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'policy': self.policy,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'skipped': self.skipped,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+_sub_hash_cache: Optional[SubHashCache] = None
+
+def enable_sub_hash_cache(
+    maxsize: int = DEFAULT_SUB_HASH_CACHE_MAXSIZE,
+    policy: str = SUB_HASH_CACHE_POLICY_LRU,
+    max_bytes: int = DEFAULT_SUB_HASH_CACHE_MAX_BYTES,
+    max_block_bytes: int = DEFAULT_SUB_HASH_CACHE_MAX_BLOCK_BYTES,
+    cache: Optional[SubHashCache] = None,
+) -> SubHashCache:
+    """
+    Turns on the process-wide sub-hash cache used by `sha256v1` (fast mode
+    only) and returns it. Replaces any previously enabled cache.
+
+    Pass `cache` to enable an existing cache (e.g. to restore the one
+    `get_sub_hash_cache` returned earlier) instead of building a new one.
+    """
+    global _sub_hash_cache
+    if cache is None:
+        cache = SubHashCache(maxsize=maxsize, policy=policy, max_bytes=max_bytes, max_block_bytes=max_block_bytes)
+    _sub_hash_cache = cache
+    return _sub_hash_cache
+
+def disable_sub_hash_cache() -> None:
+    """
+    Turns off and drops the process-wide sub-hash cache, e.g. for strict audits
+    where every block must be re-serialized and re-hashed.
+    """
+    global _sub_hash_cache
+    _sub_hash_cache = None
+
+def get_sub_hash_cache() -> Optional[SubHashCache]:
+    """
+    Returns the process-wide sub-hash cache, or None if it is disabled.
+    """
+    return _sub_hash_cache
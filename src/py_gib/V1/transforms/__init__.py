@@ -0,0 +1 @@
+# This file makes transforms a package.
@@ -0,0 +1,111 @@
+# py_gib/V1/transforms/fork.py
+
+from typing import List, Optional
+import time
+
+from ...helper import get_ib_gib_addr, get_timestamp, get_uuid
+from ..constants import IB, IBGIB_DELIMITER, ROOT_ADDR
+from ..types import Rel8n, TransformResult
+from ..sha256v1 import sha256v1
+from .transform_helper import build_dna, get_transform_data
+
+def fork(
+    src: dict,
+    dest_ib: Optional[str] = None,
+    uuid: bool = False,
+    tjp: Optional[dict] = None,
+    clone_rel8ns: bool = False,
+    clone_data: bool = False,
+    dna: bool = False,
+    linked_rel8ns: Optional[List[str]] = None,
+    no_timestamp: bool = False,
+    n_counter: bool = False,
+    src_addr: Optional[str] = None,
+) -> TransformResult:
+    """
+    Original-ish V1 transform behavior.
+
+    Creates a new ibgib whose `ancestor` is `src`, i.e. starts a new timeline.
+
+    `tjp` is e.g. `{'timestamp': True, 'uuid': True}` and makes the new ibgib
+    the temporal junction point of its timeline (`data.isTjp`).
+
+    Unlike the TS version, `clone_rel8ns`/`clone_data` are shallow copies, so
+    the new ibgib shares rel8d lists and nested data values with `src` and
+    must be treated as immutable. A cloned `tjp` rel8n is never carried over.
+
+    As in TS, which starts from a clone of `src`, the new ibgib keeps `src`'s
+    data (shallowly copied, `isTjp` and all) when its own data would be empty,
+    i.e. with `no_timestamp` and no `clone_data`, `tjp`, `uuid` or
+    `n_counter`.
+    """
+    lc = '[fork_v1]'
+
+    if not src:
+        raise ValueError(f'{lc} src required to fork.')
+    if not src.get('ib'):
+        raise ValueError(f'{lc} src.ib required.')
+    if not src.get('gib'):
+        raise ValueError(f'{lc} src.gib required.')
+    if dest_ib and IBGIB_DELIMITER in dest_ib:
+        raise ValueError(f"{lc} destIb can't contain (hardcoded) delimiter ({IBGIB_DELIMITER}) right now.")
+
+    actual_src_addr = get_ib_gib_addr(ib=src['ib'], gib=src['gib'])
+    if src_addr and src_addr != actual_src_addr:
+        raise ValueError(f'{lc} srcAddr from src does not equal opts.srcAddr')
+    src_addr = actual_src_addr
+
+    # shallow copies only: cloned lists and values stay shared with src.
+    rel8ns = dict(src.get('rel8ns') or {}) if clone_rel8ns else {}
+    data = dict(src.get('data') or {}) if clone_data else {}
+    if n_counter:
+        data['n'] = 0
+
+    if linked_rel8ns and Rel8n.ancestor in linked_rel8ns:
+        rel8ns[Rel8n.ancestor] = [src_addr]
+    else:
+        rel8ns[Rel8n.ancestor] = [*(rel8ns.get(Rel8n.ancestor) or []), src_addr]
+    rel8ns.pop(Rel8n.tjp, None)
+
+    if no_timestamp and tjp and tjp.get('timestamp'):
+        raise ValueError(f'{lc} both noTimestamp and tjp.timestamp selected.')
+    if not no_timestamp or (tjp and tjp.get('timestamp')):
+        now = time.time()
+        data['timestamp'] = get_timestamp(now)
+        data['timestampMs'] = int(now * 1000) % 1000
+    if (tjp and tjp.get('uuid')) or uuid:
+        data['uuid'] = get_uuid()
+    if tjp and (tjp.get('uuid') or tjp.get('timestamp')):
+        data['isTjp'] = True
+    else:
+        data.pop('isTjp', None)
+
+    transform_dna = None
+    if dna:
+        transform_dna = build_dna(get_transform_data(
+            'fork', destIb=dest_ib, uuid=uuid, tjp=tjp, cloneRel8ns=clone_rel8ns,
+            cloneData=clone_data, dna=dna, linkedRel8ns=linked_rel8ns,
+            noTimestamp=no_timestamp, nCounter=n_counter,
+        ))
+        dna_addr = get_ib_gib_addr(ib_gib=transform_dna)
+        if linked_rel8ns and Rel8n.dna in linked_rel8ns:
+            rel8ns[Rel8n.dna] = [dna_addr]
+        else:
+            rel8ns[Rel8n.dna] = [*(rel8ns.get(Rel8n.dna) or []), dna_addr]
+
+    new_ib_gib = {'ib': dest_ib or IB}
+    # forks of the root are not rel8d to it.
+    if src_addr != ROOT_ADDR:
+        new_ib_gib['rel8ns'] = rel8ns
+    if data:
+        new_ib_gib['data'] = data
+    elif src.get('data'):
+        src_data = src['data']
+        new_ib_gib['data'] = dict(src_data) if isinstance(src_data, dict) else src_data
+    # the fork is either the tjp itself or has no tjp, so the gib is the bare hash.
+    new_ib_gib['gib'] = sha256v1(new_ib_gib)
+
+    result: TransformResult = {'new_ib_gib': new_ib_gib}
+    if transform_dna:
+        result['dnas'] = [transform_dna]
+    return result
@@ -0,0 +1,168 @@
+# py_gib/V1/transforms/mut8.py
+
+from typing import List, Optional
+import logging
+import time
+
+from ...helper import get_ib_gib_addr, get_timestamp
+from ..constants import IBGIB_DELIMITER
+from ..types import Rel8n, TransformResult
+from .transform_helper import build_dna, get_gib, get_transform_data, increment_n, is_primitive
+
+logger = logging.getLogger(__name__)
+
+FORBIDDEN_RENAME_REMOVE_KEYS = ['timestamp']
+
+def mut8(
+    src: dict,
+    data_to_add_or_patch: Optional[dict] = None,
+    data_to_rename: Optional[dict] = None,
+    data_to_remove: Optional[dict] = None,
+    mut8_ib: Optional[str] = None,
+    dna: bool = False,
+    linked_rel8ns: Optional[List[str]] = None,
+    no_timestamp: bool = False,
+    n_counter: bool = False,
+    src_addr: Optional[str] = None,
+) -> TransformResult:
+    """
+    Original-ish V1 transform behavior.
+
+    Creates a new ibgib from the immutable `src` ibgib, mutating its intrinsic
+    `data` (and optionally its `ib`) and appending `src` to the `past` rel8n.
+
+    Unlike the TS version, this does not deep clone `src`. The new ibgib shares
+    every sub-structure that the transform does not touch: unchanged rel8n
+    lists and untouched nested `data` dicts are the very same objects as in
+    `src`, and only the dicts along a patched/renamed/removed path are copied.
+    So ibgibs must be treated as immutable (which they are by definition).
+
+    The rel8n lists that grow (`past`, and `dna`/`tjp` when added to) are not
+    shared: each is copied with the new address appended, and hashed in full
+    with the rest of the new ibgib. Unless they are linked (`linked_rel8ns`),
+    a step's cost still grows with the length of the history, the hash far
+    more than the copy (see `bench/mut8_chain.py`).
+
+    ## notes
+
+    * This is NOT going to do the plan^gib stuff ATM.
+    * This does NOT add any identity information ATM.
+    """
+    lc = '[mut8_v1]'
+
+    if not src:
+        raise ValueError(f'{lc} src required to mut8.')
+    if not src.get('ib'):
+        raise ValueError(f'{lc} src.ib required.')
+    if IBGIB_DELIMITER in src['ib']:
+        raise ValueError(f"{lc} ib can't contain hardcoded delimiter ({IBGIB_DELIMITER}) right now.")
+    if not src.get('gib'):
+        raise ValueError(f'{lc} src.gib required.')
+    if not mut8_ib and not data_to_rename and not data_to_remove and not data_to_add_or_patch:
+        raise ValueError(f'{lc} gotta provide either a mut8Ib or some data to change.')
+
+    actual_src_addr = get_ib_gib_addr(ib=src['ib'], gib=src['gib'])
+    if src_addr and src_addr != actual_src_addr:
+        raise ValueError(f'{lc} srcAddr from src does not equal opts.srcAddr')
+    src_addr = actual_src_addr
+
+    if is_primitive(ib_gib=src):
+        raise ValueError(f'{lc} cannot mutate primitive ibgib')
+
+    src_data = src.get('data')
+    if src_data and not isinstance(src_data, dict):
+        raise ValueError(f'{lc} can only mut8 ibgibs whose data is a dict.')
+
+    # shallow copies only: unchanged values stay shared with src.
+    rel8ns = dict(src.get('rel8ns') or {})
+    if linked_rel8ns and Rel8n.past in linked_rel8ns:
+        rel8ns[Rel8n.past] = [src_addr]
+    else:
+        rel8ns[Rel8n.past] = [*(rel8ns.get(Rel8n.past) or []), src_addr]
+
+    data = dict(src_data or {})
+    if data_to_rename:
+        data = _rename_or_remove(data, data_to_rename, 'rename')
+    if data_to_remove:
+        data = _rename_or_remove(data, data_to_remove, 'remove')
+    if data_to_add_or_patch:
+        data = _patch(data, data_to_add_or_patch)
+    if not no_timestamp:
+        now = time.time()
+        data['timestamp'] = get_timestamp(now)
+        data['timestampMs'] = int(now * 1000) % 1000
+
+    # n-related
+    if n_counter or 'n' in data:
+        data['n'] = increment_n(data.get('n'))
+
+    # tjp-related. if the src is the tjp, e.g. is the first ibgib after a
+    # fork, then src_addr is the tjp addr.
+    if data.get('isTjp'):
+        rel8ns[Rel8n.tjp] = [*(rel8ns.get(Rel8n.tjp) or []), src_addr]
+        del data['isTjp']
+
+    # dna-related
+    transform_dna = None
+    if dna:
+        transform_dna = build_dna(get_transform_data(
+            'mut8', dataToAddOrPatch=data_to_add_or_patch, dataToRename=data_to_rename,
+            dataToRemove=data_to_remove, mut8Ib=mut8_ib, dna=dna,
+            linkedRel8ns=linked_rel8ns, noTimestamp=no_timestamp, nCounter=n_counter,
+        ))
+        dna_addr = get_ib_gib_addr(ib_gib=transform_dna)
+        if linked_rel8ns and Rel8n.dna in linked_rel8ns:
+            rel8ns[Rel8n.dna] = [dna_addr]
+        else:
+            rel8ns[Rel8n.dna] = [*(rel8ns.get(Rel8n.dna) or []), dna_addr]
+
+    new_ib_gib = {'ib': mut8_ib or src['ib'], 'rel8ns': rel8ns}
+    if data:
+        new_ib_gib['data'] = data
+    has_tjp = len(rel8ns.get(Rel8n.tjp) or []) > 0
+    new_ib_gib['gib'] = get_gib(new_ib_gib, has_tjp=has_tjp)
+
+    result: TransformResult = {'new_ib_gib': new_ib_gib}
+    if transform_dna:
+        result['dnas'] = [transform_dna]
+    return result
+
+def _rename_or_remove(obj: dict, info: dict, which: str) -> dict:
+    """
+    Copy-on-write rename/remove. Returns a shallow copy of `obj` with the
+    changes applied; only dicts along the changed paths are copied.
+    """
+    lc = '[renameOrRemove]'
+    result = dict(obj)
+    for key, info_val in info.items():
+        if key in FORBIDDEN_RENAME_REMOVE_KEYS:
+            raise ValueError(f'{lc} Cannot rename to {key}.')
+        if key not in result:
+            logger.info(f'{lc} key to {which} does not exist')
+            continue
+        if isinstance(info_val, str):
+            if info_val in FORBIDDEN_RENAME_REMOVE_KEYS:
+                raise ValueError(f'{lc} Cannot rename to {info_val}.')
+            if which == 'rename':
+                result[info_val] = result[key]
+            del result[key]
+        else:
+            # recurse
+            result[key] = _rename_or_remove(result[key], info_val, which)
+    return result
+
+def _patch(obj: dict, patch_info: dict) -> dict:
+    """
+    Copy-on-write additive patch. Returns a shallow copy of `obj` with
+    `patch_info` merged in; only dicts along the patched paths are copied.
+    """
+    result = dict(obj)
+    for patch_key, patch_val in patch_info.items():
+        obj_val = result.get(patch_key)
+        if isinstance(obj_val, dict) and isinstance(patch_val, dict):
+            # {a: {b: 2}}, {a: {b: 3, c: 4}} -> recurse
+            result[patch_key] = _patch(obj_val, patch_val)
+        else:
+            # arrays, non-dicts and new keys are full replaces
+            result[patch_key] = patch_val
+    return result
@@ -0,0 +1,122 @@
+# py_gib/V1/transforms/rel8.py
+
+from typing import Dict, List, Optional
+import time
+
+from ...helper import get_ib_gib_addr, get_timestamp
+from ..constants import FORBIDDEN_ADD_RENAME_REMOVE_REL8N_NAMES, IBGIB_DELIMITER
+from ..types import Rel8n, TransformResult
+from .transform_helper import build_dna, get_gib, get_transform_data, increment_n, is_primitive
+
+def _is_valid_rel8d_addr(addr: str) -> bool:
+    return (
+        isinstance(addr, str) and len(addr) >= 2 and
+        IBGIB_DELIMITER in addr and len(addr.split(IBGIB_DELIMITER)[0]) >= 1
+    )
+
+def rel8(
+    src: dict,
+    rel8ns_to_add_by_addr: Optional[Dict[str, List[str]]] = None,
+    rel8ns_to_remove_by_addr: Optional[Dict[str, List[str]]] = None,
+    dna: bool = False,
+    linked_rel8ns: Optional[List[str]] = None,
+    no_timestamp: bool = False,
+    n_counter: bool = False,
+    src_addr: Optional[str] = None,
+) -> TransformResult:
+    """
+    Original-ish V1 transform behavior.
+
+    Creates a new ibgib from the immutable `src` ibgib, adding and/or removing
+    rel8d addresses and appending `src` to the `past` rel8n.
+
+    Like `mut8`, this does not deep clone `src`: rel8ns that are not touched
+    keep the very same lists as `src`, and `data` is a shallow copy. So
+    results must be treated as immutable. Rel8ns that are changed, `past`
+    included, are new lists, copied from `src`'s.
+    """
+    lc = '[rel8_v1]'
+
+    if not src:
+        raise ValueError(f'{lc} src required.')
+    if not src.get('ib'):
+        raise ValueError(f'{lc} src.ib required.')
+    if IBGIB_DELIMITER in src['ib']:
+        raise ValueError(f"{lc} ib can't contain hardcoded delimiter ({IBGIB_DELIMITER}) right now.")
+    if not src.get('gib'):
+        raise ValueError(f'{lc} src.gib required.')
+    if is_primitive(ib_gib=src):
+        raise ValueError(f'{lc} cannot relate/unrelate primitive ibgib')
+    if not rel8ns_to_add_by_addr and not rel8ns_to_remove_by_addr:
+        raise ValueError(f'{lc} gotta provide relations to either add or remove.')
+
+    actual_src_addr = get_ib_gib_addr(ib=src['ib'], gib=src['gib'])
+    if src_addr and src_addr != actual_src_addr:
+        raise ValueError(f'{lc} srcAddr from src does not equal opts.srcAddr')
+    src_addr = actual_src_addr
+
+    for rel8ds in (rel8ns_to_add_by_addr or {}).values():
+        if not (rel8ds and all(map(_is_valid_rel8d_addr, rel8ds))):
+            raise ValueError(f'{lc} Invalid rel8n attempt. Must be valid ibGibs. Did you include a delimiter (^)?')
+    for rel8ds in (rel8ns_to_remove_by_addr or {}).values():
+        if not (rel8ds and all(map(_is_valid_rel8d_addr, rel8ds))):
+            raise ValueError(f'{lc} Invalid remove rel8n attempt. Must be valid ibGibs. Did you include a delimiter (^)?')
+
+    data = dict(src.get('data') or {})
+    if n_counter or 'n' in data:
+        data['n'] = increment_n(data.get('n'))
+    if not no_timestamp:
+        now = time.time()
+        data['timestamp'] = get_timestamp(now)
+        data['timestampMs'] = int(now * 1000) % 1000
+
+    # shallow copy only: untouched rel8d lists stay shared with src.
+    rel8ns = dict(src.get('rel8ns') or {})
+    for rel8n_name, to_add in (rel8ns_to_add_by_addr or {}).items():
+        if rel8n_name in FORBIDDEN_ADD_RENAME_REMOVE_REL8N_NAMES:
+            raise ValueError(f'{lc} Cannot manually add relationship: {rel8n_name}.')
+        existing = rel8ns.get(rel8n_name) or []
+        rel8ns[rel8n_name] = [*existing, *(x for x in to_add if x not in existing)]
+    for rel8n_name, to_remove in (rel8ns_to_remove_by_addr or {}).items():
+        if rel8n_name in FORBIDDEN_ADD_RENAME_REMOVE_REL8N_NAMES:
+            raise ValueError(f'{lc} Cannot manually remove relationship: {rel8n_name}.')
+        pruned = [x for x in rel8ns.get(rel8n_name) or [] if x not in to_remove]
+        if pruned:
+            rel8ns[rel8n_name] = pruned
+        else:
+            rel8ns.pop(rel8n_name, None)
+
+    rel8ns[Rel8n.past] = [*(rel8ns.get(Rel8n.past) or []), src_addr]
+
+    # linked rel8ns only keep their most recent addr
+    for rel8n_name in linked_rel8ns or []:
+        linked = rel8ns.get(rel8n_name) or []
+        if len(linked) > 1:
+            rel8ns[rel8n_name] = [linked[-1]]
+
+    if data.get('isTjp'):
+        rel8ns[Rel8n.tjp] = [*(rel8ns.get(Rel8n.tjp) or []), src_addr]
+        del data['isTjp']
+
+    has_tjp = len(rel8ns.get(Rel8n.tjp) or []) > 0
+
+    transform_dna = None
+    if dna:
+        transform_dna = build_dna(get_transform_data(
+            'rel8', rel8nsToAddByAddr=rel8ns_to_add_by_addr,
+            rel8nsToRemoveByAddr=rel8ns_to_remove_by_addr, dna=dna,
+            linkedRel8ns=linked_rel8ns, noTimestamp=no_timestamp, nCounter=n_counter,
+        ))
+        dna_addr = get_ib_gib_addr(ib_gib=transform_dna)
+        if linked_rel8ns and Rel8n.dna in linked_rel8ns:
+            rel8ns[Rel8n.dna] = [dna_addr]
+        else:
+            rel8ns[Rel8n.dna] = [*(rel8ns.get(Rel8n.dna) or []), dna_addr]
+
+    new_ib_gib = {'ib': src['ib'], 'data': data, 'rel8ns': rel8ns}
+    new_ib_gib['gib'] = get_gib(new_ib_gib, has_tjp=has_tjp)
+
+    result: TransformResult = {'new_ib_gib': new_ib_gib}
+    if transform_dna:
+        result['dnas'] = [transform_dna]
+    return result
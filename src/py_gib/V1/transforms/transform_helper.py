@@ -0,0 +1,239 @@
+# py_gib/V1/transforms/transform_helper.py
+
+from typing import Any, List, Optional, Sequence, Tuple
+import functools
+import logging
+
+from ...helper import get_ib_and_gib
+from ..constants import GIB, GIB_DELIMITER, IBGIB_DELIMITER
+from ..sha256v1 import sha256v1
+from ..types import GibInfo
+
+logger = logging.getLogger(__name__)
+
+TJP_GIB_CACHE_MAXSIZE = 65536
+"""
+Max number of tjp address -> tjp gib lookups remembered by `get_gib`.
+"""
+
+@functools.lru_cache(maxsize=TJP_GIB_CACHE_MAXSIZE)
+def _get_tjp_gib(tjp_addr: str) -> str:
+    """
+    Every frame in a timeline points at the same tjp address, so the parse
+    is memoized. Cleared with `clear_tjp_gib_cache`.
+    """
+    return get_ib_and_gib(ib_gib_addr=tjp_addr)['gib']
+
+def clear_tjp_gib_cache() -> None:
+    _get_tjp_gib.cache_clear()
+
+def get_transform_data(transform_type: str, **opts) -> dict:
+    """
+    Builds the TS-shaped transform options (camelCase keys) stored in a dna,
+    e.g. `get_transform_data('mut8', dataToAddOrPatch={...}, dna=True)`.
+
+    Mirrors JSON-cloning the TS opts object, where unset options are dropped.
+    False flags are dropped as well, since they are the defaults.
+    """
+    transform_data = {'type': transform_type}
+    for key, value in opts.items():
+        if value is not None and value is not False:
+            transform_data[key] = value
+    return transform_data
+
+def increment_n(n: Any) -> int:
+    """
+    Next value of the `data.n` counter: 0 if there is no counter yet, else
+    `n + 1`. A negative counter is unexpected and is reset to 0.
+    """
+    if n is None:
+        return 0
+    if isinstance(n, bool) or not isinstance(n, (int, float)) or n != int(n):
+        raise ValueError('cannot increment nCounter because data.n is not a number.')
+    if n >= 0:
+        return int(n) + 1
+    logger.warning('[increment_n] data.n is less than 0, which is unexpected. Resetting data.n to 0.')
+    return 0
+
+def build_dna(transform_data: dict) -> dict:
+    """
+    Builds the dna ibgib for a transform from its options, e.g.
+    `{'type': 'mut8', 'dataToAddOrPatch': {...}, 'dna': True}`.
+
+    `src`/`srcAddr` are dropped so the same dna can be reapplied to different
+    srcs (the src is captured by the new ibgib's `past`/`ancestor` anyway).
+    """
+    transform_data = {k: v for k, v in transform_data.items() if k not in ('src', 'srcAddr')}
+    transform_type = transform_data['type']
+    result = {
+        'ib': transform_type,
+        'data': transform_data,
+        'rel8ns': {
+            'ancestor': [f'{transform_type}{IBGIB_DELIMITER}{GIB}'],  # e.g. fork^gib
+        },
+    }
+    result['gib'] = sha256v1(result)
+    return result
+
+def is_primitive(ib_gib: Optional[dict] = None, gib: Optional[str] = None) -> bool:
+    """
+    True if the gib (given or taken from `ib_gib`) is the primitive 'gib'.
+
+    A falsy gib also counts as primitive (or a programming error).
+    """
+    if ib_gib:
+        return is_primitive(gib=ib_gib.get('gib'))
+    if gib:
+        return gib == GIB
+    return True
+
+def is_dna(ib_gib: dict) -> bool:
+    """
+    True if the ibgib is a transform dna ibgib, i.e. its ancestor is one of
+    the known transform primitives (fork^gib, mut8^gib, ...).
+    """
+    if not ib_gib:
+        raise ValueError('ibGib required.')
+    known = [f'{x}{IBGIB_DELIMITER}{GIB}' for x in ('fork', 'mut8', 'rel8', 'plan')]
+    ancestor = (ib_gib.get('rel8ns') or {}).get('ancestor')
+    return isinstance(ancestor, list) and any(x in known for x in ancestor)
+
+def get_gib(
+    ib_gib: dict,
+    has_tjp: Optional[bool] = None,
+    gib_delimiter: Optional[str] = None,
+    is_primitive: bool = False,
+) -> str:
+    """
+    Generates the gib of a given `ib_gib`.
+
+    Returns either the bare hash for ibgibs with no tjp; or the tjp-scoped
+    `hash.tjpGib`; or 'gib' for primitives. If the ibgib is itself the tjp
+    (`data.isTjp`), the gib is only the hash.
+
+    If `has_tjp` is falsy, the ibgib's `rel8ns.tjp` and `data.isTjp` are
+    checked to see whether it has a tjp.
+    """
+    if not ib_gib:
+        raise ValueError('ibGib required. (E: 17d073226b9d42fd841e5a94b065ef21)')
+    if is_primitive:
+        return GIB
+
+    ib_gib_hash = sha256v1(ib_gib)
+    rel8ns = ib_gib.get('rel8ns') or {}
+    data = ib_gib.get('data')
+    is_tjp = bool(isinstance(data, dict) and data.get('isTjp'))
+    tjp_addrs = rel8ns.get('tjp')
+    gib_delimiter = gib_delimiter or GIB_DELIMITER
+
+    if not has_tjp:
+        has_tjp = bool(tjp_addrs) or is_tjp
+    if not has_tjp:
+        # no tjp, so gib is just the hash
+        return ib_gib_hash
+
+    if tjp_addrs:
+        if len(tjp_addrs) > 1:
+            logger.warning('[get_gib] found more than one tjp addr...only expecting 1 ATOW. (W: 10ed43f716e743e0afd1954f1ab46789)')
+        tjp_addr = tjp_addrs[-1]
+        if not tjp_addr:
+            raise ValueError('most recent rel8ns.tjp addr is falsy. (E: ed879d2b039543f8b1902e8b7b5a5a7b)')
+        tjp_gib = _get_tjp_gib(tjp_addr)
+    elif tjp_addrs is not None:
+        raise ValueError('hasTjp is true but rel8ns.tjp is empty array. (E: d08b2f9e86494814b5e7d7b4602b2ab7)')
+    elif is_tjp:
+        # the ibgib itself is the tjp
+        tjp_gib = ib_gib_hash
+    else:
+        raise ValueError('hasTjp is true, but both ibGib.rel8ns.tjp and ibGib.data.isTjp are falsy. (E: 4e246897e52044789594d853bb5b66ee)')
+
+    if not tjp_gib:
+        raise ValueError('hasTjp is true but could not find tjpAddrGib. (E: 1863df626b754744a1d431a683cb0ba0)')
+
+    # if the ibgib IS the tjp, then the gib is only the hash. otherwise it is
+    # the hash plus the tjp gib.
+    return ib_gib_hash if is_tjp else f'{ib_gib_hash}{gib_delimiter}{tjp_gib}'
+
+def get_gib_info(
+    ib_gib_addr: Optional[str] = None,
+    gib: Optional[str] = None,
+    gib_delimiter: Optional[str] = None,
+) -> GibInfo:
+    """
+    Parses gib (either via `gib` param or the gib of `ib_gib_addr`) and returns
+    information about it.
+
+    Uses a single split and no regex, since this runs for every address.
+    """
+    if not ib_gib_addr and not gib:
+        raise ValueError('Either ibGibAddr or gib required. (E: 25e3dcbe63cd44909032df12af9df75e)')
+    if not gib:
+        gib = ib_gib_addr.rpartition(IBGIB_DELIMITER)[2]
+
+    if gib == GIB:
+        return {'is_primitive': True}
+
+    if gib_delimiter is None:
+        gib_delimiter = GIB_DELIMITER
+
+    pieces = gib.split(gib_delimiter)
+    pieces_count = len(pieces)
+    if pieces_count == 1:
+        return {'punctiliar_hash': gib, 'pieces_count': 1, 'delimiter': gib_delimiter}
+
+    if '' in pieces:
+        raise ValueError(f'unexpected gib that contains gibDelimiter ({gib_delimiter}) but has at least one piece with empty string. (E: 75a94280045541009ee68182d12d3449)')
+    if pieces_count > 2:
+        logger.warning('[get_gib_info] gib only expected to have two pieces ATOW. re-examine please. (W: aa4283ac5a5747a386a69966ecdad39d)')
+
+    punctiliar_hash, _, tjp_gib = gib.partition(gib_delimiter)
+    return {
+        'punctiliar_hash': punctiliar_hash,
+        'tjp_gib': tjp_gib,
+        'pieces_count': pieces_count,
+        'delimiter': gib_delimiter,
+    }
+
+def get_gib_info_many(
+    ib_gib_addrs: Sequence[str],
+    gib_delimiter: Optional[str] = None,
+) -> Tuple[List[Optional[str]], List[Optional[str]], List[int]]:
+    """
+    Batched `get_gib_info` over many addresses, returned as parallel lists:
+
+        (punctiliar_hashes, tjp_gibs, pieces_counts)
+
+    Primitives ('gib') get (None, None, 0) and gibs without a tjp get a tjp
+    gib of None. Raises ValueError (naming the index) on malformed gibs.
+    """
+    if gib_delimiter is None:
+        gib_delimiter = GIB_DELIMITER
+    punctiliar_hashes: List[Optional[str]] = []
+    tjp_gibs: List[Optional[str]] = []
+    pieces_counts: List[int] = []
+
+    for i, addr in enumerate(ib_gib_addrs):
+        gib = addr.rpartition(IBGIB_DELIMITER)[2]
+        if gib == GIB:
+            punctiliar_hashes.append(None)
+            tjp_gibs.append(None)
+            pieces_counts.append(0)
+            continue
+        punctiliar_hash, sep, tjp_gib = gib.partition(gib_delimiter)
+        if not sep:
+            punctiliar_hashes.append(gib)
+            tjp_gibs.append(None)
+            pieces_counts.append(1)
+            continue
+        if not punctiliar_hash or not tjp_gib:
+            raise ValueError(f'unexpected gib at index {i} ({gib}) that contains gibDelimiter ({gib_delimiter}) but has at least one piece with empty string. (E: 75a94280045541009ee68182d12d3449)')
+        pieces_count = 2
+        if gib_delimiter in tjp_gib:
+            if '' in tjp_gib.split(gib_delimiter):
+                raise ValueError(f'unexpected gib at index {i} ({gib}) that contains gibDelimiter ({gib_delimiter}) but has at least one piece with empty string. (E: 75a94280045541009ee68182d12d3449)')
+            pieces_count = tjp_gib.count(gib_delimiter) + 2
+        punctiliar_hashes.append(punctiliar_hash)
+        tjp_gibs.append(tjp_gib)
+        pieces_counts.append(pieces_count)
+
+    return punctiliar_hashes, tjp_gibs, pieces_counts
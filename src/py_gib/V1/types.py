@@ -0,0 +1,214 @@
+# py_gib/V1/types.py
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypedDict, Union
+import sys
+
+class GibInfo(TypedDict, total=False):
+    """
+    Information parsed from a `gib`, see `get_gib_info`.
+    """
+    punctiliar_hash: str
+    """Hash for this ibgib frame in time."""
+    tjp_gib: str
+    """The gib for this ibgib's most recent tjp, if any."""
+    pieces_count: int
+    """Number of delimited pieces in the gib."""
+    delimiter: str
+    """The gib delimiter used to parse the gib."""
+    is_primitive: bool
+    """True if the gib is just 'gib' (GIB constant)."""
+
+class Rel8n:
+    """
+    Convenience names for the well-known rel8ns, to avoid spelling mistakes.
+    """
+    past = 'past'
+    ancestor = 'ancestor'
+    dna = 'dna'
+    identity = 'identity'
+    tjp = 'tjp'
+    secret = 'secret'
+    encryption = 'encryption'
+
+class TransformResult(TypedDict, total=False):
+    """
+    Result of applying a transform (fork, mut8, rel8).
+    """
+    new_ib_gib: dict
+    """The ibgib produced by the transform."""
+    dnas: List[dict]
+    """The dna ibgibs of the applied transform(s), if dna was requested."""
+    intermediate_ib_gibs: List[dict]
+    """Interim ibgibs when multiple transforms were applied in one step."""
+
+_HASH_HEX_LEN = 64
+_HASH_DIGEST_LEN = 32
+
+def intern_addr(addr: str) -> str:
+    """
+    Returns the shared copy of `addr`, so that the same address rel8d from many
+    ibgibs is held in memory once. Uses the interpreter's intern table.
+    """
+    return sys.intern(addr)
+
+def _gib_to_digest(gib: str) -> Optional[bytes]:
+    """
+    Packs a gib made of uppercase sha-256 hex hashes (`HASH` or `HASH.TJPHASH`)
+    into the concatenated raw digests, or None if it does not round trip.
+    """
+    hashes = gib.split('.')
+    if len(hashes) > 2 or any(len(h) != _HASH_HEX_LEN for h in hashes):
+        return None
+    try:
+        digest = b''.join(bytes.fromhex(h) for h in hashes)
+    except ValueError:
+        return None
+    return digest if _digest_to_gib(digest) == gib else None
+
+def _digest_to_gib(digest: bytes) -> str:
+    return '.'.join(
+        digest[i:i + _HASH_DIGEST_LEN].hex().upper()
+        for i in range(0, len(digest), _HASH_DIGEST_LEN)
+    )
+
+class IbGib_V1:
+    """
+    Compact, read-only ibgib record for holding many ibgibs in memory.
+
+    Compared to the plain dict form:
+
+    * fields live in `__slots__`, so there is no per-instance `__dict__`.
+    * rel8n names and addresses are interned (see `intern_addr`), so an
+      address rel8d from thousands of ibgibs is stored once, and each rel8n
+      is a tuple instead of a list.
+    * with `compact_gib=True`, the gib is held as its raw 32-byte digest(s)
+      instead of 64+ hex characters. `gib` still returns the hex string.
+
+    Records support `get`/`[]` with the usual 'ib', 'gib', 'data' and 'rel8ns'
+    keys, so `sha256v1` and the address helpers accept them in place of a
+    dict. Use `to_dict` for anything that needs a real dict.
+
+    Attributes cannot be reassigned. `data` and `rel8ns` are not copied, so
+    (as with every ibgib) they must not be mutated.
+    """
+    __slots__ = ('ib', '_gib', 'data', 'rel8ns')
+
+    ib: str
+    data: Any
+    rel8ns: Optional[Dict[str, Tuple[str, ...]]]
+
+    def __init__(
+        self,
+        ib: str,
+        gib: Optional[str] = None,
+        data: Any = None,
+        rel8ns: Optional[Dict[str, Iterable[str]]] = None,
+        compact_gib: bool = False,
+    ):
+        packed_gib: Union[str, bytes, None] = gib
+        if gib is not None:
+            digest = _gib_to_digest(gib) if compact_gib else None
+            packed_gib = digest if digest is not None else sys.intern(gib)
+        if rel8ns is not None:
+            rel8ns = {
+                sys.intern(name): tuple(map(sys.intern, addrs)) if isinstance(addrs, (list, tuple)) else addrs
+                for name, addrs in rel8ns.items()
+            }
+        object.__setattr__(self, 'ib', sys.intern(ib) if isinstance(ib, str) else ib)
+        object.__setattr__(self, '_gib', packed_gib)
+        object.__setattr__(self, 'data', data)
+        object.__setattr__(self, 'rel8ns', rel8ns)
+
+    @classmethod
+    def from_dict(cls, ib_gib: dict, compact_gib: bool = False) -> 'IbGib_V1':
+        return cls(
+            ib_gib.get('ib'), gib=ib_gib.get('gib'), data=ib_gib.get('data'),
+            rel8ns=ib_gib.get('rel8ns'), compact_gib=compact_gib,
+        )
+
+    def to_dict(self) -> dict:
+        """
+        Plain dict form, with rel8ns as lists. Keys that are None are omitted.
+        """
+        result: Dict[str, Any] = {'ib': self.ib}
+        gib = self.gib
+        if gib is not None:
+            result['gib'] = gib
+        if self.data is not None:
+            result['data'] = self.data
+        if self.rel8ns is not None:
+            result['rel8ns'] = {
+                name: list(addrs) if isinstance(addrs, tuple) else addrs
+                for name, addrs in self.rel8ns.items()
+            }
+        return result
+
+    @property
+    def gib(self) -> Optional[str]:
+        gib = self._gib
+        return _digest_to_gib(gib) if isinstance(gib, bytes) else gib
+
+    @property
+    def digest(self) -> Optional[bytes]:
+        """
+        Raw 32-byte digest of the punctiliar hash, or None for primitives.
+        """
+        gib = self._gib
+        if isinstance(gib, bytes):
+            return gib[:_HASH_DIGEST_LEN]
+        if gib:
+            packed = _gib_to_digest(gib)
+            if packed is not None:
+                return packed[:_HASH_DIGEST_LEN]
+        return None
+
+    @property
+    def addr(self) -> str:
+        return f'{self.ib}^{self.gib or ""}'
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'gib':
+            gib = self.gib
+            return default if gib is None else gib
+        if key in ('ib', 'data', 'rel8ns'):
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, IbGib_V1):
+            return NotImplemented
+        return (
+            self.ib == other.ib and self.gib == other.gib and
+            self.data == other.data and self.rel8ns == other.rel8ns
+        )
+
+    def __hash__(self) -> int:
+        # the gib is the content hash, so the address identifies the record.
+        return hash((self.ib, self.gib))
+
+    def __repr__(self) -> str:
+        return f'IbGib_V1({self.addr!r})'
+
+    def __reduce__(self):
+        return (_ib_gib_v1_from_state, (self.ib, self._gib, self.data, self.rel8ns))
+
+def _ib_gib_v1_from_state(ib: str, packed_gib: Union[str, bytes, None], data: Any, rel8ns: Any) -> IbGib_V1:
+    record = IbGib_V1(ib, data=data, rel8ns=rel8ns)
+    object.__setattr__(record, '_gib', packed_gib)
+    return record
@@ -0,0 +1,67 @@
+# py_gib/V1/v1_helper.py
+
+import copy
+import logging
+
+from ..helper import get_ib_gib_addr
+from .constants import GIB, GIB_DELIMITER
+from .transforms.transform_helper import get_gib_info
+
+logger = logging.getLogger(__name__)
+
+def has_tjp(ib_gib: dict) -> bool:
+    """
+    Checks the given `ib_gib` to see if it either has a tjp or is a tjp itself.
+
+    tjp = temporal junction point, i.e. the first unique frame of a timeline,
+    whose address acts as the "name" of that timeline.
+    """
+    if not ib_gib:
+        logger.warning('[has_tjp] ibGib falsy. (W: 884178562f5b4f15933ac4d98db74cc6)')
+        return False
+
+    data = ib_gib.get('data')
+    rel8ns = ib_gib.get('rel8ns')
+    if not isinstance(rel8ns, dict):
+        rel8ns = {}
+    if (isinstance(data, dict) and data.get('isTjp')) or rel8ns.get('tjp'):
+        return True
+
+    # dna transforms do not have tjp
+    dna_primitives = ['fork^gib', 'mut8^gib', 'rel8^gib']
+    if any(x in dna_primitives for x in rel8ns.get('ancestor') or []):
+        return False
+
+    gib = ib_gib.get('gib')
+    if not gib:
+        logger.warning('[has_tjp] ibGib.gib falsy. (W: 6400d780822b44d992846f1196509be3)')
+        return False
+    if GIB_DELIMITER in gib:
+        return True
+    if gib == GIB:
+        # primitive
+        return False
+
+    # would change if we change our standards for gib, so ask get_gib_info.
+    return bool(get_gib_info(ib_gib_addr=get_ib_gib_addr(ib_gib=ib_gib)).get('tjp_gib'))
+
+def to_dto(ib_gib: dict) -> dict:
+    """
+    Returns a copy of the given `ib_gib` with only the ibgib fields (ib, gib,
+    data, rel8ns). `data` and `rel8ns` are deep copied, except binary data.
+    """
+    if not ib_gib.get('ib'):
+        logger.warning('[to_dto] ibGib.ib is falsy. (W: e60e41c2a1fc48268379d88ce13cb77b)')
+    if not ib_gib.get('gib'):
+        logger.warning('[to_dto] ibGib.gib is falsy. (W: fb3889cbf0684ae4ac51e48f28570377)')
+
+    dto = {'ib': ib_gib.get('ib') or ''}
+    if ib_gib.get('gib'):
+        dto['gib'] = ib_gib['gib']
+    data = ib_gib.get('data')
+    if data:
+        # we do not copy binaries when creating the dto.
+        dto['data'] = data if isinstance(data, (bytes, bytearray, memoryview)) else copy.deepcopy(data)
+    if ib_gib.get('rel8ns'):
+        dto['rel8ns'] = copy.deepcopy(ib_gib['rel8ns'])
+    return dto
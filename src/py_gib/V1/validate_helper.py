@@ -0,0 +1,175 @@
+# py_gib/V1/validate_helper.py
+
+from typing import List, Optional
+import logging
+import re
+
+from ..helper import get_ib_and_gib, get_ib_gib_addr
+from .constants import GIB_DELIMITER, IB, IBGIB_DELIMITER
+from .transforms.transform_helper import get_gib, get_gib_info, is_primitive
+from .v1_helper import has_tjp
+
+logger = logging.getLogger(__name__)
+
+HEXADECIMAL_HASH_STRING_REGEXP_32 = re.compile(r'[0-9a-fA-F]{32}')
+HEXADECIMAL_HASH_STRING_REGEXP_64 = re.compile(r'[0-9a-fA-F]{64}')
+
+def validate_ib_gib_intrinsically(ib_gib: dict) -> Optional[List[str]]:
+    """
+    Validates the ibgib's address (`ib` and `gib` properties) and recalculates
+    the `gib` against `ib_gib['gib']`.
+
+    This validates not only that the punctiliar gib hash for this ibgib record
+    hashes to the same value, but also that the tjp gib in the gib matches the
+    tjp rel8n.
+
+    Returns a list of error strings, or None if valid.
+    """
+    if not ib_gib:
+        return ['ibGib is itself falsy. (E: 4fb98caf6ed24ef7b35a19cef56e2d7e)']
+
+    addr = get_ib_gib_addr(ib_gib=ib_gib)
+    errors = validate_ib_gib_addr(addr) or []
+    if errors:
+        logger.debug(f'[validate_ib_gib_intrinsically] errors found in addr: {addr}')
+        return errors
+
+    # if it's a primitive, the caller knows (or should know!) there are no
+    # metadata guarantees.
+    if is_primitive(gib=ib_gib.get('gib')):
+        return None
+
+    # unlike the TS, no dto copy here: get_gib only reads ib/data/rel8ns and
+    # does not mutate them.
+    gotten_gib = get_gib(ib_gib, has_tjp=has_tjp(ib_gib))
+    if gotten_gib != ib_gib['gib']:
+        data = ib_gib.get('data')
+        if ib_gib.get('ib') == 'rel8' and isinstance(data, dict) and data.get('src') and data.get('srcAddr'):
+            # old rel8 dna ibgibs were hashed without these, matching the TS workaround.
+            data = {k: v for k, v in data.items() if k not in ('src', 'srcAddr')}
+            gotten_gib = get_gib({**ib_gib, 'data': data}, has_tjp=has_tjp(ib_gib))
+            if gotten_gib != ib_gib['gib']:
+                errors.append(f"Ibgib invalid intrinsically - gottenGib ({gotten_gib}) does not equal ibGib.gib ({ib_gib['gib']}). (E: 020b71479e944b2198fe436e7e137786)")
+        else:
+            errors.append(f"Ibgib invalid intrinsically - gottenGib ({gotten_gib}) does not equal ibGib.gib ({ib_gib['gib']}). (E: 7416db016878430ca3c5b20697f164ed)")
+
+    return errors or None
+
+def validate_ib_gib_addr(
+    addr: str,
+    delimiter: Optional[str] = None,
+    version: Optional[str] = None,
+) -> Optional[List[str]]:
+    """
+    Naive synchronous validation for ibgib addresses.
+
+    Returns a list of error strings, or None if valid.
+    """
+    if version:
+        logger.warning('[validate_ib_gib_addr] version not implemented yet. Ignoring. (W: 2d19db16ec0c4766b5d35248787671f3)')
+
+    if not addr:
+        return ['addr required. (E: e9a54041aa0b41c1bb2324d9d2d42c7f)']
+
+    errors: List[str] = []
+    delimiter = delimiter or IBGIB_DELIMITER
+    if delimiter not in addr:
+        errors.append(f'No delimiter ({delimiter}) found. (E: 05e28dcb70ff44019edc53ed508bd1e8)')
+    if addr.startswith(delimiter):
+        errors.append('addr starts with delim. (E: d29f808c5a47452f9bb3ea684694c6eb)')
+
+    ib_and_gib = get_ib_and_gib(ib_gib_addr=addr, delimiter=delimiter)
+    errors.extend(validate_ib(ib_and_gib['ib'], ib_gib_addr_delimiter=delimiter, version=version) or [])
+    errors.extend(validate_gib(ib_and_gib['gib'], ib_gib_addr_delimiter=delimiter, version=version) or [])
+
+    return errors or None
+
+def validate_ib(
+    ib: str,
+    ib_gib_addr_delimiter: Optional[str] = None,
+    version: Optional[str] = None,
+) -> Optional[List[str]]:
+    """
+    Naive validation of ib.
+
+    Returns a list of error strings, or None if valid.
+    """
+    if version:
+        logger.warning('[validate_ib] version not implemented yet. Ignoring. (W: 71228ba4ed994aaa8149910e295ab087)')
+
+    if not ib:
+        return ['ib required. (E: a76d06c7b9c24db3a731a91dbe46acd5)']
+    if ib == IB:
+        return None
+
+    ib_gib_addr_delimiter = ib_gib_addr_delimiter or IBGIB_DELIMITER
+    if ib_gib_addr_delimiter in ib:
+        return [f'ib contains ibGibAddrDelimiter ({ib_gib_addr_delimiter}) (E: 09e61b46c3e84874bc02b6918f1f2c39)']
+    return None
+
+def validate_gib(
+    gib: str,
+    gib_delimiter: Optional[str] = None,
+    ib_gib_addr_delimiter: Optional[str] = None,
+    version: Optional[str] = None,
+) -> Optional[List[str]]:
+    """
+    Validates a `gib` of some ibgib/ibgib address.
+
+    If the gib has a tjp embedded in it (i.e. the associated ibgib has a tjp),
+    the tjp gib is validated recursively.
+
+    Note that `gib_delimiter` (atow '.') is NOT the same thing as the
+    `ib_gib_addr_delimiter` (atow '^').
+
+    Returns a list of error strings, or None if valid.
+    """
+    if version:
+        logger.warning('[validate_gib] version not implemented yet. Ignoring. (E: 90ced1db69774702b92acb261bdaee23)')
+
+    if not gib:
+        return ['gib required. (E: e217de4035b04086827199f4bace189c)']
+
+    errors: List[str] = []
+    ib_gib_addr_delimiter = ib_gib_addr_delimiter or IBGIB_DELIMITER
+    if ib_gib_addr_delimiter in gib:
+        errors.append(f'gib ({gib}}}) contains invalid characters: ("{ib_gib_addr_delimiter}") (E: 1e584258d9e049ba9ce7e516f3ab97f1)')
+
+    gib_info = get_gib_info(gib=gib, gib_delimiter=gib_delimiter or GIB_DELIMITER)
+
+    # automatically valid if it's a primitive, as the caller should expect no
+    # cryptographical guarantees
+    if gib_info.get('is_primitive'):
+        return None
+
+    punctiliar_hash = gib_info.get('punctiliar_hash')
+    if not punctiliar_hash:
+        raise ValueError('[validate_gib] punctiliarHash is falsy on a non-primitive gib. (E: 72835394918241bdb2632bf0510bdae5)')
+    if not (HEXADECIMAL_HASH_STRING_REGEXP_32.fullmatch(punctiliar_hash) or
+            HEXADECIMAL_HASH_STRING_REGEXP_64.fullmatch(punctiliar_hash)):
+        errors.append('gib punctiliar hash is neither a 32- or 64-char hash string. (E: d47ff6d6e14b4c02a62107090c8dad39)')
+
+    tjp_gib = gib_info.get('tjp_gib')
+    if tjp_gib:
+        tjp_gib_errors = validate_gib(tjp_gib)
+        if tjp_gib_errors:
+            errors.append(f"tjpGib has errors (E: d6b79228d4a64c0b967cdb0efcea4d0d). tjpGibValidationErrors: {'. '.join(tjp_gib_errors)}")
+
+    return errors or None
+
+def validate_rel8ns_intrinsically(rel8ns: dict) -> Optional[List[str]]:
+    """
+    Verifies that all rel8n names are strings and all rel8d addresses are
+    valid ibgib addresses.
+
+    Returns a list of error strings, or None if valid.
+    """
+    errors: List[str] = []
+    for rel8n_name, addrs in rel8ns.items():
+        if not isinstance(rel8n_name, str):
+            errors.append('non-string rel8nName found. all keys of rel8ns must be of type string. (E: 3b2e4582b638421681951f5475c85178)')
+        for addr in addrs or []:
+            addr_errors = validate_ib_gib_addr(addr)
+            if addr_errors:
+                errors.append(f"invalid addr found for rel8nName ({rel8n_name}). addr errors: {'|'.join(addr_errors)} (E: 56809a746c4f462db426e90395b80364)")
+    return errors or None
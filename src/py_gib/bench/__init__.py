@@ -0,0 +1 @@
+# This file makes bench a package.
@@ -0,0 +1,66 @@
+# py_gib/bench/__main__.py
+"""
+Runs the hashing benchmark suite (see `suite.py`).
+
+    python -m py_gib.bench [--filter TEXT] [--min-time S] [--output FILE]
+                           [--compare BASELINE] [--current FILE] [--threshold 0.10]
+                           [--memory-floor BYTES]
+
+Prints one line per benchmark and, with `--output`, saves the JSON results.
+With `--compare`, also compares against a saved baseline and exits with 1 if
+any benchmark regressed. `--current` compares a saved result file instead of
+running the suite.
+"""
+
+from typing import Optional, Sequence
+import argparse
+import json
+import sys
+
+from .suite import (
+    DEFAULT_MEMORY_REGRESSION_FLOOR_BYTES, DEFAULT_MIN_TIME_S, DEFAULT_REGRESSION_THRESHOLD,
+    compare_results, format_comparison, format_result, run_suite,
+)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.bench',
+        description='Benchmark the V1 hashing pipeline and check for regressions.',
+    )
+    parser.add_argument('--filter', default=None, help="only run benchmarks whose 'target/shape' name contains this")
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME_S, help='seconds to run each benchmark')
+    parser.add_argument('--output', default=None, help='save JSON results to this file')
+    parser.add_argument('--compare', default=None, metavar='BASELINE', help='baseline JSON results to compare against')
+    parser.add_argument('--current', default=None, help='compare this saved JSON result file instead of running')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='relative slowdown/memory growth flagged as a regression')
+    parser.add_argument('--memory-floor', type=int, default=DEFAULT_MEMORY_REGRESSION_FLOOR_BYTES, metavar='BYTES',
+                        help='peak memory growth below this many bytes is never a regression')
+    args = parser.parse_args(argv)
+
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(
+            name_filter=args.filter, min_time_s=args.min_time,
+            progress=lambda result: print(format_result(result), flush=True),
+        )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare_results(baseline, current, threshold=args.threshold, memory_floor_bytes=args.memory_floor)
+    print()
+    for row in rows:
+        print(format_comparison(row))
+    regressions = sum(1 for row in rows if row['regression'])
+    print(f'{len(rows)} compared, {regressions} regression(s) beyond {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# py_gib/bench/binary_encoding.py
+"""
+Compares binary ibgib records (`V1/binary_encoding.py`) with compact JSON:
+stored size, full decode, and checking a stored ibgib's gib.
+
+    python -m py_gib.bench.binary_encoding [--min-time 0.5]
+
+For JSON, checking a gib means `json.loads` and then `sha256v1`. For a record
+it is `IbGibRecordView(buffer).sha256v1()`, which hashes the stored canonical
+sections in place. JSON has no bytes type, so binary data is base64 encoded on
+the JSON side.
+
+Results on CPython 3.11.7 (x86_64 Linux, 1 cpu):
+
+    shape                JSON B    record B     decode JSON/record us      gib check JSON/record us
+    tiny_primitive           22          35            2.7 /      3.8               9.1 /       8.4
+    wide_flat             33173       33177          758.7 /    727.0            1145.0 /      36.6
+    deep_nested           10608       10612          219.6 /    281.1            2543.3 /      21.9
+    long_past           1400177     1400181         2679.8 /   3449.0           10850.0 /    1413.4
+    large_binary       22369646    16777250       177338.0 /   3766.0          192548.0 /   22258.1
+
+Full decodes cost about the same as `json.loads` (the sections are parsed
+with it), except for binary data, which skips base64. Gib checks no longer
+parse or re-serialize anything, so they are 8-100x faster for JSON shapes.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import argparse
+import base64
+import json
+import sys
+
+from ..V1.binary_encoding import IbGibRecordView, decode_ib_gib, encode_ib_gib
+from ..V1.sha256v1 import sha256v1
+from .suite import DEFAULT_MIN_TIME_S, SHAPES, measure
+
+def _to_json(ib_gib: dict) -> bytes:
+    data = ib_gib.get('data')
+    if isinstance(data, (bytes, bytearray)):
+        ib_gib = {**ib_gib, 'data': base64.b64encode(data).decode('ascii')}
+    return json.dumps(ib_gib, separators=(',', ':')).encode('utf-8')
+
+def _from_json(raw: bytes, binary: bool) -> dict:
+    ib_gib = json.loads(raw)
+    if binary:
+        ib_gib['data'] = base64.b64decode(ib_gib['data'])
+    return ib_gib
+
+def run(min_time_s: float = DEFAULT_MIN_TIME_S) -> List[Dict[str, Any]]:
+    rows = []
+    for shape_name, factory in SHAPES.items():
+        ib_gib = factory()
+        binary = isinstance(ib_gib.get('data'), (bytes, bytearray))
+        raw_json = _to_json(ib_gib)
+        record = encode_ib_gib(ib_gib)
+        if decode_ib_gib(record) != ib_gib or IbGibRecordView(record).sha256v1() != sha256v1(ib_gib):
+            raise AssertionError(f'{shape_name} does not round trip')
+
+        timings: Dict[str, Callable[[], Any]] = {
+            'decode_json': lambda: _from_json(raw_json, binary),
+            'decode_record': lambda: decode_ib_gib(record),
+            'gib_json': lambda: sha256v1(_from_json(raw_json, binary), use_cache=False),
+            'gib_record': lambda: IbGibRecordView(record).sha256v1(),
+        }
+        row: Dict[str, Any] = {'shape': shape_name, 'json_bytes': len(raw_json), 'record_bytes': len(record)}
+        for name, fn in timings.items():
+            row[name + '_us'] = measure(fn, 0, min_time_s=min_time_s)['p50_us']
+        rows.append(row)
+    return rows
+
+def format_row(row: Dict[str, Any]) -> str:
+    return (
+        f"{row['shape']:<16}{row['json_bytes']:>11}{row['record_bytes']:>12}"
+        f"{row['decode_json_us']:>15.1f} / {row['decode_record_us']:>8.1f}"
+        f"{row['gib_json_us']:>18.1f} / {row['gib_record_us']:>9.1f}"
+    )
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.bench.binary_encoding',
+        description='Compare binary ibgib records with JSON: size, decode time and gib check time.',
+    )
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME_S, help='seconds per measurement')
+    args = parser.parse_args(argv)
+
+    print(f'{"shape":<16}{"JSON B":>11}{"record B":>12}{"decode JSON/record us":>26}{"gib check JSON/record us":>30}')
+    for row in run(min_time_s=args.min_time):
+        print(format_row(row), flush=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# py_gib/bench/graph_index.py
+"""
+Times `GraphIndex` updates and queries on a large synthetic graph.
+
+    python -m py_gib.bench.graph_index [--nodes 1000000] [--timelines 10000] [--queries 10000]
+
+The graph is `--timelines` timelines, each forked from one of a few hundred
+shared ancestors, with frames that link their `past` and rel8 a shared `dna`.
+Addresses are synthetic (nothing is hashed), since only the index is timed.
+Reports the build rate and the mean/p99 latency of each query type.
+"""
+
+from typing import Callable, Iterator, List, Optional, Sequence
+import argparse
+import random
+import sys
+import time
+
+from ..graph_index import GraphIndex
+
+def generate(nodes: int, timelines: int) -> Iterator[dict]:
+    """
+    Yields `nodes` synthetic ibgibs, interleaving frames of `timelines`
+    timelines the way a live system would receive them.
+    """
+    heads: List[Optional[str]] = [None] * timelines
+    for i in range(nodes):
+        t = i % timelines
+        tjp_addr = f't{t}^{t:064X}'
+        if heads[t] is None:
+            ib_gib = {
+                'ib': f't{t}', 'gib': f'{t:064X}',
+                'data': {'isTjp': True},
+                'rel8ns': {'ancestor': [f'base{t % 500}^gib']},
+            }
+        else:
+            ib_gib = {
+                'ib': f't{t}', 'gib': f'{i:064X}.{t:064X}',
+                'data': {'n': i // timelines},
+                'rel8ns': {
+                    'ancestor': [f'base{t % 500}^gib'],
+                    'past': [heads[t]],
+                    'tjp': [tjp_addr],
+                    'dna': [f'mut8^{i % 100:064X}'],
+                },
+            }
+        heads[t] = f"{ib_gib['ib']}^{ib_gib['gib']}"
+        yield ib_gib
+
+def _time_queries(fn: Callable[[str], object], args: Sequence[str]) -> str:
+    timings = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    mean_us = sum(timings) / len(timings) * 1e6
+    p99_us = timings[int(len(timings) * 0.99)] * 1e6
+    return f'mean {mean_us:8.2f} us   p99 {p99_us:8.2f} us'
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.bench.graph_index',
+        description='Time GraphIndex builds and queries.',
+    )
+    parser.add_argument('--nodes', type=int, default=1_000_000)
+    parser.add_argument('--timelines', type=int, default=10_000)
+    parser.add_argument('--queries', type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    index = GraphIndex()
+    start = time.perf_counter()
+    index.add_many(generate(args.nodes, args.timelines))
+    elapsed = time.perf_counter() - start
+    print(f'indexed {len(index):,} ibgibs in {elapsed:.2f}s ({len(index) / elapsed:,.0f}/s)')
+
+    rng = random.Random(0)
+    tjps = [f't{t}^{t:064X}' for t in (rng.randrange(args.timelines) for _ in range(args.queries))]
+    frames = [index.heads(tjp)[0] for tjp in tjps]
+    pasts = [index.rel8d(frame, 'past')[0] for frame in frames if index.rel8d(frame, 'past')]
+    print(f'{"head(tjp)":<32}{_time_queries(index.head, tjps)}')
+    print(f'{"referrers(tjp, tjp)":<32}{_time_queries(lambda a: index.referrers(a, "tjp"), tjps)}')
+    print(f'{"referrers(frame)":<32}{_time_queries(index.referrers, pasts)}')
+    print(f'{"descendants(head past)":<32}{_time_queries(index.descendants, pasts)}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# py_gib/bench/incremental_chain.py
+"""
+Hashing throughput over a long mut8 chain: `sha256v1` on every frame vs one
+`IncrementalSha256V1Hasher` carried along the chain.
+
+    python -m py_gib.bench.incremental_chain [--steps 5000] [--keys 200] [--linked-past]
+
+Builds a timeline of `--steps` mut8 frames whose `data` has `--keys` keys
+(each step patches one random key and the timestamp) and whose `past` keeps
+every previous address, unless `--linked-past`. Then hashes every frame both
+ways (the gibs must match) and reports frames/s.
+
+Results on CPython 3.11.7 (x86_64 Linux, 1 cpu):
+
+    5,001 frames, 200 data keys, full past      sha256v1    727 frames/s   incremental  8,973 frames/s (12.3x)
+    5,001 frames, 200 data keys, linked past    sha256v1 14,603 frames/s   incremental 15,261 frames/s (1.0x)
+    2,001 frames, 2000 data keys, full past     sha256v1    907 frames/s   incremental  1,542 frames/s (1.7x)
+
+A full `past` is where the time goes, and only its new address is hashed.
+A small `data` block is hashed in one pass either way. In the 2000-key
+`data` block (~45 KB), a patch to a random key still re-encodes that key's
+segment and digests everything after it, so the gain there is smaller.
+"""
+
+from typing import List, Optional, Sequence
+import argparse
+import random
+import sys
+import time
+
+from ..V1.constants import ROOT
+from ..V1.incremental_sha256v1 import IncrementalSha256V1Hasher
+from ..V1.sha256v1 import sha256v1
+from ..V1.transforms.fork import fork
+from ..V1.transforms.mut8 import mut8
+
+def build_chain(steps: int, keys: int, linked_past: bool = False, seed: int = 0) -> List[dict]:
+    """
+    The frames of a `steps` long mut8 chain, in order.
+    """
+    rng = random.Random(seed)
+    src = fork(ROOT, dest_ib='bench', tjp={'uuid': True})['new_ib_gib']
+    src = mut8(src, data_to_add_or_patch={f'key{i:04}': f'value {i}' for i in range(keys)})['new_ib_gib']
+    linked_rel8ns = ['past'] if linked_past else None
+    frames = [src]
+    for step in range(steps):
+        patch = {f'key{rng.randrange(keys):04}': f'step {step}'}
+        src = mut8(src, data_to_add_or_patch=patch, linked_rel8ns=linked_rel8ns, n_counter=True)['new_ib_gib']
+        frames.append(src)
+    return frames
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.bench.incremental_chain',
+        description='Compare full and incremental re-hashing along a mut8 chain.',
+    )
+    parser.add_argument('--steps', type=int, default=5000)
+    parser.add_argument('--keys', type=int, default=200, help='keys in each frame\'s data')
+    parser.add_argument('--linked-past', action='store_true', help='keep only the previous addr in past')
+    args = parser.parse_args(argv)
+
+    frames = build_chain(args.steps, args.keys, args.linked_past)
+    start = time.perf_counter()
+    full = [sha256v1(x, use_cache=False) for x in frames]
+    full_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    incremental = list(IncrementalSha256V1Hasher().hash_many(frames))
+    incremental_s = time.perf_counter() - start
+    if incremental != full:
+        raise AssertionError('incremental gibs differ from sha256v1')
+
+    print(f'{len(frames):,} frames, {args.keys} data keys, {"linked" if args.linked_past else "full"} past')
+    print(f'sha256v1:    {len(frames) / full_s:>10,.0f} frames/s')
+    print(f'incremental: {len(frames) / incremental_s:>10,.0f} frames/s ({full_s / incremental_s:.1f}x)')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
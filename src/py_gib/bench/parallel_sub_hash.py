@@ -0,0 +1,90 @@
+# py_gib/bench/parallel_sub_hash.py
+"""
+Sequential `sha256v1` vs `sha256v1_parallel` on single very large ibgibs.
+
+    python -m py_gib.bench.parallel_sub_hash [--scale 1] [--min-time 0.5]
+
+Shapes (sizes times `--scale`):
+
+* `binary_and_past`: 64 MB of binary `data` and a 100,000 address `past`.
+* `json_and_past`: ~20 MB of JSON `data` and a 100,000 address `past`.
+* `small`: a regular comment, which stays on the sequential path.
+
+Results on CPython 3.11.7 (x86_64 Linux, 1 cpu):
+
+    shape               sequential ms  parallel ms  speedup
+    binary_and_past            206.64       227.13    0.91x
+    json_and_past             1457.02      1024.65    1.42x
+    small                        0.02         0.03    0.78x
+
+With one cpu there is nothing to overlap with, and repeated runs of the large
+shapes land anywhere within about 0.9-1.4x, i.e. noise. `small` shows the cost
+of the size check before falling back to `sha256v1` (about 6 us). The gain
+needs at least 2 cores: there the 64 MB digest runs without the GIL alongside
+the `past` serialization, bounding the call by the slower of the two.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import argparse
+import os
+import sys
+
+from ..V1.parallel_sha256v1 import get_sub_hash_executor, sha256v1_parallel, shutdown_sub_hash_executor
+from ..V1.sha256v1 import sha256v1
+from .suite import DEFAULT_MIN_TIME_S, measure
+
+_HASH = '{:064X}'
+
+def _past(n: int) -> Dict[str, List[str]]:
+    tjp_gib = _HASH.format(1)
+    return {
+        'ancestor': ['comment^gib'],
+        'past': [f'comment^{_HASH.format(i)}.{tjp_gib}' for i in range(n)],
+        'tjp': [f'comment^{tjp_gib}'],
+    }
+
+def shapes(scale: float = 1) -> Dict[str, dict]:
+    n_past = int(100_000 * scale)
+    return {
+        'binary_and_past': {'ib': 'pic', 'data': os.urandom(int(64 * 1024 * 1024 * scale)), 'rel8ns': _past(n_past)},
+        'json_and_past': {
+            'ib': 'doc',
+            'data': {f'row{i}': {'text': f'row {i} ' * 10, 'n': i, 'tags': ['a', 'b']} for i in range(int(200_000 * scale))},
+            'rel8ns': _past(n_past),
+        },
+        'small': {'ib': 'comment', 'data': {'text': 'hi'}, 'rel8ns': _past(3)},
+    }
+
+def run(scale: float = 1, min_time_s: float = DEFAULT_MIN_TIME_S) -> List[Dict[str, Any]]:
+    rows = []
+    get_sub_hash_executor()
+    try:
+        for name, ib_gib in shapes(scale).items():
+            if sha256v1_parallel(ib_gib) != sha256v1(ib_gib):
+                raise AssertionError(f'{name}: gibs differ')
+            sequential = measure(lambda: sha256v1(ib_gib, use_cache=False), 0, min_time_s)
+            parallel = measure(lambda: sha256v1_parallel(ib_gib, use_cache=False), 0, min_time_s)
+            rows.append({'shape': name, 'sequential_us': sequential['p50_us'], 'parallel_us': parallel['p50_us']})
+    finally:
+        shutdown_sub_hash_executor()
+    return rows
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.bench.parallel_sub_hash',
+        description='Compare sequential and parallel sub-hashing of very large ibgibs.',
+    )
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME_S)
+    args = parser.parse_args(argv)
+    print(f'cpus: {os.cpu_count()}')
+    print(f'{"shape":<18} {"sequential ms":>14} {"parallel ms":>12} {"speedup":>8}')
+    for row in run(args.scale, args.min_time):
+        print(
+            f'{row["shape"]:<18} {row["sequential_us"] / 1e3:>14.2f} {row["parallel_us"] / 1e3:>12.2f} '
+            f'{row["sequential_us"] / row["parallel_us"]:>7.2f}x'
+        )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
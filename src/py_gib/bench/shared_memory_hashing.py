@@ -0,0 +1,116 @@
+# py_gib/bench/shared_memory_hashing.py
+"""
+Multi-process hashing of ibgibs with large payloads: `sha256v1_many`, which
+pickles every ibgib to the workers, vs `sha256v1_many_shared`, which passes
+the large payloads through shared memory.
+
+    python -m py_gib.bench.shared_memory_hashing [--count 200] [--size-kb 1024] [--workers N]
+
+Shapes (`--count` ibgibs each):
+
+* `binary`: ibgibs with `--size-kb` of binary `data`.
+* `records`: `encode_ib_gib` records of ibgibs with about `--size-kb` of JSON
+  `data` (the pickling path gets the same ibgibs as dicts).
+
+Reports the bytes pickled to the workers both ways (the IPC volume) and the
+throughput. Results on CPython 3.11.7 (x86_64 Linux, 1 cpu, 2 workers):
+
+    shape      pickled MB  shared MB  pickled MB (shm)  IPC saved  pickling MB/s  shared MB/s
+    binary         209.72     209.72             0.007    99.997%            192          324
+    records        216.10     216.07             0.004    99.998%             41          403
+
+`sha256v1_many_shared` runs with its defaults, i.e. chunks cut at
+`DEFAULT_SEGMENT_BYTES`. Throughput is noisy here: other runs gave 242 vs 421
+MB/s and 34 vs 525 MB/s.
+For `binary`, only the copies go away: the parent makes one copy into the
+segment instead of pickling, and nothing goes through the pipe or is
+unpickled. For `records`, the workers hash the stored canonical JSON in place,
+but the pickling path has to unpickle and re-serialize every `data` dict. So
+that is less work overall, not just less IPC. With one cpu the parent and the
+workers share a core, so only the totals compare.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import argparse
+import os
+import pickle
+import sys
+import time
+
+from ..pool import DEFAULT_CHUNK_SIZE
+from ..V1.binary_encoding import encode_ib_gib
+from ..V1.sha256v1 import sha256v1
+from ..V1.sha256v1_many import sha256v1_many
+from ..V1.shared_memory_sha256v1 import SharedMemoryStats, sha256v1_many_shared
+
+def shapes(count: int, size_kb: int) -> Dict[str, List[dict]]:
+    rows = max(1, size_kb * 1024 // 110)
+    return {
+        'binary': [{'ib': f'pic {i}', 'data': os.urandom(size_kb * 1024)} for i in range(count)],
+        'records': [
+            {'ib': f'doc {i}', 'data': {f'row{j:06}': f'{i} {j} ' + 'x' * 90 for j in range(rows)}}
+            for i in range(count)
+        ],
+    }
+
+def _pickled_bytes(ib_gibs: List[Any], chunk_size: int) -> int:
+    return sum(
+        len(pickle.dumps(ib_gibs[i:i + chunk_size], pickle.HIGHEST_PROTOCOL))
+        for i in range(0, len(ib_gibs), chunk_size)
+    )
+
+def run(count: int = 200, size_kb: int = 1024, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    workers = workers or max(2, os.cpu_count() or 1)
+    rows = []
+    for name, ib_gibs in shapes(count, size_kb).items():
+        items = [encode_ib_gib(x) for x in ib_gibs] if name == 'records' else ib_gibs
+        payload_bytes = sum(len(x) for x in items) if name == 'records' else sum(len(x['data']) for x in ib_gibs)
+        expected = [sha256v1(x) for x in ib_gibs]
+        chunk_size = max(1, min(DEFAULT_CHUNK_SIZE, count // (2 * workers)))
+
+        start = time.perf_counter()
+        pickling = list(sha256v1_many(ib_gibs, workers=workers, chunk_size=chunk_size, min_parallel=0))
+        pickling_s = time.perf_counter() - start
+
+        stats = SharedMemoryStats()
+        start = time.perf_counter()
+        shared = list(sha256v1_many_shared(items, workers=workers, stats=stats))
+        shared_s = time.perf_counter() - start
+        if pickling != expected or shared != expected:
+            raise AssertionError(f'{name}: gibs differ from sha256v1')
+
+        rows.append({
+            'shape': name,
+            'pickled_bytes': _pickled_bytes(ib_gibs, chunk_size),
+            'shared_bytes': stats.shared_bytes,
+            'shared_pickled_bytes': stats.sent_bytes,
+            'pickling_bytes_per_s': payload_bytes / pickling_s,
+            'shared_bytes_per_s': payload_bytes / shared_s,
+        })
+    return rows
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.bench.shared_memory_hashing',
+        description='Compare pickled and shared-memory payloads for multi-process hashing.',
+    )
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--size-kb', type=int, default=1024, help='payload size of each ibgib')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count, at least 2)')
+    args = parser.parse_args(argv)
+    print(f'cpus: {os.cpu_count()}')
+    print(
+        f'{"shape":<9} {"pickled MB":>11} {"shared MB":>10} {"pickled MB (shm)":>17} {"IPC saved":>10} '
+        f'{"pickling MB/s":>14} {"shared MB/s":>12}'
+    )
+    for row in run(args.count, args.size_kb, args.workers):
+        saved = 1 - row['shared_pickled_bytes'] / row['pickled_bytes']
+        print(
+            f'{row["shape"]:<9} {row["pickled_bytes"] / 1e6:>11.2f} {row["shared_bytes"] / 1e6:>10.2f} '
+            f'{row["shared_pickled_bytes"] / 1e6:>17.3f} {saved:>10.3%} '
+            f'{row["pickling_bytes_per_s"] / 1e6:>14,.0f} {row["shared_bytes_per_s"] / 1e6:>12,.0f}'
+        )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+# py_gib/bench/suite.py
+"""
+Benchmark suite for the V1 hashing pipeline. Run with `python -m py_gib.bench`.
+
+Every benchmark is one target (`sha256v1`, `sha256v1` in reference mode,
+`to_normalized_for_hashing` or `_hash_to_hex`) applied to one ibgib shape (see
+`SHAPES`). Results are plain dicts, saved as JSON:
+
+    {
+      "meta": {"python": "3.11.7", "platform": "...", "cpus": 8, ...},
+      "results": [
+        {"name": "sha256v1/wide_flat", "ops_per_s": 1234.5, "p50_us": ...,
+         "p99_us": ..., "bytes_per_s": ..., "peak_memory_bytes": ..., ...},
+        ...
+      ]
+    }
+
+`compare_results` matches two result sets by name and flags regressions, i.e.
+throughput that dropped (or peak memory that grew) by more than a threshold.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import datetime
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+from ..V1.sha256v1 import (
+    SHA256V1_MODE_REFERENCE, _hash_to_hex, sha256v1, to_normalized_for_hashing,
+)
+
+BENCH_FORMAT_VERSION = 1
+
+DEFAULT_MIN_TIME_S = 0.5
+"""
+Each benchmark repeats until it has run at least this long (and `MIN_REPEATS`
+times), so fast ops get enough samples for a stable p99.
+"""
+
+MIN_REPEATS = 5
+
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+"""
+Relative change beyond which `compare_results` flags a regression.
+"""
+
+DEFAULT_MEMORY_REGRESSION_FLOOR_BYTES = 4 * 1024
+"""
+Peak memory growth below this many bytes is never a regression, whatever its
+relative size: small benchmarks peak at a few KiB, where allocator and
+interpreter noise alone moves them by more than `DEFAULT_REGRESSION_THRESHOLD`.
+"""
+
+_HASH = '{:064X}'
+
+def _tiny_primitive() -> dict:
+    return {'ib': '7', 'gib': 'gib'}
+
+def _wide_flat() -> dict:
+    return {
+        'ib': 'wide',
+        'data': {f'key{i}': (i if i % 3 else f'value {i}') for i in range(2000)},
+        'rel8ns': {'ancestor': ['wide^gib']},
+    }
+
+def _deep_nested() -> dict:
+    data: Dict[str, Any] = {'leaf': 'value', 'n': 0}
+    for depth in range(1, 200):
+        data = {'child': data, 'n': depth, 'name': f'level {depth}', 'tags': ['a', 'b']}
+    return {'ib': 'deep', 'data': data, 'rel8ns': {'ancestor': ['deep^gib']}}
+
+def _long_past() -> dict:
+    tjp_gib = _HASH.format(1)
+    return {
+        'ib': 'comment',
+        'data': {'n': 10000, 'text': 'hi'},
+        'rel8ns': {
+            'ancestor': ['comment^gib'],
+            'past': [f'comment^{_HASH.format(i)}.{tjp_gib}' for i in range(10000)],
+            'tjp': [f'comment^{tjp_gib}'],
+        },
+    }
+
+def _large_binary() -> dict:
+    return {'ib': 'pic', 'data': os.urandom(16 * 1024 * 1024)}
+
+SHAPES: Dict[str, Callable[[], dict]] = {
+    'tiny_primitive': _tiny_primitive,
+    'wide_flat': _wide_flat,
+    'deep_nested': _deep_nested,
+    'long_past': _long_past,
+    'large_binary': _large_binary,
+}
+"""
+Realistic ibgib shapes, name -> factory.
+"""
+
+def _payload(ib_gib: dict) -> Any:
+    """
+    What the sub-hash targets work on: binary `data` if any, otherwise the
+    bigger of `data`/`rel8ns` (or `ib` for primitives).
+    """
+    data = ib_gib.get('data')
+    if isinstance(data, (bytes, bytearray)):
+        return data
+    blocks = [x for x in (data, ib_gib.get('rel8ns')) if x]
+    if not blocks:
+        return ib_gib['ib']
+    return max(blocks, key=lambda x: len(json.dumps(x)))
+
+def _payload_bytes(ib_gib: dict) -> int:
+    """
+    Bytes hashed for the whole ibgib: ib, canonical JSON of rel8ns/data, or
+    the binary data.
+    """
+    total = len(ib_gib['ib'].encode('utf-8'))
+    for key in ('rel8ns', 'data'):
+        block = ib_gib.get(key)
+        if isinstance(block, (bytes, bytearray)):
+            total += len(block)
+        elif block:
+            total += len(json.dumps(to_normalized_for_hashing(block), sort_keys=True, separators=(',', ':')))
+    return total
+
+def _targets(ib_gib: dict) -> Dict[str, Tuple[Callable[[], Any], int]]:
+    """
+    target name -> (zero-arg callable, bytes processed per call)
+    """
+    payload = _payload(ib_gib)
+    if isinstance(payload, (bytes, bytearray)):
+        hash_input = payload
+        normalize_input = None
+    else:
+        normalize_input = payload
+        hash_input = json.dumps(to_normalized_for_hashing(payload), sort_keys=True, separators=(',', ':'))
+    hash_bytes = len(hash_input) if isinstance(hash_input, (bytes, bytearray)) else len(hash_input.encode('utf-8'))
+
+    targets = {
+        'sha256v1': (lambda: sha256v1(ib_gib), _payload_bytes(ib_gib)),
+        'sha256v1_reference': (lambda: sha256v1(ib_gib, mode=SHA256V1_MODE_REFERENCE), _payload_bytes(ib_gib)),
+        '_hash_to_hex': (lambda: _hash_to_hex(hash_input), hash_bytes),
+    }
+    if normalize_input is not None:
+        targets['to_normalized_for_hashing'] = (lambda: to_normalized_for_hashing(normalize_input), hash_bytes)
+    return targets
+
+def _percentile(sorted_values: Sequence[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+def measure(fn: Callable[[], Any], bytes_per_op: int, min_time_s: float = DEFAULT_MIN_TIME_S) -> Dict[str, Any]:
+    """
+    Times `fn` repeatedly and returns ops/s, p50/p99 (microseconds), bytes/s
+    and the peak memory allocated by one call (measured in a separate,
+    untimed call since tracing slows everything down).
+    """
+    fn()  # warm up
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < MIN_REPEATS or time.perf_counter() - start < min_time_s:
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    total = sum(timings)
+    timings.sort()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    ops_per_s = len(timings) / total if total > 0 else float('inf')
+    return {
+        'iterations': len(timings),
+        'ops_per_s': ops_per_s,
+        'p50_us': _percentile(timings, 0.5) * 1e6,
+        'p99_us': _percentile(timings, 0.99) * 1e6,
+        'bytes_per_s': bytes_per_op * ops_per_s,
+        'peak_memory_bytes': peak,
+    }
+
+def run_suite(
+    name_filter: Optional[str] = None,
+    min_time_s: float = DEFAULT_MIN_TIME_S,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs every target x shape benchmark whose name ('target/shape') contains
+    `name_filter` and returns the results document.
+    """
+    results = []
+    for shape_name, factory in SHAPES.items():
+        targets = None
+        for target_name in ('sha256v1', 'sha256v1_reference', 'to_normalized_for_hashing', '_hash_to_hex'):
+            name = f'{target_name}/{shape_name}'
+            if name_filter and name_filter not in name:
+                continue
+            if targets is None:
+                targets = _targets(factory())
+            if target_name not in targets:
+                continue
+            fn, bytes_per_op = targets[target_name]
+            result = {'name': name, 'target': target_name, 'shape': shape_name, 'bytes_per_op': bytes_per_op}
+            result.update(measure(fn, bytes_per_op, min_time_s=min_time_s))
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        'meta': {
+            'format': BENCH_FORMAT_VERSION,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        'results': results,
+    }
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+    memory_floor_bytes: int = DEFAULT_MEMORY_REGRESSION_FLOOR_BYTES,
+) -> List[Dict[str, Any]]:
+    """
+    Compares two results documents benchmark by benchmark.
+
+    Returns one row per benchmark present in both, with the relative change in
+    ops/s and peak memory and `regression` set if ops/s dropped, or peak
+    memory grew, by more than `threshold` (e.g. 0.10 for 10%). Memory only
+    counts if it also grew by at least `memory_floor_bytes`.
+    """
+    baseline_by_name = {r['name']: r for r in baseline.get('results', [])}
+    rows = []
+    for result in current.get('results', []):
+        base = baseline_by_name.get(result['name'])
+        if base is None:
+            continue
+        speed_change = result['ops_per_s'] / base['ops_per_s'] - 1 if base['ops_per_s'] else 0.0
+        base_memory = base.get('peak_memory_bytes') or 0
+        memory = result.get('peak_memory_bytes') or 0
+        memory_change = memory / base_memory - 1 if base_memory else 0.0
+        memory_regressed = memory_change > threshold and memory - base_memory >= memory_floor_bytes
+        rows.append({
+            'name': result['name'],
+            'baseline_ops_per_s': base['ops_per_s'],
+            'ops_per_s': result['ops_per_s'],
+            'speed_change': speed_change,
+            'memory_change': memory_change,
+            'regression': speed_change < -threshold or memory_regressed,
+        })
+    return rows
+
+def format_result(result: Dict[str, Any]) -> str:
+    return (
+        f"{result['name']:<44}{result['ops_per_s']:>14,.1f} ops/s"
+        f"{result['p50_us']:>12,.1f} us p50{result['p99_us']:>12,.1f} us p99"
+        f"{result['bytes_per_s'] / 1e6:>10,.1f} MB/s{result['peak_memory_bytes'] / 1024:>10,.0f} KiB peak"
+    )
+
+def format_comparison(row: Dict[str, Any]) -> str:
+    flag = 'REGRESSION' if row['regression'] else 'ok'
+    return (
+        f"{row['name']:<44}{row['baseline_ops_per_s']:>14,.1f} -> {row['ops_per_s']:>14,.1f} ops/s"
+        f"{row['speed_change']:>+9.1%} speed{row['memory_change']:>+9.1%} memory  {flag}"
+    )
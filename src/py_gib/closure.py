@@ -0,0 +1,509 @@
+# py_gib/closure.py
+"""
+Reachability closure over `rel8ns`, exported as a topologically ordered
+bundle.
+
+    python -m py_gib.closure STORE ROOT [ROOT ...] [--rel8n NAME ...] [--out FILE]
+
+The closure of some root addresses is every ibgib reachable from them through
+the given rel8ns (default: all of them), e.g. a timeline frame with its
+`past`, `ancestor` and `dna`. Primitives (`gib == 'gib'`) are leaves: they are
+never looked up, and only exported with `include_primitives`.
+
+It is computed in two passes, both within bounded memory however large the
+closure is:
+
+1. Discovery, breadth first. Unseen addresses are looked up in batches of
+   `batch_size` (`store.get_many`), with up to `workers` batches in flight
+   on a thread pool. Every ibgib found is appended to a temporary
+   `PackStore`, which doubles as the queue: its pack is read back in order
+   (`PackStore.iter_records`) to find the next addresses, so the frontier is
+   on disk, not in memory.
+2. Export, depth first from the roots in postorder, so every ibgib comes after
+   everything it rel8s to (dependencies first) and exactly once. Children are
+   taken by rel8n name, sorted, then in list order, so the same closure is
+   always exported in the same order. The stack keeps 40 bytes per frame and
+   the parsed ibgibs of only its top `_CACHED_FRAMES` frames, re-reading the
+   others from the temporary store when it unwinds to them.
+
+Both passes remember the addresses they have handled in a `_KeySet`, which
+keeps up to `memory_keys` sha-256 digests in memory and spills the rest to
+sorted files in the temporary directory.
+
+`store` is anything with `get_many(addrs) -> List[Optional[dict]]`, e.g. a
+`PackStore`. A `PackStore` serializes reads under its lock, so extra workers
+mostly pay off for stores with slower lookups (remote or cold ones).
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import argparse
+import heapq
+import json
+import mmap
+import os
+import sys
+import tempfile
+import time
+
+from .helper import get_ib_and_gib, get_ib_gib_addr
+from .pack_store import PackStore, _addr_key
+from .V1.factory import Factory_V1
+from .V1.transforms.transform_helper import is_primitive
+
+DEFAULT_BATCH_SIZE = 256
+"""
+Addresses per `store.get_many` call.
+"""
+
+DEFAULT_WORKERS = 4
+"""
+`store.get_many` calls in flight at once.
+"""
+
+DEFAULT_MEMORY_KEYS = 1 << 18
+"""
+Address digests a `_KeySet` keeps in memory (about 25 MB) before spilling
+them to disk. Also the temporary store's `auto_flush`.
+"""
+
+MISSING_SAMPLE_SIZE = 10
+"""
+Missing addresses kept in `ClosureStats.missing_sample`.
+"""
+
+_CACHED_FRAMES = 64
+"""
+Top stack frames whose ibgibs the export pass keeps parsed.
+"""
+
+_KEY_SIZE = 32
+
+# region key sets
+
+class _Run:
+    """
+    A sorted file of address digests, memory mapped and searched with a
+    binary search. Deleted on `close`.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = len(self._map) // _KEY_SIZE
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._map[i * _KEY_SIZE:(i + 1) * _KEY_SIZE]
+
+    def __iter__(self) -> Iterator[bytes]:
+        for pos in range(0, self.count * _KEY_SIZE, _KEY_SIZE):
+            yield self._map[pos:pos + _KEY_SIZE]
+
+    def __contains__(self, key: bytes) -> bool:
+        i = bisect_left(self, key)
+        return i < self.count and self[i] == key
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+        os.remove(self.path)
+
+class _KeySet:
+    """
+    Exact set of address digests that keeps at most `memory_keys` of them in
+    memory. Beyond that, they are sorted and written to a run file in
+    `directory`, and runs are merged whenever the newest is no larger than
+    the one before it, so there are O(log n) runs and every digest is
+    rewritten O(log n) times.
+
+    A two-probe bit filter over the spilled digests (8 to 16 bits per digest)
+    spares most new digests the binary searches.
+    """
+    def __init__(self, directory: str, memory_keys: int = DEFAULT_MEMORY_KEYS):
+        if memory_keys < 1:
+            raise ValueError(f"memory_keys must be at least 1, got {memory_keys}")
+        self.directory = directory
+        self.memory_keys = memory_keys
+        self._memory: set = set()
+        self._runs: List[_Run] = []
+        self._spilled = 0
+        self._runs_written = 0
+        self._filter = bytearray()
+        self._filter_bits = 0
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._memory)
+
+    def _probes(self, key: bytes) -> Tuple[int, int]:
+        # digests are uniform already, so their bytes serve as the hashes.
+        return (
+            int.from_bytes(key[:8], 'little') % self._filter_bits,
+            int.from_bytes(key[8:16], 'little') % self._filter_bits,
+        )
+
+    def _set_bits(self, keys: Iterable[bytes]) -> None:
+        bits = self._filter
+        for key in keys:
+            for p in self._probes(key):
+                bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        if key in self._memory:
+            return True
+        if not self._runs:
+            return False
+        bits = self._filter
+        for p in self._probes(key):
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return any(key in run for run in reversed(self._runs))
+
+    def add(self, key: bytes) -> bool:
+        """
+        Remembers `key`, returning False if it was already there.
+        """
+        if key in self:
+            return False
+        self._memory.add(key)
+        if len(self._memory) >= self.memory_keys:
+            self._spill()
+        return True
+
+    def _spill(self) -> None:
+        keys = sorted(self._memory)
+        self._memory.clear()
+        sources: List[Any] = [keys]
+        size = len(keys)
+        while self._runs and self._runs[-1].count <= size:
+            run = self._runs.pop()
+            sources.append(run)
+            size += run.count
+
+        path = os.path.join(self.directory, f'keys-{id(self):x}-{self._runs_written}.run')
+        self._runs_written += 1
+        with open(path, 'wb') as f:
+            batch = []
+            for key in heapq.merge(*sources):
+                batch.append(key)
+                if len(batch) >= 65536:
+                    f.write(b''.join(batch))
+                    batch.clear()
+            f.write(b''.join(batch))
+        for run in sources[1:]:
+            run.close()
+        self._runs.append(_Run(path))
+        self._spilled += len(keys)
+
+        if self._filter_bits < 8 * self._spilled:
+            # resized to 16 bits per digest, so rebuilt O(log n) times.
+            self._filter_bits = 16 * self._spilled
+            self._filter = bytearray((self._filter_bits + 7) // 8)
+            for run in self._runs:
+                self._set_bits(run)
+        else:
+            self._set_bits(keys)
+
+    def close(self) -> None:
+        for run in self._runs:
+            run.close()
+        self._runs.clear()
+        self._memory.clear()
+
+# endregion key sets
+
+class ClosureStats:
+    """
+    What `iter_closure` found. `nodes` counts the (non-primitive) ibgibs found
+    and `emitted` what was exported, i.e. also the primitives with
+    `include_primitives`. `lookups` is the number of addresses looked up, in
+    `batches` calls.
+    """
+    __slots__ = (
+        'roots', 'nodes', 'primitives', 'missing', 'missing_sample', 'emitted', 'lookups', 'batches', 'elapsed_s',
+    )
+
+    def __init__(self):
+        self.roots = 0
+        self.nodes = 0
+        self.primitives = 0
+        self.missing = 0
+        self.missing_sample: List[str] = []
+        self.emitted = 0
+        self.lookups = 0
+        self.batches = 0
+        self.elapsed_s = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(roots={self.roots}, nodes={self.nodes}, primitives={self.primitives}, '
+            f'missing={self.missing}, emitted={self.emitted}, lookups={self.lookups}, batches={self.batches}, '
+            f'elapsed_s={self.elapsed_s:.3f})'
+        )
+
+def _is_primitive_addr(addr: str) -> bool:
+    return is_primitive(gib=get_ib_and_gib(ib_gib_addr=addr)['gib'])
+
+def _children(ib_gib: dict, rel8n_names: Optional[frozenset]) -> List[str]:
+    """
+    The addresses `ib_gib` rel8s to through `rel8n_names` (None for all), by
+    rel8n name, sorted, then in list order.
+    """
+    rel8ns = ib_gib.get('rel8ns') or {}
+    names = sorted(rel8ns if rel8n_names is None else rel8n_names.intersection(rel8ns))
+    return [addr for name in names for addr in rel8ns[name] or () if isinstance(addr, str)]
+
+def _discover(
+    store: Any,
+    roots: Sequence[str],
+    spill: PackStore,
+    seen: _KeySet,
+    rel8n_names: Optional[frozenset],
+    batch_size: int,
+    workers: int,
+    stats: ClosureStats,
+) -> None:
+    """
+    Pass 1: copies every non-primitive ibgib reachable from `roots` into
+    `spill`, breadth first.
+    """
+    pending: List[str] = []
+
+    def visit(addr: str) -> None:
+        if not seen.add(_addr_key(addr)):
+            return
+        if _is_primitive_addr(addr):
+            stats.primitives += 1
+        else:
+            pending.append(addr)
+
+    for root in roots:
+        visit(root)
+
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    in_flight: deque = deque()
+    cursor = 0
+    records = spill.iter_records(cursor)
+    try:
+        while True:
+            while len(in_flight) < workers:
+                # only read the queue as far as the next batch needs.
+                while len(pending) < batch_size:
+                    record = next(records, None)
+                    if record is None:
+                        break
+                    cursor, _, ib_gib = record
+                    for child in _children(ib_gib, rel8n_names):
+                        visit(child)
+                if not pending:
+                    break
+                batch = pending[:batch_size]
+                del pending[:batch_size]
+                if executor is None:
+                    future: Future = Future()
+                    future.set_result(store.get_many(batch))
+                else:
+                    future = executor.submit(store.get_many, batch)
+                in_flight.append((batch, future))
+            if not in_flight:
+                return
+
+            # in submission order, so that the closure is found the same way
+            # every time.
+            batch, future = in_flight.popleft()
+            found = []
+            for addr, ib_gib in zip(batch, future.result()):
+                if ib_gib is None:
+                    stats.missing += 1
+                    if len(stats.missing_sample) < MISSING_SAMPLE_SIZE:
+                        stats.missing_sample.append(addr)
+                    continue
+                if get_ib_gib_addr(ib_gib=ib_gib) != addr:
+                    raise ValueError(f'[iter_closure] store returned {get_ib_gib_addr(ib_gib=ib_gib)} for {addr}')
+                found.append(ib_gib)
+            stats.lookups += len(batch)
+            stats.batches += 1
+            stats.nodes += len(found)
+            spill.put_many(found, validate=False)
+            # picks up the records just put.
+            records.close()
+            records = spill.iter_records(cursor)
+    finally:
+        records.close()
+        if executor is not None:
+            for _, future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+def _export(
+    spill: PackStore,
+    roots: Sequence[str],
+    visited: _KeySet,
+    rel8n_names: Optional[frozenset],
+    include_primitives: bool,
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Pass 2: yields the ibgibs in `spill` reachable from `roots` depth first in
+    postorder, i.e. dependencies first.
+    """
+    keys = bytearray()
+    positions = array('q')
+    frames: Dict[int, Tuple[str, dict, List[str]]] = {}
+
+    for root in roots:
+        child: Optional[str] = root
+        while True:
+            if child is not None:
+                key = _addr_key(child)
+                # marking on the way down also skips a node whose own
+                # descendants rel8 back to it.
+                if visited.add(key):
+                    if _is_primitive_addr(child):
+                        if include_primitives:
+                            yield child, Factory_V1.primitive(ib=get_ib_and_gib(ib_gib_addr=child)['ib'])
+                    else:
+                        ib_gib = spill.get(child)
+                        if ib_gib is not None:
+                            depth = len(positions)
+                            keys += key
+                            positions.append(0)
+                            frames[depth] = (child, ib_gib, _children(ib_gib, rel8n_names))
+                            frames.pop(depth - _CACHED_FRAMES, None)
+            if not positions:
+                break
+
+            depth = len(positions) - 1
+            frame = frames.get(depth)
+            if frame is None:
+                [(addr, ib_gib)] = spill.get_by_keys([bytes(keys[-_KEY_SIZE:])])
+                frame = frames[depth] = (addr, ib_gib, _children(ib_gib, rel8n_names))
+            addr, ib_gib, children = frame
+            position = positions[-1]
+            if position < len(children):
+                positions[-1] = position + 1
+                child = children[position]
+            else:
+                yield addr, ib_gib
+                positions.pop()
+                del keys[-_KEY_SIZE:]
+                del frames[depth]
+                child = None
+
+def iter_closure(
+    store: Any,
+    roots: Iterable[str],
+    rel8n_names: Optional[Iterable[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    include_primitives: bool = False,
+    memory_keys: int = DEFAULT_MEMORY_KEYS,
+    tmp_dir: Optional[str] = None,
+    stats: Optional[ClosureStats] = None,
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Yields (address, ibgib) for every ibgib reachable from the `roots`
+    addresses through `rel8n_names` (None for all rel8ns), once each, with
+    everything an ibgib rel8s to before it (see the module docstring).
+
+    Primitives are leaves, yielded as `Factory_V1.primitive`s only if
+    `include_primitives`. Addresses `store` does not have are skipped, and
+    counted in `stats`, a `ClosureStats` if given. Temporary files go in a
+    directory under `tmp_dir` (default: the system's), removed when the
+    generator finishes or is closed.
+
+    Nothing is yielded until discovery is done.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if stats is None:
+        stats = ClosureStats()
+    roots = list(roots)
+    names = None if rel8n_names is None else frozenset(rel8n_names)
+    stats.roots = len(roots)
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix='closure-', dir=tmp_dir) as directory:
+        with PackStore(os.path.join(directory, 'spill'), auto_flush=memory_keys) as spill:
+            seen = _KeySet(directory, memory_keys)
+            try:
+                _discover(store, roots, spill, seen, names, batch_size, workers, stats)
+            finally:
+                seen.close()
+            visited = _KeySet(directory, memory_keys)
+            try:
+                for addr, ib_gib in _export(spill, roots, visited, names, include_primitives):
+                    stats.emitted += 1
+                    yield addr, ib_gib
+            finally:
+                visited.close()
+    stats.elapsed_s = time.perf_counter() - start
+
+def write_bundle(store: Any, roots: Iterable[str], out: TextIO, **kwargs: Any) -> ClosureStats:
+    """
+    Writes the closure of `roots` (`iter_closure(store, roots, **kwargs)`) to
+    `out` as JSONL, one ibgib per line in canonical compact form, so that
+    `ingest` can read it back (in order) and `loads_sha256v1` hashes it as is.
+    Returns the `ClosureStats`.
+    """
+    stats = kwargs.pop('stats', None) or ClosureStats()
+    lines = []
+    for _, ib_gib in iter_closure(store, roots, stats=stats, **kwargs):
+        lines.append(json.dumps(ib_gib, sort_keys=True, separators=(',', ':')))
+        if len(lines) >= 1024:
+            lines.append('')
+            out.write('\n'.join(lines))
+            lines.clear()
+    if lines:
+        lines.append('')
+        out.write('\n'.join(lines))
+    return stats
+
+def format_stats(stats: ClosureStats) -> str:
+    lines = [
+        f'{stats.emitted:,} ibgibs from {stats.roots:,} roots in {stats.elapsed_s:.2f}s: '
+        f'{stats.nodes:,} found, {stats.primitives:,} primitives, {stats.missing:,} missing; '
+        f'{stats.lookups:,} lookups in {stats.batches:,} batches'
+    ]
+    lines.extend(f'missing {addr}' for addr in stats.missing_sample)
+    return '\n'.join(lines)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.closure',
+        description='Export everything reachable from some ibgibs as a topologically ordered JSONL bundle.',
+    )
+    parser.add_argument('store', help='PackStore directory')
+    parser.add_argument('roots', nargs='+', metavar='ROOT', help='ib^gib addresses to start from')
+    parser.add_argument('--rel8n', action='append', dest='rel8n_names', metavar='NAME',
+                        help='only follow this rel8n (repeatable, default: all)')
+    parser.add_argument('--out', default='-', help='bundle file, or - for stdout')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='lookups in flight')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--memory-keys', type=int, default=DEFAULT_MEMORY_KEYS,
+                        help='addresses remembered in memory before spilling to disk')
+    parser.add_argument('--include-primitives', action='store_true', help='also export the primitives reached')
+    parser.add_argument('--tmp-dir', default=None, help='directory for temporary files')
+    args = parser.parse_args(argv)
+
+    kwargs = dict(
+        rel8n_names=args.rel8n_names, workers=args.workers, batch_size=args.batch_size,
+        memory_keys=args.memory_keys, include_primitives=args.include_primitives, tmp_dir=args.tmp_dir,
+    )
+    with PackStore(args.store) as store:
+        if args.out == '-':
+            stats = write_bundle(store, args.roots, sys.stdout, **kwargs)
+        else:
+            with open(args.out, 'w', encoding='utf-8') as f:
+                stats = write_bundle(store, args.roots, f, **kwargs)
+    print(format_stats(stats), file=sys.stderr)
+    return 1 if stats.missing else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,416 @@
+# py_gib/fuzz.py
+"""
+Differential fuzzer for the V1 gib paths.
+
+    python -m py_gib.fuzz [--cases 1000000] [--seed 0] [--workers N] [--block-size 1000]
+
+Generates random ibgibs (nested dicts, None values, unicode keys, floats,
+empty containers, lists of dicts, binary data, salts, ...) and checks that every
+alternative way of computing a gib (see `CHECKS`) agrees with
+`sha256v1(..., mode=SHA256V1_MODE_REFERENCE)`. Cases are fanned out over a
+process pool in blocks. Every failing case is shrunk to a minimal reproducer
+and printed as a Python literal. Exits with 1 if anything failed.
+
+Case `i` of seed `s` is always the same ibgib, so `--seed s --start i --cases 1`
+reproduces it.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+from .pool import map_chunks
+from .V1 import sub_hash_cache
+from .V1.binary_encoding import IbGibRecordView, encode_ib_gib
+from .V1.incremental_sha256v1 import IncrementalSha256V1Hasher
+from .V1.instrumentation import instrument
+from .V1.parallel_sha256v1 import sha256v1_parallel
+from .V1.raw_sha256v1 import _raw_sha256v1, sha256v1_raw
+from .V1.sha256v1 import SHA256V1_MODE_FAST, SHA256V1_MODE_REFERENCE, Sha256V1Hasher, sha256v1
+from .V1.shared_memory_sha256v1 import _hash_chunks, _prepare_chunk, _release
+from .V1.types import IbGib_V1
+
+DEFAULT_BLOCK_SIZE = 1000
+"""
+Cases generated and checked per worker task.
+"""
+
+_STRINGS = [
+    '', 'a', 'ib', 'gib', 'ib^gib', ' ', '\n', '"quoted"', 'back\\slash', 'tab\t',
+    'é', 'ünïcödé', '日本語', '🙂', 'emoji 👍🏽', '\u0000', '\u001f', ' ', '\ud800',
+]
+_FLOATS = [0.0, -0.0, 0.5, -1.5, 1e-7, 1e21, 3.141592653589793, 1.7976931348623157e308, 5e-324,
+           float('inf'), float('-inf'), float('nan')]
+_INTS = [0, 1, -1, 7, 2 ** 31, -2 ** 53, 2 ** 64, 10 ** 30]
+_NON_STR_IBS = [0, 5, 1.5, True, False, ['ib'], {'ib': 'ib'}]
+
+def _random_str(rng: random.Random) -> str:
+    if rng.random() < 0.6:
+        return rng.choice(_STRINGS)
+    alphabet = 'abcXYZ019 _-.^é日🙂\\"'
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randrange(12)))
+
+def _random_scalar(rng: random.Random) -> Any:
+    kind = rng.randrange(6)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.random() < 0.5
+    if kind == 2:
+        return rng.choice(_INTS) if rng.random() < 0.5 else rng.randrange(-1000, 1000)
+    if kind == 3:
+        return rng.choice(_FLOATS) if rng.random() < 0.5 else rng.uniform(-1e6, 1e6)
+    return _random_str(rng)
+
+def _random_value(rng: random.Random, depth: int) -> Any:
+    roll = rng.random()
+    if depth <= 0 or roll < 0.5:
+        return _random_scalar(rng)
+    if roll < 0.75:
+        return _random_dict(rng, depth - 1)
+    if roll < 0.85:
+        # lists of dicts
+        return [_random_dict(rng, depth - 1) for _ in range(rng.randrange(4))]
+    return [_random_value(rng, depth - 1) for _ in range(rng.randrange(5))]
+
+def _random_dict(rng: random.Random, depth: int) -> dict:
+    return {_random_str(rng): _random_value(rng, depth) for _ in range(rng.randrange(6))}
+
+def _random_addr(rng: random.Random) -> str:
+    if rng.random() < 0.3:
+        return rng.choice(['ib^gib', 'comment^gib', 'x^' + 'A' * 64])
+    return f'{_random_str(rng) or "ib"}^{rng.getrandbits(256):064X}'
+
+def random_ib_gib(rng: random.Random, max_depth: int = 4) -> dict:
+    """
+    A random ibgib-shaped dict. `data` and `rel8ns` may be missing, None,
+    empty, deeply nested, binary or not dicts at all, and a few `ib`s are not
+    strings.
+    """
+    roll = rng.random()
+    if roll < 0.02:
+        # every path must refuse these the same way (see `Sha256V1Hasher`).
+        ib: Any = rng.choice(_NON_STR_IBS)
+    elif roll < 0.5:
+        ib = _random_str(rng)
+    else:
+        ib = 'comment'
+    ib_gib: Dict[str, Any] = {'ib': ib}
+
+    roll = rng.random()
+    if roll < 0.1:
+        ib_gib['data'] = None
+    elif roll < 0.2:
+        ib_gib['data'] = rng.randbytes(rng.choice([0, 1, 31, 1000]))
+    elif roll < 0.25:
+        ib_gib['data'] = _random_scalar(rng)
+    elif roll < 0.9:
+        ib_gib['data'] = _random_dict(rng, rng.randrange(max_depth + 1))
+
+    roll = rng.random()
+    if roll < 0.1:
+        ib_gib['rel8ns'] = None
+    elif roll < 0.8:
+        rel8ns: Dict[str, Any] = {}
+        for _ in range(rng.randrange(5)):
+            name = rng.choice(['past', 'ancestor', 'dna', 'tjp', 'identity']) if rng.random() < 0.7 else _random_str(rng)
+            rel8ns[name] = None if rng.random() < 0.1 else [_random_addr(rng) for _ in range(rng.randrange(4))]
+        ib_gib['rel8ns'] = rel8ns
+    return ib_gib
+
+def random_salt(rng: random.Random) -> str:
+    return '' if rng.random() < 0.7 else _random_str(rng)
+
+def generate_case(seed: int, index: int) -> Tuple[dict, str]:
+    """
+    The (ibgib, salt) of case `index` for `seed`, independent of every other case.
+    """
+    rng = random.Random(f'{seed}:{index}')
+    ib_gib, salt = random_ib_gib(rng), random_salt(rng)
+    if not isinstance(ib_gib['ib'], str) and not salt.isascii():
+        # a non-str ib and a salt that may not encode are two errors, and
+        # which one a path runs into first is not part of the contract.
+        salt = ''
+    return ib_gib, salt
+
+# region checks
+
+def _check_fast(ib_gib: dict, salt: str) -> str:
+    return sha256v1(ib_gib, mode=SHA256V1_MODE_FAST, use_cache=False, salt=salt)
+
+def _check_fast_cached(ib_gib: dict, salt: str) -> str:
+    previous = sub_hash_cache.get_sub_hash_cache()
+    sub_hash_cache.enable_sub_hash_cache(maxsize=16)
+    try:
+        sha256v1(ib_gib, salt=salt)
+        return sha256v1(ib_gib, salt=salt)  # served from the cache
+    finally:
+        if previous is None:
+            sub_hash_cache.disable_sub_hash_cache()
+        else:
+            sub_hash_cache.enable_sub_hash_cache(cache=previous)
+
+def _check_hasher(ib_gib: dict, salt: str) -> str:
+    return Sha256V1Hasher(salt).hash(ib_gib, use_cache=False)
+
+def _check_record(ib_gib: dict, salt: str) -> str:
+    return sha256v1(IbGib_V1.from_dict(ib_gib), use_cache=False, salt=salt)
+
+def _check_instrumented(ib_gib: dict, salt: str) -> str:
+    with instrument():
+        return sha256v1(ib_gib, use_cache=False, salt=salt)
+
+def _check_instrumented_reference(ib_gib: dict, salt: str) -> str:
+    with instrument():
+        return sha256v1(ib_gib, mode=SHA256V1_MODE_REFERENCE, salt=salt)
+
+def _check_binary_record(ib_gib: dict, salt: str) -> str:
+    return IbGibRecordView(encode_ib_gib(ib_gib)).sha256v1(salt)
+
+def _check_parallel(ib_gib: dict, salt: str) -> str:
+    return sha256v1_parallel(ib_gib, use_cache=False, salt=salt, threshold=0)
+
+def _check_shared_memory(ib_gib: dict, salt: str) -> str:
+    # binary data and the encoded record both go through a segment, as a
+    # worker would hash them (but in process).
+    segment, chunk = _prepare_chunk([ib_gib, encode_ib_gib(ib_gib)], salt, threshold=1)
+    try:
+        gib, record_gib = _hash_chunks([chunk])[0]
+    finally:
+        _release(segment)
+    return gib if gib == record_gib else f'{gib} (from the record: {record_gib})'
+
+def _check_raw(ib_gib: dict, salt: str) -> str:
+    if isinstance(ib_gib.get('data'), bytes):
+        # JSON has no bytes.
+        return _check_fast(ib_gib, salt)
+    # sorted compact JSON takes the raw fast path unless it has nulls in
+    # dicts, default `json.dumps` output never does.
+    compact = json.dumps(ib_gib, sort_keys=True, separators=(',', ':'))
+    result = _raw_sha256v1(compact, salt)
+    gib = sha256v1_raw(compact, salt) if result is None else result[1]
+    other = sha256v1_raw(json.dumps(ib_gib), salt)
+    return gib if gib == other else f'{gib} (from non-canonical JSON: {other})'
+
+def _previous_frame(ib_gib: dict) -> dict:
+    """
+    A plausible previous frame of `ib_gib`: one `data` key fewer and every
+    rel8n list one item shorter, sharing all other values.
+    """
+    previous = dict(ib_gib)
+    data = ib_gib.get('data')
+    if isinstance(data, dict) and data:
+        previous['data'] = dict(list(data.items())[:-1])
+    rel8ns = ib_gib.get('rel8ns')
+    if isinstance(rel8ns, dict):
+        previous['rel8ns'] = {k: v[:-1] if isinstance(v, list) else v for k, v in rel8ns.items()}
+    return previous
+
+def _check_incremental(ib_gib: dict, salt: str) -> str:
+    hasher = IncrementalSha256V1Hasher(salt, checkpoint_bytes=1)
+    hasher.hash(_previous_frame(ib_gib))
+    return hasher.hash(ib_gib)
+
+def reference_gib(ib_gib: dict, salt: str) -> str:
+    return sha256v1(ib_gib, mode=SHA256V1_MODE_REFERENCE, salt=salt)
+
+CHECKS: Dict[str, Callable[[dict, str], str]] = {
+    'fast': _check_fast,
+    'fast+cache': _check_fast_cached,
+    'hasher': _check_hasher,
+    'record': _check_record,
+    'instrumented': _check_instrumented,
+    'instrumented+reference': _check_instrumented_reference,
+    'binary_record': _check_binary_record,
+    'parallel': _check_parallel,
+    'incremental': _check_incremental,
+    'shared_memory': _check_shared_memory,
+    'raw': _check_raw,
+}
+"""
+Alternative gib paths, name -> fn(ib_gib, salt). Each must equal `reference_gib`.
+"""
+
+def failing_checks(
+    ib_gib: dict,
+    salt: str,
+    checks: Optional[Dict[str, Callable[[dict, str], str]]] = None,
+) -> List[str]:
+    """
+    Names of the checks that disagree with the reference (or raise when the
+    reference does not, or vice versa).
+    """
+    try:
+        expected: Any = reference_gib(ib_gib, salt)
+    except Exception as error:
+        expected = type(error)
+    failures = []
+    for name, check in (checks or CHECKS).items():
+        try:
+            actual: Any = check(ib_gib, salt)
+        except Exception as error:
+            actual = type(error)
+        if actual != expected:
+            failures.append(name)
+    return failures
+
+# endregion checks
+
+# region shrinking
+
+def _simpler_values(value: Any) -> Iterator[Any]:
+    """
+    Strictly simpler replacements for `value`, simplest first.
+    """
+    if value is None:
+        return
+    yield None
+    if isinstance(value, dict):
+        keys = list(value)
+        for key in keys:
+            yield {k: v for k, v in value.items() if k != key}
+        for key in keys:
+            for simpler in _simpler_values(value[key]):
+                yield {**value, key: simpler}
+        for key in keys:
+            if isinstance(key, str) and key:
+                shorter = key[:len(key) // 2]
+                if shorter not in value:
+                    yield {(shorter if k == key else k): v for k, v in value.items()}
+    elif isinstance(value, list):
+        for i in range(len(value)):
+            yield value[:i] + value[i + 1:]
+        for i, item in enumerate(value):
+            for simpler in _simpler_values(item):
+                yield value[:i] + [simpler] + value[i + 1:]
+    elif isinstance(value, (str, bytes)):
+        if value:
+            yield value[:0]
+            yield value[:len(value) // 2]
+            yield value[1:]
+    elif isinstance(value, bool):
+        if value:
+            yield False
+    elif isinstance(value, int):
+        if value != 0:
+            yield 0
+            if abs(value) > 1:
+                yield value // 2
+    elif isinstance(value, float):
+        if value != 0.0 or math.copysign(1, value) < 0:
+            yield 0.0
+            if math.isfinite(value) and value != int(value):
+                yield float(int(value))
+
+def shrink(
+    ib_gib: dict,
+    salt: str,
+    still_fails: Callable[[dict, str], bool],
+    max_steps: int = 10000,
+) -> Tuple[dict, str]:
+    """
+    Greedily simplifies a failing (ibgib, salt) while `still_fails` keeps
+    returning True: dropping keys and list items, emptying or halving strings
+    and bytes, zeroing numbers and so on, until no single simplification
+    keeps it failing.
+    """
+    for _ in range(max_steps):
+        for candidate in _simpler_values(ib_gib):
+            if isinstance(candidate, dict) and isinstance(candidate.get('ib'), str) and still_fails(candidate, salt):
+                ib_gib = candidate
+                break
+        else:
+            for candidate_salt in _simpler_values(salt):
+                if candidate_salt is not None and still_fails(ib_gib, candidate_salt):
+                    salt = candidate_salt
+                    break
+            else:
+                return ib_gib, salt
+    return ib_gib, salt
+
+# endregion shrinking
+
+class FuzzFailure(NamedTuple):
+    seed: int
+    index: int
+    checks: List[str]
+    """Names of the checks that disagreed with the reference."""
+    ib_gib: dict
+    """Minimal reproducer, after shrinking."""
+    salt: str
+
+def _fuzz_block(blocks: List[Tuple[int, int, int]]) -> List[List[FuzzFailure]]:
+    """
+    Worker entry point: checks cases [start, start + count) of each
+    (seed, start, count) block, shrinking any failure.
+    """
+    results = []
+    for seed, start, count in blocks:
+        failures = []
+        for index in range(start, start + count):
+            ib_gib, salt = generate_case(seed, index)
+            failed = failing_checks(ib_gib, salt)
+            if failed:
+                checks = {name: CHECKS[name] for name in failed}
+                small_ib_gib, small_salt = shrink(
+                    ib_gib, salt, lambda x, s: bool(failing_checks(x, s, checks)),
+                )
+                failures.append(FuzzFailure(seed, index, failed, small_ib_gib, small_salt))
+        results.append(failures)
+    return results
+
+def run_fuzz(
+    cases: int,
+    seed: int = 0,
+    start: int = 0,
+    workers: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[List[FuzzFailure]]:
+    """
+    Checks cases [start, start + cases) of `seed` across a process pool,
+    yielding the (usually empty) list of failures of each block in order.
+    """
+    blocks = (
+        (seed, block_start, min(block_size, start + cases - block_start))
+        for block_start in range(start, start + cases, block_size)
+    )
+    return map_chunks(_fuzz_block, blocks, workers=workers, chunk_size=1, min_parallel=2)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.fuzz',
+        description='Differential fuzzing of every sha256v1 path against the reference.',
+    )
+    parser.add_argument('--cases', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start', type=int, default=0, help='index of the first case')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE, help='cases per worker task')
+    args = parser.parse_args(argv)
+
+    checked = failed = 0
+    started = last_report = time.perf_counter()
+    for failures in run_fuzz(args.cases, args.seed, args.start, args.workers, args.block_size):
+        checked = min(args.cases, checked + args.block_size)
+        for failure in failures:
+            failed += 1
+            print(
+                f'FAIL seed={failure.seed} case={failure.index} checks={",".join(failure.checks)}\n'
+                f'  ib_gib={failure.ib_gib!r}\n  salt={failure.salt!r}',
+                flush=True,
+            )
+        now = time.perf_counter()
+        if now - last_report >= 10:
+            print(f'{checked:,}/{args.cases:,} cases, {failed} failed, {checked / (now - started):,.0f} cases/s',
+                  file=sys.stderr, flush=True)
+            last_report = now
+    elapsed = time.perf_counter() - started
+    print(f'checked {checked:,} cases x {len(CHECKS)} paths in {elapsed:.1f}s: {failed} failed', file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+# py_gib/graph_index.py
+"""
+In-memory index over ibgib `rel8ns` for timeline and ancestry queries.
+
+Holds forward adjacency (the ibgib's own `rel8ns`), reverse adjacency per rel8n
+name (who rel8s to an address) and the current head(s) of every timeline, all
+updated incrementally as ibgibs are added. Lookups are dict hits, so head,
+referrer and (small) descendant queries do not depend on the size of the graph.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from collections import deque
+import sys
+import threading
+
+from .helper import get_ib_gib_addr
+from .V1.types import Rel8n
+
+_EMPTY: Tuple[str, ...] = ()
+
+DEFAULT_DESCENDANT_REL8N_NAMES = (Rel8n.past, Rel8n.ancestor)
+"""
+Descendants of an address are the later frames of its timeline (rel8d via
+`past`) and its forks (rel8d via `ancestor`), recursively.
+"""
+
+def _frame_rank(ib_gib: Any, past: Sequence[str]) -> Tuple[int, int]:
+    """
+    Orders frames within a timeline: by `data.n` when present, then by how
+    long the `past` is.
+    """
+    data = ib_gib.get('data')
+    n = data.get('n') if isinstance(data, dict) else None
+    if not isinstance(n, int) or isinstance(n, bool):
+        n = -1
+    return n, len(past)
+
+class GraphIndex:
+    """
+    Forward/reverse rel8n adjacency plus per-tjp timeline heads.
+
+    Add ibgibs (dicts or `IbGib_V1` records) with `add`/`add_many` in any
+    order. An ibgib's timeline is its most recent `rel8ns.tjp` address, or its
+    own address if it is the tjp itself (`data.isTjp`). A frame is a head of
+    its timeline while no other frame of the index has it in its `past`.
+
+    Safe to use from several threads.
+    """
+    def __init__(self):
+        self._forward: Dict[str, Dict[str, Sequence[str]]] = {}
+        self._reverse: Dict[str, Dict[str, List[str]]] = {}
+        self._heads: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._forward)
+
+    def __contains__(self, addr: str) -> bool:
+        return addr in self._forward
+
+    # region updates
+
+    def add(self, ib_gib: Any) -> bool:
+        """
+        Indexes `ib_gib`. Returns False if its address was already indexed.
+        """
+        addr = sys.intern(get_ib_gib_addr(ib_gib=ib_gib))
+        with self._lock:
+            if addr in self._forward:
+                return False
+            rel8ns = ib_gib.get('rel8ns') or {}
+            self._forward[addr] = rel8ns
+            for rel8n_name, rel8d_addrs in rel8ns.items():
+                if not rel8d_addrs:
+                    continue
+                reverse = self._reverse.get(rel8n_name)
+                if reverse is None:
+                    reverse = self._reverse[sys.intern(rel8n_name)] = {}
+                for rel8d_addr in rel8d_addrs:
+                    referrers = reverse.get(rel8d_addr)
+                    if referrers is None:
+                        reverse[sys.intern(rel8d_addr)] = [addr]
+                    else:
+                        referrers.append(addr)
+            self._update_heads(addr, ib_gib, rel8ns)
+            return True
+
+    def add_many(self, ib_gibs: Iterable[Any]) -> int:
+        """
+        Indexes many ibgibs, returning how many were new.
+        """
+        with self._lock:
+            return sum(1 for ib_gib in ib_gibs if self.add(ib_gib))
+
+    def _update_heads(self, addr: str, ib_gib: Any, rel8ns: Dict[str, Sequence[str]]) -> None:
+        tjp_addrs = rel8ns.get(Rel8n.tjp)
+        if tjp_addrs:
+            tjp_addr = tjp_addrs[-1]
+        else:
+            data = ib_gib.get('data')
+            if not (isinstance(data, dict) and data.get('isTjp')):
+                return
+            tjp_addr = addr
+        heads = self._heads.get(tjp_addr)
+        if heads is None:
+            heads = self._heads[sys.intern(tjp_addr)] = {}
+        past = rel8ns.get(Rel8n.past) or _EMPTY
+        for past_addr in past:
+            heads.pop(past_addr, None)
+        # if a later frame arrived first, this one is already superseded.
+        if not self._reverse.get(Rel8n.past, {}).get(addr):
+            heads[addr] = _frame_rank(ib_gib, past)
+
+    # endregion updates
+
+    # region queries
+
+    def rel8d(self, addr: str, rel8n_name: Optional[str] = None) -> List[str]:
+        """
+        Forward adjacency: the addresses `addr` rel8s to, either via
+        `rel8n_name` or via any rel8n.
+        """
+        rel8ns = self._forward.get(addr)
+        if not rel8ns:
+            return []
+        if rel8n_name is not None:
+            return list(rel8ns.get(rel8n_name) or _EMPTY)
+        return [x for rel8d_addrs in rel8ns.values() for x in rel8d_addrs or _EMPTY]
+
+    def rel8ns(self, addr: str) -> Optional[Dict[str, Sequence[str]]]:
+        """
+        The indexed ibgib's own `rel8ns`, or None if `addr` is not indexed.
+        """
+        return self._forward.get(addr)
+
+    def referrers(self, addr: str, rel8n_name: Optional[str] = None) -> List[str]:
+        """
+        Reverse adjacency: the indexed ibgibs that rel8 to `addr`, either via
+        `rel8n_name` or via any rel8n (deduplicated), in the order added.
+        """
+        with self._lock:
+            if rel8n_name is not None:
+                return list(self._reverse.get(rel8n_name, {}).get(addr) or _EMPTY)
+            result: List[str] = []
+            for reverse in self._reverse.values():
+                result.extend(reverse.get(addr) or _EMPTY)
+            return list(dict.fromkeys(result))
+
+    def rel8n_names(self) -> List[str]:
+        return list(self._reverse)
+
+    def tjp_addrs(self) -> List[str]:
+        """
+        Every timeline (tjp address) with at least one indexed frame.
+        """
+        with self._lock:
+            return list(self._heads)
+
+    def heads(self, tjp_addr: str) -> List[str]:
+        """
+        Every head of the timeline of `tjp_addr`, latest first. More than one
+        means the timeline has branched (or frames are missing).
+        """
+        with self._lock:
+            heads = self._heads.get(tjp_addr)
+            if not heads:
+                return []
+            ranked = sorted(enumerate(heads.items()), key=lambda x: (x[1][1], x[0]), reverse=True)
+            return [head_addr for _, (head_addr, _) in ranked]
+
+    def head(self, tjp_addr: str) -> Optional[str]:
+        """
+        The latest frame of the timeline of `tjp_addr`, or None if the index
+        has no frame of that timeline. Between branches, the frame with the
+        highest `data.n`, then longest `past`, then most recently added wins.
+        """
+        heads = self.heads(tjp_addr)
+        return heads[0] if heads else None
+
+    def timeline(self, tjp_addr: str) -> List[str]:
+        """
+        Every indexed frame of the timeline of `tjp_addr`, tjp first, in the
+        order added.
+        """
+        with self._lock:
+            frames = list(self._reverse.get(Rel8n.tjp, {}).get(tjp_addr) or _EMPTY)
+        return [tjp_addr, *frames] if tjp_addr in self._forward else frames
+
+    def iter_descendants(
+        self,
+        addr: str,
+        rel8n_names: Sequence[str] = DEFAULT_DESCENDANT_REL8N_NAMES,
+        max_depth: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Breadth-first over reverse `rel8n_names` edges starting at `addr`,
+        yielding each descendant once (not `addr` itself).
+        """
+        reverses = [self._reverse[name] for name in rel8n_names if name in self._reverse]
+        seen: Set[str] = {addr}
+        queue = deque([(addr, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for reverse in reverses:
+                for referrer in reverse.get(current) or _EMPTY:
+                    if referrer not in seen:
+                        seen.add(referrer)
+                        yield referrer
+                        queue.append((referrer, depth + 1))
+
+    def descendants(
+        self,
+        addr: str,
+        rel8n_names: Sequence[str] = DEFAULT_DESCENDANT_REL8N_NAMES,
+        max_depth: Optional[int] = None,
+    ) -> List[str]:
+        """
+        See `iter_descendants`.
+        """
+        with self._lock:
+            return list(self.iter_descendants(addr, rel8n_names=rel8n_names, max_depth=max_depth))
+
+    # endregion queries
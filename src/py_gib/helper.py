@@ -0,0 +1,69 @@
+# py_gib/helper.py
+
+from typing import Dict, Optional
+from email.utils import formatdate
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+def get_ib_gib_addr(
+    ib: Optional[str] = None,
+    gib: Optional[str] = None,
+    ib_gib: Optional[dict] = None,
+    delimiter: str = '^',
+) -> str:
+    """
+    Gets the ib^gib address from the given ib and gib or from the ibgib.
+    """
+    ib = ib or (ib_gib or {}).get('ib') or ''
+    gib = gib or (ib_gib or {}).get('gib') or ''
+    return ib + delimiter + gib
+
+def get_ib_and_gib(
+    ib_gib_addr: Optional[str] = None,
+    ib_gib: Optional[dict] = None,
+    delimiter: str = '^',
+) -> Dict[str, str]:
+    """
+    Gets the ib and gib fields from an ibgib or ib^gib address with the given
+    `delimiter`.
+
+    If the address contains multiple delimiters, the last one is considered
+    the demarcation of the gib, e.g. 'ib^ABC123^gib' -> ib 'ib^ABC123', gib 'gib'.
+    """
+    if not ib_gib_addr:
+        if ib_gib:
+            ib_gib_addr = get_ib_gib_addr(ib_gib=ib_gib)
+        else:
+            raise ValueError('[get_ib_and_gib] We need either an address or an ibGib object')
+    if not delimiter:
+        delimiter = '^'
+
+    pieces = ib_gib_addr.split(delimiter)
+    if len(pieces) == 2:
+        # normal v1 case, e.g. 'ib^gib' or 'tag home^ABC123'.
+        # also covers '7^' (primitive) and '^ABC123' (only gib/hash).
+        return {'ib': pieces[0], 'gib': pieces[1]}
+    if len(pieces) == 1:
+        # no delimiter at all. matches the TS behavior of taking it as the gib.
+        return {'ib': '', 'gib': pieces[0]}
+
+    logger.warning('[get_ib_and_gib] multiple delimiters found in ibGibAddr. Considering last delimiter as the demarcation of gib hash')
+    ib, _, gib = ib_gib_addr.rpartition(delimiter)
+    return {'ib': ib, 'gib': gib}
+
+def get_timestamp(timestamp_s: Optional[float] = None) -> str:
+    """
+    UTC timestamp in the same format as the TS `Date.toUTCString()`,
+    e.g. 'Mon, 14 Feb 2022 14:19:32 GMT'.
+    """
+    return formatdate(timestamp_s, usegmt=True)
+
+def get_uuid() -> str:
+    """
+    Random UUID the same shape as the TS `getUUID` (a sha-256 hex hash of
+    random values).
+    """
+    return hashlib.sha256(''.join(str(b) for b in os.urandom(16)).encode('utf-8')).hexdigest()
@@ -0,0 +1,466 @@
+# py_gib/ingest.py
+"""
+Streaming ingestion of JSONL ibgib dumps: read -> parse/hash -> dedupe -> sink.
+
+    python -m py_gib.ingest DUMP.jsonl [DUMP.jsonl ...] --store DIR [--workers N]
+
+Every stage is a generator of batches (lists), so stages compose and memory is
+bounded by `queue_size` batches between stages rather than by the size of the
+dump:
+
+    - `read_stage` reads lines incrementally (`validate.iter_sources`).
+    - `hash_stage` parses and validates (or, without a `gib`, computes the gib
+      of) every ibgib across a process pool.
+    - `dedupe_stage` drops addresses already seen, via a `BoundedSeenSet` or a
+      `BloomFilter`.
+    - a sink is any callable taking a batch of ibgib dicts, e.g.
+      `PackStore.put_many`.
+
+`buffered` runs a stage in its own thread behind a bounded queue, so a slow
+sink blocks the hashing, which blocks the reading (backpressure). Each stage
+records its busy time and throughput in a `StageStats`.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from collections import OrderedDict
+import argparse
+import hashlib
+import json
+import logging
+import math
+import queue
+import sys
+import threading
+import time
+
+from .helper import get_ib_gib_addr
+from .pool import map_chunks
+from .validate import iter_sources, shape_errors
+from .V1.transforms.transform_helper import get_gib
+from .V1.validate_helper import validate_ib_gib_intrinsically
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 512
+"""
+ibgibs per batch, i.e. per worker task and per sink call.
+"""
+
+DEFAULT_QUEUE_SIZE = 8
+"""
+Batches buffered between two stages before the upstream stage blocks.
+"""
+
+DEFAULT_SEEN_MAXSIZE = 1_000_000
+"""
+Addresses remembered by the default `BoundedSeenSet`.
+"""
+
+Sink = Callable[[List[dict]], Any]
+
+class IngestItem(NamedTuple):
+    source: str
+    """Where the ibgib came from, e.g. 'dump.jsonl:42'."""
+    ib_gib: Optional[dict]
+    """The parsed ibgib (with its gib filled in), or None if it could not be parsed."""
+    addr: Optional[str]
+    errors: Optional[List[str]]
+    """Parse/validation errors, or None if valid."""
+    size: int
+    """Size of the raw line in bytes."""
+
+class StageStats:
+    """
+    Items, bytes and busy time of one stage. Busy time excludes time spent
+    waiting on the upstream stage.
+    """
+    __slots__ = ('name', 'items', 'bytes', 'total_s', 'wait_s')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.bytes = 0
+        self.total_s = 0.0
+        self.wait_s = 0.0
+
+    @property
+    def busy_s(self) -> float:
+        return max(0.0, self.total_s - self.wait_s)
+
+    def to_dict(self) -> Dict[str, Any]:
+        busy_s = self.busy_s
+        return {
+            'name': self.name,
+            'items': self.items,
+            'bytes': self.bytes,
+            'busy_s': busy_s,
+            'items_per_s': self.items / busy_s if busy_s > 0 else 0.0,
+            'mb_per_s': self.bytes / 1e6 / busy_s if busy_s > 0 else 0.0,
+        }
+
+    def __repr__(self) -> str:
+        return f'StageStats({self.to_dict()!r})'
+
+def _metered(iterable: Iterable[List[Any]], stats: StageStats, field: str) -> Iterator[List[Any]]:
+    """
+    Adds the time spent pulling each batch from `iterable` to `stats.<field>`.
+    """
+    it = iter(iterable)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            batch = next(it)
+        except StopIteration:
+            setattr(stats, field, getattr(stats, field) + time.perf_counter() - t0)
+            return
+        setattr(stats, field, getattr(stats, field) + time.perf_counter() - t0)
+        yield batch
+
+def _stage(
+    upstream: Iterable[List[Any]],
+    stats: StageStats,
+    fn: Callable[[Iterable[List[Any]]], Iterable[List[Any]]],
+) -> Iterator[List[Any]]:
+    for batch in _metered(fn(_metered(upstream, stats, 'wait_s')), stats, 'total_s'):
+        stats.items += len(batch)
+        yield batch
+
+# region dedupe
+
+class BoundedSeenSet:
+    """
+    The `maxsize` most recently seen addresses. Exact while fewer than
+    `maxsize` distinct addresses have been seen; beyond that a duplicate whose
+    first copy was evicted gets through again, which sinks such as `PackStore`
+    tolerate.
+    """
+    def __init__(self, maxsize: int = DEFAULT_SEEN_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self.maxsize = maxsize
+        self._seen: 'OrderedDict[str, None]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, addr: str) -> bool:
+        return addr in self._seen
+
+    def add(self, addr: str) -> bool:
+        """
+        Remembers `addr`, returning False if it was already seen.
+        """
+        if addr in self._seen:
+            self._seen.move_to_end(addr)
+            return False
+        self._seen[addr] = None
+        if len(self._seen) > self.maxsize:
+            self._seen.popitem(last=False)
+        return True
+
+class BloomFilter:
+    """
+    Fixed-memory set of addresses sized for `capacity` addresses at
+    `error_rate` false positives. Never lets a duplicate through, but about
+    `error_rate` of new addresses are wrongly reported as seen (and so dropped
+    by `dedupe_stage`), so only use it where that loss is acceptable or
+    recoverable (e.g. a second pass).
+    """
+    def __init__(self, capacity: int, error_rate: float = 1e-6):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate must be between 0 and 1, got {error_rate}")
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, addr: str) -> Iterator[int]:
+        digest = hashlib.blake2b(addr.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, addr: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(addr))
+
+    def add(self, addr: str) -> bool:
+        """
+        Sets `addr`'s bits, returning False if they were all set already.
+        """
+        new = False
+        for p in self._positions(addr):
+            mask = 1 << (p & 7)
+            if not self._bits[p >> 3] & mask:
+                self._bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+# endregion dedupe
+
+# region stages
+
+def _hash_batches(batches: List[List[Tuple[str, bytes]]]) -> List[List[IngestItem]]:
+    """
+    Worker entry point: parses every raw line and validates its gib, or fills
+    in the gib if the line has none.
+    """
+    results = []
+    for batch in batches:
+        items = []
+        for source, raw in batch:
+            try:
+                ib_gib = json.loads(raw)
+            except ValueError as error:
+                items.append(IngestItem(source, None, None, [f'invalid JSON: {error}'], len(raw)))
+                continue
+            if not isinstance(ib_gib, dict) or not isinstance(ib_gib.get('ib'), str):
+                items.append(IngestItem(source, None, None, ['not an ibgib'], len(raw)))
+                continue
+            errors = shape_errors(ib_gib)
+            if errors:
+                items.append(IngestItem(source, None, None, errors, len(raw)))
+                continue
+            addr = None
+            try:
+                if ib_gib.get('gib'):
+                    errors = validate_ib_gib_intrinsically(ib_gib)
+                else:
+                    ib_gib['gib'] = get_gib(ib_gib)
+                    errors = None
+                addr = get_ib_gib_addr(ib_gib=ib_gib)
+            except Exception as error:
+                # one bad line must not end a multi-GB ingest.
+                errors = [f'validation raised {type(error).__name__}: {error}']
+            items.append(IngestItem(source, ib_gib, addr, errors, len(raw)))
+        results.append(items)
+    return results
+
+def read_stage(
+    paths: Sequence[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    stats: Optional[StageStats] = None,
+) -> Iterator[List[Tuple[str, bytes]]]:
+    """
+    Batches of (source label, raw line) from JSONL files (or `-` for stdin),
+    read incrementally.
+    """
+    stats = stats or StageStats('read')
+
+    def read(_):
+        batch: List[Tuple[str, bytes]] = []
+        for source in iter_sources(paths):
+            batch.append(source)
+            stats.bytes += len(source[1])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    return _stage((), stats, read)
+
+def hash_stage(
+    batches: Iterable[List[Tuple[str, bytes]]],
+    workers: Optional[int] = None,
+    stats: Optional[StageStats] = None,
+) -> Iterator[List[IngestItem]]:
+    """
+    Parses and hashes batches of raw lines across a process pool (at most
+    `2 * workers` batches in flight), yielding `IngestItem` batches in order.
+    """
+    stats = stats or StageStats('hash')
+
+    def hash_(upstream):
+        for items in map_chunks(_hash_batches, upstream, workers=workers, chunk_size=1, min_parallel=2):
+            stats.bytes += sum(item.size for item in items)
+            yield items
+
+    return _stage(batches, stats, hash_)
+
+def dedupe_stage(
+    batches: Iterable[List[IngestItem]],
+    seen: Any,
+    on_invalid: Optional[Callable[[IngestItem], Any]] = None,
+    stats: Optional[StageStats] = None,
+) -> Iterator[List[dict]]:
+    """
+    Drops invalid items (passing each to `on_invalid`) and items whose address
+    `seen.add` reports as already seen, yielding batches of new ibgibs.
+    """
+    stats = stats or StageStats('dedupe')
+
+    def dedupe(upstream):
+        for items in upstream:
+            batch = []
+            for item in items:
+                if item.errors:
+                    if on_invalid is not None:
+                        on_invalid(item)
+                    continue
+                if seen.add(item.addr):
+                    stats.bytes += item.size
+                    batch.append(item.ib_gib)
+            if batch:
+                yield batch
+
+    return _stage(batches, stats, dedupe)
+
+def buffered(iterable: Iterable[Any], maxsize: int = DEFAULT_QUEUE_SIZE) -> Iterator[Any]:
+    """
+    Runs `iterable` in a background thread, handing its items over through a
+    queue of at most `maxsize` items: the thread blocks while the queue is
+    full. Exceptions are re-raised in the consumer. Closing the returned
+    generator stops the thread.
+    """
+    q: 'queue.Queue[Tuple[str, Any]]' = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in iterable:
+                if not put(('item', item)):
+                    return
+            put(('done', None))
+        except BaseException as error:
+            put(('error', error))
+
+    thread = threading.Thread(target=run, name='py_gib-ingest-stage', daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value = q.get()
+            if kind == 'item':
+                yield value
+            elif kind == 'error':
+                raise value
+            else:
+                return
+    finally:
+        stop.set()
+        thread.join()
+
+# endregion stages
+
+class IngestReport(NamedTuple):
+    read: int
+    """Lines read."""
+    stored: int
+    """New ibgibs handed to the sink."""
+    duplicates: int
+    invalid: int
+    elapsed_s: float
+    stages: List[Dict[str, Any]]
+    """`StageStats.to_dict()` of every stage, in pipeline order."""
+
+def ingest_jsonl(
+    paths: Sequence[str],
+    sink: Sink,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    seen: Any = None,
+    on_invalid: Optional[Callable[[IngestItem], Any]] = None,
+) -> IngestReport:
+    """
+    Streams the JSONL dumps at `paths` into `sink` (called with batches of new,
+    valid ibgib dicts), with a bounded queue of `queue_size` batches between
+    every stage.
+
+    `seen` is anything with `add(addr) -> bool` (default: a `BoundedSeenSet`
+    of `DEFAULT_SEEN_MAXSIZE`). Invalid lines are passed to `on_invalid`
+    (default: logged as warnings) and skipped.
+    """
+    if seen is None:
+        seen = BoundedSeenSet()
+    if on_invalid is None:
+        on_invalid = lambda item: logger.warning(f'[ingest_jsonl] skipping {item.source}: {"; ".join(item.errors)}')
+    invalid = 0
+
+    def count_invalid(item: IngestItem) -> None:
+        nonlocal invalid
+        invalid += 1
+        on_invalid(item)
+
+    read_stats, hash_stats, dedupe_stats, sink_stats = (
+        StageStats('read'), StageStats('hash'), StageStats('dedupe'), StageStats('sink'),
+    )
+    start = time.perf_counter()
+    batches = buffered(read_stage(paths, batch_size=batch_size, stats=read_stats), queue_size)
+    items = buffered(hash_stage(batches, workers=workers, stats=hash_stats), queue_size)
+    new = dedupe_stage(items, seen, on_invalid=count_invalid, stats=dedupe_stats)
+
+    def store(upstream):
+        for batch in upstream:
+            sink(batch)
+            yield batch
+
+    for _ in _stage(new, sink_stats, store):
+        pass
+    sink_stats.bytes = dedupe_stats.bytes
+    elapsed = time.perf_counter() - start
+
+    return IngestReport(
+        read=read_stats.items,
+        stored=sink_stats.items,
+        duplicates=hash_stats.items - invalid - sink_stats.items,
+        invalid=invalid,
+        elapsed_s=elapsed,
+        stages=[s.to_dict() for s in (read_stats, hash_stats, dedupe_stats, sink_stats)],
+    )
+
+def format_report(report: IngestReport) -> str:
+    lines = [
+        f'read {report.read:,} ibgibs in {report.elapsed_s:.2f}s: {report.stored:,} stored, '
+        f'{report.duplicates:,} duplicates, {report.invalid:,} invalid',
+        f'{"stage":<10}{"items":>14}{"busy s":>10}{"items/s":>14}{"MB/s":>10}',
+    ]
+    for stage in report.stages:
+        lines.append(
+            f'{stage["name"]:<10}{stage["items"]:>14,}{stage["busy_s"]:>10.2f}'
+            f'{stage["items_per_s"]:>14,.0f}{stage["mb_per_s"]:>10.2f}'
+        )
+    return '\n'.join(lines)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from .pack_store import PackStore
+
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.ingest',
+        description='Stream JSONL ibgib dumps into a pack store, skipping duplicates and invalid ibgibs.',
+    )
+    parser.add_argument('paths', nargs='+', help='JSONL files, or - for stdin')
+    parser.add_argument('--store', required=True, help='PackStore directory')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help='batches buffered between stages')
+    parser.add_argument('--bloom', type=int, default=None, metavar='CAPACITY',
+                        help='dedupe with a bloom filter sized for CAPACITY addresses instead of a bounded set')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    seen = BloomFilter(args.bloom) if args.bloom else BoundedSeenSet()
+    with PackStore(args.store) as store:
+        # already validated by the hash stage.
+        report = ingest_jsonl(
+            args.paths, lambda batch: store.put_many(batch, validate=False),
+            workers=args.workers, batch_size=args.batch_size, queue_size=args.queue_size, seen=seen,
+        )
+    print(format_report(report), file=sys.stderr)
+    return 1 if report.invalid else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
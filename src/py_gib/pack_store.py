@@ -0,0 +1,426 @@
+# py_gib/pack_store.py
+"""
+Local append-only ibgib store keyed by `ib^gib` address.
+
+A store is a directory with two files:
+
+* `pack.dat` - every stored ibgib, appended one record at a time and never
+  rewritten. Each record is a `>II` header (address length, body length), the
+  UTF-8 address and the ibgib's compact JSON.
+* `pack.idx` - a header followed by fixed-size entries sorted by the sha-256
+  digest of the address, each pointing at a record in the pack. It is memory
+  mapped and searched with a binary search, so lookups are O(log n) without
+  loading the index.
+
+New puts are appended to the pack right away and indexed in memory until
+`flush` merges them into a new index file, which atomically replaces the old
+one. If the process dies before a flush, the unindexed tail of the pack is
+re-scanned the next time the store is opened, so nothing written is lost.
+
+ibgibs are validated with `validate_ib_gib_intrinsically` (i.e. their gib is
+recomputed with `sha256v1`) on write, and optionally on read. Only JSON ibgibs
+are supported, i.e. not binary `data`.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+
+from .helper import get_ib_gib_addr
+from .V1.validate_helper import validate_ib_gib_intrinsically
+
+PACK_FILENAME = 'pack.dat'
+INDEX_FILENAME = 'pack.idx'
+
+INDEX_MAGIC = b'IBGPIDX1'
+_INDEX_HEADER = struct.Struct('>8sQQ')
+"""magic, pack bytes covered by the index, entry count"""
+_INDEX_ENTRY = struct.Struct('>32sQI')
+"""address digest, record offset, record length"""
+_RECORD_HEADER = struct.Struct('>II')
+"""address length, body length"""
+
+DEFAULT_AUTO_FLUSH = 65536
+"""
+Pending (unindexed) puts that trigger a `flush`. Every flush rewrites the whole
+index, so this trades memory for fewer rewrites.
+"""
+
+def _addr_key(addr: str) -> bytes:
+    return hashlib.sha256(addr.encode('utf-8')).digest()
+
+class PackStore:
+    """
+    Content-addressed ibgib store in the directory `path` (created if needed).
+
+    Not safe for multiple writer processes. Within a process, methods may be
+    called from several threads.
+
+    `verify_on_read=True` re-validates every ibgib read, raising ValueError
+    if the pack was corrupted. `auto_flush` is the number of pending puts
+    that triggers a `flush` (None to only flush explicitly and on `close`).
+    """
+    def __init__(
+        self,
+        path: str,
+        verify_on_read: bool = False,
+        auto_flush: Optional[int] = DEFAULT_AUTO_FLUSH,
+    ):
+        self.path = path
+        self.verify_on_read = verify_on_read
+        self.auto_flush = auto_flush
+        self._lock = threading.RLock()
+        self._pending: Dict[bytes, Tuple[int, int]] = {}
+        self._index_file = None
+        self._index: Optional[mmap.mmap] = None
+        self._index_count = 0
+        self._index_covers = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._pack = open(os.path.join(path, PACK_FILENAME), 'a+b')
+        self._pack_size = self._pack.seek(0, os.SEEK_END)
+        try:
+            self._open_index()
+            self._recover_tail()
+        except BaseException:
+            # no store to close later, so don't leave the files open.
+            self._close_index()
+            self._pack.close()
+            raise
+
+    # region open/close
+
+    def _open_index(self) -> None:
+        index_path = os.path.join(self.path, INDEX_FILENAME)
+        if not os.path.exists(index_path):
+            return
+        index_file = open(index_path, 'rb')
+        size = os.fstat(index_file.fileno()).st_size
+        if size < _INDEX_HEADER.size:
+            index_file.close()
+            raise ValueError(f'[PackStore] index file is truncated: {index_path}')
+        index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, covers, count = _INDEX_HEADER.unpack_from(index, 0)
+        if magic != INDEX_MAGIC or size != _INDEX_HEADER.size + count * _INDEX_ENTRY.size:
+            index.close()
+            index_file.close()
+            raise ValueError(f'[PackStore] not a valid index file: {index_path}')
+        if covers > self._pack_size:
+            index.close()
+            index_file.close()
+            raise ValueError(f'[PackStore] index covers {covers} bytes but pack only has {self._pack_size}')
+        self._index_file, self._index = index_file, index
+        self._index_count, self._index_covers = count, covers
+
+    def _close_index(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index_file.close()
+        self._index_file = self._index = None
+        self._index_count = 0
+
+    def _recover_tail(self) -> None:
+        """
+        Indexes records appended after the last flush (e.g. after a crash).
+        A torn record at the very end is truncated away.
+        """
+        offset = self._index_covers
+        while offset < self._pack_size:
+            header = os.pread(self._pack.fileno(), _RECORD_HEADER.size, offset)
+            if len(header) < _RECORD_HEADER.size:
+                break
+            addr_len, body_len = _RECORD_HEADER.unpack(header)
+            length = _RECORD_HEADER.size + addr_len + body_len
+            if offset + length > self._pack_size:
+                break
+            addr = os.pread(self._pack.fileno(), addr_len, offset + _RECORD_HEADER.size).decode('utf-8')
+            self._pending.setdefault(_addr_key(addr), (offset, length))
+            offset += length
+        if offset < self._pack_size:
+            self._pack.truncate(offset)
+            self._pack_size = offset
+
+    def close(self) -> None:
+        """
+        Flushes pending puts and closes the store.
+        """
+        with self._lock:
+            if self._pack.closed:
+                return
+            self.flush()
+            self._close_index()
+            self._pack.close()
+
+    def __enter__(self) -> 'PackStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # endregion open/close
+
+    # region lookups
+
+    def _find_indexed(self, key: bytes) -> Optional[Tuple[int, int]]:
+        index = self._index
+        lo, hi = 0, self._index_count
+        header_size, entry_size = _INDEX_HEADER.size, _INDEX_ENTRY.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = header_size + mid * entry_size
+            mid_key = index[pos:pos + 32]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                _, offset, length = _INDEX_ENTRY.unpack_from(index, pos)
+                return offset, length
+        return None
+
+    def _find(self, key: bytes) -> Optional[Tuple[int, int]]:
+        location = self._pending.get(key)
+        if location is None and self._index_count:
+            location = self._find_indexed(key)
+        return location
+
+    def _index_position(self, key: bytes) -> int:
+        """
+        Number of indexed entries whose key sorts before `key`.
+        """
+        index = self._index
+        lo, hi = 0, self._index_count
+        header_size, entry_size = _INDEX_HEADER.size, _INDEX_ENTRY.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = header_size + mid * entry_size
+            if index[pos:pos + 32] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _read(self, addr: Optional[str], location: Tuple[int, int]) -> Tuple[str, dict]:
+        """
+        Reads the record at `location`, checking that it belongs to `addr`
+        unless that is None. Returns (address, ibgib).
+        """
+        offset, length = location
+        record = os.pread(self._pack.fileno(), length, offset)
+        addr_len, body_len = _RECORD_HEADER.unpack_from(record, 0)
+        start = _RECORD_HEADER.size
+        record_addr = record[start:start + addr_len].decode('utf-8')
+        if addr is not None and record_addr != addr:
+            # sha-256 collision on the address or a corrupted index.
+            raise ValueError(f'[PackStore] record at {offset} does not belong to {addr}')
+        ib_gib = json.loads(record[start + addr_len:start + addr_len + body_len])
+        if self.verify_on_read:
+            errors = validate_ib_gib_intrinsically(ib_gib)
+            if errors or get_ib_gib_addr(ib_gib=ib_gib) != record_addr:
+                raise ValueError(f'[PackStore] stored ibgib {record_addr} is invalid: {errors or "address mismatch"}')
+        return record_addr, ib_gib
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._index_count + len(self._pending)
+
+    def __contains__(self, addr: str) -> bool:
+        return self.contains(addr)
+
+    def contains(self, addr: str) -> bool:
+        with self._lock:
+            return self._find(_addr_key(addr)) is not None
+
+    def contains_many(self, addrs: Iterable[str]) -> List[bool]:
+        """
+        Existence check for many addresses, in input order. Only touches the
+        index, never the pack.
+        """
+        with self._lock:
+            return [self._find(_addr_key(addr)) is not None for addr in addrs]
+
+    def get(self, addr: str) -> Optional[dict]:
+        """
+        Returns the stored ibgib for `addr`, or None if it is not stored.
+        """
+        with self._lock:
+            location = self._find(_addr_key(addr))
+            return None if location is None else self._read(addr, location)[1]
+
+    def get_many(self, addrs: Sequence[str]) -> List[Optional[dict]]:
+        """
+        Returns the stored ibgib (or None) for each of `addrs`, in input order.
+        Records are read in pack order to keep disk access sequential.
+        """
+        with self._lock:
+            found = []
+            for i, addr in enumerate(addrs):
+                location = self._find(_addr_key(addr))
+                if location is not None:
+                    found.append((location, i))
+            found.sort()
+            results: List[Optional[dict]] = [None] * len(addrs)
+            for location, i in found:
+                results[i] = self._read(addrs[i], location)[1]
+            return results
+
+    def keys(self, lo: bytes = b'', hi: Optional[bytes] = None) -> List[bytes]:
+        """
+        The sorted address digests (sha-256 of the `ib^gib` address, i.e. the
+        index order) of every stored ibgib whose digest is in `[lo, hi)`, or
+        `[lo, ...)` if `hi` is None. Only touches the index, never the pack.
+        """
+        with self._lock:
+            index = self._index
+            entry_size, header_size = _INDEX_ENTRY.size, _INDEX_HEADER.size
+            start = self._index_position(lo) if self._index_count else 0
+            stop = self._index_position(hi) if self._index_count and hi is not None else self._index_count
+            indexed = [
+                index[pos:pos + 32]
+                for pos in range(header_size + start * entry_size, header_size + stop * entry_size, entry_size)
+            ]
+            pending = sorted(key for key in self._pending if lo <= key and (hi is None or key < hi))
+            if not pending:
+                return indexed
+            return list(heapq.merge(indexed, pending))
+
+    def get_by_keys(self, keys: Iterable[bytes]) -> List[Tuple[str, dict]]:
+        """
+        (address, ibgib) for each of the address digests `keys` (see `keys`)
+        that is stored, once each and in pack order. Unknown digests are
+        skipped.
+        """
+        with self._lock:
+            locations = sorted(set(filter(None, map(self._find, keys))))
+            return [self._read(None, location) for location in locations]
+
+    def iter_ib_gibs(self) -> Iterator[Tuple[str, dict]]:
+        """
+        Yields (address, ibgib) for every stored ibgib in the order they were
+        put, with one sequential pass over the pack. ibgibs put while
+        iterating are not included.
+        """
+        for _, addr, ib_gib in self.iter_records():
+            yield addr, ib_gib
+
+    def iter_records(self, start: int = 0) -> Iterator[Tuple[int, str, dict]]:
+        """
+        `iter_ib_gibs` from pack offset `start` (0 or an offset this yielded),
+        yielding (offset of the next record, address, ibgib). A later call
+        from the last offset picks up the ibgibs put since, e.g. to follow the
+        store as it grows.
+        """
+        with self._lock:
+            end = self._pack_size
+        with open(os.path.join(self.path, PACK_FILENAME), 'rb') as f:
+            f.seek(start)
+            offset = start
+            while offset < end:
+                addr_len, body_len = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+                addr = f.read(addr_len).decode('utf-8')
+                ib_gib = json.loads(f.read(body_len))
+                offset += _RECORD_HEADER.size + addr_len + body_len
+                yield offset, addr, ib_gib
+
+    # endregion lookups
+
+    # region writes
+
+    def put(self, ib_gib: dict) -> str:
+        """
+        Validates and stores `ib_gib`, returning its address. Storing an
+        address that is already stored is a no-op.
+        """
+        return self.put_many([ib_gib])[0]
+
+    def put_many(self, ib_gibs: Iterable[dict], validate: bool = True) -> List[str]:
+        """
+        Validates and stores many ibgibs with a single append to the pack,
+        returning their addresses in input order.
+
+        Raises ValueError (and stores none of them) if any ibgib is invalid.
+        Pass `validate=False` only if the caller has already validated them
+        (e.g. `ingest.hash_stage`).
+        """
+        addrs = []
+        records = []
+        for ib_gib in ib_gibs:
+            errors = validate_ib_gib_intrinsically(ib_gib) if validate else None
+            if errors:
+                raise ValueError(f'[PackStore] refusing to store invalid ibgib: {errors}')
+            addr = get_ib_gib_addr(ib_gib=ib_gib)
+            addrs.append(addr)
+            records.append((addr, ib_gib))
+
+        with self._lock:
+            chunks = []
+            new_locations: Dict[bytes, Tuple[int, int]] = {}
+            offset = self._pack_size
+            for addr, ib_gib in records:
+                key = _addr_key(addr)
+                if key in new_locations or self._find(key) is not None:
+                    continue
+                addr_bytes = addr.encode('utf-8')
+                body = json.dumps(ib_gib, separators=(',', ':')).encode('utf-8')
+                record = _RECORD_HEADER.pack(len(addr_bytes), len(body)) + addr_bytes + body
+                chunks.append(record)
+                new_locations[key] = (offset, len(record))
+                offset += len(record)
+            if chunks:
+                self._pack.write(b''.join(chunks))
+                self._pack.flush()
+                self._pack_size = offset
+                self._pending.update(new_locations)
+                if self.auto_flush is not None and len(self._pending) >= self.auto_flush:
+                    self.flush()
+        return addrs
+
+    def flush(self) -> None:
+        """
+        Durably writes the pack and merges pending puts into a new index file,
+        which atomically replaces the old one.
+        """
+        with self._lock:
+            self._pack.flush()
+            os.fsync(self._pack.fileno())
+            if not self._pending and self._index_covers == self._pack_size:
+                return
+
+            pending = sorted(
+                _INDEX_ENTRY.pack(key, offset, length)
+                for key, (offset, length) in self._pending.items()
+            )
+            index = self._index
+            entry_size, header_size = _INDEX_ENTRY.size, _INDEX_HEADER.size
+            existing = (
+                index[pos:pos + entry_size]
+                for pos in range(header_size, header_size + self._index_count * entry_size, entry_size)
+            )
+            count = self._index_count + len(pending)
+
+            index_path = os.path.join(self.path, INDEX_FILENAME)
+            tmp_path = index_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(_INDEX_HEADER.pack(INDEX_MAGIC, self._pack_size, count))
+                # entries start with the key, so merging the packed bytes keeps key order.
+                batch = []
+                for entry in heapq.merge(existing, pending):
+                    batch.append(entry)
+                    if len(batch) >= 65536:
+                        f.write(b''.join(batch))
+                        batch.clear()
+                f.write(b''.join(batch))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._close_index()
+            os.replace(tmp_path, index_path)
+            self._pending.clear()
+            self._open_index()
+
+    # endregion writes
@@ -0,0 +1,90 @@
+# py_gib/pool.py
+
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+DEFAULT_CHUNK_SIZE = 256
+"""
+Number of items sent to a worker process at a time.
+"""
+
+DEFAULT_MIN_PARALLEL = 4096
+"""
+Below this many items, work stays in-process because starting the pool costs
+more than it saves.
+"""
+
+def map_chunks(
+    fn: Callable[[List[T]], List[R]],
+    items: Iterable[T],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    min_parallel: int = DEFAULT_MIN_PARALLEL,
+) -> Iterator[R]:
+    """
+    Applies `fn` to chunks of `items` and yields the flattened results in
+    input order. `fn` takes a list of items and returns one result per item,
+    and must be a module-level function so it can be pickled.
+
+    This is a generator that pulls from `items` lazily, so it can be fed an
+    arbitrarily large stream without memory growing with the input.
+
+    - If the input has fewer than `min_parallel` items, or `workers` is 1,
+      everything runs in-process.
+    - Otherwise chunks of `chunk_size` items are fanned out across a process
+      pool of `workers` processes (defaults to `os.cpu_count()`). At most
+      `2 * workers` chunks are in flight at any time.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+
+    it = iter(items)
+
+    if workers == 1:
+        # one item at a time so the consumer sees results as early as possible.
+        for item in it:
+            yield from fn([item])
+        return
+
+    # peek ahead to see whether this batch is worth a pool at all.
+    head = list(islice(it, max(min_parallel, 1)))
+    if len(head) < min_parallel:
+        if head:
+            yield from fn(head)
+        return
+
+    def chunks() -> Iterator[List[T]]:
+        for i in range(0, len(head), chunk_size):
+            yield head[i:i + chunk_size]
+        head.clear()
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    max_in_flight = workers * 2
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk in chunks():
+            pending.append(executor.submit(fn, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # if the consumer stopped early, don't wait on work nobody will read.
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,565 @@
+# py_gib/reconcile.py
+"""
+Merkle-tree set reconciliation between two `PackStore`s.
+
+    python -m py_gib.reconcile serve STORE [--host 127.0.0.1] [--port 7411] [--allow-push]
+    python -m py_gib.reconcile sync STORE HOST:PORT [--push] [--no-fetch] [--leaf-size N]
+
+Both stores keep their addresses sorted by sha-256 digest (see `pack.idx`),
+and those digests are spread uniformly. So the digest space is cut into a
+fixed tree of ranges, `FANOUT` children per node by the next hex digit of the
+digest, down to a depth both sides agree on (see `tree_depth`). A leaf's hash
+is the sha-256 of its sorted digests, an inner node's the sha-256 of its
+children's hashes.
+
+`reconcile` walks both trees down from the root, one level per round trip and
+only into nodes whose hashes differ. Small differing nodes are settled by
+exchanging their digests, after which only the missing ibgibs are fetched
+(and/or pushed) in batches. With d differences among n ibgibs that is
+O(log n) round trips and O(d log n) hashes on the wire instead of n addresses.
+
+The other store is reached through a `Transport`: `LocalTransport` calls a
+`ReconcileServer` in process, `SocketTransport` sends length-prefixed JSON
+over a socket (see `serve_connection` and `make_tcp_server`).
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import hashlib
+import itertools
+import json
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+from .helper import get_ib_gib_addr
+from .pack_store import PackStore, _addr_key
+
+RECONCILE_PROTOCOL_VERSION = 1
+
+FANOUT_BITS = 4
+FANOUT = 1 << FANOUT_BITS
+
+MAX_DEPTH = 16
+"""
+Deepest tree allowed. Leaves are then cut by the first 64 bits of the digest.
+"""
+
+DEFAULT_LEAF_SIZE = 64
+"""
+Digests per leaf the tree depth is sized for (on the larger store), and the
+combined size below which a differing node is settled by listing its digests
+instead of descending further.
+"""
+
+DEFAULT_BATCH_SIZE = 256
+"""
+ibgibs per fetch or push request.
+"""
+
+DEFAULT_PORT = 7411
+
+_KEY_BITS = 256
+_FRAME_HEADER = struct.Struct('>I')
+"""payload length"""
+_ZERO_HASH = bytes(32)
+
+Node = Tuple[bytes, int]
+"""A tree node's hash (b'' if empty) and number of digests."""
+
+_EMPTY_NODE: Node = (b'', 0)
+
+def tree_depth(count: int, leaf_size: int = DEFAULT_LEAF_SIZE) -> int:
+    """
+    Levels below the root for a store of `count` ibgibs, so that leaves hold
+    about `leaf_size` digests or fewer.
+    """
+    if leaf_size < 1:
+        raise ValueError(f"leaf_size must be at least 1, got {leaf_size}")
+    depth = 0
+    while depth < MAX_DEPTH and count > leaf_size * FANOUT ** depth:
+        depth += 1
+    return depth
+
+def node_range(level: int, index: int) -> Tuple[bytes, Optional[bytes]]:
+    """
+    The `[lo, hi)` digest range of node `index` at `level` (hi is None for
+    the last node of a level), as taken by `PackStore.keys`.
+    """
+    shift = _KEY_BITS - FANOUT_BITS * level
+    lo = (index << shift).to_bytes(32, 'big')
+    if index + 1 == FANOUT ** level:
+        return lo, None
+    return lo, ((index + 1) << shift).to_bytes(32, 'big')
+
+class MerkleTree:
+    """
+    Hash and digest count of every non-empty node of a store's digest tree,
+    `depth` levels below the root. Node `index` at `level` covers the digests
+    whose first `level` hex digits are `index`, so its children are
+    `index * FANOUT + i`.
+    """
+    __slots__ = ('depth', '_levels')
+
+    def __init__(self, depth: int, levels: List[Dict[int, Node]]):
+        self.depth = depth
+        self._levels = levels
+
+    @classmethod
+    def build(cls, keys: Callable[[bytes, Optional[bytes]], List[bytes]], depth: int) -> 'MerkleTree':
+        """
+        Builds the tree from `keys(lo, hi)`, e.g. `PackStore.keys`, which is
+        called for a few hundred ranges so the digests are never all in memory.
+        """
+        if not 0 <= depth <= MAX_DEPTH:
+            raise ValueError(f"depth must be in [0, {MAX_DEPTH}], got {depth}")
+        shift = 64 - FANOUT_BITS * depth
+        leaf_of = lambda key: int.from_bytes(key[:8], 'big') >> shift
+        chunk_level = min(depth, 2)
+        leaves: Dict[int, Node] = {}
+        for chunk in range(FANOUT ** chunk_level):
+            for leaf, group in itertools.groupby(keys(*node_range(chunk_level, chunk)), key=leaf_of):
+                group = list(group)
+                leaves[leaf] = (hashlib.sha256(b''.join(group)).digest(), len(group))
+
+        levels = [leaves]
+        for _ in range(depth):
+            children = levels[-1]
+            parents: Dict[int, Node] = {}
+            for parent, indexes in itertools.groupby(sorted(children), key=lambda i: i >> FANOUT_BITS):
+                indexes = list(indexes)
+                base = parent << FANOUT_BITS
+                hashes = [_ZERO_HASH] * FANOUT
+                for index in indexes:
+                    hashes[index - base] = children[index][0]
+                count = sum(children[index][1] for index in indexes)
+                parents[parent] = (hashlib.sha256(b''.join(hashes)).digest(), count)
+            levels.append(parents)
+        levels.reverse()
+        return cls(depth, levels)
+
+    @property
+    def root(self) -> Node:
+        return self.node(0, 0)
+
+    def node(self, level: int, index: int) -> Node:
+        return self._levels[level].get(index, _EMPTY_NODE)
+
+    def children(self, level: int, index: int) -> List[Node]:
+        if level >= self.depth:
+            raise ValueError(f"[MerkleTree] level {level} nodes are leaves (depth {self.depth})")
+        below = self._levels[level + 1]
+        base = index << FANOUT_BITS
+        return [below.get(base + i, _EMPTY_NODE) for i in range(FANOUT)]
+
+def _node_to_json(node: Node) -> List[Any]:
+    return [node[0].hex(), node[1]]
+
+def _node_from_json(value: Sequence[Any]) -> Node:
+    return bytes.fromhex(value[0]), int(value[1])
+
+# region server
+
+class ReconcileServer:
+    """
+    Answers reconciliation requests (see `handle`) against `store`. Clients
+    may only put ibgibs into the store if `allow_push`; they are validated by
+    `PackStore.put_many` either way. Safe to share between connections.
+    """
+    def __init__(self, store: PackStore, allow_push: bool = False):
+        self.store = store
+        self.allow_push = allow_push
+        self._lock = threading.Lock()
+        self._trees: Dict[int, Tuple[int, MerkleTree]] = {}
+        self._handlers: Dict[str, Callable[[dict], dict]] = {
+            'hello': self._hello,
+            'step': self._step,
+            'fetch': self._fetch,
+            'push': self._push,
+        }
+
+    def tree(self, depth: int) -> MerkleTree:
+        """
+        The store's tree at `depth`, rebuilt only once the store has grown
+        (a store never loses ibgibs, so its size tells whether it changed).
+        """
+        with self._lock:
+            size = len(self.store)
+            cached = self._trees.get(depth)
+            if cached is None or cached[0] != size:
+                cached = self._trees[depth] = (size, MerkleTree.build(self.store.keys, depth))
+            return cached[1]
+
+    def handle(self, request: dict) -> dict:
+        """
+        Answers one decoded request. Raises ValueError for a bad request.
+        """
+        handler = self._handlers.get(request.get('op'))
+        if handler is None:
+            raise ValueError(f"[ReconcileServer] unknown op: {request.get('op')!r}")
+        return handler(request)
+
+    def handle_bytes(self, payload: bytes) -> bytes:
+        """
+        Answers one JSON request with a JSON response, turning errors into an
+        `{"error": ...}` response.
+        """
+        try:
+            response = self.handle(json.loads(payload))
+        except (ValueError, KeyError, TypeError, IndexError) as error:
+            response = {'error': str(error)}
+        return json.dumps(response, separators=(',', ':')).encode('utf-8')
+
+    def _hello(self, request: dict) -> dict:
+        if request['version'] != RECONCILE_PROTOCOL_VERSION:
+            raise ValueError(f"unsupported protocol version {request['version']!r}")
+        count = len(self.store)
+        depth = tree_depth(max(count, int(request['count'])), int(request['leaf_size']))
+        return {
+            'version': RECONCILE_PROTOCOL_VERSION,
+            'count': count,
+            'depth': depth,
+            'root': _node_to_json(self.tree(depth).root),
+        }
+
+    def _step(self, request: dict) -> dict:
+        tree = self.tree(int(request['depth']))
+        level = int(request['level'])
+        children = [[_node_to_json(x) for x in tree.children(level, int(index))] for index in request['expand']]
+        keys = [
+            [key.hex() for key in self.store.keys(*node_range(int(list_level), int(index)))]
+            for list_level, index in request['list']
+        ]
+        return {'children': children, 'keys': keys}
+
+    def _fetch(self, request: dict) -> dict:
+        keys = [bytes.fromhex(key) for key in request['keys']]
+        return {'ib_gibs': [ib_gib for _, ib_gib in self.store.get_by_keys(keys)]}
+
+    def _push(self, request: dict) -> dict:
+        if not self.allow_push:
+            raise ValueError('push is not allowed by this server')
+        ib_gibs = request['ib_gibs']
+        if not all(isinstance(x, dict) for x in ib_gibs):
+            raise ValueError('ib_gibs must be objects')
+        return {'stored': len(self.store.put_many(ib_gibs))}
+
+# endregion server
+
+# region transports
+
+class Transport:
+    """
+    How `reconcile` reaches the other store's `ReconcileServer`: one request,
+    one response, both JSON objects. Subclasses implement `_exchange` (and
+    `close` if they hold resources). Counts round trips and bytes both ways.
+    """
+    def __init__(self):
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _exchange(self, payload: bytes) -> bytes:
+        raise NotImplementedError()
+
+    def request(self, message: dict) -> dict:
+        """
+        Sends `message` and returns the response. Raises ValueError if the
+        server answered with an error.
+        """
+        payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+        raw = self._exchange(payload)
+        self.round_trips += 1
+        self.bytes_sent += len(payload)
+        self.bytes_received += len(raw)
+        response = json.loads(raw)
+        if 'error' in response:
+            raise ValueError(f"[reconcile] server error: {response['error']}")
+        return response
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'Transport':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class LocalTransport(Transport):
+    """
+    Calls `server` in process. Requests and responses still go through JSON,
+    so nothing is shared between the stores and the byte counts are real.
+    """
+    def __init__(self, server: ReconcileServer):
+        super().__init__()
+        self.server = server
+
+    def _exchange(self, payload: bytes) -> bytes:
+        return self.server.handle_bytes(payload)
+
+def _send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def _recv_frame(sock: socket.socket) -> Optional[bytes]:
+    """
+    The next frame's payload, or None if the peer closed the connection
+    between frames.
+    """
+    header = _recv_exact(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exact(sock, _FRAME_HEADER.unpack(header)[0])
+    if payload is None:
+        raise ValueError('[reconcile] connection closed mid-frame')
+    return payload
+
+class SocketTransport(Transport):
+    """
+    Sends each request as a length-prefixed (`>I`) JSON frame over the
+    connected stream socket `sock` (TCP, unix or a `socket.socketpair` end)
+    and reads the response frame. The other end runs `serve_connection`.
+    """
+    def __init__(self, sock: socket.socket):
+        super().__init__()
+        self.sock = sock
+
+    @classmethod
+    def connect(cls, host: str, port: int, timeout: Optional[float] = None) -> 'SocketTransport':
+        return cls(socket.create_connection((host, port), timeout=timeout))
+
+    def _exchange(self, payload: bytes) -> bytes:
+        _send_frame(self.sock, payload)
+        response = _recv_frame(self.sock)
+        if response is None:
+            raise ValueError('[reconcile] connection closed by server')
+        return response
+
+    def close(self) -> None:
+        self.sock.close()
+
+def serve_connection(server: ReconcileServer, sock: socket.socket) -> None:
+    """
+    Answers `SocketTransport` requests on `sock` until the client closes it.
+    """
+    with sock:
+        while True:
+            payload = _recv_frame(sock)
+            if payload is None:
+                return
+            _send_frame(sock, server.handle_bytes(payload))
+
+def make_tcp_server(server: ReconcileServer, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> socketserver.ThreadingTCPServer:
+    """
+    A TCP server answering every connection with `serve_connection` in its
+    own thread. Call `serve_forever()` on it (and `shutdown()` to stop).
+    """
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            serve_connection(server, self.request)
+
+    tcp_server = socketserver.ThreadingTCPServer((host, port), Handler, bind_and_activate=False)
+    tcp_server.daemon_threads = True
+    tcp_server.allow_reuse_address = True
+    tcp_server.server_bind()
+    tcp_server.server_activate()
+    return tcp_server
+
+# endregion transports
+
+# region client
+
+class ReconcileReport(NamedTuple):
+    depth: int
+    round_trips: int
+    local_only: int
+    """ibgibs only in the local store (pushed if `push`)."""
+    remote_only: int
+    """ibgibs only in the remote store (fetched if `fetch`)."""
+    fetched: int
+    pushed: int
+    bytes_sent: int
+    bytes_received: int
+
+def diff(
+    store: PackStore,
+    transport: Transport,
+    leaf_size: int = DEFAULT_LEAF_SIZE,
+) -> Tuple[int, List[bytes], List[bytes]]:
+    """
+    Compares `store` with the store behind `transport`. Returns the tree depth
+    used and the sorted address digests (see `PackStore.keys`) only the local
+    store has and only the remote one has.
+    """
+    hello = transport.request({
+        'op': 'hello',
+        'version': RECONCILE_PROTOCOL_VERSION,
+        'count': len(store),
+        'leaf_size': leaf_size,
+    })
+    depth = int(hello['depth'])
+    tree = MerkleTree.build(store.keys, depth)
+
+    local_only: List[bytes] = []
+    remote_only: List[bytes] = []
+    level = 0
+    # differing nodes at `level`, with the remote side's (hash, count).
+    frontier = {0: _node_from_json(hello['root'])}
+    if frontier[0] == tree.root:
+        frontier = {}
+    while frontier:
+        expand: List[int] = []
+        listed: List[int] = []
+        for index, remote in sorted(frontier.items()):
+            if level == depth or tree.node(level, index)[1] + remote[1] <= leaf_size:
+                listed.append(index)
+            else:
+                expand.append(index)
+        response = transport.request({
+            'op': 'step',
+            'depth': depth,
+            'level': level,
+            'expand': expand,
+            'list': [[level, index] for index in listed],
+        })
+
+        for index, remote_keys in zip(listed, response['keys']):
+            local_keys = set(store.keys(*node_range(level, index)))
+            remote_keys = set(map(bytes.fromhex, remote_keys))
+            local_only.extend(local_keys - remote_keys)
+            remote_only.extend(remote_keys - local_keys)
+
+        frontier = {}
+        for index, children in zip(expand, response['children']):
+            base = index << FANOUT_BITS
+            for i, (local, remote) in enumerate(zip(tree.children(level, index), children)):
+                remote = _node_from_json(remote)
+                if local != remote:
+                    frontier[base + i] = remote
+        level += 1
+
+    return depth, sorted(local_only), sorted(remote_only)
+
+def _batches(items: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def reconcile(
+    store: PackStore,
+    transport: Transport,
+    fetch: bool = True,
+    push: bool = False,
+    leaf_size: int = DEFAULT_LEAF_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ReconcileReport:
+    """
+    Finds the ibgibs that differ between `store` and the store behind
+    `transport` (see `diff`), then puts the ones only the remote store has
+    into `store` (if `fetch`) and sends it the ones only `store` has (if
+    `push`, which the server must allow), `batch_size` at a time.
+
+    Fetched ibgibs are validated by `PackStore.put_many`, and ValueError is
+    raised if the server sends one that was not asked for.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    round_trips, bytes_sent, bytes_received = transport.round_trips, transport.bytes_sent, transport.bytes_received
+    depth, local_only, remote_only = diff(store, transport, leaf_size)
+
+    fetched = 0
+    if fetch:
+        for keys in _batches(remote_only, batch_size):
+            ib_gibs = transport.request({'op': 'fetch', 'keys': [key.hex() for key in keys]})['ib_gibs']
+            wanted = set(keys)
+            for ib_gib in ib_gibs:
+                if not isinstance(ib_gib, dict) or _addr_key(get_ib_gib_addr(ib_gib=ib_gib)) not in wanted:
+                    raise ValueError(f'[reconcile] server sent an ibgib that was not asked for: {ib_gib!r:.200}')
+            fetched += len(store.put_many(ib_gibs))
+
+    pushed = 0
+    if push:
+        for keys in _batches(local_only, batch_size):
+            ib_gibs = [ib_gib for _, ib_gib in store.get_by_keys(keys)]
+            pushed += transport.request({'op': 'push', 'ib_gibs': ib_gibs})['stored']
+
+    return ReconcileReport(
+        depth=depth,
+        round_trips=transport.round_trips - round_trips,
+        local_only=len(local_only),
+        remote_only=len(remote_only),
+        fetched=fetched,
+        pushed=pushed,
+        bytes_sent=transport.bytes_sent - bytes_sent,
+        bytes_received=transport.bytes_received - bytes_received,
+    )
+
+# endregion client
+
+def _parse_host_port(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(':')
+    if not host or not port.isdigit():
+        raise argparse.ArgumentTypeError(f'expected HOST:PORT, got {value!r}')
+    return host, int(port)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.reconcile',
+        description='Reconcile two pack stores, transferring only the ibgibs one of them is missing.',
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='answer reconciliation requests for a store')
+    serve_parser.add_argument('store', help='PackStore directory')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--allow-push', action='store_true', help='let clients add ibgibs to the store')
+    sync_parser = commands.add_parser('sync', help='reconcile a store with a serving one')
+    sync_parser.add_argument('store', help='PackStore directory')
+    sync_parser.add_argument('address', type=_parse_host_port, help='HOST:PORT of the server')
+    sync_parser.add_argument('--push', action='store_true', help='send the ibgibs only this store has')
+    sync_parser.add_argument('--no-fetch', action='store_true', help='do not fetch the ibgibs only the server has')
+    sync_parser.add_argument('--leaf-size', type=int, default=DEFAULT_LEAF_SIZE)
+    sync_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    with PackStore(args.store) as store:
+        if args.command == 'serve':
+            with make_tcp_server(ReconcileServer(store, allow_push=args.allow_push), args.host, args.port) as tcp_server:
+                print(f'serving {args.store} ({len(store)} ibgibs) on {args.host}:{args.port}', file=sys.stderr)
+                try:
+                    tcp_server.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+            return 0
+
+        start = time.perf_counter()
+        with SocketTransport.connect(*args.address) as transport:
+            report = reconcile(
+                store, transport,
+                fetch=not args.no_fetch, push=args.push,
+                leaf_size=args.leaf_size, batch_size=args.batch_size,
+            )
+        elapsed = time.perf_counter() - start
+    print(
+        f'{report.remote_only} only on the server ({report.fetched} fetched), '
+        f'{report.local_only} only here ({report.pushed} pushed); '
+        f'depth {report.depth}, {report.round_trips} round trips, '
+        f'{report.bytes_sent:,} bytes sent, {report.bytes_received:,} received, in {elapsed:.2f}s',
+        file=sys.stderr,
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
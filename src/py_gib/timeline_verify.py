@@ -0,0 +1,401 @@
+# py_gib/timeline_verify.py
+"""
+Parallel, resumable verification of the timelines in a `PackStore`.
+
+    python -m py_gib.timeline_verify STORE [--checkpoint FILE] [--workers N]
+
+Every tjp timeline is an independent work unit. A worker walks the `past`
+rel8ns back from the timeline's head(s) to its tjp and checks every frame:
+
+    - it is in the store,
+    - it is intrinsically valid (its gib recomputes, see
+      `validate_ib_gib_intrinsically`),
+    - it belongs to the timeline (it is the tjp, or its `tjp` rel8n is).
+
+Timelines are found with a single pass over the pack that keeps only each
+timeline's current head(s), not the frames' rel8ns (see `TimelineScan`).
+
+A checkpoint file records the verified head(s) of every timeline that passed,
+so a rerun skips unchanged timelines and, for timelines that have grown, only
+verifies the frames added since. It also records how far the pack was scanned
+and the heads found so far, so a rerun only reads the records appended since.
+Exits with 1 if any timeline failed.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+import argparse
+import json
+import os
+import sys
+import time
+
+from .graph_index import _frame_rank
+from .helper import get_ib_gib_addr
+from .pool import map_chunks
+from .V1.types import Rel8n
+from .V1.validate_helper import validate_ib_gib_intrinsically
+
+CHECKPOINT_FORMAT_VERSION = 2
+"""
+Version 2 added the scanned pack offset and heads. Version 1 checkpoints are
+still read (their scan starts over from the beginning of the pack).
+"""
+
+DEFAULT_CHECKPOINT_EVERY = 100
+"""
+Completed timelines between checkpoint saves. The checkpoint is also saved
+at the end of a run and when it is interrupted.
+"""
+
+class TimelineResult(NamedTuple):
+    tjp_addr: str
+    heads: Tuple[str, ...]
+    verified: int
+    """Frames re-hashed in this run (frames covered by the checkpoint are not)."""
+    errors: List[str]
+
+class TimelineScan:
+    """
+    tjp address -> current head(s), found by scanning ibgibs in the order
+    they were stored.
+
+    Heads follow `GraphIndex`: an ibgib's timeline is its most recent
+    `rel8ns.tjp` address, or its own if it is the tjp, and a frame stays a
+    head until a frame with it in its `past` is scanned. Unlike `GraphIndex`,
+    only the heads (and their rank) are kept, so memory grows with the number
+    of timelines, not with their frames or the length of their pasts.
+
+    `offset` is how far into a `PackStore`'s pack `update` has scanned, so a
+    scan restored from a checkpoint only reads the records appended since.
+    """
+    def __init__(self, offset: int = 0, heads: Optional[Dict[str, Dict[str, Tuple[int, int]]]] = None):
+        self.offset = offset
+        self.heads: Dict[str, Dict[str, Tuple[int, int]]] = heads if heads is not None else {}
+        # timelines that gained a head since the last `resolve`.
+        self._added: Set[str] = set()
+
+    def add(self, addr: str, ib_gib: Any) -> None:
+        rel8ns = ib_gib.get('rel8ns') or {}
+        tjp_addrs = rel8ns.get(Rel8n.tjp)
+        if tjp_addrs:
+            tjp_addr = tjp_addrs[-1]
+        else:
+            data = ib_gib.get('data')
+            if not (isinstance(data, dict) and data.get('isTjp')):
+                return
+            tjp_addr = addr
+        heads = self.heads.get(tjp_addr)
+        if heads is None:
+            heads = self.heads[tjp_addr] = {}
+        past = rel8ns.get(Rel8n.past) or ()
+        for past_addr in past:
+            heads.pop(past_addr, None)
+        heads[addr] = _frame_rank(ib_gib, past)
+        self._added.add(tjp_addr)
+
+    def resolve(self, store: Any) -> None:
+        """
+        Drops heads whose later frame was stored (and scanned) before them.
+        Without rel8ns to look back at, such a frame is taken for a head when
+        it is scanned, so for every timeline that gained a head and now has
+        more than one, this walks `past` back from its heads in `store` and
+        drops the heads it reaches. Timelines with a single head, i.e. nearly
+        all of them, cost nothing.
+        """
+        for tjp_addr in self._added:
+            heads = self.heads.get(tjp_addr)
+            if not heads or len(heads) < 2:
+                continue
+            seen: Set[str] = set()
+            stack = list(heads)
+            while stack:
+                addr = stack.pop()
+                ib_gib = store.get(addr) if addr != tjp_addr else None
+                if ib_gib is None:
+                    continue
+                for past_addr in (ib_gib.get('rel8ns') or {}).get(Rel8n.past) or ():
+                    if past_addr not in seen:
+                        seen.add(past_addr)
+                        heads.pop(past_addr, None)
+                        stack.append(past_addr)
+        self._added.clear()
+
+    def update(self, store: Any) -> int:
+        """
+        Scans the records `store` (a flushed `PackStore`) appended since
+        `offset` and resolves the heads. Starts over if the pack is shorter
+        than `offset`, i.e. it is not the pack this scan came from. Returns
+        the number of records scanned.
+        """
+        from .pack_store import PACK_FILENAME
+
+        if self.offset > os.path.getsize(os.path.join(store.path, PACK_FILENAME)):
+            self.offset, self.heads = 0, {}
+            self._added.clear()
+        count = 0
+        for offset, addr, ib_gib in store.iter_records(self.offset):
+            self.add(addr, ib_gib)
+            self.offset = offset
+            count += 1
+        self.resolve(store)
+        return count
+
+    def timelines(self) -> Dict[str, List[str]]:
+        """
+        tjp address -> heads, latest first (see `GraphIndex.heads`).
+        """
+        result = {}
+        for tjp_addr, heads in self.heads.items():
+            ranked = sorted(enumerate(heads.items()), key=lambda x: (x[1][1], x[0]), reverse=True)
+            result[tjp_addr] = [head_addr for _, (head_addr, _) in ranked]
+        return result
+
+def find_timelines(ib_gibs: Iterable[Any], store: Any = None) -> Dict[str, List[str]]:
+    """
+    tjp address -> head address(es), for every timeline among `ib_gibs`.
+
+    If a frame comes after a later frame of its timeline in `ib_gibs`, pass
+    the `store` holding them so it can be dropped from the heads (see
+    `TimelineScan.resolve`).
+    """
+    scan = TimelineScan()
+    for ib_gib in ib_gibs:
+        scan.add(get_ib_gib_addr(ib_gib=ib_gib), ib_gib)
+    if store is not None:
+        scan.resolve(store)
+    return scan.timelines()
+
+def verify_timeline(
+    store: Any,
+    tjp_addr: str,
+    heads: Sequence[str],
+    verified_heads: Sequence[str] = (),
+) -> TimelineResult:
+    """
+    Verifies the frames of one timeline in `store` (anything with
+    `get(addr) -> Optional[dict]`, e.g. a `PackStore`), walking `past` back
+    from `heads`.
+
+    Frames reachable from `verified_heads` (from a previous run's
+    checkpoint) are trusted and not re-hashed.
+    """
+    trusted: Set[str] = set()
+    for addr in verified_heads:
+        ib_gib = store.get(addr)
+        if ib_gib is not None:
+            trusted.update((tjp_addr, addr))
+            trusted.update((ib_gib.get('rel8ns') or {}).get(Rel8n.past) or ())
+
+    errors: List[str] = []
+    verified = 0
+    seen: Set[str] = set(trusted)
+    # (addr, who rel8d to it via past)
+    stack: List[Tuple[str, Optional[str]]] = [(tjp_addr, None)] + [(addr, None) for addr in reversed(heads)]
+    while stack:
+        addr, referrer = stack.pop()
+        if addr in seen:
+            continue
+        seen.add(addr)
+        ib_gib = store.get(addr)
+        if ib_gib is None:
+            errors.append(f'{addr} is missing' + (f' (past of {referrer})' if referrer else ''))
+            continue
+        verified += 1
+        frame_errors = validate_ib_gib_intrinsically(ib_gib)
+        if frame_errors:
+            errors.extend(f'{addr}: {error}' for error in frame_errors)
+        elif get_ib_gib_addr(ib_gib=ib_gib) != addr:
+            errors.append(f'{addr}: stored under the wrong address ({get_ib_gib_addr(ib_gib=ib_gib)})')
+
+        rel8ns = ib_gib.get('rel8ns') or {}
+        if addr == tjp_addr:
+            # the tjp's own past (if cloned on fork) belongs to another timeline.
+            continue
+        tjp_addrs = rel8ns.get(Rel8n.tjp)
+        if not tjp_addrs or tjp_addrs[-1] != tjp_addr:
+            errors.append(f'{addr}: not a frame of timeline {tjp_addr} (tjp: {tjp_addrs})')
+        for past_addr in reversed(rel8ns.get(Rel8n.past) or ()):
+            if past_addr not in seen:
+                stack.append((past_addr, addr))
+
+    return TimelineResult(tjp_addr, tuple(heads), verified, errors)
+
+# region workers
+
+_stores: Dict[str, Any] = {}
+
+def _get_store(path: str) -> Any:
+    """
+    One read-only `PackStore` per worker process and path, kept open for the
+    life of the process.
+    """
+    store = _stores.get(path)
+    if store is None:
+        from .pack_store import PackStore
+        store = _stores[path] = PackStore(path, auto_flush=None)
+    return store
+
+def _close_stores() -> None:
+    while _stores:
+        _, store = _stores.popitem()
+        store.close()
+
+def _verify_chunk(units: List[Tuple[str, str, Tuple[str, ...], Tuple[str, ...]]]) -> List[TimelineResult]:
+    """
+    Worker entry point for (store path, tjp, heads, verified heads) units.
+    """
+    return [
+        verify_timeline(_get_store(path), tjp_addr, heads, verified_heads)
+        for path, tjp_addr, heads, verified_heads in units
+    ]
+
+# endregion workers
+
+class TimelineCheckpoint:
+    """
+    tjp address -> heads verified by a previous run, plus the `TimelineScan`
+    of the pack so far, persisted as JSON at `path` and replaced atomically
+    on `save`.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.timelines: Dict[str, Dict[str, Any]] = {}
+        self.scan = TimelineScan()
+        self._dirty = False
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                doc = json.load(f)
+            if doc.get('format') not in (1, CHECKPOINT_FORMAT_VERSION):
+                raise ValueError(f'[TimelineCheckpoint] unsupported checkpoint format in {path}: {doc.get("format")}')
+            self.timelines = doc['timelines']
+            scan = doc.get('scan')
+            if scan:
+                self.scan = TimelineScan(scan['offset'], {
+                    tjp_addr: {addr: (n, past_len) for addr, n, past_len in heads}
+                    for tjp_addr, heads in scan['heads'].items()
+                })
+
+    def update_scan(self, store: Any) -> int:
+        """
+        `self.scan.update(store)`, marking the checkpoint for saving if any
+        records were scanned.
+        """
+        count = self.scan.update(store)
+        if count:
+            self._dirty = True
+        return count
+
+    def verified_heads(self, tjp_addr: str) -> Tuple[str, ...]:
+        entry = self.timelines.get(tjp_addr)
+        return tuple(entry['heads']) if entry else ()
+
+    def update(self, result: TimelineResult) -> None:
+        """
+        Records a timeline that passed. Failed timelines keep their previous
+        checkpoint, so they are re-verified next time.
+        """
+        if result.errors:
+            return
+        entry = self.timelines.get(result.tjp_addr) or {'heads': [], 'frames': 0}
+        self.timelines[result.tjp_addr] = {
+            'heads': list(result.heads),
+            'frames': entry['frames'] + result.verified,
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            scan = {
+                'offset': self.scan.offset,
+                'heads': {
+                    tjp_addr: [[addr, n, past_len] for addr, (n, past_len) in heads.items()]
+                    for tjp_addr, heads in self.scan.heads.items()
+                },
+            }
+            json.dump({'format': CHECKPOINT_FORMAT_VERSION, 'timelines': self.timelines, 'scan': scan}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+def verify_timelines(
+    store_path: str,
+    timelines: Dict[str, Sequence[str]],
+    checkpoint: Optional[TimelineCheckpoint] = None,
+    workers: Optional[int] = None,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+) -> Iterator[TimelineResult]:
+    """
+    Verifies `timelines` (tjp address -> heads, see `find_timelines`) of the
+    `PackStore` at `store_path` across a process pool, yielding one
+    `TimelineResult` per timeline that needed work. The store must be
+    flushed and must not be written to meanwhile.
+
+    Timelines whose heads match `checkpoint` are skipped; passing results
+    are recorded in it and it is saved every `checkpoint_every` results.
+    """
+    units = []
+    for tjp_addr, heads in timelines.items():
+        verified_heads = checkpoint.verified_heads(tjp_addr) if checkpoint else ()
+        if set(verified_heads) == set(heads):
+            continue
+        units.append((store_path, tjp_addr, tuple(heads), verified_heads))
+
+    done = 0
+    try:
+        for result in map_chunks(_verify_chunk, units, workers=workers, chunk_size=1, min_parallel=2):
+            if checkpoint is not None:
+                checkpoint.update(result)
+                done += 1
+                if done % checkpoint_every == 0:
+                    checkpoint.save()
+            yield result
+    finally:
+        # units run in-process when there are few of them or workers=1.
+        _close_stores()
+        if checkpoint is not None:
+            checkpoint.save()
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from .pack_store import PackStore
+
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.timeline_verify',
+        description='Verify every timeline (past chain) in a pack store, resuming from a checkpoint.',
+    )
+    parser.add_argument('store', help='PackStore directory')
+    parser.add_argument('--checkpoint', default=None, help='checkpoint file (default: STORE/timelines.ckpt)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument('--quiet', action='store_true', help='only print the summary')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    checkpoint = TimelineCheckpoint(args.checkpoint or os.path.join(args.store, 'timelines.ckpt'))
+    with PackStore(args.store) as store:
+        store.flush()
+        scanned = checkpoint.update_scan(store)
+    timelines = checkpoint.scan.timelines()
+
+    checked = failed = frames = 0
+    for result in verify_timelines(args.store, timelines, checkpoint=checkpoint, workers=args.workers):
+        checked += 1
+        frames += result.verified
+        if result.errors:
+            failed += 1
+            if not args.quiet:
+                for error in result.errors:
+                    print(f'{result.tjp_addr}: {error}', flush=True)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f'{scanned} new records, {len(timelines)} timelines: {checked} verified ({frames} frames, {failed} failed), '
+        f'{len(timelines) - checked} unchanged since the checkpoint, in {elapsed:.2f}s',
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
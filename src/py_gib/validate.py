@@ -0,0 +1,155 @@
+# py_gib/validate.py
+"""
+Bulk intrinsic validation of stored ibgibs.
+
+    python -m py_gib.validate PATH [PATH ...] [--workers N] [--chunk-size N]
+
+Each PATH is a directory (every `*.json` file below it is one ibgib), a JSONL
+file (one ibgib per line) or `-` for JSONL on stdin. Errors are printed as they
+are found, followed by a throughput summary on stderr. Exits with 1 if any
+ibgib is invalid.
+"""
+
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+import argparse
+import json
+import os
+import sys
+import time
+
+from .pool import DEFAULT_CHUNK_SIZE, DEFAULT_MIN_PARALLEL, map_chunks
+from .helper import get_ib_gib_addr
+from .V1.validate_helper import validate_ib_gib_intrinsically
+
+class ValidationResult(NamedTuple):
+    source: str
+    """Where the ibgib came from, e.g. 'path/to/file.json' or 'dump.jsonl:42'."""
+    addr: Optional[str]
+    """The ibgib's ib^gib address, or None if it could not be parsed."""
+    errors: Optional[List[str]]
+    """Validation errors, or None if valid."""
+    size: int
+    """Size of the raw ibgib in bytes."""
+
+def iter_sources(paths: Sequence[str], stdin: Optional[TextIO] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yields (source label, raw JSON bytes) for every ibgib found under `paths`.
+    """
+    for path in paths:
+        if path == '-':
+            stream = (stdin or sys.stdin).buffer
+            yield from _iter_lines('<stdin>', stream)
+        elif os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith('.json'):
+                        file_path = os.path.join(dirpath, filename)
+                        with open(file_path, 'rb') as f:
+                            yield file_path, f.read()
+        else:
+            with open(path, 'rb') as f:
+                yield from _iter_lines(path, f)
+
+def _iter_lines(label: str, stream) -> Iterator[Tuple[str, bytes]]:
+    for line_number, line in enumerate(stream, start=1):
+        if line.strip():
+            yield f'{label}:{line_number}', line
+
+def shape_errors(ib_gib: Any) -> Optional[List[str]]:
+    """
+    Checks that parsed JSON has the shape validation relies on: an object
+    whose `ib` and `gib` (when present) are strings and whose `rel8ns` (when
+    present) maps rel8n names to lists of address strings.
+
+    Returns a list of error strings, or None if the shape is fine.
+    """
+    if not isinstance(ib_gib, dict):
+        return ['not a JSON object']
+    errors = []
+    for key in ('ib', 'gib'):
+        if ib_gib.get(key) is not None and not isinstance(ib_gib[key], str):
+            errors.append(f'{key} is not a string')
+    rel8ns = ib_gib.get('rel8ns')
+    if rel8ns is not None and not (
+        isinstance(rel8ns, dict)
+        and all(isinstance(addrs, list) and all(isinstance(x, str) for x in addrs) for addrs in rel8ns.values())
+    ):
+        errors.append('rel8ns is not an object of address lists')
+    return errors or None
+
+def _validate_chunk(chunk: List[Tuple[str, bytes]]) -> List[ValidationResult]:
+    """
+    Worker entry point. Parsing happens here too so it is spread across the pool.
+    """
+    results = []
+    for source, raw in chunk:
+        try:
+            ib_gib = json.loads(raw)
+        except ValueError as error:
+            results.append(ValidationResult(source, None, [f'invalid JSON: {error}'], len(raw)))
+            continue
+        errors = shape_errors(ib_gib)
+        if errors:
+            results.append(ValidationResult(source, None, errors, len(raw)))
+            continue
+        addr = None
+        try:
+            addr = get_ib_gib_addr(ib_gib=ib_gib)
+            errors = validate_ib_gib_intrinsically(ib_gib)
+        except Exception as error:
+            # one bad ibgib must not end a sweep over millions.
+            errors = [f'validation raised {type(error).__name__}: {error}']
+        results.append(ValidationResult(source, addr, errors, len(raw)))
+    return results
+
+def validate_many(
+    sources: Iterable[Tuple[str, bytes]],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    min_parallel: int = DEFAULT_MIN_PARALLEL,
+) -> Iterator[ValidationResult]:
+    """
+    Validates raw ibgibs from `sources` (see `iter_sources`) across a process
+    pool, yielding one `ValidationResult` per ibgib in input order.
+    """
+    return map_chunks(
+        _validate_chunk, sources,
+        workers=workers, chunk_size=chunk_size, min_parallel=min_parallel,
+    )
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.validate',
+        description='Validate that stored ibgibs still hash to their gib.',
+    )
+    parser.add_argument('paths', nargs='+', help='directories of *.json ibgibs, JSONL files, or - for stdin')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='ibgibs per worker task')
+    parser.add_argument('--quiet', action='store_true', help='only print the summary')
+    args = parser.parse_args(argv)
+
+    count = invalid = total_bytes = 0
+    start = time.perf_counter()
+    for result in validate_many(iter_sources(args.paths), workers=args.workers, chunk_size=args.chunk_size):
+        count += 1
+        total_bytes += result.size
+        if result.errors:
+            invalid += 1
+            if not args.quiet:
+                label = f'{result.source} ({result.addr})' if result.addr else result.source
+                for error in result.errors:
+                    print(f'{label}: {error}', flush=True)
+    elapsed = time.perf_counter() - start
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    mb_rate = total_bytes / 1e6 / elapsed if elapsed > 0 else 0.0
+    print(
+        f'validated {count} ibgibs ({invalid} invalid) in {elapsed:.2f}s: '
+        f'{rate:,.0f} ibgibs/s, {mb_rate:,.2f} MB/s',
+        file=sys.stderr,
+    )
+    return 1 if invalid else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# py_gib/workload.py
+"""
+Deterministic synthetic ibgib corpora for load testing and capacity planning.
+
+    python -m py_gib.workload --timelines 100000 --output corpus.ibr [--seed 0] [--workers N]
+                              [--format records|jsonl] [--min-frames 1] [--max-frames 50] ...
+
+A corpus is `WorkloadShape.shared` tag ibgibs (made with `Factory_V1.first_gen`)
+followed by `WorkloadShape.timelines` timelines. Each timeline is a tjp (a fork
+with `tjp={'uuid': True}`) and a run of mut8/rel8 frames that grow its `past`
+chain, with:
+
+    - linked or full `past` (`linked_past`),
+    - `dna` ibgibs for every transform (`dna`),
+    - rel8 frames fanning out to shared tags, other timelines' tjps and earlier
+      frames (`rel8_fraction`, `max_fanout`),
+    - binary-data ibgibs rel8d via `pic` (`binary_fraction`, `max_binary_bytes`).
+
+Every ibgib is valid (its gib is computed by the real transforms). As in
+real data, identical dna ibgibs can repeat. The corpus is a pure function of
+(shape, seed): uuids and timestamps come from a per-timeline RNG and clock
+instead of the system. Timelines are independent units, so generation streams
+and fans out across processes.
+
+`records` output is a stream of `V1/binary_encoding.py` records. `jsonl` output
+cannot carry binary data, so it requires `--binary-fraction 0`.
+"""
+
+from typing import Any, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import functools
+import hashlib
+import json
+import random
+import sys
+import time
+
+from .helper import get_ib_gib_addr, get_timestamp
+from .pool import map_chunks
+from .V1.binary_encoding import encode_ib_gib
+from .V1.factory import Factory_V1
+from .V1.sha256v1 import sha256v1
+from .V1.transforms.fork import fork
+from .V1.transforms.mut8 import mut8
+from .V1.transforms.rel8 import rel8
+from .V1.types import Rel8n
+
+class WorkloadShape(NamedTuple):
+    timelines: int = 1000
+    min_frames: int = 1
+    """Frames per timeline (including the tjp) are uniform in [min_frames, max_frames]."""
+    max_frames: int = 50
+    linked_past: float = 0.5
+    """Fraction of timelines whose `past` only holds the previous frame."""
+    dna: float = 0.2
+    """Fraction of timelines that keep `dna` ibgibs for every transform."""
+    rel8_fraction: float = 0.25
+    """Fraction of frames that are rel8s (the rest are mut8s)."""
+    max_fanout: int = 4
+    """A rel8 frame adds 1 to `max_fanout` addresses."""
+    binary_fraction: float = 0.05
+    """Fraction of frames that rel8 a new binary-data ibgib."""
+    max_binary_bytes: int = 64 * 1024
+    data_keys: int = 3
+    """Keys patched by each mut8."""
+    shared: int = 100
+    """Tag ibgibs that rel8 frames point at."""
+
+_KINDS = ('comment', 'note', 'task', 'link', 'pic')
+_WORDS = ('ib', 'gib', 'alpha', 'beta', 'gamma', 'delta', 'timeline', 'frame', 'tag', 'é', '日本', '🙂')
+
+EPOCH_S = 1_600_000_000
+"""
+Start of every generated timeline's clock.
+"""
+
+def _rng(seed: int, *path: Any) -> random.Random:
+    return random.Random(':'.join(str(x) for x in (seed, *path)))
+
+def _text(rng: random.Random, max_words: int = 12) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(1, max_words)))
+
+def _timestamp_data(clock_ms: int) -> dict:
+    return {'timestamp': get_timestamp(clock_ms // 1000), 'timestampMs': clock_ms % 1000}
+
+def shared_ib_gibs(shape: WorkloadShape, seed: int = 0) -> List[dict]:
+    """
+    The shared tag ibgibs (and their intermediate forks), in creation order.
+    """
+    result = []
+    for i in range(shape.shared):
+        rng = _rng(seed, 'tag', i)
+        res = Factory_V1.first_gen(
+            ib=f'tag {i}',
+            parent_ib_gib=Factory_V1.primitive(ib='tag'),
+            data={'text': _text(rng, 3), 'icon': rng.choice(_WORDS)},
+            no_timestamp=True,
+        )
+        result.extend(res.get('intermediate_ib_gibs') or [])
+        result.append(res['new_ib_gib'])
+    return result
+
+@functools.lru_cache(maxsize=8)
+def _shared_addrs(shape: WorkloadShape, seed: int) -> Tuple[str, ...]:
+    return tuple(
+        get_ib_gib_addr(ib_gib=x) for x in shared_ib_gibs(shape, seed) if x['ib'].startswith('tag ') and 'data' in x
+    )
+
+def timeline_tjp(shape: WorkloadShape, seed: int, index: int) -> Tuple[dict, List[dict]]:
+    """
+    The tjp of timeline `index` and the dna of its fork (if the timeline keeps
+    dna). Depends only on (seed, index), so other timelines can rel8 to it.
+    """
+    rng = _rng(seed, 'tjp', index)
+    kind = rng.choice(_KINDS)
+    keep_dna = rng.random() < shape.dna
+    res = fork(
+        Factory_V1.primitive(ib=kind), dest_ib=f'{kind} {index}',
+        tjp={'uuid': True}, dna=keep_dna, no_timestamp=True, n_counter=True,
+    )
+    # pin the uuid and timestamp so the tjp is reproducible.
+    tjp = dict(res['new_ib_gib'])
+    tjp['data'] = {
+        **tjp['data'],
+        'uuid': hashlib.sha256(rng.getrandbits(128).to_bytes(16, 'big')).hexdigest(),
+        **_timestamp_data((EPOCH_S + index) * 1000 + rng.randrange(1000)),
+    }
+    tjp['gib'] = sha256v1(tjp)
+    return tjp, res.get('dnas') or []
+
+@functools.lru_cache(maxsize=4096)
+def _tjp_addr(shape: WorkloadShape, seed: int, index: int) -> str:
+    return get_ib_gib_addr(ib_gib=timeline_tjp(shape, seed, index)[0])
+
+def generate_timeline(shape: WorkloadShape, seed: int, index: int) -> List[dict]:
+    """
+    Every ibgib of timeline `index` (dnas and binary ibgibs before the frames
+    that use them), in creation order.
+    """
+    rng = _rng(seed, 'timeline', index)
+    tjp, dnas = timeline_tjp(shape, seed, index)
+    keep_dna = bool(dnas)
+    linked_rel8ns = [Rel8n.past] if rng.random() < shape.linked_past else None
+    clock_ms = (EPOCH_S + index) * 1000
+    shared = _shared_addrs(shape, seed)
+
+    ib_gibs = [*dnas, tjp]
+    frames = [get_ib_gib_addr(ib_gib=tjp)]
+    current = tjp
+    for _ in range(rng.randint(shape.min_frames, shape.max_frames) - 1):
+        clock_ms += rng.randint(1, 3_600_000)
+        roll = rng.random()
+        if roll < shape.binary_fraction:
+            binary = {'ib': 'bin', 'data': rng.randbytes(rng.randint(0, shape.max_binary_bytes))}
+            binary['gib'] = sha256v1(binary)
+            ib_gibs.append(binary)
+            res = rel8(
+                current, rel8ns_to_add_by_addr={'pic': [get_ib_gib_addr(ib_gib=binary)]},
+                dna=keep_dna, linked_rel8ns=linked_rel8ns, no_timestamp=True, n_counter=True,
+            )
+        elif roll < shape.binary_fraction + shape.rel8_fraction:
+            to_add: dict = {}
+            for _ in range(rng.randint(1, max(1, shape.max_fanout))):
+                target_roll = rng.random()
+                if shared and target_roll < 0.5:
+                    name, addr = 'tag', rng.choice(shared)
+                elif target_roll < 0.8 and shape.timelines > 1:
+                    name, addr = 'link', _tjp_addr(shape, seed, rng.randrange(shape.timelines))
+                else:
+                    name, addr = 'child', rng.choice(frames)
+                if addr not in to_add.setdefault(name, []):
+                    to_add[name].append(addr)
+            res = rel8(
+                current, rel8ns_to_add_by_addr=to_add,
+                dna=keep_dna, linked_rel8ns=linked_rel8ns, no_timestamp=True, n_counter=True,
+            )
+        else:
+            patch = {f'{rng.choice(_WORDS)}{rng.randrange(10)}': _text(rng) for _ in range(shape.data_keys)}
+            if rng.random() < 0.2:
+                patch['meta'] = {'score': round(rng.uniform(0, 100), 3), 'done': rng.random() < 0.5, 'note': None}
+            patch.update(_timestamp_data(clock_ms))
+            res = mut8(
+                current, data_to_add_or_patch=patch,
+                dna=keep_dna, linked_rel8ns=linked_rel8ns, no_timestamp=True, n_counter=True,
+            )
+        ib_gibs.extend(res.get('dnas') or [])
+        current = res['new_ib_gib']
+        ib_gibs.append(current)
+        frames.append(get_ib_gib_addr(ib_gib=current))
+    return ib_gibs
+
+def _generate_chunk(units: List[Tuple[WorkloadShape, int, int]]) -> List[List[dict]]:
+    """
+    Worker entry point for (shape, seed, timeline index) units.
+    """
+    return [generate_timeline(shape, seed, index) for shape, seed, index in units]
+
+def generate(
+    shape: WorkloadShape = WorkloadShape(),
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = 16,
+) -> Iterator[dict]:
+    """
+    Streams the whole corpus: shared ibgibs, then every timeline in index
+    order, generated `chunk_size` timelines per task across `workers`
+    processes. The output does not depend on `workers` or `chunk_size`.
+    """
+    yield from shared_ib_gibs(shape, seed)
+    units = ((shape, seed, index) for index in range(shape.timelines))
+    for ib_gibs in map_chunks(_generate_chunk, units, workers=workers, chunk_size=chunk_size, min_parallel=2):
+        yield from ib_gibs
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    defaults = WorkloadShape()
+    parser = argparse.ArgumentParser(
+        prog='python -m py_gib.workload',
+        description='Generate a deterministic synthetic ibgib corpus.',
+    )
+    parser.add_argument('--output', '-o', default='-', help='output file (default: stdout)')
+    parser.add_argument('--format', choices=('records', 'jsonl'), default='records')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    for field in WorkloadShape._fields:
+        parser.add_argument(
+            '--' + field.replace('_', '-'), type=type(getattr(defaults, field)), default=getattr(defaults, field),
+        )
+    args = parser.parse_args(argv)
+    shape = WorkloadShape(**{field: getattr(args, field) for field in WorkloadShape._fields})
+    if args.format == 'jsonl' and shape.binary_fraction > 0:
+        parser.error('jsonl cannot hold binary data: use --format records or --binary-fraction 0')
+
+    out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    count = total_bytes = 0
+    start = time.perf_counter()
+    try:
+        for ib_gib in generate(shape, seed=args.seed, workers=args.workers):
+            if args.format == 'records':
+                raw = encode_ib_gib(ib_gib)
+            else:
+                raw = json.dumps(ib_gib, separators=(',', ':')).encode('utf-8') + b'\n'
+            out.write(raw)
+            count += 1
+            total_bytes += len(raw)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f'generated {count:,} ibgibs ({total_bytes / 1e6:,.1f} MB) in {elapsed:.1f}s: '
+        f'{count / elapsed if elapsed > 0 else 0:,.0f} ibgibs/s',
+        file=sys.stderr,
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
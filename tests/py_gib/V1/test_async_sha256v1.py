@@ -0,0 +1,106 @@
+import unittest
+import asyncio
+import tempfile
+import pathlib
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.async_sha256v1 import (
+    async_sha256v1, async_sha256v1_many, should_offload, shutdown_hash_executor,
+)
+from src.py_gib.V1.sha256v1 import sha256v1
+
+LARGE = os.urandom(300 * 1024)
+LARGE_JSON = {f'key {i:06}': {'n': i, 'text': 'value'} if i % 2 else i for i in range(200_000)}
+
+class TestAsyncSha256v1(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_hash_executor()
+
+    def test_should_offload(self):
+        self.assertFalse(should_offload({'ib': 'x', 'data': {'a': 1}}))
+        self.assertFalse(should_offload({'ib': 'x', 'data': b'small'}))
+        self.assertTrue(should_offload({'ib': 'x', 'data': LARGE}))
+        self.assertTrue(should_offload({'ib': 'x', 'data': memoryview(LARGE)}))
+        self.assertTrue(should_offload({'ib': 'x', 'data': b'small'}, offload_threshold=1))
+        self.assertTrue(should_offload({'ib': 'x', 'data': LARGE_JSON}))
+        self.assertTrue(should_offload({'ib': 'x', 'data': 'x' * len(LARGE)}))
+        past = [f'x^{i:064X}' for i in range(4000)]
+        self.assertTrue(should_offload({'ib': 'x', 'data': b'small', 'rel8ns': {'past': past}}))
+        self.assertFalse(should_offload({'ib': 'x', 'data': {'a': 1}, 'rel8ns': {'past': past[:10]}}))
+
+    async def test_matches_sync(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(LARGE)
+        try:
+            cases = [
+                {'ib': 'x', 'data': {'a': 1}, 'rel8ns': {'ancestor': ['x^gib']}},
+                {'ib': 'x', 'data': LARGE},
+                {'ib': 'x', 'data': pathlib.Path(f.name)},
+            ]
+            for ib_gib in cases:
+                with self.subTest(data=type(ib_gib['data']).__name__):
+                    expected = sha256v1(ib_gib)
+                    self.assertEqual(await async_sha256v1(ib_gib), expected)
+                    self.assertEqual(await async_sha256v1(ib_gib, offload=True), expected)
+                    self.assertEqual(await async_sha256v1(ib_gib, offload=False), expected)
+        finally:
+            os.remove(f.name)
+
+    async def test_many_in_order(self):
+        ib_gibs = []
+        for i in range(40):
+            data = LARGE[i:] if i % 10 == 0 else {'n': i}
+            ib_gibs.append({'ib': f'x{i}', 'data': data})
+        gibs = await async_sha256v1_many(ib_gibs, max_concurrency=2)
+        self.assertEqual(gibs, [sha256v1(x) for x in ib_gibs])
+        self.assertEqual(await async_sha256v1_many([]), [])
+        with self.assertRaises(ValueError):
+            await async_sha256v1_many(ib_gibs, max_concurrency=0)
+
+    async def test_loop_keeps_running_during_large_hash(self):
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await async_sha256v1({'ib': 'x', 'data': LARGE * 64})
+        done.set()
+        await task
+        self.assertGreater(ticks, 1)
+
+    async def test_loop_lag_during_large_json_hash(self):
+        ib_gib = {'ib': 'x', 'data': LARGE_JSON}
+        start = time.perf_counter()
+        expected = sha256v1(ib_gib)
+        inline_s = time.perf_counter() - start
+        gaps = []
+        done = asyncio.Event()
+
+        async def ticker():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.001)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0.01)
+        self.assertEqual(await async_sha256v1(ib_gib), expected)
+        done.set()
+        await task
+        # inline, the one gap would be the whole hash.
+        self.assertLess(max(gaps), inline_s / 2)
+
+if __name__ == '__main__':
+    unittest.main()
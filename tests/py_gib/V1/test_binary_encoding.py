@@ -0,0 +1,94 @@
+import unittest
+import io
+import mmap
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.binary_encoding import IbGibRecordView, decode_ib_gib, encode_ib_gib
+from src.py_gib.V1.canonical_json import to_canonical_json
+from src.py_gib.V1.sha256v1 import sha256v1
+from src.py_gib.V1.types import IbGib_V1
+
+HASH = 'A' * 64
+
+CASES = {
+    'primitive': {'ib': '7', 'gib': 'gib'},
+    'no gib yet': {'ib': 'x', 'data': {'a': 1}},
+    'empty ib': {'ib': '', 'gib': 'gib'},
+    'explicit nulls': {'ib': 'x', 'gib': 'g', 'data': None, 'rel8ns': None},
+    'empty blocks': {'ib': 'x', 'gib': 'g', 'data': {}, 'rel8ns': {'past': []}},
+    'nested nulls': {
+        'ib': 'comment',
+        'gib': HASH,
+        'data': {'z': None, 'a': {'b': None, 'c': {'d': None, 'e': 1}}, 'l': [{'kept': None}, None]},
+        'rel8ns': {'ancestor': [f'comment^{HASH}'], 'dead': None},
+    },
+    'unicode and floats': {'ib': 'ünï 🙂', 'gib': HASH, 'data': {'日本': [-0.0, 1e21, 0.1, 2 ** 70, True]}},
+    'string data': {'ib': 'x', 'gib': HASH, 'data': 'just text'},
+    'scalar data': {'ib': 'x', 'gib': HASH, 'data': 0},
+    'binary data': {'ib': 'pic', 'gib': HASH, 'data': bytes(range(256)) * 10},
+    'empty binary': {'ib': 'pic', 'gib': HASH, 'data': b''},
+}
+
+class TestBinaryEncoding(unittest.TestCase):
+    def test_round_trip_and_gib(self):
+        for name, ib_gib in CASES.items():
+            for salt in ('', 'pepper'):
+                with self.subTest(name=name, salt=salt):
+                    record = encode_ib_gib(ib_gib)
+                    decoded = decode_ib_gib(record)
+                    self.assertEqual(decoded, ib_gib)
+                    self.assertEqual(sha256v1(decoded, salt=salt), sha256v1(ib_gib, salt=salt))
+                    self.assertEqual(IbGibRecordView(record).sha256v1(salt), sha256v1(ib_gib, salt=salt))
+
+    def test_sections_are_canonical_json(self):
+        ib_gib = CASES['nested nulls']
+        view = IbGibRecordView(encode_ib_gib(ib_gib))
+        self.assertEqual((view.ib, view.gib), ('comment', HASH))
+        self.assertEqual(bytes(view.rel8ns_json).decode(), to_canonical_json(ib_gib['rel8ns']))
+        self.assertEqual(bytes(view.data_bytes).decode(), to_canonical_json(ib_gib['data']))
+        self.assertIsNone(IbGibRecordView(encode_ib_gib(CASES['no gib yet'])).gib)
+
+    def test_ib_gib_v1_records(self):
+        ib_gib = CASES['nested nulls']
+        record = IbGib_V1.from_dict(ib_gib)
+        view = IbGibRecordView(encode_ib_gib(record))
+        self.assertEqual(view.sha256v1(), sha256v1(ib_gib))
+
+    def test_zero_copy_reads_from_mmap(self):
+        ib_gibs = list(CASES.values())
+        with tempfile.TemporaryFile() as f:
+            for ib_gib in ib_gibs:
+                f.write(encode_ib_gib(ib_gib))
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = 0
+                for ib_gib in ib_gibs:
+                    view = IbGibRecordView(mm, offset)
+                    self.assertEqual(view.to_ib_gib(), ib_gib)
+                    self.assertEqual(view.sha256v1(), sha256v1(ib_gib))
+                    self.assertIs(view.data_bytes.obj, mm)
+                    offset += view.nbytes
+                    del view
+                self.assertEqual(offset, len(mm))
+
+    def test_errors(self):
+        record = encode_ib_gib(CASES['binary data'])
+        with self.assertRaises(ValueError):
+            IbGibRecordView(b'XXXX' + record[4:])
+        with self.assertRaises(ValueError):
+            IbGibRecordView(record[:-1])
+        with self.assertRaises(ValueError):
+            IbGibRecordView(record[:10])
+        with self.assertRaises(ValueError):
+            encode_ib_gib({'ib': 'x', 'extra': 1})
+        with self.assertRaises(ValueError):
+            encode_ib_gib({'ib': None})
+        with self.assertRaises(ValueError):
+            encode_ib_gib({'ib': 'x', 'data': io.BytesIO(b'stream')})
+
+if __name__ == '__main__':
+    unittest.main()
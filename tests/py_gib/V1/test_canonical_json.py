@@ -0,0 +1,79 @@
+import unittest
+import hashlib
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.sha256v1 import to_normalized_for_hashing
+from src.py_gib.V1.canonical_json import (
+    encode_canonical_compact, encode_canonical_key, to_canonical_json, update_canonical_json,
+)
+
+def reference_json(obj) -> str:
+    return json.dumps(to_normalized_for_hashing(obj), sort_keys=True, separators=(',', ':'))
+
+class TestCanonicalJson(unittest.TestCase):
+    CASES = [
+        {},
+        {'a': None},
+        {'a': {}},
+        {'a': {'b': None}},
+        {'z': 1, 'a': 2, 'm': None},
+        {'a': None, 'b': float('nan'), 'c': -0.0, 'd': float('inf'), 'e': 1e300},
+        {'list': [{'z': None, 'a': 1}, None, [None, {'y': 2, 'x': 1}]]},
+        {'tuple': (1, None, 'x')},
+        {'ключ': 'значение', 'emoji': '\U0001F600', 'ctrl': '\x00\n\t"\\'},
+        {'k': {'k': {'k': None, 'j': [None]}, 'i': 'x'}},
+        {1: 2, 3: {'a': None}},
+        {True: 1},
+        {'b': True, 'f': False, 'i': -17, 'big': 2 ** 80},
+        [],
+        [{'b': None, 'a': 1}],
+        'just a string',
+        '',
+        1.5,
+        0,
+        True,
+    ]
+
+    def test_matches_reference(self):
+        for i, case in enumerate(self.CASES):
+            with self.subTest(case_index=i, case=case):
+                self.assertEqual(to_canonical_json(case), reference_json(case))
+
+    def test_update_matches_reference_digest(self):
+        for i, case in enumerate(self.CASES):
+            with self.subTest(case_index=i, case=case):
+                expected = reference_json(case).encode('utf-8')
+                hasher = hashlib.sha256()
+                fed = update_canonical_json(hasher, case)
+                self.assertEqual(fed, len(expected))
+                self.assertEqual(hasher.hexdigest(), hashlib.sha256(expected).hexdigest())
+
+    def test_small_buffer_streams_in_chunks(self):
+        data = {f'k{i:04}': {'x': i, 'drop': None, 'nested': {'s': 'v' * 10}} for i in range(200)}
+        expected = reference_json(data).encode('utf-8')
+
+        class RecordingHasher:
+            def __init__(self):
+                self.chunks = []
+            def update(self, b):
+                self.chunks.append(b)
+
+        recorder = RecordingHasher()
+        update_canonical_json(recorder, data, buffer_size=256)
+        self.assertGreater(len(recorder.chunks), 1)
+        self.assertEqual(b''.join(recorder.chunks), expected)
+
+    def test_compact_and_key_encoders(self):
+        self.assertEqual(encode_canonical_compact({'b': [1, 'é'], 'a': {'y': None}}), '{"a":{"y":null},"b":[1,"\\u00e9"]}')
+        self.assertEqual(encode_canonical_compact({'b': 1.5, 'a': 'x'}), to_canonical_json({'b': 1.5, 'a': 'x'}))
+        for key, expected in [('k', '"k"'), ('é', '"\\u00e9"'), (1, '"1"'), (1.5, '"1.5"'), (True, '"true"'), (None, '"null"')]:
+            with self.subTest(key=key):
+                self.assertEqual(encode_canonical_key(key), expected)
+                self.assertEqual(to_canonical_json({key: 0}), '{' + expected + ':0}')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.factory import Factory_V1
+from src.py_gib.V1.sha256v1 import sha256v1
+from src.py_gib.V1.transforms.transform_helper import get_gib, get_gib_info
+from src.py_gib.V1.validate_helper import validate_ib_gib_intrinsically
+
+PRIMITIVE_IBS = [
+    'a', '7', 'tag',
+    'any string/value that isnt hashed with a gib is a primitive',
+]
+
+DATA_SIMPLE_XY = {'x': 1, 'y': 2}
+
+SIMPLE_REL8N_NAMES = ['child', 'container', 'folder', 'identity', 'tag', 'liked']
+
+class TestFactory(unittest.TestCase):
+    def test_primitives(self):
+        self.assertEqual(Factory_V1.root(), ROOT)
+        primitives = Factory_V1.primitives(PRIMITIVE_IBS)
+        self.assertEqual(len(primitives), len(PRIMITIVE_IBS))
+        self.assertEqual(primitives[1], {'ib': '7', 'gib': 'gib'})
+
+    def test_first_gen_fork_only(self):
+        result = Factory_V1.first_gen(ib='some ib here', parent_ib_gib=ROOT)
+        self.assertEqual(result['new_ib_gib']['ib'], 'some ib here')
+        self.assertNotIn('intermediate_ib_gibs', result)
+
+    def test_first_gen_with_data(self):
+        result = Factory_V1.first_gen(ib='some ib here', parent_ib_gib=ROOT, data=DATA_SIMPLE_XY, no_timestamp=True)
+        self.assertEqual(result['new_ib_gib']['data'], DATA_SIMPLE_XY)
+        # an intermediate ibgib with the same ib, not yet mutated with the data.
+        intermediates = result['intermediate_ib_gibs']
+        self.assertEqual(len(intermediates), 1)
+        self.assertEqual(intermediates[0]['ib'], 'some ib here')
+        self.assertFalse(intermediates[0].get('data'))
+
+    def test_first_gen_with_data_and_rel8ns(self):
+        addrs = [get_ib_gib_addr(ib_gib=x) for x in Factory_V1.primitives(PRIMITIVE_IBS)]
+        rel8ns = {name: addrs for name in SIMPLE_REL8N_NAMES}
+        result = Factory_V1.first_gen(
+            ib='some ib here', parent_ib_gib=ROOT, data=DATA_SIMPLE_XY, no_timestamp=True, rel8ns=rel8ns,
+        )
+        new = result['new_ib_gib']
+        self.assertEqual(new['data'], DATA_SIMPLE_XY)
+        for name in SIMPLE_REL8N_NAMES:
+            self.assertEqual(new['rel8ns'][name], addrs)
+        self.assertEqual([x['ib'] for x in result['intermediate_ib_gibs']], ['some ib here'] * 2)
+
+    def test_gibs_match_sha256v1_and_get_gib(self):
+        result = Factory_V1.first_gen(
+            parent_ib_gib=Factory_V1.primitive(ib='comment'),
+            ib='comment ff1at755',
+            data={'text': 'ff1 at 755', 'textTimestamp': 'Fri, 18 Feb 2022 13:56:01 GMT'},
+            dna=True,
+            tjp={'uuid': True, 'timestamp': True},
+            n_counter=True,
+        )
+        self.assertEqual(len(result['dnas']), 2)
+        for x in [result['new_ib_gib'], *result['intermediate_ib_gibs'], *result['dnas']]:
+            with self.subTest(ib=x['ib']):
+                gib = get_gib(x)
+                self.assertEqual(gib, x['gib'])
+                self.assertEqual(sha256v1(x), get_gib_info(gib=gib)['punctiliar_hash'])
+                self.assertIsNone(validate_ib_gib_intrinsically(x))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.incremental_sha256v1 import IncrementalSha256V1Hasher
+from src.py_gib.V1.sha256v1 import sha256v1
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.mut8 import mut8
+from src.py_gib.V1.transforms.rel8 import rel8
+
+def build_timeline(steps, linked_past=False):
+    src = fork(ROOT, dest_ib='doc', tjp={'uuid': True}, dna=True)['new_ib_gib']
+    src = mut8(src, data_to_add_or_patch={f'key{i:03}': {'text': f'value {i}', 'n': i} for i in range(300)})['new_ib_gib']
+    frames = [src]
+    for step in range(steps):
+        if step % 7 == 3:
+            res = rel8(src, rel8ns_to_add_by_addr={'tag': [f'tag {step}^gib']}, dna=True, n_counter=True)
+        else:
+            patch = {f'key{(step * 37) % 300:03}': {'text': f'step {step}', 'none': None}, 'removed': None}
+            if step % 5 == 0:
+                patch['new key'] = [step, 1.0, True, None]
+            linked_rel8ns = ['past'] if linked_past else None
+            res = mut8(src, data_to_add_or_patch=patch, dna=True, linked_rel8ns=linked_rel8ns, n_counter=True)
+        src = res['new_ib_gib']
+        frames.append(src)
+    return frames
+
+class TestIncrementalSha256v1(unittest.TestCase):
+    def test_timeline_matches_sha256v1(self):
+        for linked_past in (False, True):
+            frames = build_timeline(120, linked_past)
+            for salt in ('', 'pepper'):
+                for checkpoint_bytes in (1, 512, 4096):
+                    with self.subTest(linked_past=linked_past, salt=salt, checkpoint_bytes=checkpoint_bytes):
+                        hasher = IncrementalSha256V1Hasher(salt, checkpoint_bytes=checkpoint_bytes)
+                        self.assertEqual(list(hasher.hash_many(frames)), [sha256v1(x, salt=salt) for x in frames])
+
+    def test_unrelated_and_repeated_frames(self):
+        frames = build_timeline(30)
+        # frames out of order, repeated, and loaded from JSON (nothing shared).
+        loaded = [json.loads(json.dumps(x)) for x in frames]
+        order = [frames[10], frames[10], frames[3], loaded[4], frames[29], loaded[29], frames[5]]
+        hasher = IncrementalSha256V1Hasher(checkpoint_bytes=64)
+        for ib_gib in order:
+            self.assertEqual(hasher(ib_gib), sha256v1(ib_gib))
+        hasher.reset()
+        self.assertEqual(hasher.hash(frames[0]), sha256v1(frames[0]))
+
+    def test_scalars_that_look_equal(self):
+        # 1, 1.0 and True are equal in Python but not in canonical JSON.
+        base = {f'k{i:03}': 'x' * 40 for i in range(200)}
+        hasher = IncrementalSha256V1Hasher(checkpoint_bytes=64)
+        for value in (1, 1.0, True, -0.0, 0.0, 0, False, float('nan'), 'x'):
+            ib_gib = {'ib': 'x', 'data': {**base, 'k050': value, 'k150': [value]}}
+            with self.subTest(value=value):
+                self.assertEqual(hasher.hash(ib_gib), sha256v1(ib_gib))
+
+    def test_growing_lists(self):
+        addrs = [f'comment^{i:064X}' for i in range(200)]
+        hasher = IncrementalSha256V1Hasher(checkpoint_bytes=64)
+        for n in (40, 41, 60, 60, 59, 120, 200):
+            # `past` grows (and once shrinks), `other` grows with a non-string.
+            ib_gib = {
+                'ib': 'x',
+                'rel8ns': {'ancestor': ['x^gib'], 'other': addrs[:n] + ([7] if n == 60 else []), 'past': addrs[:n]},
+            }
+            with self.subTest(n=n):
+                self.assertEqual(hasher.hash(ib_gib), sha256v1(ib_gib))
+
+    def test_frames_changed_in_place(self):
+        addrs = [f'comment^{i:064X}' for i in range(100)]
+        data = {f'k{i:03}': {'text': 'x' * 40, 'n': i} for i in range(200)}
+        ib_gib = {'ib': 'x', 'data': data, 'rel8ns': {'ancestor': ['x^gib'], 'past': addrs[:50]}}
+        changes = [
+            lambda x: x['data'].__setitem__('k005', 'changed'),
+            lambda x: x['data']['k100'].__setitem__('n', True),
+            lambda x: x['data']['k150'].__setitem__('list', [1]),
+            lambda x: x['data']['k150']['list'].append(1.0),
+            lambda x: x['rel8ns']['past'].append(addrs[60]),
+            lambda x: x['rel8ns']['past'].__setitem__(-1, addrs[61]),
+            lambda x: x['rel8ns']['ancestor'].append('y^gib'),
+            lambda x: x['data'].pop('k199'),
+        ]
+        for checkpoint_bytes in (1, 64, 4096):
+            frame = json.loads(json.dumps(ib_gib))
+            hasher = IncrementalSha256V1Hasher(checkpoint_bytes=checkpoint_bytes)
+            self.assertEqual(hasher.hash(frame), sha256v1(frame))
+            for i, change in enumerate(changes):
+                with self.subTest(checkpoint_bytes=checkpoint_bytes, change=i):
+                    # the same frame changed in place, then a new frame sharing
+                    # the changed values.
+                    change(frame)
+                    self.assertEqual(hasher.hash(frame), sha256v1(frame))
+                    frame = {**frame, 'data': dict(frame['data']), 'rel8ns': dict(frame['rel8ns'])}
+                    frame['data'][f'new {i}'] = i
+                    self.assertEqual(hasher.hash(frame), sha256v1(frame))
+
+    def test_long_list_item_replaced_in_place(self):
+        past = [f'comment {i}^{i:064X}' for i in range(400)]
+        frame = {'ib': 'x', 'data': {'n': 0}, 'rel8ns': {'ancestor': ['x^gib'], 'past': past}}
+        hasher = IncrementalSha256V1Hasher()
+        self.assertEqual(hasher.hash(frame), sha256v1(frame))
+        for replaced in (10, 0, 399):
+            with self.subTest(replaced=replaced):
+                # replaced in place, then a new frame whose list grew from it.
+                past[replaced] = f'tampered^{replaced:064X}'
+                self.assertEqual(hasher.hash(frame), sha256v1(frame))
+                past = past + [f'comment new {replaced}^{replaced:064X}']
+                frame = {**frame, 'rel8ns': {**frame['rel8ns'], 'past': past}}
+                self.assertEqual(hasher.hash(frame), sha256v1(frame))
+                # and grown in place after a replacement.
+                past[5] = f'again {replaced}^{replaced:064X}'
+                past.append(f'appended {replaced}^{replaced:064X}')
+                self.assertEqual(hasher.hash(frame), sha256v1(frame))
+
+    def test_non_dict_data(self):
+        hasher = IncrementalSha256V1Hasher('pepper')
+        for data in ('text', b'bytes', [1, 2], 0, {}, {'a': None}):
+            ib_gib = {'ib': 'x', 'data': data}
+            with self.subTest(data=data):
+                self.assertEqual(hasher.hash(ib_gib), sha256v1(ib_gib, salt='pepper'))
+        with self.assertRaises(ValueError):
+            IncrementalSha256V1Hasher(checkpoint_bytes=0)
+
+if __name__ == '__main__':
+    unittest.main()
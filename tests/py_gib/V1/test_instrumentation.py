@@ -0,0 +1,95 @@
+import unittest
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.sha256v1 import sha256v1, Sha256V1Hasher, SHA256V1_MODES, SHA256V1_MODE_REFERENCE
+from src.py_gib.V1.instrumentation import (
+    enable_instrumentation, disable_instrumentation, get_instrumentation, instrument,
+    PHASE_TOTAL, PHASE_NORMALIZE, PHASE_JSON_DUMPS, PHASE_ENCODE, PHASE_DIGEST,
+    PHASE_CANONICAL_JSON, PHASE_CACHE_LOOKUP,
+)
+from src.py_gib.V1.sub_hash_cache import enable_sub_hash_cache, disable_sub_hash_cache
+
+IB_GIBS = [
+    {'ib': 'ib'},
+    {'ib': ''},
+    {'ib': 'ib', 'data': {}, 'rel8ns': {'past': []}},
+    {'ib': 'ib', 'data': {'x': 1, 'y': {'z': None, 'a': 'é'}}, 'rel8ns': {'past': ['ib^gib']}},
+    {'ib': 'bin', 'data': b'\x00binary'},
+    {'ib': 'bin', 'data': b''},
+    {'ib': 'bin', 'data': bytearray(b'abc')},
+]
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        disable_instrumentation()
+        disable_sub_hash_cache()
+
+    def test_same_gibs_when_instrumented(self):
+        for salt in ('', 'salt'):
+            for mode in SHA256V1_MODES:
+                expected = [sha256v1(x, mode=mode, salt=salt) for x in IB_GIBS]
+                expected.append(sha256v1({'ib': 'f', 'data': b'stream'}, mode=mode, salt=salt))
+                with self.subTest(salt=salt, mode=mode):
+                    with instrument():
+                        gibs = [sha256v1(x, mode=mode, salt=salt) for x in IB_GIBS]
+                        gibs.append(sha256v1({'ib': 'f', 'data': io.BytesIO(b'stream')}, mode=mode, salt=salt))
+                    self.assertEqual(gibs, expected)
+
+    def test_phases_recorded(self):
+        ib_gib = IB_GIBS[3]
+        with instrument() as stats:
+            sha256v1(ib_gib, mode=SHA256V1_MODE_REFERENCE)
+        phases = stats.stats()
+        self.assertEqual(phases[PHASE_TOTAL]['calls'], 1)
+        self.assertEqual(phases[PHASE_NORMALIZE]['calls'], 2)
+        self.assertEqual(phases[PHASE_JSON_DUMPS]['calls'], 2)
+        self.assertEqual(phases[PHASE_ENCODE]['calls'], 4)
+        self.assertEqual(phases[PHASE_DIGEST]['calls'], 4)
+        self.assertGreater(phases[PHASE_DIGEST]['bytes'], 0)
+        self.assertIn('digest', stats.report())
+
+        enable_sub_hash_cache()
+        with instrument() as stats:
+            Sha256V1Hasher('salt').hash(ib_gib)
+            Sha256V1Hasher('salt').hash(ib_gib)
+        phases = stats.stats()
+        self.assertEqual(phases[PHASE_TOTAL]['calls'], 2)
+        self.assertEqual(phases[PHASE_CANONICAL_JSON]['calls'], 2)  # second call hits the cache
+        self.assertEqual(phases[PHASE_CACHE_LOOKUP]['calls'], 4)
+
+    def test_shares_cache_with_uninstrumented_calls(self):
+        cache = enable_sub_hash_cache()
+        for salt in ('', 'salt'):
+            with self.subTest(salt=salt):
+                cache.clear()
+                with instrument():
+                    instrumented = sha256v1(IB_GIBS[3], salt=salt)
+                self.assertEqual(len(cache), 2)
+                self.assertEqual(sha256v1(IB_GIBS[3], salt=salt), instrumented)
+                self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_sink_enable_disable_and_scoping(self):
+        seen = []
+        outer = enable_instrumentation(sink=lambda phase, seconds, nbytes: seen.append(phase))
+        self.assertIs(get_instrumentation(), outer)
+        with instrument() as inner:
+            sha256v1(IB_GIBS[0])
+            self.assertIs(get_instrumentation(), inner)
+        self.assertIs(get_instrumentation(), outer)
+        self.assertEqual(seen, [])
+        sha256v1(IB_GIBS[0])
+        self.assertIn(PHASE_TOTAL, seen)
+        self.assertEqual(outer.stats()[PHASE_TOTAL]['calls'], 1)
+        outer.reset()
+        self.assertEqual(outer.stats(), {})
+        disable_instrumentation()
+        self.assertIsNone(get_instrumentation())
+        sha256v1(IB_GIBS[0])
+        self.assertEqual(outer.stats(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.instrumentation import instrument
+from src.py_gib.V1.parallel_sha256v1 import estimated_size, sha256v1_parallel, shutdown_sub_hash_executor
+from src.py_gib.V1.sha256v1 import SHA256V1_MODE_REFERENCE, sha256v1
+
+PAST = {'ancestor': ['comment^gib'], 'past': [f'comment^{i:064X}' for i in range(2000)]}
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+class TestParallelSha256v1(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_sub_hash_executor()
+
+    def test_matches_sha256v1(self):
+        cases = {
+            'json data': {'ib': 'doc', 'data': {'rows': [{'n': i, 'x': None} for i in range(500)], 'z': None}, 'rel8ns': PAST},
+            'binary data': {'ib': 'pic', 'data': os.urandom(100_000), 'rel8ns': PAST},
+            'empty binary': {'ib': 'pic', 'data': b'', 'rel8ns': PAST},
+            'string data': {'ib': '', 'data': 'text ' * 1000, 'rel8ns': PAST},
+            'no rel8ns': {'ib': 'x', 'data': {'a': 1}},
+            'primitive': {'ib': '7', 'gib': 'gib'},
+        }
+        for name, ib_gib in cases.items():
+            for salt in ('', 'pepper'):
+                for mode in ('fast', SHA256V1_MODE_REFERENCE):
+                    with self.subTest(name=name, salt=salt, mode=mode):
+                        expected = sha256v1(ib_gib, mode=mode, salt=salt)
+                        self.assertEqual(sha256v1_parallel(ib_gib, mode=mode, salt=salt, threshold=0), expected)
+                        self.assertEqual(sha256v1_parallel(ib_gib, mode=mode, salt=salt), expected)
+
+    def test_threshold(self):
+        ib_gib = {'ib': 'pic', 'data': os.urandom(10_000), 'rel8ns': PAST}
+        with RecordingExecutor() as executor:
+            sha256v1_parallel(ib_gib, executor=executor)
+            self.assertEqual(executor.submitted, 0)
+            sha256v1_parallel(ib_gib, threshold=10_000, executor=executor)
+            self.assertEqual(executor.submitted, 1)
+            sha256v1_parallel(ib_gib, threshold=10_001, executor=executor)
+            self.assertEqual(executor.submitted, 1)
+            with instrument():
+                sha256v1_parallel(ib_gib, threshold=0, executor=executor)
+            self.assertEqual(executor.submitted, 1)
+
+    def test_estimated_size(self):
+        self.assertEqual(estimated_size(b'x' * 1000, 10), 1000)
+        self.assertEqual(estimated_size(io.BytesIO(b'x'), 123), 123)
+        self.assertLess(estimated_size(PAST, 1000), 1100)
+        past_json = len(str(PAST))
+        self.assertAlmostEqual(estimated_size(PAST, 10 ** 9), past_json, delta=past_json * 0.1)
+        with self.assertRaises(ValueError):
+            sha256v1_parallel(PAST, mode='nope')
+
+if __name__ == '__main__':
+    unittest.main()
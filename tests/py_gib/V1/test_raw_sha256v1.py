@@ -0,0 +1,86 @@
+import unittest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.canonical_json import to_canonical_json
+from src.py_gib.V1.instrumentation import instrument
+from src.py_gib.V1.raw_sha256v1 import RAW_FAST_PATH_MIN_SIZE, _raw_sha256v1, loads_sha256v1, sha256v1_raw
+from src.py_gib.V1.sha256v1 import sha256v1
+
+def canonical_raw(ib_gib):
+    return '{' + ','.join(f'{json.dumps(k)}:{to_canonical_json(v)}' for k, v in sorted(ib_gib.items())) + '}'
+
+IB_GIB = {
+    'ib': 'comment hello',
+    'gib': 'ABC',
+    'data': {'text': 'say "hi" \\ é 😀', 'n': -3, 'f': 0.1, 'z': -0.0, 'tags': ['a', None, 1e-07], 'empty': {}},
+    'rel8ns': {'ancestor': ['comment^gib'], 'past': [f'comment {i}^{i:064X}' for i in range(40)]},
+}
+
+FLAT = {**IB_GIB, 'data': {k: v for k, v in IB_GIB['data'].items() if k != 'empty'}}
+
+class TestRawSha256v1(unittest.TestCase):
+    def test_canonical_takes_fast_path(self):
+        nested = {**IB_GIB, 'data': {'rows': [{'b': 1, 'a': {'y': None}}], 'x': {'k': 'v'}}}
+        for ib_gib in (IB_GIB, FLAT, nested, {'ib': 'x'}, {'ib': 'x', 'data': 'text'}, {'data': 5}, {}):
+            raw = canonical_raw(ib_gib)
+            for salt in ('', 'pepper'):
+                with self.subTest(raw=raw[:60], salt=salt):
+                    result = _raw_sha256v1(raw, salt)
+                    self.assertIsNotNone(result)
+                    self.assertEqual(result[0], json.loads(raw))
+                    self.assertEqual(result[1], sha256v1(ib_gib, salt=salt))
+
+    def test_non_canonical_falls_back(self):
+        raw = canonical_raw(FLAT)
+        variants = {
+            'whitespace': json.dumps(FLAT, sort_keys=True),
+            'unsorted keys': raw.replace('"f":0.1,"n":-3', '"n":-3,"f":0.1'),
+            'duplicate key': raw.replace('"f":0.1', '"f":0.2,"f":0.1'),
+            'null value': raw.replace('"f":0.1', '"e":null,"f":0.1'),
+            'escaped slash': raw.replace('"comment^gib"', '"comment\\/^gib"'),
+            'uppercase escape': raw.replace('\\u00e9', '\\u00E9'),
+            'escaped ascii': raw.replace('"text":"', '"text":"\\u0061'),
+            'non-ascii': json.dumps(FLAT, sort_keys=True, separators=(',', ':'), ensure_ascii=False),
+            'float': raw.replace('1e-07', '1e-7'),
+            'trailing zero': raw.replace('0.1', '0.10'),
+            'negative zero': raw.replace('"n":-3', '"n":-0'),
+            'nested unsorted': canonical_raw({**FLAT, 'data': {'x': {'k': 1}}}).replace('{"k":1}', '{"k":1,"j":2}'),
+        }
+        self.assertIsNotNone(_raw_sha256v1(raw))
+        for name, variant in variants.items():
+            with self.subTest(name):
+                self.assertNotEqual(variant, raw)
+                self.assertIsNone(_raw_sha256v1(variant))
+                ib_gib, gib = loads_sha256v1(variant.encode('utf-8') + b' ' * RAW_FAST_PATH_MIN_SIZE)
+                self.assertEqual(ib_gib, json.loads(variant))
+                self.assertEqual(gib, sha256v1(json.loads(variant)))
+
+    def test_bytes_salt_and_instrumentation(self):
+        raw = canonical_raw(IB_GIB).encode('ascii')
+        self.assertGreaterEqual(len(raw), RAW_FAST_PATH_MIN_SIZE)
+        for salt in ('', 'pepper'):
+            with self.subTest(salt=salt):
+                self.assertEqual(loads_sha256v1(raw, salt), (json.loads(raw), sha256v1(IB_GIB, salt=salt)))
+                self.assertEqual(sha256v1_raw(bytearray(raw), salt), sha256v1(IB_GIB, salt=salt))
+                self.assertIsNotNone(_raw_sha256v1(raw.decode('ascii') + '\r\n', salt))  # a JSONL line
+                self.assertEqual(sha256v1_raw(raw.decode('ascii').encode('utf-16'), salt), sha256v1(IB_GIB, salt=salt))
+        with instrument() as stats:
+            self.assertEqual(sha256v1_raw(raw), sha256v1(IB_GIB))
+        self.assertTrue(stats.stats())
+
+    def test_invalid_json_raises_like_json_loads(self):
+        raw = canonical_raw(IB_GIB)
+        for bad in (raw[:-1], raw + 'x', raw.replace(':', ' ', 1), '', '\ufeff' + raw, 'nope' * 300):
+            with self.subTest(bad=bad[:20]):
+                self.assertIsNone(_raw_sha256v1(bad))
+                with self.assertRaises(ValueError):
+                    loads_sha256v1(bad)
+        with self.assertRaises(AttributeError):
+            loads_sha256v1('[' + '1,' * RAW_FAST_PATH_MIN_SIZE + '1]')
+
+if __name__ == '__main__':
+    unittest.main()
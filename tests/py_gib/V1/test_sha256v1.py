@@ -1,14 +1,22 @@
 import unittest
 import json
 import hashlib
+import io
+import mmap
+import pathlib
 import sys
 import os
+import tempfile
 
 # Adjust the Python path to include the root directory for absolute imports
 # This allows 'from python_ibgib.ibgib_helper import ...' to work
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))) # Adjusted path
 
-from src.py_gib.V1.sha256v1 import sha256v1, to_normalized_for_hashing, _hash_to_hex
+from src.py_gib.V1.sha256v1 import (
+    sha256v1, to_normalized_for_hashing, _hash_to_hex, SHA256V1_MODES, SHA256V1_MODE_REFERENCE,
+    is_binary_source, update_binary_source, Sha256V1Hasher, get_sha256v1_hasher,
+)
+from src.py_gib.V1.sub_hash_cache import enable_sub_hash_cache, disable_sub_hash_cache
 
 # Helper function for tests (Python equivalent of hashToHexCopy)
 def hash_to_hex_copy(message: str | bytes) -> str:
@@ -471,5 +479,183 @@ class TestSha256V1(unittest.TestCase):
             
             self.assertEqual(sha256v1(ibgib_s10b), expected_gib_s10b)
 
+    def test_all_modes_match_reference_vectors(self):
+        """Every sha256v1 mode must produce the same gib as the reference path."""
+        vectors = [(x["ibgib"], x["ibgib"]["gib"]) for x in self.TEST_IBGIBS_PYTHON] + [
+            ({'ib': 'ib', 'rel8ns': self.EMPTY_REL8NS, 'data': None}, "E975776B1A3E4468086E1D8C409116F6E098D13BEEDFE17AF668071B5D11CD55"),
+            ({'ib': 's1', 'data': {'a': None, 'b': '', 'c': 'val', 'd': {'d1': None, 'd2': 'd2val'}}}, "9B9D08F270C5249FD1DC2E0453010EBD544C7781FF5CDAFADD7679C2C7DA7247"),
+            ({'ib': 's2', 'rel8ns': {'next': ['addr1', None, 'addr2'], 'prev': None}}, "8DD27B4AFBE3AD7D59768CB4D1A574DC2FEA19546E922101FED6F6ECA9B97C61"),
+            ({'ib': 's3', 'data': []}, "BA109F5B0C09CF0A27EF976F876EE8F336DC954EF6443F324F19D78020E3E59A"),
+            ({'ib': 's4', 'data': {'items': [{'id': 1, 'val': None, 'name': 'item1'}, {'id': 2, 'val': 'present'}]}}, "2AE26C6F9A4D53CE32A0A1792E59F34126A25503CE33728EA7CB8A38E29DD0BF"),
+            ({'ib': 's5', 'data': {'z': 1, 'a': 2}, 'rel8ns': {'z_rel': ['z1'], 'a_rel': ['a1']}}, "7AC6FB16BC853C6AE7D375ECEEA810ABB6F60241A1679ADEE4DC6ED4E29BE74A"),
+            ({'ib': 's6', 'data': {'key "1"': 'value with "quotes" and \n newline', 'key_ñ': 'val_ü'}}, "9AF9BE9284CFCE565CBFD482EA0797E0D67CCD0AEDF6509BCEA3B9D4D00931BF"),
+            ({'ib': 's7a', 'data': True}, "53BBABB9F24C75E3C6037D744C241AF710B6E886C22398537AA9332D5626D022"),
+            ({'ib': 's7b', 'data': 123.45}, "F81D2861750A638FBE6F792D66A8EE2408C5F5CB965755166957C46B1B242F41"),
+            ({'ib': 's8', 'rel8ns': {'past': [], 'future': ['addr1'], 'empty_too': []}}, "EE653CEE56759A6C868A485582E4E66C8B57DFBE1C55CF36BDBF237BF5C09CF8"),
+            ({'ib': 's9', 'data': {'level1': {'l2_val': 'v2', 'l2_none': None, 'l2_list': [1, {'l3_none': None, 'l3_val': 'v3'}, 3]}}}, "DB2F3306E2E91F22B0C7B10787760D0FE25BA79B7E3DFFE38164381EA06BE6A6"),
+            ({'ib': 's10a', 'data': {'k': 'v'}}, "81C655EDEC7294CC0900430ED8EE0125EFF15C2F86EAF047C0E8FEFE0D4569E8"),
+            ({'ib': 's10b', 'rel8ns': {'r': ['a']}}, "F35416C53D3683B60C2EE46DD1542A2A1D957F70D991D8DDEDC8C03715ED0DEA"),
+        ]
+        for mode in SHA256V1_MODES:
+            for i, (ibgib, expected_gib) in enumerate(vectors):
+                with self.subTest(mode=mode, case_index=i):
+                    self.assertEqual(sha256v1(ibgib, mode=mode), expected_gib)
+                    self.assertEqual(sha256v1(ibgib, mode=mode), sha256v1(ibgib, mode=SHA256V1_MODE_REFERENCE))
+
+    def test_binary_sources_hash_like_bytes(self):
+        payload = bytes(range(256)) * 1000
+        expected_gib = sha256v1({'ib': 'bin', 'data': payload})
+        self.assertEqual(_hash_to_hex(payload), hash_to_hex_copy(payload))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'payload.bin'
+            path.write_bytes(payload)
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                sources = {
+                    'bytearray': bytearray(payload),
+                    'memoryview': memoryview(payload),
+                    'mmap': mm,
+                    'bytesio': io.BytesIO(payload),
+                    'path': path,
+                }
+                for name, source in sources.items():
+                    with self.subTest(source=name):
+                        self.assertTrue(is_binary_source(source))
+                        self.assertEqual(sha256v1({'ib': 'bin', 'data': source}), expected_gib)
+            with open(path, 'rb') as f:
+                self.assertEqual(sha256v1({'ib': 'bin', 'data': f}), expected_gib)
+
+    def test_update_binary_source_chunks(self):
+        payload = b'0123456789' * 1001
+        chunks = []
+        class RecordingHasher:
+            def update(self, b):
+                chunks.append(bytes(b))
+        self.assertEqual(update_binary_source(RecordingHasher(), memoryview(payload), chunk_size=1000), len(payload))
+        self.assertEqual(len(chunks), 11)
+        self.assertEqual(b''.join(chunks), payload)
+
+        chunks.clear()
+        self.assertEqual(update_binary_source(RecordingHasher(), io.BytesIO(payload), chunk_size=4096), len(payload))
+        self.assertEqual(b''.join(chunks), payload)
+
+    def test_binary_source_edge_cases(self):
+        self.assertFalse(is_binary_source('not a path'))
+        self.assertFalse(is_binary_source({'a': 1}))
+        self.assertEqual(_hash_to_hex(bytearray()), "")
+        self.assertEqual(_hash_to_hex(io.BytesIO(b'')), "")
+        # empty binary data is still data, same as empty bytes.
+        self.assertEqual(sha256v1({'ib': 'e', 'data': io.BytesIO(b'')}), sha256v1({'ib': 'e', 'data': b''}))
+
+    def test_unknown_mode_raises(self):
+        with self.assertRaises(ValueError):
+            sha256v1({'ib': 'ib'}, mode='nope')
+
+    def test_non_str_ib(self):
+        self.assertEqual(sha256v1({}), sha256v1({'ib': ''}))
+        self.assertEqual(sha256v1({'ib': None, 'data': {'a': 1}}), sha256v1({'ib': '', 'data': {'a': 1}}))
+        for ib in (5, 0, 1.5, True, b'ib', ['ib']):
+            for salt in ('', 'salt'):
+                for mode in SHA256V1_MODES:
+                    with self.subTest(ib=ib, salt=salt, mode=mode):
+                        with self.assertRaises(ValueError):
+                            sha256v1({'ib': ib, 'rel8ns': {'past': ['a^gib']}}, mode=mode, salt=salt)
+
+def salted_sha256v1_naive(ib_gib: dict, salt: str) -> str:
+    """
+    Literal port of the TS salted `hashFields`: the salt string is concatenated
+    onto every message before it is encoded and hashed.
+    """
+    def h(message: str) -> str:
+        return hashlib.sha256(message.encode('utf-8')).hexdigest().upper()
+
+    def stringify(obj) -> str:
+        return json.dumps(to_normalized_for_hashing(obj), sort_keys=True, separators=(',', ':'))
+
+    rel8ns = ib_gib.get('rel8ns') or {}
+    data = ib_gib.get('data')
+    has_rel8ns = any(v for v in rel8ns.values())
+    has_data = isinstance(data, bytes) or bool(data)
+    ib_hash = h(salt + ib_gib['ib'])
+    rel8ns_hash = h(salt + stringify(rel8ns)) if has_rel8ns else ''
+    data_hash = ''
+    if has_data:
+        if isinstance(data, bytes):
+            data_hash = hashlib.sha256(salt.encode('utf-8') + data).hexdigest().upper()
+        else:
+            data_hash = h(salt + stringify(data))
+    if has_rel8ns or has_data:
+        return h(salt + ib_hash + rel8ns_hash + data_hash)
+    return h(salt + ib_hash)
+
+class TestSaltedSha256V1(unittest.TestCase):
+    IB_GIBS = [
+        {'ib': 'ib'},
+        {'ib': 'ib', 'data': {}, 'rel8ns': {'past': []}},
+        {'ib': 'ib', 'data': {'x': 1, 'y': {'z': None, 'a': 'é'}}, 'rel8ns': {'past': ['ib^gib'], 'tjp': ['ib^gib']}},
+        {'ib': 'bin', 'data': b'\x00\x01binary'},
+        {'ib': 'bin', 'data': b''},
+    ]
+    SALTS = ['s', 'salty salt', 'ünïcode salt']
+
+    def tearDown(self):
+        disable_sub_hash_cache()
+
+    def test_matches_ts_semantics(self):
+        for salt in self.SALTS:
+            hasher = Sha256V1Hasher(salt)
+            for ib_gib in self.IB_GIBS:
+                with self.subTest(salt=salt, ib_gib=ib_gib):
+                    expected = salted_sha256v1_naive(ib_gib, salt)
+                    for mode in SHA256V1_MODES:
+                        self.assertEqual(sha256v1(ib_gib, mode=mode, salt=salt), expected)
+                        self.assertEqual(hasher.hash(ib_gib, mode=mode), expected)
+                    self.assertNotEqual(expected, sha256v1(ib_gib))
+
+    def test_binary_sources_and_empty_salt(self):
+        payload = os.urandom(3 * 1024 * 1024)
+        hasher = Sha256V1Hasher('salt')
+        expected = hasher({'ib': 'bin', 'data': payload})
+        self.assertEqual(hasher({'ib': 'bin', 'data': memoryview(payload)}), expected)
+        self.assertEqual(hasher({'ib': 'bin', 'data': io.BytesIO(payload)}), expected)
+        ib_gib = self.IB_GIBS[2]
+        self.assertEqual(Sha256V1Hasher('').hash(ib_gib), sha256v1(ib_gib))
+        self.assertEqual(sha256v1(ib_gib, salt=''), sha256v1(ib_gib))
+
+    def test_hash_many_and_shared_hasher(self):
+        hasher = get_sha256v1_hasher('salt')
+        self.assertIs(get_sha256v1_hasher('salt'), hasher)
+        self.assertEqual(
+            list(hasher.hash_many(self.IB_GIBS)),
+            [salted_sha256v1_naive(x, 'salt') for x in self.IB_GIBS],
+        )
+
+    def test_sub_hash_cache_keyed_by_salt(self):
+        enable_sub_hash_cache()
+        ib_gib = self.IB_GIBS[2]
+        for _ in range(2):
+            self.assertEqual(sha256v1(ib_gib, salt='a'), salted_sha256v1_naive(ib_gib, 'a'))
+            self.assertEqual(sha256v1(ib_gib, salt='b'), salted_sha256v1_naive(ib_gib, 'b'))
+            self.assertEqual(sha256v1(ib_gib), sha256v1(ib_gib, use_cache=False))
+
+    def test_sub_hash_methods_compose_to_hash(self):
+        for salt in [''] + self.SALTS:
+            hasher = Sha256V1Hasher(salt)
+            for ib_gib in self.IB_GIBS:
+                with self.subTest(salt=salt, ib_gib=ib_gib):
+                    rel8ns, data = ib_gib.get('rel8ns'), ib_gib.get('data')
+                    rel8ns_hash = hasher.hex_json(rel8ns) if rel8ns and any(rel8ns.values()) else ''
+                    data_hash = ''
+                    if isinstance(data, bytes):
+                        data_hash = hasher.hex_bytes(data)
+                    elif data:
+                        data_hash = hasher.hex_json(data)
+                    gib = hasher.hex_gib(hasher.hex_ib(ib_gib['ib']), rel8ns_hash, data_hash)
+                    self.assertEqual(gib, hasher.hash(ib_gib))
+            state = hasher.prefix_state()
+            state.update(b'x')
+            self.assertEqual(state.hexdigest().upper(), hasher.hex_str('x'))
+            self.assertEqual(hasher.prefix_state().hexdigest(), hashlib.sha256(salt.encode('utf-8')).hexdigest())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.sha256v1 import sha256v1
+from src.py_gib.V1.sha256v1_many import sha256v1_many
+
+def make_ib_gibs(count: int) -> list:
+    return [
+        {
+            'ib': f'test {i}',
+            'data': {'i': i, 'name': f'name {i}', 'maybe': None if i % 2 else 'present'},
+            'rel8ns': {'past': [f'test {j}^ABC{j}' for j in range(i % 5)], 'ancestor': ['test^gib']},
+        }
+        for i in range(count)
+    ]
+
+class TestSha256V1Many(unittest.TestCase):
+    def test_in_process_matches_sha256v1(self):
+        ib_gibs = make_ib_gibs(50)
+        expected = [sha256v1(x) for x in ib_gibs]
+        self.assertEqual(list(sha256v1_many(ib_gibs, workers=4)), expected)
+        self.assertEqual(list(sha256v1_many(ib_gibs, workers=1)), expected)
+
+    def test_process_pool_matches_sha256v1_in_order(self):
+        ib_gibs = make_ib_gibs(203)
+        expected = [sha256v1(x) for x in ib_gibs]
+        actual = list(sha256v1_many(iter(ib_gibs), workers=2, chunk_size=16, min_parallel=32))
+        self.assertEqual(actual, expected)
+
+    def test_is_lazy_generator(self):
+        consumed = []
+        def source():
+            for ib_gib in make_ib_gibs(10):
+                consumed.append(ib_gib)
+                yield ib_gib
+        gen = sha256v1_many(source(), workers=1)
+        self.assertEqual(consumed, [])
+        next(gen)
+        self.assertEqual(len(consumed), 1)
+
+    def test_early_close_shuts_down_pool(self):
+        ib_gibs = make_ib_gibs(100)
+        gen = sha256v1_many(ib_gibs, workers=2, chunk_size=8, min_parallel=8)
+        self.assertEqual(next(gen), sha256v1(ib_gibs[0]))
+        gen.close()
+
+    def test_empty_input(self):
+        self.assertEqual(list(sha256v1_many([], workers=2, min_parallel=0)), [])
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            list(sha256v1_many([], chunk_size=0))
+        with self.assertRaises(ValueError):
+            list(sha256v1_many([], workers=0))
+
+if __name__ == '__main__':
+    unittest.main()
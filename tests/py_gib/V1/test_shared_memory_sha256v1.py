@@ -0,0 +1,129 @@
+import unittest
+import mmap
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.binary_encoding import encode_ib_gib
+from src.py_gib.V1.sha256v1 import sha256v1
+from src.py_gib.V1.shared_memory_sha256v1 import (
+    SharedMemoryStats, _hash_chunks, _prepare_chunk, _release, sha256v1_many_shared,
+)
+from src.py_gib.V1.types import IbGib_V1
+
+SHM_DIR = '/dev/shm'
+
+def make_items():
+    ib_gibs = [
+        {'ib': f'pic {i}', 'data': os.urandom(5000 if i % 3 else 10), 'rel8ns': {'ancestor': ['pic^gib']}}
+        for i in range(12)
+    ]
+    docs = [{'ib': f'doc {i}', 'data': {'rows': ['x' * 100] * (i * 20), 'none': None}} for i in range(8)]
+    items = ib_gibs + [encode_ib_gib(x) for x in docs] + docs
+    items += [
+        {'ib': 'empty', 'data': b''},
+        {'ib': 'view', 'data': memoryview(os.urandom(8000)).cast('I')},
+        memoryview(encode_ib_gib(docs[5])),
+        IbGib_V1.from_dict(docs[6]),
+        {'ib': '7', 'gib': 'gib'},
+    ]
+    expected = [sha256v1(x) for x in ib_gibs + docs + docs]
+    expected += [sha256v1(items[-5]), sha256v1(items[-4]), sha256v1(docs[5]), sha256v1(docs[6]), sha256v1(items[-1])]
+    return items, expected
+
+def shm_segments():
+    return set(os.listdir(SHM_DIR)) if os.path.isdir(SHM_DIR) else set()
+
+class TestSharedMemorySha256v1(unittest.TestCase):
+    def test_matches_sha256v1(self):
+        items, expected = make_items()
+        before = shm_segments()
+        for workers in (1, 2):
+            for threshold in (1, 4096, 10 ** 9):
+                with self.subTest(workers=workers, threshold=threshold):
+                    stats = SharedMemoryStats()
+                    gibs = sha256v1_many_shared(
+                        iter(items), workers=workers, chunk_size=4, min_parallel=1, threshold=threshold, stats=stats,
+                    )
+                    self.assertEqual(list(gibs), expected)
+                    if workers == 1 or threshold == 10 ** 9:
+                        self.assertEqual(stats.shared_bytes, 0)
+                    else:
+                        self.assertEqual(stats.items, len(items))
+                        self.assertGreater(stats.shared_bytes, 5000 * 8)
+                        self.assertLess(stats.sent_bytes, stats.shared_bytes)
+                        self.assertGreater(stats.saved_fraction, 0.5)
+        self.assertEqual(shm_segments(), before)
+
+    def test_salt_and_segment_bytes(self):
+        items, _ = make_items()
+        expected = list(sha256v1_many_shared(items, workers=1, salt='pepper'))
+        self.assertEqual(expected[0], sha256v1(items[0], salt='pepper'))
+        stats = SharedMemoryStats()
+        gibs = sha256v1_many_shared(
+            items, workers=2, chunk_size=100, min_parallel=1, threshold=1000, segment_bytes=6000, salt='pepper', stats=stats,
+        )
+        self.assertEqual(list(gibs), expected)
+        # a chunk is cut at its first 5000 byte payload after another one.
+        self.assertGreaterEqual(stats.chunks, 4)
+
+    def test_worker_entry_in_process(self):
+        payload = os.urandom(3000)
+        with mmap.mmap(-1, len(payload)) as mapped:
+            mapped[:] = payload
+            items = [{'ib': 'a', 'data': mapped}, encode_ib_gib({'ib': 'b', 'data': payload})]
+            segment, chunk = _prepare_chunk(items, '', threshold=1)
+            try:
+                self.assertIsNotNone(segment)
+                expected = [sha256v1({'ib': 'a', 'data': payload}), sha256v1({'ib': 'b', 'data': payload})]
+                self.assertEqual(_hash_chunks([chunk])[0], expected)
+            finally:
+                _release(segment)
+
+    def test_early_close_releases_segments(self):
+        before = shm_segments()
+        items = [{'ib': f'pic {i}', 'data': os.urandom(100_000)} for i in range(40)]
+        gibs = sha256v1_many_shared(items, workers=2, chunk_size=2, min_parallel=1)
+        self.assertEqual(next(gibs), sha256v1(items[0]))
+        gibs.close()
+        self.assertEqual(shm_segments(), before)
+
+    def test_defaults_decide_by_payload_bytes(self):
+        payload = os.urandom(1 << 20)
+        consumed = 0
+
+        def items(count):
+            nonlocal consumed
+            for i in range(count):
+                consumed += 1
+                yield {'ib': f'pic {i}', 'data': payload}
+
+        # a handful of large payloads reach a segment's worth: shared memory.
+        stats = SharedMemoryStats()
+        gibs = list(sha256v1_many_shared(items(12), workers=2, stats=stats))
+        self.assertEqual(gibs, [sha256v1({'ib': f'pic {i}', 'data': payload}) for i in range(12)])
+        self.assertGreater(stats.shared_bytes, 0)
+        self.assertGreaterEqual(stats.chunks, 2)
+        # a few small ones stay in-process.
+        stats = SharedMemoryStats()
+        list(sha256v1_many_shared([{'ib': 'x', 'data': b'small'}] * 10, workers=2, stats=stats))
+        self.assertEqual(stats.chunks, 0)
+        # only about a segment is read ahead before the first gib.
+        consumed = 0
+        gibs = sha256v1_many_shared(items(4096), workers=2)
+        next(gibs)
+        gibs.close()
+        self.assertLess(consumed, 100)
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            list(sha256v1_many_shared([], chunk_size=0))
+        with self.assertRaises(ValueError):
+            list(sha256v1_many_shared([], workers=0))
+        with self.assertRaises(ValueError):
+            list(sha256v1_many_shared([], segment_bytes=0))
+        self.assertEqual(list(sha256v1_many_shared([], workers=2, min_parallel=0)), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.sha256v1 import sha256v1, SHA256V1_MODE_REFERENCE
+from src.py_gib.V1.sub_hash_cache import (
+    SubHashCache, fingerprint, sized_fingerprint, enable_sub_hash_cache, disable_sub_hash_cache, get_sub_hash_cache,
+    SUB_HASH_CACHE_POLICY_FIFO,
+)
+
+REL8NS = {
+    "past": ["ib^gib"],
+    "ancestor": ["ib^gib"],
+    "dna": ["ib^gib"],
+    "identity": ["ib^gib"],
+}
+
+class TestFingerprint(unittest.TestCase):
+    def test_distinguishes_json_distinct_scalars(self):
+        values = [1, 1.0, True, '1', -0.0, 0.0, 0, False, None, [1], (1,), {'a': 1}]
+        fingerprints = [fingerprint({'x': v}) for v in values]
+        # list and tuple serialize identically, everything else must differ.
+        self.assertEqual(fingerprints[9], fingerprints[10])
+        distinct = fingerprints[:10] + fingerprints[11:]
+        self.assertEqual(len(set(distinct)), len(distinct))
+
+    def test_list_of_str_vs_nested(self):
+        self.assertNotEqual(fingerprint(['d', 'a']), fingerprint({'a': 'a'}))
+        self.assertNotEqual(fingerprint(['a', 'b']), fingerprint([['a', 'b']]))
+
+    def test_uncacheable(self):
+        self.assertIsNone(fingerprint({'a': b'bytes'}))
+        self.assertIsNone(fingerprint({'a': object()}))
+
+    def test_too_large(self):
+        past = [f'comment {i}^{"A" * 64}' for i in range(1000)]
+        self.assertIsNone(fingerprint(past))
+        self.assertIsNone(fingerprint({'rows': [{'n': i} for i in range(1000)]}))
+        self.assertIsNone(fingerprint({'text': 'x' * 100_000}))
+        self.assertIsNotNone(fingerprint(past, max_bytes=1 << 20))
+        key, nbytes = sized_fingerprint(past[:10])
+        self.assertEqual(key, ('l', *past[:10]))
+        self.assertGreater(nbytes, sum(map(len, past[:10])))
+
+class TestSubHashCache(unittest.TestCase):
+    def tearDown(self):
+        disable_sub_hash_cache()
+
+    def test_lru_eviction_and_counters(self):
+        cache = SubHashCache(maxsize=2)
+        cache.put('a', 'A')
+        cache.put('b', 'B')
+        self.assertEqual(cache.get('a'), 'A')  # a is now most recent
+        cache.put('c', 'C')                     # evicts b
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 'C')
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (2, 1, 1))
+        self.assertEqual(len(cache), 2)
+
+    def test_fifo_eviction(self):
+        cache = SubHashCache(maxsize=2, policy=SUB_HASH_CACHE_POLICY_FIFO)
+        cache.put('a', 'A')
+        cache.put('b', 'B')
+        cache.get('a')
+        cache.put('c', 'C')                     # evicts a despite the hit
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 'B')
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            SubHashCache(maxsize=0)
+        with self.assertRaises(ValueError):
+            SubHashCache(policy='mru')
+        with self.assertRaises(ValueError):
+            SubHashCache(max_bytes=10, max_block_bytes=100)
+
+    def test_byte_budget_eviction(self):
+        cache = SubHashCache(max_bytes=1000, max_block_bytes=500)
+        cache.put('a', 'A', 400)
+        cache.put('b', 'B', 400)
+        cache.put('a', 'A', 400)                # replacing does not double count
+        self.assertEqual(cache.nbytes, 800)
+        cache.put('c', 'C', 400)                # evicts b, the oldest
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), ('A', 'C'))
+        self.assertEqual((cache.nbytes, cache.evictions), (800, 1))
+
+    def test_sha256v1_skips_large_blocks(self):
+        ib_gib = {'ib': 'ib', 'data': {'text': 'x' * 100_000}, 'rel8ns': REL8NS}
+        expected = sha256v1(ib_gib, mode=SHA256V1_MODE_REFERENCE)
+        cache = enable_sub_hash_cache()
+        self.assertEqual(sha256v1(ib_gib), expected)
+        self.assertEqual(sha256v1(ib_gib), expected)
+        # only rel8ns is cached, the data block is skipped both times.
+        self.assertEqual((len(cache), cache.skipped, cache.hits), (1, 2, 1))
+        self.assertLess(cache.nbytes, 1000)
+
+    def test_sha256v1_uses_cache_and_matches_reference(self):
+        ib_gibs = [{'ib': 'ib', 'data': {'n': i}, 'rel8ns': REL8NS} for i in range(10)]
+        expected = [sha256v1(x, mode=SHA256V1_MODE_REFERENCE) for x in ib_gibs]
+        cache = enable_sub_hash_cache(maxsize=100)
+        self.assertIs(get_sub_hash_cache(), cache)
+        self.assertEqual([sha256v1(x) for x in ib_gibs], expected)
+        self.assertEqual([sha256v1(x) for x in ib_gibs], expected)
+        # rel8ns misses once, then every other lookup of rel8ns and data hits.
+        self.assertEqual(cache.misses, 11)
+        self.assertEqual(cache.hits, 29)
+
+    def test_use_cache_false_and_disable_bypass(self):
+        ib_gib = {'ib': 'ib', 'data': {'x': 1}, 'rel8ns': REL8NS}
+        cache = enable_sub_hash_cache()
+        sha256v1(ib_gib, use_cache=False)
+        sha256v1(ib_gib, mode=SHA256V1_MODE_REFERENCE)
+        self.assertEqual(cache.stats()['hits'] + cache.stats()['misses'], 0)
+        disable_sub_hash_cache()
+        self.assertIsNone(get_sub_hash_cache())
+        self.assertIs(enable_sub_hash_cache(cache=cache), cache)
+        self.assertIs(get_sub_hash_cache(), cache)
+        disable_sub_hash_cache()
+        self.assertEqual(sha256v1(ib_gib), sha256v1(ib_gib, mode=SHA256V1_MODE_REFERENCE))
+
+if __name__ == '__main__':
+    unittest.main()
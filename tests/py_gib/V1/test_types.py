@@ -0,0 +1,81 @@
+import unittest
+import pickle
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.V1.sha256v1 import sha256v1, SHA256V1_MODE_REFERENCE
+from src.py_gib.V1.transforms.transform_helper import get_gib
+from src.py_gib.V1.types import IbGib_V1
+
+TJP_GIB = 'C' * 64
+
+def make_ib_gib(n=1):
+    ib_gib = {
+        'ib': 'comment',
+        'data': {'n': n, 'text': 'hi'},
+        'rel8ns': {'past': [f'comment^{"A" * 64}'], 'tjp': [f'comment^{TJP_GIB}']},
+    }
+    ib_gib['gib'] = get_gib(ib_gib)
+    return ib_gib
+
+class TestIbGibV1(unittest.TestCase):
+    def test_sha256v1_matches_dict(self):
+        cases = [
+            make_ib_gib(),
+            {'ib': 'ib', 'gib': 'gib'},
+            {'ib': 'x', 'rel8ns': {'ancestor': ['x^gib']}},
+            {'ib': 'x', 'data': b'bytes'},
+        ]
+        for ib_gib in cases:
+            for compact_gib in (False, True):
+                with self.subTest(ib=ib_gib['ib'], compact_gib=compact_gib):
+                    record = IbGib_V1.from_dict(ib_gib, compact_gib=compact_gib)
+                    self.assertEqual(sha256v1(record), sha256v1(ib_gib))
+                    self.assertEqual(sha256v1(record, mode=SHA256V1_MODE_REFERENCE), sha256v1(ib_gib))
+                    self.assertEqual(record.to_dict(), ib_gib)
+
+    def test_compact_gib(self):
+        ib_gib = make_ib_gib()
+        record = IbGib_V1.from_dict(ib_gib, compact_gib=True)
+        self.assertEqual(record.gib, ib_gib['gib'])
+        self.assertEqual(record.digest, bytes.fromhex(ib_gib['gib'].split('.')[0]))
+        self.assertEqual(record.addr, get_ib_gib_addr(ib_gib=ib_gib))
+        self.assertEqual(get_ib_gib_addr(ib_gib=record), record.addr)
+        # gibs that would not round trip stay as strings
+        for gib in ('gib', 'a' * 64, 'not hex'):
+            with self.subTest(gib=gib):
+                self.assertEqual(IbGib_V1('x', gib=gib, compact_gib=True).gib, gib)
+
+    def test_addresses_are_interned(self):
+        a = IbGib_V1.from_dict(make_ib_gib(1))
+        b = IbGib_V1.from_dict(make_ib_gib(2))
+        self.assertIsInstance(a.rel8ns['past'], tuple)
+        self.assertIs(a.rel8ns['tjp'][0], b.rel8ns['tjp'][0])
+
+    def test_immutable(self):
+        record = IbGib_V1.from_dict(make_ib_gib())
+        with self.assertRaises(AttributeError):
+            record.ib = 'other'
+        with self.assertRaises(AttributeError):
+            record.extra = 1
+        with self.assertRaises(AttributeError):
+            del record.data
+
+    def test_mapping_access_eq_and_pickle(self):
+        ib_gib = make_ib_gib()
+        record = IbGib_V1.from_dict(ib_gib, compact_gib=True)
+        self.assertEqual(record['gib'], ib_gib['gib'])
+        self.assertIn('data', record)
+        self.assertIsNone(IbGib_V1('x').get('rel8ns'))
+        with self.assertRaises(KeyError):
+            IbGib_V1('x')['data']
+        clone = pickle.loads(pickle.dumps(record))
+        self.assertEqual(clone, record)
+        self.assertEqual(hash(clone), hash(record))
+        self.assertNotEqual(record, IbGib_V1.from_dict(make_ib_gib(2)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import hashlib
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.V1.constants import IB, GIB
+from src.py_gib.V1.transforms.transform_helper import get_gib
+from src.py_gib.V1.validate_helper import (
+    validate_ib_gib_intrinsically, validate_ib_gib_addr, validate_ib, validate_gib,
+    validate_rel8ns_intrinsically,
+)
+
+VALID_IBS = [IB, 'yo', 'spaces is cool', 'underscores_yay_woo']
+INVALID_IBS = ['cant have delimiter ^ woo']
+VALID_GIBS = [GIB, hashlib.sha256(b'wakka').hexdigest()]
+INVALID_GIBS = ['not a hash and not primitive gib']
+VALID_ADDRS = [f'{ib}^{gib}' for ib in VALID_IBS for gib in VALID_GIBS]
+INVALID_ADDRS = [
+    f'{INVALID_IBS[0]}^{VALID_GIBS[0]}',
+    f'{INVALID_IBS[0]}^{VALID_GIBS[1]}',
+    f'{VALID_IBS[0]}^{INVALID_GIBS[0]}',
+    f'{VALID_IBS[1]}^{INVALID_GIBS[0]}',
+]
+
+def make_timeline():
+    tjp = {'ib': 'x', 'data': {'isTjp': True, 'n': 0}, 'rel8ns': {'ancestor': ['x^gib']}}
+    tjp['gib'] = get_gib(tjp)
+    frame = {
+        'ib': 'x',
+        'data': {'n': 1},
+        'rel8ns': {'ancestor': ['x^gib'], 'past': [f"x^{tjp['gib']}"], 'tjp': [f"x^{tjp['gib']}"]},
+    }
+    frame['gib'] = get_gib(frame)
+    return tjp, frame
+
+class TestValidateIbGibIntrinsically(unittest.TestCase):
+    def test_valid_primitives(self):
+        for ib in VALID_IBS:
+            with self.subTest(ib=ib):
+                self.assertIsNone(validate_ib_gib_intrinsically({'ib': ib, 'gib': GIB}))
+
+    def test_invalid_primitives(self):
+        for ib in INVALID_IBS:
+            with self.subTest(ib=ib):
+                self.assertTrue(validate_ib_gib_intrinsically({'ib': ib, 'gib': GIB}))
+
+    def test_falsy(self):
+        self.assertTrue(validate_ib_gib_intrinsically({}))
+
+    def test_timeline(self):
+        for ib_gib in make_timeline():
+            with self.subTest(gib=ib_gib['gib']):
+                self.assertIsNone(validate_ib_gib_intrinsically(ib_gib))
+
+                # modified data before updating gib -> invalid
+                ib_gib['data'] = {**ib_gib['data'], 'x': 'some other data'}
+                self.assertTrue(validate_ib_gib_intrinsically(ib_gib))
+
+                # modified data after updating gib -> valid again
+                ib_gib['gib'] = get_gib(ib_gib)
+                self.assertIsNone(validate_ib_gib_intrinsically(ib_gib))
+
+                # modified gib by a single char -> invalid
+                gib = ib_gib['gib']
+                ib_gib['gib'] = ('0' if gib[0] == 'A' else 'A') + gib[1:]
+                self.assertTrue(validate_ib_gib_intrinsically(ib_gib))
+
+    def test_wrong_tjp_gib_is_invalid(self):
+        _, frame = make_timeline()
+        punctiliar_hash = frame['gib'].split('.')[0]
+        frame['gib'] = f"{punctiliar_hash}.{'C' * 64}"
+        self.assertTrue(validate_ib_gib_intrinsically(frame))
+
+class TestValidatePieces(unittest.TestCase):
+    def test_addrs(self):
+        for addr in VALID_ADDRS:
+            with self.subTest(addr=addr):
+                self.assertIsNone(validate_ib_gib_addr(addr))
+        for addr in INVALID_ADDRS + ['', 'no delimiter', '^startswithdelim']:
+            with self.subTest(addr=addr):
+                self.assertTrue(validate_ib_gib_addr(addr))
+
+    def test_ib_and_gib(self):
+        self.assertTrue(validate_ib(''))
+        self.assertIsNone(validate_ib('ib'))
+        self.assertTrue(validate_gib(''))
+        self.assertIsNone(validate_gib('A' * 32))
+        self.assertIsNone(validate_gib(f"{'A' * 64}.{'b' * 64}"))
+        self.assertTrue(validate_gib(f"{'A' * 64}.nothex"))
+        self.assertTrue(validate_gib('A' * 63))
+
+class TestValidateRel8nsIntrinsically(unittest.TestCase):
+    VALID_REL8N_NAMES = [
+        'past', 'ancestor', 'dna', 'identity', 'tjp', 'secret', 'encryption',
+        'some rel8n name with spaces fine', 'under_scores_are_good too',
+    ]
+
+    def test_valid(self):
+        rel8ns = {name: list(VALID_ADDRS) for name in self.VALID_REL8N_NAMES}
+        self.assertIsNone(validate_rel8ns_intrinsically(rel8ns))
+
+    def test_invalid_addr(self):
+        for addr in INVALID_ADDRS:
+            with self.subTest(addr=addr):
+                rel8ns = {name: list(VALID_ADDRS) for name in self.VALID_REL8N_NAMES}
+                rel8ns[self.VALID_REL8N_NAMES[0]] = [addr]
+                self.assertTrue(validate_rel8ns_intrinsically(rel8ns))
+
+if __name__ == '__main__':
+    unittest.main()
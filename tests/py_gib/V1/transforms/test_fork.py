@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
+
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.mut8 import mut8
+from src.py_gib.V1.validate_helper import validate_ib_gib_intrinsically
+
+class TestFork(unittest.TestCase):
+    def test_fork_root(self):
+        new = fork(ROOT, dest_ib='x')['new_ib_gib']
+        self.assertEqual(new['ib'], 'x')
+        self.assertNotIn('rel8ns', new)
+        self.assertIn('timestamp', new['data'])
+        self.assertIsNone(validate_ib_gib_intrinsically(new))
+
+    def test_tjp(self):
+        new = fork(ROOT, dest_ib='x', tjp={'uuid': True, 'timestamp': True})['new_ib_gib']
+        self.assertTrue(new['data']['isTjp'])
+        self.assertEqual(len(new['data']['uuid']), 64)
+        self.assertNotIn('.', new['gib'])
+        self.assertIsNone(validate_ib_gib_intrinsically(new))
+        with self.assertRaises(ValueError):
+            fork(ROOT, tjp={'timestamp': True}, no_timestamp=True)
+
+    def test_fork_of_timeline_clones_shallowly(self):
+        tjp = fork(ROOT, dest_ib='src', tjp={'uuid': True})['new_ib_gib']
+        src = mut8(tjp, data_to_add_or_patch={'nested': {'a': 1}})['new_ib_gib']
+        src_addr = f"src^{src['gib']}"
+        new = fork(src, dest_ib='copy', clone_rel8ns=True, clone_data=True)['new_ib_gib']
+        self.assertIsNone(validate_ib_gib_intrinsically(new))
+        self.assertEqual(new['rel8ns']['ancestor'], [src_addr])
+        self.assertNotIn('tjp', new['rel8ns'])
+        self.assertIs(new['rel8ns']['past'], src['rel8ns']['past'])
+        self.assertIs(new['data']['nested'], src['data']['nested'])
+        self.assertIn('tjp', src['rel8ns'])
+        self.assertIsNone(validate_ib_gib_intrinsically(src))
+
+    def test_empty_new_data_keeps_src_data(self):
+        src = fork(ROOT, dest_ib='src', tjp={'uuid': True})['new_ib_gib']
+        new = fork(src, dest_ib='copy', no_timestamp=True)['new_ib_gib']
+        self.assertEqual(new['data'], src['data'])
+        self.assertIsNot(new['data'], src['data'])
+        self.assertIsNone(validate_ib_gib_intrinsically(new))
+        # any new data replaces src's data entirely.
+        new = fork(src, dest_ib='copy', no_timestamp=True, n_counter=True)['new_ib_gib']
+        self.assertEqual(new['data'], {'n': 0})
+        new = fork(ROOT, dest_ib='x', no_timestamp=True)['new_ib_gib']
+        self.assertNotIn('data', new)
+
+    def test_dna_and_linked_ancestor(self):
+        src = fork(ROOT, dest_ib='a')['new_ib_gib']
+        once = fork(src, dest_ib='b')['new_ib_gib']
+        twice = fork(once, dest_ib='c', clone_rel8ns=True, linked_rel8ns=['ancestor'], dna=True)
+        new = twice['new_ib_gib']
+        self.assertEqual(new['rel8ns']['ancestor'], [f"b^{once['gib']}"])
+        dna = twice['dnas'][0]
+        self.assertEqual(dna['ib'], 'fork')
+        self.assertEqual(new['rel8ns']['dna'], [f"fork^{dna['gib']}"])
+        self.assertIsNone(validate_ib_gib_intrinsically(new))
+
+if __name__ == '__main__':
+    unittest.main()
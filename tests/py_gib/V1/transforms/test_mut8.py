@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
+
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.mut8 import mut8
+from src.py_gib.V1.validate_helper import validate_ib_gib_intrinsically
+
+def new_src(**data):
+    src = fork(ROOT, dest_ib='src', tjp={'uuid': True})['new_ib_gib']
+    return mut8(src, data_to_add_or_patch=data, no_timestamp=True)['new_ib_gib']
+
+class TestMut8(unittest.TestCase):
+    def test_valid_and_past_appended(self):
+        src = new_src(a=1)
+        result = mut8(src, data_to_add_or_patch={'b': 2})
+        new = result['new_ib_gib']
+        self.assertIsNone(validate_ib_gib_intrinsically(new))
+        self.assertEqual(new['rel8ns']['past'], [*src['rel8ns']['past'], f"src^{src['gib']}"])
+        self.assertEqual((new['data']['a'], new['data']['b']), (1, 2))
+        self.assertTrue(new['gib'].endswith('.' + src['gib'].split('.')[1]))
+        self.assertNotIn('dnas', result)
+
+    def test_linked_past(self):
+        src = new_src(a=1)
+        new = mut8(src, data_to_add_or_patch={'b': 2}, linked_rel8ns=['past'])['new_ib_gib']
+        self.assertEqual(new['rel8ns']['past'], [f"src^{src['gib']}"])
+
+    def test_first_mut8_after_fork_rel8s_tjp(self):
+        tjp = fork(ROOT, dest_ib='src', tjp={'uuid': True})['new_ib_gib']
+        new = mut8(tjp, data_to_add_or_patch={'a': 1})['new_ib_gib']
+        self.assertEqual(new['rel8ns']['tjp'], [f"src^{tjp['gib']}"])
+        self.assertNotIn('isTjp', new['data'])
+        self.assertIn('isTjp', tjp['data'])
+
+    def test_structural_sharing_and_src_unmutated(self):
+        src = new_src(keep={'deep': [1, 2]}, change={'x': 1, 'y': {'z': 1}}, gone=1)
+        src_rel8ns = dict(src['rel8ns'])
+        src_data = dict(src['data'])
+        new = mut8(
+            src,
+            data_to_add_or_patch={'change': {'x': 2}},
+            data_to_remove={'gone': ''},
+            no_timestamp=True,
+        )['new_ib_gib']
+        # untouched sub-objects are shared, not copied
+        self.assertIs(new['data']['keep'], src['data']['keep'])
+        self.assertIs(new['data']['change']['y'], src['data']['change']['y'])
+        self.assertIs(new['rel8ns']['tjp'], src['rel8ns']['tjp'])
+        self.assertEqual(new['data']['change'], {'x': 2, 'y': {'z': 1}})
+        self.assertNotIn('gone', new['data'])
+        # src is untouched
+        self.assertEqual(src['rel8ns'], src_rel8ns)
+        self.assertEqual(src['data'], src_data)
+        self.assertEqual(src['data']['change'], {'x': 1, 'y': {'z': 1}})
+        self.assertIsNone(validate_ib_gib_intrinsically(src))
+        self.assertIsNone(validate_ib_gib_intrinsically(new))
+
+    def test_rename_and_mut8_ib(self):
+        src = new_src(a=1, nested={'b': 2})
+        new = mut8(src, data_to_rename={'a': 'c', 'nested': {'b': 'd'}}, mut8_ib='renamed')['new_ib_gib']
+        self.assertEqual(new['ib'], 'renamed')
+        self.assertEqual((new['data']['c'], new['data']['nested']), (1, {'d': 2}))
+        self.assertEqual(src['data']['nested'], {'b': 2})
+        with self.assertRaises(ValueError):
+            mut8(src, data_to_rename={'a': 'timestamp'})
+
+    def test_n_counter(self):
+        src = new_src(a=1)
+        first = mut8(src, data_to_add_or_patch={'a': 2}, n_counter=True)['new_ib_gib']
+        second = mut8(first, data_to_add_or_patch={'a': 3})['new_ib_gib']
+        self.assertEqual((first['data']['n'], second['data']['n']), (0, 1))
+        with self.assertRaises(ValueError):
+            mut8(second, data_to_add_or_patch={'n': 'x'})
+
+    def test_dna(self):
+        src = new_src(a=1)
+        result = mut8(src, data_to_add_or_patch={'a': 2}, dna=True, no_timestamp=True)
+        dna = result['dnas'][0]
+        self.assertEqual(dna['ib'], 'mut8')
+        self.assertEqual(dna['data'], {'type': 'mut8', 'dataToAddOrPatch': {'a': 2}, 'dna': True, 'noTimestamp': True})
+        self.assertIn(f"mut8^{dna['gib']}", result['new_ib_gib']['rel8ns']['dna'])
+        self.assertIsNone(validate_ib_gib_intrinsically(dna))
+
+    def test_invalid(self):
+        src = new_src(a=1)
+        with self.subTest('nothing to change'):
+            with self.assertRaises(ValueError):
+                mut8(src)
+        with self.subTest('primitive'):
+            with self.assertRaises(ValueError):
+                mut8({'ib': '7', 'gib': 'gib'}, data_to_add_or_patch={'a': 1})
+        with self.subTest('wrong src_addr'):
+            with self.assertRaises(ValueError):
+                mut8(src, data_to_add_or_patch={'a': 1}, src_addr='x^gib')
+
+if __name__ == '__main__':
+    unittest.main()
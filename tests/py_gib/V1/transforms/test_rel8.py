@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
+
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.rel8 import rel8
+from src.py_gib.V1.validate_helper import validate_ib_gib_intrinsically
+
+class TestRel8(unittest.TestCase):
+    def setUp(self):
+        tjp = fork(ROOT, dest_ib='src', tjp={'uuid': True})['new_ib_gib']
+        self.src = rel8(tjp, rel8ns_to_add_by_addr={'keep': ['a^gib'], 'change': ['b^gib', 'c^gib']})['new_ib_gib']
+
+    def test_add_remove_and_sharing(self):
+        src = self.src
+        new = rel8(
+            src,
+            rel8ns_to_add_by_addr={'change': ['c^gib', 'd^gib']},
+            rel8ns_to_remove_by_addr={'change': ['b^gib']},
+        )['new_ib_gib']
+        self.assertIsNone(validate_ib_gib_intrinsically(new))
+        self.assertEqual(new['rel8ns']['change'], ['c^gib', 'd^gib'])
+        self.assertIs(new['rel8ns']['keep'], src['rel8ns']['keep'])
+        self.assertIs(new['rel8ns']['tjp'], src['rel8ns']['tjp'])
+        self.assertEqual(src['rel8ns']['change'], ['b^gib', 'c^gib'])
+        self.assertEqual(new['rel8ns']['past'][-1], f"src^{src['gib']}")
+        self.assertIsNone(validate_ib_gib_intrinsically(src))
+
+    def test_remove_last_deletes_rel8n(self):
+        new = rel8(self.src, rel8ns_to_remove_by_addr={'keep': ['a^gib']})['new_ib_gib']
+        self.assertNotIn('keep', new['rel8ns'])
+
+    def test_linked_rel8ns_keep_last(self):
+        new = rel8(self.src, rel8ns_to_add_by_addr={'change': ['d^gib']}, linked_rel8ns=['past', 'change'])['new_ib_gib']
+        self.assertEqual(new['rel8ns']['change'], ['d^gib'])
+        self.assertEqual(new['rel8ns']['past'], [f"src^{self.src['gib']}"])
+
+    def test_dna(self):
+        result = rel8(self.src, rel8ns_to_add_by_addr={'x': ['x^gib']}, dna=True)
+        dna = result['dnas'][0]
+        self.assertEqual(dna['data'], {'type': 'rel8', 'rel8nsToAddByAddr': {'x': ['x^gib']}, 'dna': True})
+        self.assertEqual(result['new_ib_gib']['rel8ns']['dna'], [f"rel8^{dna['gib']}"])
+
+    def test_invalid(self):
+        cases = [
+            ('nothing to do', {}),
+            ('forbidden add', {'rel8ns_to_add_by_addr': {'past': ['a^gib']}}),
+            ('forbidden remove', {'rel8ns_to_remove_by_addr': {'ancestor': ['a^gib']}}),
+            ('invalid addr', {'rel8ns_to_add_by_addr': {'x': ['no delimiter']}}),
+            ('empty ib in addr', {'rel8ns_to_add_by_addr': {'x': ['^gib']}}),
+        ]
+        for name, kwargs in cases:
+            with self.subTest(name):
+                with self.assertRaises(ValueError):
+                    rel8(self.src, **kwargs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
+
+from src.py_gib.V1.sha256v1 import sha256v1
+from src.py_gib.V1.transforms.transform_helper import (
+    get_gib, get_gib_info, get_gib_info_many, is_primitive, is_dna,
+)
+
+HASH_A = 'A' * 64
+HASH_B = 'B' * 64
+
+class TestGetGib(unittest.TestCase):
+    def test_primitive(self):
+        self.assertEqual(get_gib({'ib': '7'}, is_primitive=True), 'gib')
+
+    def test_no_tjp_is_bare_hash(self):
+        ib_gib = {'ib': 'x', 'data': {'a': 1}, 'rel8ns': {'ancestor': ['x^gib']}}
+        self.assertEqual(get_gib(ib_gib), sha256v1(ib_gib))
+
+    def test_is_tjp_is_bare_hash(self):
+        ib_gib = {'ib': 'x', 'data': {'isTjp': True}, 'rel8ns': {'ancestor': ['x^gib']}}
+        self.assertEqual(get_gib(ib_gib), sha256v1(ib_gib))
+
+    def test_with_tjp_appends_tjp_gib(self):
+        ib_gib = {'ib': 'x', 'data': {'n': 1}, 'rel8ns': {'tjp': [f'x^{HASH_B}'], 'past': [f'x^{HASH_B}']}}
+        self.assertEqual(get_gib(ib_gib), f'{sha256v1(ib_gib)}.{HASH_B}')
+        # the most recent tjp wins
+        ib_gib['rel8ns']['tjp'] = [f'x^{HASH_A}', f'x^{HASH_B}']
+        self.assertTrue(get_gib(ib_gib).endswith(f'.{HASH_B}'))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            get_gib({})
+        with self.assertRaises(ValueError):
+            get_gib({'ib': 'x', 'data': {'isTjp': True}, 'rel8ns': {'tjp': []}})
+        with self.assertRaises(ValueError):
+            get_gib({'ib': 'x'}, has_tjp=True)
+
+class TestGetGibInfo(unittest.TestCase):
+    def test_primitive(self):
+        self.assertEqual(get_gib_info(ib_gib_addr='7^gib'), {'is_primitive': True})
+
+    def test_punctiliar_only(self):
+        self.assertEqual(
+            get_gib_info(gib=HASH_A),
+            {'punctiliar_hash': HASH_A, 'pieces_count': 1, 'delimiter': '.'},
+        )
+
+    def test_with_tjp(self):
+        self.assertEqual(
+            get_gib_info(ib_gib_addr=f'comment abc^{HASH_A}.{HASH_B}'),
+            {'punctiliar_hash': HASH_A, 'tjp_gib': HASH_B, 'pieces_count': 2, 'delimiter': '.'},
+        )
+        info = get_gib_info(gib='A.B.C')
+        self.assertEqual((info['punctiliar_hash'], info['tjp_gib'], info['pieces_count']), ('A', 'B.C', 3))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            get_gib_info()
+        with self.assertRaises(ValueError):
+            get_gib_info(gib='A..B')
+
+    def test_many_matches_single(self):
+        addrs = ['7^gib', f'x^{HASH_A}', f'x^{HASH_A}.{HASH_B}', 'y^A.B.C', 'ib^ABC^DEF.GHI']
+        hashes, tjp_gibs, counts = get_gib_info_many(addrs)
+        for i, addr in enumerate(addrs):
+            with self.subTest(addr=addr):
+                info = get_gib_info(ib_gib_addr=addr)
+                self.assertEqual(hashes[i], info.get('punctiliar_hash'))
+                self.assertEqual(tjp_gibs[i], info.get('tjp_gib'))
+                self.assertEqual(counts[i], info.get('pieces_count', 0))
+
+    def test_many_errors(self):
+        for bad in ['x^A.', 'x^.A', 'x^A..B']:
+            with self.subTest(bad=bad):
+                with self.assertRaises(ValueError):
+                    get_gib_info_many(['x^A', bad])
+
+class TestIsPrimitiveIsDna(unittest.TestCase):
+    def test_is_primitive(self):
+        self.assertTrue(is_primitive(ib_gib={'ib': '7', 'gib': 'gib'}))
+        self.assertFalse(is_primitive(gib=HASH_A))
+        self.assertTrue(is_primitive())
+
+    def test_is_dna(self):
+        self.assertTrue(is_dna({'ib': 'mut8', 'rel8ns': {'ancestor': ['mut8^gib']}}))
+        self.assertFalse(is_dna({'ib': 'x', 'rel8ns': {'ancestor': ['x^gib']}}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+# This file makes Python treat the 'tests' directory as a package.
@@ -0,0 +1,54 @@
+import unittest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+
+from src.py_gib.bench.suite import SHAPES, compare_results, run_suite
+from src.py_gib.V1.sha256v1 import sha256v1, SHA256V1_MODE_REFERENCE
+
+def result(name, ops_per_s, peak_memory_bytes=100_000):
+    return {'name': name, 'ops_per_s': ops_per_s, 'peak_memory_bytes': peak_memory_bytes}
+
+class TestBenchSuite(unittest.TestCase):
+    def test_shapes_hash_consistently(self):
+        for name, factory in SHAPES.items():
+            if name == 'large_binary':
+                continue
+            with self.subTest(name):
+                ib_gib = factory()
+                self.assertEqual(sha256v1(ib_gib), sha256v1(ib_gib, mode=SHA256V1_MODE_REFERENCE))
+
+    def test_run_suite_emits_json(self):
+        doc = run_suite(name_filter='tiny_primitive', min_time_s=0.0)
+        names = [r['name'] for r in doc['results']]
+        self.assertIn('sha256v1/tiny_primitive', names)
+        self.assertTrue(all('tiny_primitive' in n for n in names))
+        for r in doc['results']:
+            for key in ('ops_per_s', 'p50_us', 'p99_us', 'bytes_per_s', 'peak_memory_bytes'):
+                self.assertIn(key, r)
+        json.dumps(doc)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'results': [result('a', 100), result('b', 100), result('c', 100), result('gone', 1)]}
+        current = {'results': [result('a', 95), result('b', 80), result('c', 120, 200_000), result('new', 1)]}
+        rows = {row['name']: row for row in compare_results(baseline, current, threshold=0.10)}
+        self.assertEqual(set(rows), {'a', 'b', 'c'})
+        self.assertFalse(rows['a']['regression'])
+        self.assertTrue(rows['b']['regression'])
+        self.assertAlmostEqual(rows['b']['speed_change'], -0.2)
+        self.assertTrue(rows['c']['regression'])  # memory doubled
+
+    def test_compare_ignores_small_memory_growth(self):
+        baseline = {'results': [result('tiny', 100, 1000), result('big', 100, 10_000)]}
+        current = {'results': [result('tiny', 100, 2000), result('big', 100, 20_000)]}
+        rows = {row['name']: row for row in compare_results(baseline, current)}
+        self.assertAlmostEqual(rows['tiny']['memory_change'], 1.0)
+        self.assertFalse(rows['tiny']['regression'])  # +1000 bytes is noise
+        self.assertTrue(rows['big']['regression'])
+        rows = compare_results(baseline, current, memory_floor_bytes=0)
+        self.assertTrue(all(row['regression'] for row in rows))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import hashlib
+import tempfile
+import json
+import sys
+import os
+from collections import deque
+from contextlib import redirect_stderr
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.closure import ClosureStats, _KeySet, iter_closure, main, write_bundle
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.pack_store import PackStore
+from src.py_gib.V1.sha256v1 import sha256v1
+
+def make(ib, **rel8ns):
+    ib_gib = {'ib': ib, 'data': {'name': ib}, 'rel8ns': rel8ns}
+    ib_gib['gib'] = sha256v1(ib_gib)
+    return ib_gib
+
+def addr(ib_gib):
+    return get_ib_gib_addr(ib_gib=ib_gib)
+
+def make_graph():
+    """
+    A 150 frame `past` chain (deeper than the cached frames), a diamond over
+    it and a few primitives and custom rel8ns.
+    """
+    chain = [make('frame 0', ancestor=['frame^gib'])]
+    for i in range(1, 150):
+        chain.append(make(f'frame {i}', past=[addr(chain[-1])], ancestor=['frame^gib']))
+    left = make('left', past=[addr(chain[-1])], tag=['7^gib'])
+    right = make('right', custom=[addr(chain[40])], past=[addr(chain[-1])])
+    top = make('top', custom=[addr(right), addr(left)], ancestor=['top^gib'], dna=[addr(left)])
+    other = make('other', past=[addr(chain[10])])
+    return chain + [left, right, top, other], top
+
+def reachable(by_addr, roots, names=None):
+    found, queue = set(), deque(roots)
+    while queue:
+        a = queue.popleft()
+        if a in found or a not in by_addr:
+            continue
+        found.add(a)
+        for name, addrs in by_addr[a].get('rel8ns', {}).items():
+            if names is None or name in names:
+                queue.extend(addrs)
+    return found
+
+class TestClosure(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ib_gibs, self.top = make_graph()
+        self.by_addr = {addr(x): x for x in self.ib_gibs}
+        self.store = PackStore(os.path.join(self.tmp.name, 'store'))
+        self.store.put_many(self.ib_gibs)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def closure(self, roots, **kwargs):
+        return list(iter_closure(self.store, roots, tmp_dir=self.tmp.name, **kwargs))
+
+    def test_topological_and_deduplicated(self):
+        roots = [addr(self.top), addr(self.ib_gibs[5]), addr(self.top)]
+        expected = None
+        for workers in (1, 3):
+            for batch_size, memory_keys in ((256, 1 << 18), (2, 3)):
+                with self.subTest(workers=workers, batch_size=batch_size, memory_keys=memory_keys):
+                    stats = ClosureStats()
+                    result = self.closure(
+                        roots, workers=workers, batch_size=batch_size, memory_keys=memory_keys, stats=stats,
+                    )
+                    addrs = [a for a, _ in result]
+                    self.assertEqual(len(addrs), len(set(addrs)))
+                    self.assertEqual(set(addrs), reachable(self.by_addr, roots))
+                    position = {a: i for i, a in enumerate(addrs)}
+                    for a, ib_gib in result:
+                        self.assertEqual(ib_gib, self.by_addr[a])
+                        for children in ib_gib['rel8ns'].values():
+                            for child in children:
+                                if child in self.by_addr:
+                                    self.assertLess(position[child], position[a])
+                    self.assertEqual(addrs[0], addr(self.ib_gibs[0]))
+                    self.assertEqual(addrs[-1], addr(self.top))
+                    self.assertEqual((stats.roots, stats.nodes, stats.emitted, stats.missing), (3, 153, 153, 0))
+                    self.assertEqual(stats.primitives, 3)  # frame^gib, 7^gib, top^gib
+                    if expected is None:
+                        expected = addrs
+                    self.assertEqual(addrs, expected)
+        self.assertEqual(os.listdir(self.tmp.name), ['store'])
+
+    def test_rel8n_filter_and_primitives(self):
+        result = self.closure([addr(self.top)], rel8n_names=['custom', 'tag'], include_primitives=True)
+        addrs = [a for a, _ in result]
+        # `custom` lists right, then left; `tag` is only followed from left.
+        self.assertEqual(
+            addrs, [addr(self.ib_gibs[40]), addr(self.ib_gibs[151]), '7^gib', addr(self.ib_gibs[150]), addr(self.top)],
+        )
+        self.assertEqual(dict(result)['7^gib'], {'ib': '7', 'gib': 'gib'})
+        only_past = self.closure([addr(self.ib_gibs[150])], rel8n_names=['past'], include_primitives=True)
+        self.assertEqual(len(only_past), 151)
+        self.assertNotIn('frame^gib', dict(only_past))
+        self.assertEqual(
+            self.closure(['7^gib', 'x^'], include_primitives=True),
+            [('7^gib', {'ib': '7', 'gib': 'gib'}), ('x^', {'ib': 'x', 'gib': 'gib'})],
+        )
+
+    def test_missing(self):
+        orphan = make('orphan', past=['gone^ABC', addr(self.ib_gibs[0])])
+        self.store.put(orphan)
+        stats = ClosureStats()
+        result = self.closure([addr(orphan), 'nope^DEF', 'gone^ABC'], stats=stats)
+        self.assertEqual([a for a, _ in result], [addr(self.ib_gibs[0]), addr(orphan)])
+        self.assertEqual((stats.missing, stats.missing_sample), (2, ['nope^DEF', 'gone^ABC']))
+
+    def test_key_set_spills(self):
+        keys = [hashlib.sha256(str(i).encode()).digest() for i in range(2000)]
+        with tempfile.TemporaryDirectory() as directory:
+            key_set = _KeySet(directory, memory_keys=7)
+            self.assertTrue(all(key_set.add(key) for key in keys[:1000]))
+            self.assertFalse(any(key_set.add(key) for key in keys[:1000]))
+            self.assertEqual(len(key_set), 1000)
+            self.assertTrue(all(key in key_set for key in keys[:1000]))
+            self.assertFalse(any(key in key_set for key in keys[1000:]))
+            self.assertLessEqual(len(os.listdir(directory)), 8)
+            key_set.close()
+            self.assertEqual(os.listdir(directory), [])
+        with self.assertRaises(ValueError):
+            _KeySet('.', memory_keys=0)
+
+    def test_write_bundle_and_main(self):
+        out = StringIO()
+        stats = write_bundle(self.store, [addr(self.top)], out, tmp_dir=self.tmp.name)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), stats.emitted)
+        self.assertEqual(lines[-1], json.dumps(self.top, sort_keys=True, separators=(',', ':')))
+        self.store.close()
+
+        path = os.path.join(self.tmp.name, 'bundle.jsonl')
+        with redirect_stderr(StringIO()) as err:
+            self.assertEqual(main([os.path.join(self.tmp.name, 'store'), addr(self.top), '--out', path]), 0)
+            with open(path) as f:
+                self.assertEqual(f.read().splitlines(), lines)
+            self.assertEqual(main([os.path.join(self.tmp.name, 'store'), 'nope^DEF', '--out', path, '--workers', '1']), 1)
+        self.assertIn('missing nope^DEF', err.getvalue())
+        with self.assertRaises(ValueError):
+            list(iter_closure(self.store, [], batch_size=0))
+
+if __name__ == '__main__':
+    unittest.main()
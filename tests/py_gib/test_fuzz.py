@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib import fuzz
+from src.py_gib.fuzz import failing_checks, generate_case, reference_gib, run_fuzz, shrink
+from src.py_gib.V1.sub_hash_cache import disable_sub_hash_cache, enable_sub_hash_cache, get_sub_hash_cache
+
+def walk(obj):
+    yield obj
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            yield key
+            yield from walk(value)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from walk(item)
+
+class TestFuzz(unittest.TestCase):
+    def test_generate_case_is_deterministic(self):
+        for index in range(50):
+            with self.subTest(index=index):
+                self.assertEqual(repr(generate_case(3, index)), repr(generate_case(3, index)))
+        self.assertNotEqual(repr(generate_case(3, 0)), repr(generate_case(4, 0)))
+
+    def test_generator_covers_edge_cases(self):
+        seen = set()
+        for index in range(2000):
+            ib_gib, salt = generate_case(0, index)
+            data = ib_gib.get('data')
+            if isinstance(data, bytes):
+                seen.add('bytes')
+            if salt:
+                seen.add('salt')
+            if not isinstance(ib_gib['ib'], str):
+                seen.add('non-str ib')
+            for x in walk(data):
+                if x is None:
+                    seen.add('None')
+                elif isinstance(x, float):
+                    seen.add('float')
+                elif isinstance(x, str) and any(ord(c) > 127 for c in x):
+                    seen.add('unicode')
+                elif x == {} or x == []:
+                    seen.add('empty')
+                elif isinstance(x, list) and x and all(isinstance(i, dict) for i in x):
+                    seen.add('list of dicts')
+                elif isinstance(x, dict) and any(isinstance(v, dict) for v in x.values()):
+                    seen.add('nested')
+        self.assertEqual(seen, {'bytes', 'salt', 'non-str ib', 'None', 'float', 'unicode', 'empty', 'list of dicts', 'nested'})
+
+    def test_every_path_matches_reference(self):
+        failures = [f for block in run_fuzz(2000, seed=1, workers=1, block_size=500) for f in block]
+        self.assertEqual(failures, [])
+
+    def test_parallel_run_reports_every_block(self):
+        blocks = list(run_fuzz(250, seed=2, workers=2, block_size=100))
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual([f for block in blocks for f in block], [])
+
+    def test_broken_path_is_caught_and_shrunk(self):
+        def broken(ib_gib, salt):
+            # wrong whenever a float hides anywhere in data
+            gib = reference_gib(ib_gib, salt)
+            return gib.lower() if any(isinstance(x, float) for x in walk(ib_gib.get('data'))) else gib
+
+        checks = {'broken': broken}
+        for index in range(1000):
+            ib_gib, salt = generate_case(5, index)
+            if failing_checks(ib_gib, salt, checks):
+                break
+        else:
+            self.fail('no failing case generated')
+
+        small, small_salt = shrink(ib_gib, salt, lambda x, s: bool(failing_checks(x, s, checks)))
+        self.assertEqual(failing_checks(small, small_salt, checks), ['broken'])
+        self.assertEqual(small_salt, '')
+        self.assertEqual(small['ib'], '')
+        self.assertNotIn('rel8ns', small)
+        # one float left, at the shallowest possible spot, and zeroed
+        self.assertEqual([x for x in walk(small['data']) if isinstance(x, float)], [0.0])
+        self.assertLessEqual(len(repr(small)), len(repr(ib_gib)))
+
+    def test_cached_check_restores_the_cache(self):
+        ib_gib = {'ib': 'ib', 'data': {'x': 1}}
+        fuzz._check_fast_cached(ib_gib, '')
+        self.assertIsNone(get_sub_hash_cache())
+        cache = enable_sub_hash_cache()
+        try:
+            fuzz._check_fast_cached(ib_gib, '')
+            self.assertIs(get_sub_hash_cache(), cache)
+            self.assertEqual(len(cache), 0)
+        finally:
+            disable_sub_hash_cache()
+
+    def test_shrink_keeps_passing_input(self):
+        ib_gib = {'ib': 'x', 'data': {'a': [1, {'b': 'c'}]}}
+        self.assertEqual(shrink(ib_gib, 'salt', lambda x, s: True), ({'ib': ''}, ''))
+        self.assertEqual(shrink(ib_gib, 'salt', lambda x, s: x == ib_gib and s == 'salt'), (ib_gib, 'salt'))
+
+    def test_main_exit_code(self):
+        self.assertEqual(fuzz.main(['--cases', '20', '--workers', '1']), 0)
+
+if __name__ == '__main__':
+    unittest.main()
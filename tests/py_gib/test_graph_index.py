@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.graph_index import GraphIndex
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.mut8 import mut8
+from src.py_gib.V1.transforms.rel8 import rel8
+from src.py_gib.V1.types import IbGib_V1
+
+def addr(ib_gib):
+    return get_ib_gib_addr(ib_gib=ib_gib)
+
+def make_timeline(count, dest_ib='t'):
+    ib_gib = fork(ROOT, dest_ib=dest_ib, tjp={'uuid': True})['new_ib_gib']
+    frames = [ib_gib]
+    for i in range(count - 1):
+        ib_gib = mut8(ib_gib, data_to_add_or_patch={'i': i}, n_counter=True, linked_rel8ns=['past'])['new_ib_gib']
+        frames.append(ib_gib)
+    return frames
+
+class TestGraphIndex(unittest.TestCase):
+    def test_heads_incremental_and_out_of_order(self):
+        frames = make_timeline(6)
+        tjp_addr = addr(frames[0])
+        for order_name, order in [('in order', frames), ('reversed', frames[::-1])]:
+            with self.subTest(order_name):
+                index = GraphIndex()
+                for frame in order:
+                    index.add(frame)
+                self.assertEqual(index.head(tjp_addr), addr(frames[-1]))
+                self.assertEqual(index.heads(tjp_addr), [addr(frames[-1])])
+        index = GraphIndex()
+        index.add_many(frames[:3])
+        self.assertEqual(index.head(tjp_addr), addr(frames[2]))
+        index.add(frames[3])
+        self.assertEqual(index.head(tjp_addr), addr(frames[3]))
+        self.assertIsNone(index.head('nope^gib'))
+
+    def test_branches(self):
+        frames = make_timeline(3)
+        branch = mut8(frames[1], data_to_add_or_patch={'branch': 1}, n_counter=True)['new_ib_gib']
+        index = GraphIndex()
+        index.add_many([*frames, branch])
+        tjp_addr = addr(frames[0])
+        # both have n == 1 but the branch keeps the full past, so it ranks first.
+        self.assertEqual(index.heads(tjp_addr), [addr(branch), addr(frames[2])])
+        self.assertEqual(set(index.timeline(tjp_addr)), {addr(x) for x in [*frames, branch]})
+
+    def test_referrers_rel8d_and_descendants(self):
+        frames = make_timeline(3)
+        other = make_timeline(2, dest_ib='other')
+        tagged = rel8(other[-1], rel8ns_to_add_by_addr={'tag': [addr(frames[1])]})['new_ib_gib']
+        fork_of_frame = fork(frames[1], dest_ib='forked')['new_ib_gib']
+        index = GraphIndex()
+        self.assertEqual(index.add_many([*frames, *other, tagged, fork_of_frame, frames[0]]), 7)
+        self.assertEqual(len(index), 7)
+        self.assertIn(addr(tagged), index)
+        self.assertEqual(index.referrers(addr(frames[1]), 'tag'), [addr(tagged)])
+        self.assertEqual(
+            set(index.referrers(addr(frames[1]))),
+            {addr(frames[2]), addr(tagged), addr(fork_of_frame)},
+        )
+        self.assertEqual(index.rel8d(addr(tagged), 'tag'), [addr(frames[1])])
+        self.assertIn(addr(frames[1]), index.rel8d(addr(tagged)))
+        self.assertEqual(
+            set(index.descendants(addr(frames[0]))),
+            {addr(frames[1]), addr(frames[2]), addr(fork_of_frame)},
+        )
+        self.assertEqual(index.descendants(addr(frames[0]), max_depth=1), [addr(frames[1])])
+
+    def test_accepts_records(self):
+        frames = make_timeline(3)
+        index = GraphIndex()
+        index.add_many(IbGib_V1.from_dict(x) for x in frames)
+        self.assertEqual(index.head(addr(frames[0])), addr(frames[-1]))
+
+if __name__ == '__main__':
+    unittest.main()
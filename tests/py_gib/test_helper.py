@@ -0,0 +1,34 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.helper import get_ib_gib_addr, get_ib_and_gib
+from src.py_gib.V1.constants import ROOT, ROOT_ADDR
+
+class TestGetIbGibAddr(unittest.TestCase):
+    def test_root(self):
+        self.assertEqual(get_ib_gib_addr(ib_gib=ROOT), ROOT_ADDR)
+
+    def test_primitives(self):
+        for ib in ['7', 'foo', 'ibgib', 'wakka doodle']:
+            with self.subTest(ib=ib):
+                self.assertEqual(get_ib_gib_addr(ib_gib={'ib': ib, 'gib': 'gib'}), f'{ib}^gib')
+
+class TestGetIbAndGib(unittest.TestCase):
+    def test_root(self):
+        self.assertEqual(get_ib_and_gib(ib_gib=ROOT), {'ib': 'ib', 'gib': 'gib'})
+        self.assertEqual(get_ib_and_gib(ib_gib_addr=ROOT_ADDR), {'ib': 'ib', 'gib': 'gib'})
+
+    def test_edge_cases(self):
+        self.assertEqual(get_ib_and_gib(ib_gib_addr='7^'), {'ib': '7', 'gib': ''})
+        self.assertEqual(get_ib_and_gib(ib_gib_addr='^ABC'), {'ib': '', 'gib': 'ABC'})
+        self.assertEqual(get_ib_and_gib(ib_gib_addr='ib^ABC123^gib'), {'ib': 'ib^ABC123', 'gib': 'gib'})
+
+    def test_requires_addr_or_ibgib(self):
+        with self.assertRaises(ValueError):
+            get_ib_and_gib()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import contextlib
+import json
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.ingest import BloomFilter, BoundedSeenSet, buffered, ingest_jsonl, main
+from src.py_gib.pack_store import PackStore
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.mut8 import mut8
+from src.py_gib.V1.validate_helper import validate_ib_gib_intrinsically
+
+def make_frames(count):
+    ib_gib = fork(ROOT, dest_ib='c', tjp={'uuid': True})['new_ib_gib']
+    frames = [ib_gib]
+    for i in range(count - 1):
+        ib_gib = mut8(ib_gib, data_to_add_or_patch={'i': i}, n_counter=True, linked_rel8ns=['past'])['new_ib_gib']
+        frames.append(ib_gib)
+    return frames
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.frames = make_frames(50)
+        self.dump = os.path.join(self.dir.name, 'dump.jsonl')
+        bad = dict(self.frames[3], data={'tampered': True})
+        with open(self.dump, 'w') as f:
+            for ib_gib in self.frames + self.frames[:10]:
+                f.write(json.dumps(ib_gib) + '\n')
+            f.write('\n')
+            f.write('{not json\n')
+            f.write(json.dumps(bad) + '\n')
+            f.write(json.dumps({'ib': 'no gib', 'data': {'a': 1}}) + '\n')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_dedupes_skips_invalid_and_fills_missing_gibs(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                batches = []
+                invalid = []
+                report = ingest_jsonl(
+                    [self.dump], batches.append, workers=workers, batch_size=7, queue_size=2,
+                    on_invalid=invalid.append,
+                )
+                stored = [ib_gib for batch in batches for ib_gib in batch]
+                self.assertTrue(all(len(batch) <= 7 for batch in batches))
+                self.assertEqual([x['gib'] for x in stored[:50]], [x['gib'] for x in self.frames])
+                self.assertEqual(stored[-1]['ib'], 'no gib')
+                self.assertIsNone(validate_ib_gib_intrinsically(stored[-1]))
+                self.assertEqual([item.source.rsplit(':', 1)[1] for item in invalid], ['62', '63'])
+                self.assertEqual((report.read, report.stored, report.duplicates, report.invalid), (63, 51, 10, 2))
+                self.assertEqual([s['name'] for s in report.stages], ['read', 'hash', 'dedupe', 'sink'])
+                self.assertEqual([s['items'] for s in report.stages], [63, 63, 51, 51])
+                self.assertTrue(all(s['busy_s'] >= 0 for s in report.stages))
+
+    def test_into_pack_store(self):
+        with PackStore(os.path.join(self.dir.name, 'store')) as store:
+            report = ingest_jsonl([self.dump], store.put_many, workers=1, on_invalid=lambda item: None)
+            self.assertEqual(len(store), report.stored)
+            self.assertEqual(store.get(get_ib_gib_addr(ib_gib=self.frames[-1])), self.frames[-1])
+
+    def test_malformed_lines_are_invalid(self):
+        path = os.path.join(self.dir.name, 'malformed.jsonl')
+        with open(path, 'w') as f:
+            f.write('{"ib":"a","rel8ns":"x"}\n')
+            f.write('{"ib":"a","gib":5}\n')
+            f.write('{"ib":"a","rel8ns":{"past":[1]}}\n')
+            f.write(json.dumps(self.frames[0]) + '\n')
+        invalid = []
+        stored = []
+        report = ingest_jsonl([path], stored.extend, workers=1, on_invalid=invalid.append)
+        self.assertEqual((report.read, report.stored, report.invalid), (4, 1, 3))
+        self.assertEqual(invalid[0].errors, ['rel8ns is not an object of address lists'])
+        self.assertEqual(invalid[1].errors, ['gib is not a string'])
+        self.assertEqual(stored, [self.frames[0]])
+        with open(os.devnull, 'w') as null, contextlib.redirect_stderr(null):
+            self.assertEqual(main([path, '--store', os.path.join(self.dir.name, 'store'), '--workers', '1']), 1)
+
+    def test_sink_errors_propagate(self):
+        def sink(batch):
+            raise RuntimeError('disk full')
+        with self.assertRaises(RuntimeError):
+            ingest_jsonl([self.dump], sink, workers=1, on_invalid=lambda item: None)
+
+class TestBuffered(unittest.TestCase):
+    def test_backpressure_bounds_read_ahead(self):
+        produced = []
+
+        def producer():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        consumed = 0
+        for _ in buffered(producer(), maxsize=3):
+            consumed += 1
+            time.sleep(0.005)
+            # queue holds 3, plus one item waiting to be put
+            self.assertLessEqual(len(produced) - consumed, 4)
+        self.assertEqual(consumed, 100)
+
+    def test_errors_reach_consumer_and_close_stops_thread(self):
+        def failing():
+            yield 1
+            raise ValueError('boom')
+        with self.assertRaises(ValueError):
+            list(buffered(failing()))
+
+        gen = buffered(iter(range(10 ** 9)), maxsize=2)
+        self.assertEqual(next(gen), 0)
+        gen.close()
+
+class TestSeen(unittest.TestCase):
+    def test_bounded_seen_set(self):
+        seen = BoundedSeenSet(maxsize=2)
+        self.assertEqual([seen.add(x) for x in 'aab'], [True, False, True])
+        seen.add('a')  # refreshes a
+        seen.add('c')  # evicts b
+        self.assertEqual((len(seen), 'a' in seen, 'b' in seen), (2, True, False))
+        with self.assertRaises(ValueError):
+            BoundedSeenSet(0)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(capacity=10000, error_rate=0.01)
+        addrs = [f'x^{i:064X}' for i in range(10000)]
+        added = sum(bloom.add(addr) for addr in addrs)
+        self.assertGreater(added, 9800)
+        self.assertTrue(all(addr in bloom for addr in addrs))
+        self.assertFalse(any(bloom.add(addr) for addr in addrs))
+        false_positives = sum(f'y^{i:064X}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+if __name__ == '__main__':
+    unittest.main()
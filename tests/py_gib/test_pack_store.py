@@ -0,0 +1,140 @@
+import unittest
+from unittest import mock
+import hashlib
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.pack_store import PackStore, INDEX_FILENAME, PACK_FILENAME
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.mut8 import mut8
+
+def make_timeline(count):
+    ib_gib = fork(ROOT, dest_ib='t', tjp={'uuid': True})['new_ib_gib']
+    ib_gibs = [ib_gib]
+    for i in range(count - 1):
+        ib_gib = mut8(ib_gib, data_to_add_or_patch={'i': i}, linked_rel8ns=['past'])['new_ib_gib']
+        ib_gibs.append(ib_gib)
+    return ib_gibs
+
+class TestPackStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_put_get_before_and_after_flush(self):
+        ib_gibs = make_timeline(50)
+        addrs = [get_ib_gib_addr(ib_gib=x) for x in ib_gibs]
+        with PackStore(self.path, auto_flush=None) as store:
+            self.assertEqual(store.put_many(ib_gibs[:30]), addrs[:30])
+            self.assertEqual(store.get(addrs[0]), ib_gibs[0])  # pending
+            store.flush()
+            store.put_many(ib_gibs[30:])
+            self.assertEqual(len(store), 50)
+            self.assertEqual(store.get_many(addrs[::-1]), ib_gibs[::-1])
+        with PackStore(self.path, verify_on_read=True) as store:
+            self.assertEqual(len(store), 50)
+            self.assertEqual(store.get_many(addrs), ib_gibs)
+            self.assertIsNone(store.get('t^' + 'A' * 64))
+
+    def test_contains_many_and_duplicates(self):
+        ib_gibs = make_timeline(5)
+        with PackStore(self.path, auto_flush=2) as store:
+            store.put_many(ib_gibs[:3])
+            size = os.path.getsize(os.path.join(self.path, PACK_FILENAME))
+            store.put_many(ib_gibs[:3])  # already stored, nothing appended
+            self.assertEqual(os.path.getsize(os.path.join(self.path, PACK_FILENAME)), size)
+            self.assertEqual(len(store), 3)
+            addrs = [get_ib_gib_addr(ib_gib=x) for x in ib_gibs]
+            self.assertEqual(store.contains_many(addrs), [True, True, True, False, False])
+            self.assertIn(addrs[0], store)
+
+    def test_rejects_invalid_on_write(self):
+        ib_gib = dict(make_timeline(1)[0], gib='A' * 64)
+        with PackStore(self.path) as store:
+            with self.assertRaises(ValueError):
+                store.put_many([make_timeline(1)[0], ib_gib])
+            self.assertEqual(len(store), 0)
+
+    def test_unflushed_tail_recovered_and_torn_record_dropped(self):
+        ib_gibs = make_timeline(10)
+        store = PackStore(self.path, auto_flush=None)
+        store.put_many(ib_gibs[:5])
+        store.flush()
+        store.put_many(ib_gibs[5:])
+        store._pack.close()  # simulate a crash: no flush of the index
+        with open(os.path.join(self.path, PACK_FILENAME), 'ab') as f:
+            f.write(b'\x00\x00\x00\x05')  # torn record header
+        with PackStore(self.path) as store:
+            self.assertEqual(len(store), 10)
+            self.assertEqual(store.get_many([get_ib_gib_addr(ib_gib=x) for x in ib_gibs]), ib_gibs)
+
+    def test_bad_index_closes_files(self):
+        for index in (b'\x00', b'\x00' * 64):
+            with self.subTest(size=len(index)):
+                with open(os.path.join(self.path, INDEX_FILENAME), 'wb') as f:
+                    f.write(index)
+                opened = []
+                def recording_open(*args, **kwargs):
+                    opened.append(open(*args, **kwargs))
+                    return opened[-1]
+                with mock.patch('src.py_gib.pack_store.open', recording_open, create=True):
+                    with self.assertRaises(ValueError):
+                        PackStore(self.path)
+                self.assertEqual(len(opened), 2)
+                self.assertTrue(all(f.closed for f in opened))
+
+    def test_verify_on_read_detects_corruption(self):
+        ib_gib = make_timeline(1)[0]
+        addr = get_ib_gib_addr(ib_gib=ib_gib)
+        with PackStore(self.path) as store:
+            store.put(ib_gib)
+        pack_path = os.path.join(self.path, PACK_FILENAME)
+        with open(pack_path, 'rb') as f:
+            raw = f.read()
+        with open(pack_path, 'wb') as f:
+            f.write(raw.replace(b'"uuid":"', b'"uuid":"X', 1)[:-1])
+        with PackStore(self.path, verify_on_read=True) as store:
+            with self.assertRaises(ValueError):
+                store.get(addr)
+
+    def test_keys_and_get_by_keys(self):
+        ib_gibs = make_timeline(40)
+        addrs = [get_ib_gib_addr(ib_gib=x) for x in ib_gibs]
+        digests = sorted(hashlib.sha256(addr.encode('utf-8')).digest() for addr in addrs)
+        with PackStore(self.path, auto_flush=None) as store:
+            store.put_many(ib_gibs[:25])
+            store.flush()
+            store.put_many(ib_gibs[25:])  # half indexed, half pending
+            self.assertEqual(store.keys(), digests)
+            self.assertEqual(store.keys(digests[10], digests[30]), digests[10:30])
+            self.assertEqual(store.keys(digests[39] + b'\0'), [])
+            found = store.get_by_keys([digests[5], digests[5], bytes(32), digests[20]])
+            self.assertEqual(
+                sorted(hashlib.sha256(addr.encode('utf-8')).digest() for addr, _ in found),
+                [digests[5], digests[20]],
+            )
+            for addr, ib_gib in found:
+                self.assertEqual(ib_gib, ib_gibs[addrs.index(addr)])
+
+    def test_iter_records_resumes(self):
+        ib_gibs = make_timeline(10)
+        addrs = [get_ib_gib_addr(ib_gib=x) for x in ib_gibs]
+        with PackStore(self.path) as store:
+            store.put_many(ib_gibs[:4])
+            records = list(store.iter_records())
+            self.assertEqual([(addr, ib_gib) for _, addr, ib_gib in records], list(zip(addrs[:4], ib_gibs[:4])))
+            self.assertEqual(list(store.iter_records(records[-1][0])), [])
+            store.put_many(ib_gibs[4:])
+            self.assertEqual([addr for _, addr, _ in store.iter_records(records[1][0])], addrs[2:])
+            self.assertEqual(list(store.iter_ib_gibs()), list(zip(addrs, ib_gibs)))
+
+if __name__ == '__main__':
+    unittest.main()
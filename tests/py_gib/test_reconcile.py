@@ -0,0 +1,143 @@
+import unittest
+import contextlib
+import socket
+import tempfile
+import threading
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.pack_store import PackStore
+from src.py_gib.reconcile import (
+    LocalTransport, MerkleTree, ReconcileServer, SocketTransport,
+    make_tcp_server, main, reconcile, serve_connection, tree_depth,
+)
+from src.py_gib.V1.factory import Factory_V1
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.mut8 import mut8
+
+def primitives(start, stop):
+    return Factory_V1.primitives([f'p{i}' for i in range(start, stop)])
+
+def addrs_of(store):
+    return sorted(addr for addr, _ in store.iter_ib_gibs())
+
+class TestReconcile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.stack = contextlib.ExitStack()
+        self.local = self.stack.enter_context(PackStore(os.path.join(self.tmp.name, 'local'), auto_flush=None))
+        self.remote = self.stack.enter_context(PackStore(os.path.join(self.tmp.name, 'remote'), auto_flush=None))
+
+    def tearDown(self):
+        self.stack.close()
+        self.tmp.cleanup()
+
+    def test_tree_depth(self):
+        self.assertEqual(tree_depth(0), 0)
+        self.assertEqual(tree_depth(64), 0)
+        self.assertEqual(tree_depth(65), 1)
+        self.assertEqual(tree_depth(16 * 64 + 1), 2)
+        self.assertEqual(tree_depth(10 ** 30), 16)
+        with self.assertRaises(ValueError):
+            tree_depth(1, leaf_size=0)
+
+    def test_tree_ignores_flushes_and_put_order(self):
+        ib_gibs = primitives(0, 500)
+        self.local.put_many(ib_gibs[:300])
+        self.local.flush()
+        self.local.put_many(ib_gibs[300:])
+        self.remote.put_many(ib_gibs[::-1])
+        for depth in (0, 1, 2, 3):
+            with self.subTest(depth=depth):
+                local, remote = MerkleTree.build(self.local.keys, depth), MerkleTree.build(self.remote.keys, depth)
+                self.assertEqual(local.root, remote.root)
+                self.assertEqual(local.root[1], 500)
+        self.remote.put(Factory_V1.primitive('extra'))
+        self.assertNotEqual(MerkleTree.build(self.local.keys, 2).root, MerkleTree.build(self.remote.keys, 2).root)
+
+    def test_reconcile_both_ways(self):
+        expected = sorted(get_ib_gib_addr(ib_gib=x) for x in primitives(0, 1500))
+        for leaf_size in (1, 8, 64, 10000):
+            with self.subTest(leaf_size=leaf_size), contextlib.ExitStack() as stack:
+                local = stack.enter_context(PackStore(os.path.join(self.tmp.name, f'local{leaf_size}')))
+                remote = stack.enter_context(PackStore(os.path.join(self.tmp.name, f'remote{leaf_size}')))
+                local.put_many(primitives(0, 1200))
+                local.flush()
+                remote.put_many(primitives(400, 1500))
+                server = ReconcileServer(remote, allow_push=True)
+                report = reconcile(local, LocalTransport(server), push=True, leaf_size=leaf_size)
+                self.assertEqual((report.local_only, report.remote_only), (400, 300))
+                self.assertEqual((report.pushed, report.fetched), (400, 300))
+                self.assertEqual(addrs_of(local), expected)
+                self.assertEqual(addrs_of(remote), expected)
+                # in sync: the roots match on the first round trip.
+                again = reconcile(local, LocalTransport(server), push=True, leaf_size=leaf_size)
+                self.assertEqual((again.round_trips, again.local_only, again.remote_only), (1, 0, 0))
+
+    def test_few_differences_are_cheap(self):
+        ib_gibs = primitives(0, 5000)
+        self.local.put_many(ib_gibs)
+        self.remote.put_many(ib_gibs)
+        missing = fork(ROOT, dest_ib='late', tjp={'uuid': True})['new_ib_gib']
+        missing = [missing, mut8(missing, data_to_add_or_patch={'a': 1})['new_ib_gib']]
+        self.remote.put_many(missing)
+        transport = LocalTransport(ReconcileServer(self.remote))
+        report = reconcile(self.local, transport, leaf_size=16)
+        self.assertEqual(report.depth, tree_depth(5002, 16))
+        self.assertEqual((report.remote_only, report.fetched, report.local_only, report.pushed), (2, 2, 0, 0))
+        # hello, at most one step per level, one fetch.
+        self.assertLessEqual(report.round_trips, report.depth + 3)
+        # far less than the 5000 digests a full listing would send.
+        self.assertLess(report.bytes_received, 5000 * 32)
+        self.assertEqual(self.local.get_many([get_ib_gib_addr(ib_gib=x) for x in missing]), missing)
+
+    def test_socket_transport(self):
+        self.local.put_many(primitives(0, 50))
+        self.remote.put_many(primitives(25, 100))
+        server = ReconcileServer(self.remote)
+        client_sock, server_sock = socket.socketpair()
+        thread = threading.Thread(target=serve_connection, args=(server, server_sock))
+        thread.start()
+        with SocketTransport(client_sock) as transport:
+            report = reconcile(self.local, transport, batch_size=10, leaf_size=4)
+            self.assertEqual((report.fetched, report.local_only), (50, 25))
+            with self.assertRaises(ValueError):
+                reconcile(self.local, transport, push=True)  # push not allowed
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(self.local), 100)
+        self.assertEqual(len(self.remote), 75)
+
+    def test_tcp_server_and_cli(self):
+        self.remote.put_many(primitives(0, 30))
+        self.remote.flush()
+        tcp_server = make_tcp_server(ReconcileServer(self.remote, allow_push=True), port=0)
+        thread = threading.Thread(target=tcp_server.serve_forever)
+        thread.start()
+        try:
+            host, port = tcp_server.server_address
+            path = os.path.join(self.tmp.name, 'cli')
+            with PackStore(path) as store:
+                store.put_many(primitives(20, 40))
+            self.assertEqual(main(['sync', path, f'{host}:{port}', '--push']), 0)
+            with PackStore(path) as store:
+                self.assertEqual(len(store), 40)
+            self.assertEqual(len(self.remote), 40)
+        finally:
+            tcp_server.shutdown()
+            tcp_server.server_close()
+            thread.join()
+
+    def test_bad_requests(self):
+        server = ReconcileServer(self.remote)
+        self.assertIn(b'error', server.handle_bytes(b'{"op":"nope"}'))
+        self.assertIn(b'error', server.handle_bytes(b'not json'))
+        with self.assertRaises(ValueError):
+            LocalTransport(server).request({'op': 'hello', 'version': 0, 'count': 0, 'leaf_size': 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.pack_store import PackStore
+from src.py_gib.timeline_verify import (
+    TimelineCheckpoint, TimelineScan, find_timelines, main, verify_timeline, verify_timelines,
+)
+from src.py_gib.V1.constants import ROOT
+from src.py_gib.V1.transforms.fork import fork
+from src.py_gib.V1.transforms.mut8 import mut8
+
+def addr(ib_gib):
+    return get_ib_gib_addr(ib_gib=ib_gib)
+
+def make_timeline(count, dest_ib='t', linked=True):
+    ib_gib = fork(ROOT, dest_ib=dest_ib, tjp={'uuid': True})['new_ib_gib']
+    frames = [ib_gib]
+    for i in range(count - 1):
+        ib_gib = extend(ib_gib, i, linked)
+        frames.append(ib_gib)
+    return frames
+
+def extend(ib_gib, i, linked=True):
+    return mut8(
+        ib_gib, data_to_add_or_patch={'i': i}, n_counter=True, linked_rel8ns=['past'] if linked else None,
+    )['new_ib_gib']
+
+class TestTimelineVerify(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.dir.name, 'store')
+        self.ckpt_path = os.path.join(self.dir.name, 'ckpt.json')
+        self.linked = make_timeline(10, 'linked', linked=True)
+        self.full = make_timeline(10, 'full', linked=False)
+        self.other = make_timeline(3, 'other')
+        with PackStore(self.store_path) as store:
+            store.put_many(self.linked + self.full + self.other)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def timelines(self):
+        with PackStore(self.store_path) as store:
+            return find_timelines(ib_gib for _, ib_gib in store.iter_ib_gibs())
+
+    def test_find_timelines(self):
+        self.assertEqual(self.timelines(), {
+            addr(frames[0]): [addr(frames[-1])] for frames in (self.linked, self.full, self.other)
+        })
+
+    def test_out_of_order_frames_are_not_heads(self):
+        # later frames stored before earlier ones, in a linked and a full past
+        ib_gibs = self.linked[6:] + self.linked[:6] + self.full[::-1]
+        store = {addr(x): x for x in ib_gibs}
+        expected = {addr(frames[0]): [addr(frames[-1])] for frames in (self.linked, self.full)}
+        self.assertEqual(find_timelines(ib_gibs, store=store), expected)
+        self.assertNotEqual(find_timelines(ib_gibs), expected)
+
+    def test_scan_resumes_from_offset(self):
+        checkpoint = TimelineCheckpoint(self.ckpt_path)
+        with PackStore(self.store_path) as store:
+            self.assertEqual(checkpoint.update_scan(store), 23)
+        checkpoint.save()
+        self.assertEqual(checkpoint.scan.timelines(), self.timelines())
+
+        new_frames = [extend(self.linked[-1], 100)]
+        new_frames.append(extend(self.full[-1], 100, linked=False))
+        with PackStore(self.store_path) as store:
+            store.put_many(new_frames)
+        checkpoint = TimelineCheckpoint(self.ckpt_path)
+        with PackStore(self.store_path) as store:
+            self.assertEqual(checkpoint.update_scan(store), 2)
+            self.assertEqual(checkpoint.update_scan(store), 0)
+        self.assertEqual(checkpoint.scan.timelines(), self.timelines())
+        self.assertEqual(checkpoint.scan.timelines()[addr(self.full[0])], [addr(new_frames[-1])])
+
+        # a scan past the end of the pack is from another store: start over.
+        with PackStore(self.store_path) as store:
+            scan = TimelineScan(offset=1 << 40, heads={'x^gib': {'x^gib': (0, 0)}})
+            self.assertEqual(scan.update(store), 25)
+        self.assertEqual(scan.timelines(), self.timelines())
+
+    def test_verifies_and_resumes_from_checkpoint(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                if os.path.exists(self.ckpt_path):
+                    os.remove(self.ckpt_path)
+                results = list(verify_timelines(
+                    self.store_path, self.timelines(), TimelineCheckpoint(self.ckpt_path), workers=workers,
+                ))
+                self.assertEqual(sorted(r.verified for r in results), [3, 10, 10])
+                self.assertTrue(all(not r.errors for r in results))
+
+                # nothing changed: nothing to do
+                results = list(verify_timelines(self.store_path, self.timelines(), TimelineCheckpoint(self.ckpt_path)))
+                self.assertEqual(results, [])
+
+        # grow two timelines: only the new frames are verified
+        new_linked = [extend(self.linked[-1], 100)]
+        new_linked.append(extend(new_linked[-1], 101))
+        new_full = [extend(self.full[-1], 100, linked=False)]
+        with PackStore(self.store_path) as store:
+            store.put_many(new_linked + new_full)
+        checkpoint = TimelineCheckpoint(self.ckpt_path)
+        results = {r.tjp_addr: r for r in verify_timelines(self.store_path, self.timelines(), checkpoint, workers=1)}
+        self.assertEqual(set(results), {addr(self.linked[0]), addr(self.full[0])})
+        self.assertEqual(results[addr(self.linked[0])].verified, 2)
+        self.assertEqual(results[addr(self.full[0])].verified, 1)
+        self.assertEqual(TimelineCheckpoint(self.ckpt_path).timelines[addr(self.linked[0])],
+                         {'heads': [addr(new_linked[-1])], 'frames': 12})
+
+    def test_reports_missing_invalid_and_foreign_frames(self):
+        store = {addr(x): x for x in self.linked}
+        result = verify_timeline(store, addr(self.linked[0]), [addr(self.linked[-1])])
+        self.assertEqual((result.verified, result.errors), (10, []))
+
+        missing = dict(store)
+        del missing[addr(self.linked[4])]
+        result = verify_timeline(missing, addr(self.linked[0]), [addr(self.linked[-1])])
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn('is missing (past of', result.errors[0])
+
+        tampered = dict(store)
+        tampered[addr(self.linked[4])] = dict(self.linked[4], data={'i': 'changed'})
+        result = verify_timeline(tampered, addr(self.linked[0]), [addr(self.linked[-1])])
+        self.assertTrue(result.errors and result.errors[0].startswith(addr(self.linked[4])))
+
+        # a frame of another timeline spliced into the past chain
+        foreign = dict(store)
+        foreign[addr(self.other[1])] = self.other[1]
+        result = verify_timeline(foreign, addr(self.linked[0]), [addr(self.other[1])])
+        self.assertTrue(any('not a frame of timeline' in error for error in result.errors))
+
+    def test_failed_timeline_is_not_checkpointed(self):
+        checkpoint = TimelineCheckpoint(self.ckpt_path)
+        result = verify_timeline({}, 'x^gib', ['x^gib'])
+        checkpoint.update(result)
+        checkpoint.save()
+        self.assertFalse(os.path.exists(self.ckpt_path))
+
+    def test_main(self):
+        self.assertEqual(main([self.store_path, '--workers', '1', '--quiet']), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.store_path, 'timelines.ckpt')))
+        self.assertEqual(main([self.store_path, '--workers', '1', '--quiet']), 0)
+
+if __name__ == '__main__':
+    unittest.main()
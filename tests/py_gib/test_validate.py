@@ -0,0 +1,95 @@
+import unittest
+import unittest.mock
+import contextlib
+import io
+import json
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.V1.transforms.transform_helper import get_gib
+from src.py_gib.V1.v1_helper import has_tjp
+from src.py_gib.validate import iter_sources, validate_many, main
+
+def make_ib_gibs(count: int) -> list:
+    ib_gibs = []
+    for i in range(count):
+        ib_gib = {'ib': f'item {i}', 'data': {'i': i}, 'rel8ns': {'ancestor': ['item^gib']}}
+        ib_gib['gib'] = get_gib(ib_gib)
+        ib_gibs.append(ib_gib)
+    return ib_gibs
+
+class TestValidate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.ib_gibs = make_ib_gibs(20)
+        self.ib_gibs[3]['data'] = {'i': 'tampered'}
+        self.jsonl_path = os.path.join(self.tmp.name, 'dump.jsonl')
+        with open(self.jsonl_path, 'w') as f:
+            for ib_gib in self.ib_gibs:
+                f.write(json.dumps(ib_gib) + '\n')
+            f.write('\n{not json\n')
+
+    def test_validate_many_jsonl(self):
+        results = list(validate_many(iter_sources([self.jsonl_path]), workers=1))
+        self.assertEqual(len(results), 21)
+        invalid = [r for r in results if r.errors]
+        self.assertEqual([r.source for r in invalid], [f'{self.jsonl_path}:4', f'{self.jsonl_path}:22'])
+        self.assertIsNone(invalid[1].addr)
+
+    def test_validate_many_pool_matches_in_process(self):
+        sources = list(iter_sources([self.jsonl_path]))
+        in_process = list(validate_many(sources, workers=1))
+        pooled = list(validate_many(sources, workers=2, chunk_size=4, min_parallel=8))
+        self.assertEqual(pooled, in_process)
+
+    def test_directory_source(self):
+        directory = os.path.join(self.tmp.name, 'ibgibs')
+        os.makedirs(os.path.join(directory, 'nested'))
+        for i, ib_gib in enumerate(self.ib_gibs[:5]):
+            sub = 'nested' if i % 2 else ''
+            with open(os.path.join(directory, sub, f'{i}.json'), 'w') as f:
+                json.dump(ib_gib, f)
+        results = list(validate_many(iter_sources([directory]), workers=1))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(sum(1 for r in results if r.errors), 1)
+
+    def test_malformed_ibgibs_are_invalid(self):
+        gib = get_gib({'ib': 'a'})
+        lines = [
+            {'ib': 'a', 'gib': gib, 'rel8ns': 'x'},
+            {'ib': 'a', 'gib': gib, 'rel8ns': {'past': 'a^gib'}},
+            {'ib': 'a', 'gib': 5},
+            {'ib': ['a'], 'gib': gib},
+            [1, 2],
+            {'ib': 'a', 'gib': gib},
+        ]
+        sources = [(str(i), json.dumps(x).encode()) for i, x in enumerate(lines)]
+        results = list(validate_many(sources, workers=1))
+        self.assertEqual([bool(r.errors) for r in results], [True] * 5 + [False])
+        self.assertEqual(results[0].errors, ['rel8ns is not an object of address lists'])
+        self.assertEqual(results[2].errors, ['gib is not a string'])
+        self.assertEqual(results[-1].addr, f'a^{gib}')
+        self.assertFalse(has_tjp(lines[0]))
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            stdin = io.TextIOWrapper(io.BytesIO(b''.join(raw + b'\n' for _, raw in sources)))
+            with unittest.mock.patch('sys.stdin', stdin):
+                self.assertEqual(main(['-', '--workers', '1']), 1)
+        self.assertIn('validated 6 ibgibs (5 invalid)', stderr.getvalue())
+
+    def test_main_exit_code_and_summary(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exit_code = main([self.jsonl_path, '--workers', '1'])
+        self.assertEqual(exit_code, 1)
+        self.assertIn('dump.jsonl:4', stdout.getvalue())
+        self.assertIn('validated 21 ibgibs (2 invalid)', stderr.getvalue())
+        self.assertIn('ibgibs/s', stderr.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import collections
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.py_gib.graph_index import GraphIndex
+from src.py_gib.helper import get_ib_gib_addr
+from src.py_gib.V1.binary_encoding import IbGibRecordView
+from src.py_gib.V1.validate_helper import validate_ib_gib_intrinsically
+from src.py_gib.workload import WorkloadShape, generate, generate_timeline, main, timeline_tjp
+
+SHAPE = WorkloadShape(timelines=30, max_frames=20, shared=10, dna=0.5, binary_fraction=0.1, max_binary_bytes=256)
+
+def addr(ib_gib):
+    return get_ib_gib_addr(ib_gib=ib_gib)
+
+class TestWorkload(unittest.TestCase):
+    def test_every_ibgib_is_valid_and_shapes_are_mixed(self):
+        ib_gibs = list(generate(SHAPE, seed=1, workers=1))
+        for ib_gib in ib_gibs:
+            self.assertIsNone(validate_ib_gib_intrinsically(ib_gib), ib_gib)
+        kinds = collections.Counter(x['ib'].split(' ')[0] for x in ib_gibs)
+        for kind in ('tag', 'bin', 'mut8', 'rel8', 'fork'):
+            self.assertIn(kind, kinds)
+        self.assertTrue(any(isinstance(x.get('data'), bytes) for x in ib_gibs))
+        rel8n_names = {name for x in ib_gibs for name in (x.get('rel8ns') or {})}
+        self.assertTrue({'past', 'tjp', 'dna', 'ancestor', 'tag', 'link', 'pic'} <= rel8n_names)
+
+    def test_timelines_are_well_formed(self):
+        index = GraphIndex()
+        ib_gibs = list(generate(SHAPE, seed=2, workers=1))
+        index.add_many(ib_gibs)
+        self.assertEqual(len(index.tjp_addrs()), SHAPE.timelines)
+        for i in range(SHAPE.timelines):
+            timeline = generate_timeline(SHAPE, 2, i)
+            tjp_addr = addr(timeline_tjp(SHAPE, 2, i)[0])
+            last = [x for x in timeline if x['ib'].endswith(f' {i}')][-1]
+            self.assertEqual(index.head(tjp_addr), addr(last))
+
+    def test_deterministic(self):
+        first = [addr(x) for x in generate(SHAPE, seed=3, workers=1)]
+        self.assertEqual([addr(x) for x in generate(SHAPE, seed=3, workers=2, chunk_size=4)], first)
+        self.assertNotEqual([addr(x) for x in generate(SHAPE, seed=4, workers=1)], first)
+
+    def test_main_writes_records(self):
+        with tempfile.TemporaryDirectory() as dir_name:
+            path = os.path.join(dir_name, 'corpus.ibr')
+            self.assertEqual(main(['--output', path, '--timelines', '3', '--shared', '2', '--workers', '1']), 0)
+            with open(path, 'rb') as f:
+                buffer = f.read()
+            offset = count = 0
+            while offset < len(buffer):
+                view = IbGibRecordView(buffer, offset)
+                self.assertIsNone(validate_ib_gib_intrinsically(view.to_ib_gib()))
+                offset += view.nbytes
+                count += 1
+            self.assertEqual(count, len(list(generate(WorkloadShape(timelines=3, shared=2), workers=1))))
+            with self.assertRaises(SystemExit):
+                main(['--output', path, '--format', 'jsonl'])
+
+if __name__ == '__main__':
+    unittest.main()